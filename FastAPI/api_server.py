@@ -7,19 +7,25 @@ Conecta el frontend con el agente brain_agent.
 
 Endpoints principales:
 - POST /api/reservation-requests: Procesa conversación
+- POST /api/reservation-requests/stream: Igual, con progreso por SSE
 - GET /health: Health check
+- GET /api/metrics/llm: Uso de tokens y aciertos de caché del LLM
+- GET /api/metrics/cache: Aciertos/fallos de las cachés de APIs
+- GET /api/photo/{path}: Proxy cacheado de fotos de Google Places
 """
 
 import sys
 from pathlib import Path
-from fastapi import FastAPI, HTTPException, Header
+from fastapi import FastAPI, HTTPException, Header, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import Response
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel, Field
 from typing import Optional, List, Any, Dict
 from datetime import datetime
-import requests
 import os
+import httpx
+import uuid
+import json
 
 # Path setup
 ROOT_DIR = Path(__file__).parent.parent
@@ -29,7 +35,21 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # Importar el agente
-from agent.graph import run_agent
+from agent.graph import arun_agent, astream_agent, has_session
+from backend.llm_clients import get_llm_usage_stats
+from backend.cache import cache_stats
+from backend.place_catalog import get_place_catalog
+from backend.query_similarity import query_similarity_stats
+from backend.photo_cache import cache_headers as photo_cache_headers
+from backend.photo_cache import get_photo_cache, photo_cache_key
+from backend.photo_transcode import atranscode as atranscode_photo
+from backend.photo_transcode import clamp_size as clamp_photo_size
+from backend.photo_transcode import normalize_format as normalize_photo_format
+from backend import http_client
+
+# Tamaño por defecto con el que se piden las fotos a Google (?w=&h= lo cambian)
+PHOTO_WIDTH = 400
+PHOTO_HEIGHT = 300
 
 
 # ==================== MODELOS ====================
@@ -41,10 +61,19 @@ class Message(BaseModel):
 
 
 class AgentRequest(BaseModel):
-    """Request con historial completo (stateless)"""
+    """
+    Request de un turno de conversación.
+
+    Con session_id el servidor recuerda el historial y el knowledge,
+    así que basta con enviar el mensaje nuevo (incremental=True).
+    """
     session_id: Optional[str] = Field(None, description="ID de sesión")
     user_id: Optional[str] = Field("anonymous", description="ID del usuario")
-    messages: List[Message] = Field(..., description="Historial completo")
+    messages: List[Message] = Field(..., description="Mensajes nuevos o historial completo")
+    incremental: bool = Field(
+        False,
+        description="True si messages solo contiene los mensajes nuevos del turno"
+    )
     session_context: Dict[str, Any] = Field(
         default_factory=dict,
         description="Contexto adicional (ignorado por ahora)"
@@ -108,6 +137,11 @@ def extract_restaurants_from_knowledge(knowledge: Dict) -> List[Dict]:
     return restaurants
 
 
+def _new_session_id() -> str:
+    """Genera un session_id único (el store de sesiones se indexa por él)."""
+    return f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+
+
 def determine_status(response: str, knowledge: Dict) -> str:
     """Determina el status basado en la respuesta y knowledge."""
     response_lower = response.lower()
@@ -134,7 +168,8 @@ async def process_request(request: AgentRequest):
     """
     Endpoint principal para interactuar con el agente.
     
-    Recibe historial completo y devuelve respuesta.
+    Recibe los mensajes del turno (o el historial completo) y devuelve
+    respuesta. El estado del agente se guarda por session_id entre turnos.
     """
     
     print("\n" + "=" * 60)
@@ -144,6 +179,18 @@ async def process_request(request: AgentRequest):
     print(f"📨 Mensajes: {len(request.messages)}")
     print("=" * 60 + "\n")
     
+    # Generar session_id si no existe
+    session_id = request.session_id or _new_session_id()
+
+    # El cliente solo envió lo nuevo pero la sesión ya no existe (TTL/reinicio):
+    # pedirle que reenvíe el historial completo
+    if request.incremental and not has_session(session_id):
+        return AgentResponse(
+            status="session_expired",
+            message="La sesión ha caducado. Reenvía el historial completo.",
+            session_id=session_id
+        )
+    
     try:
         # Convertir mensajes al formato del agente
         messages = [
@@ -151,8 +198,8 @@ async def process_request(request: AgentRequest):
             for msg in request.messages
         ]
         
-        # Ejecutar agente
-        result = run_agent(messages)
+        # Ejecutar agente (async: no bloquea el event loop del worker)
+        result = await arun_agent(messages, session_id=session_id)
         
         response_text = result.get("response", "")
         knowledge = result.get("knowledge", {})
@@ -163,9 +210,6 @@ async def process_request(request: AgentRequest):
         # Determinar status
         status = determine_status(response_text, knowledge)
         
-        # Generar session_id si no existe
-        session_id = request.session_id or f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-        
         print(f"\n✓ Respuesta generada")
         print(f"   Status: {status}")
         print(f"   Restaurantes: {len(restaurants)}")
@@ -185,10 +229,86 @@ async def process_request(request: AgentRequest):
         return AgentResponse(
             status="error",
             message=f"Error procesando la solicitud: {str(e)}",
-            session_id=request.session_id
+            session_id=session_id
         )
 
 
+@app.post("/api/reservation-requests/stream")
+async def process_request_stream(request: AgentRequest):
+    """
+    Igual que /api/reservation-requests pero emite Server-Sent Events
+    con el progreso del agente (decisiones, herramientas, lugares) y
+    termina con un evento "final" con el mismo contenido que AgentResponse.
+    """
+    session_id = request.session_id or _new_session_id()
+    messages = [{"role": msg.role, "content": msg.content} for msg in request.messages]
+
+    async def event_stream():
+        if request.incremental and not has_session(session_id):
+            yield _sse_event({
+                "type": "final",
+                **AgentResponse(
+                    status="session_expired",
+                    message="La sesión ha caducado. Reenvía el historial completo.",
+                    session_id=session_id
+                ).model_dump()
+            })
+            return
+
+        try:
+            async for event in astream_agent(messages, session_id=session_id):
+                if event["type"] == "places":
+                    event = {
+                        "type": "places",
+                        "restaurants": extract_restaurants_from_knowledge(
+                            {"places": event["places"]}
+                        ),
+                    }
+                elif event["type"] == "final":
+                    event = _final_event(event, session_id)
+                yield _sse_event(event)
+
+        except Exception as e:
+            print(f"❌ Error: {str(e)}")
+            yield _sse_event({
+                "type": "final",
+                **AgentResponse(
+                    status="error",
+                    message=f"Error procesando la solicitud: {str(e)}",
+                    session_id=session_id
+                ).model_dump()
+            })
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def _final_event(result: Dict, session_id: str) -> Dict:
+    """Convierte el resultado del agente en el evento final (AgentResponse)."""
+    response_text = result.get("response", "")
+    knowledge = result.get("knowledge", {})
+    restaurants = extract_restaurants_from_knowledge(knowledge)
+
+    return {
+        "type": "final",
+        **AgentResponse(
+            status=determine_status(response_text, knowledge),
+            message=response_text,
+            session_id=session_id,
+            restaurants=restaurants if restaurants else None
+        ).model_dump()
+    }
+
+
+def _sse_event(event: Dict) -> str:
+    """Formatea un evento como mensaje Server-Sent Events."""
+    data = json.dumps(event, ensure_ascii=False, default=str)
+    return f"event: {event['type']}\ndata: {data}\n\n"
+
+
 @app.post("/api/agent/continue", response_model=AgentResponse)
 async def continue_conversation(request: AgentRequest):
     """Alias de /api/reservation-requests"""
@@ -214,8 +334,31 @@ async def health():
     }
 
 
+@app.get("/api/metrics/llm")
+async def llm_metrics():
+    """Tokens de entrada cacheados vs. no cacheados por llamada al LLM."""
+    return get_llm_usage_stats()
+
+
+@app.get("/api/metrics/cache")
+async def cache_metrics():
+    """Aciertos y fallos de las cachés de APIs externas (geocoding, fotos, etc.)."""
+    return {
+        **cache_stats(),
+        "photos": get_photo_cache().stats(),
+        "place_catalog": get_place_catalog().stats(),
+        "query_similarity": query_similarity_stats(),
+    }
+
+
 @app.get("/api/photo/{path:path}")
-async def get_photo(path: str):
+async def get_photo(
+    path: str,
+    w: Optional[int] = Query(None, description="Ancho máximo en píxeles"),
+    h: Optional[int] = Query(None, description="Alto máximo en píxeles"),
+    image_format: Optional[str] = Query(None, alias="format", description="webp, avif o jpeg"),
+    if_none_match: Optional[str] = Header(None),
+):
     """
     Endpoint proxy para obtener fotos de Google Places API.
 
@@ -223,12 +366,92 @@ async def get_photo(path: str):
     por lo que no se pueden cargar directamente desde el navegador.
     Este endpoint actúa como proxy seguro.
 
+    Las fotos se cachean en memoria y disco (backend/photo_cache.py) y se
+    sirven con Cache-Control/ETag, así el navegador no las vuelve a pedir
+    y un If-None-Match que coincide recibe un 304 sin cuerpo.
+
+    Con ?w=&h=&format=webp|avif se sirve una miniatura recodificada
+    (backend/photo_transcode.py), también cacheada por variante.
+
     Args:
         path: El photo_name completo, ej: "places/ChIJ.../photos/..."
+        w, h: Tamaño máximo (por defecto 400x300)
+        image_format: Formato de salida; sin él (o sin Pillow) el original
 
     Returns:
-        La imagen en formato JPEG
+        La imagen en formato JPEG (o el formato pedido)
     """
+    width = clamp_photo_size(w, PHOTO_WIDTH)
+    height = clamp_photo_size(h, PHOTO_HEIGHT)
+    image_format = normalize_photo_format(image_format)
+    key = photo_cache_key(path, width, height, image_format)
+    headers = photo_cache_headers(key)
+
+    if if_none_match and if_none_match == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+
+    cache = get_photo_cache()
+    cached = await cache.aget(key)
+    if cached is not None:
+        data, content_type = cached
+        return Response(content=data, media_type=content_type, headers=headers)
+
+    if image_format:
+        return await _transcoded_photo(path, width, height, image_format)
+
+    response = await _open_google_photo(path, width, height)
+    content_type = response.headers.get("Content-Type", "image/jpeg")
+
+    async def relay():
+        # Reenvía los bytes según llegan y guarda la foto completa al final
+        chunks = []
+        try:
+            async for chunk in response.aiter_bytes():
+                chunks.append(chunk)
+                yield chunk
+            await cache.aset(key, b"".join(chunks), content_type)
+        finally:
+            await response.aclose()
+
+    return StreamingResponse(relay(), media_type=content_type, headers=headers)
+
+
+async def _transcoded_photo(path: str, width: int, height: int, image_format: str) -> Response:
+    """Miniatura recodificada a partir del original (cacheado o de Google)."""
+    cache = get_photo_cache()
+    source_key = photo_cache_key(path, width, height)
+
+    source = await cache.aget(source_key)
+    if source is None:
+        response = await _open_google_photo(path, width, height)
+        try:
+            data = await response.aread()
+        finally:
+            await response.aclose()
+        source = (data, response.headers.get("Content-Type", "image/jpeg"))
+        await cache.aset(source_key, *source)
+
+    transcoded = await atranscode_photo(source[0], width, height, image_format)
+    if transcoded is None:
+        # No se pudo convertir: se sirve el original
+        return Response(
+            content=source[0], media_type=source[1], headers=photo_cache_headers(source_key)
+        )
+
+    key = photo_cache_key(path, width, height, image_format)
+    await cache.aset(key, *transcoded)
+    return Response(
+        content=transcoded[0], media_type=transcoded[1], headers=photo_cache_headers(key)
+    )
+
+
+async def _open_google_photo(path: str, width: int, height: int):
+    """
+    Abre en streaming la foto de Google Places.
+
+    Los errores se traducen a HTTPException (504 timeout, 502 red, etc.).
+    """
+    response = None
     try:
         # Obtener API key del entorno
         google_api_key = os.getenv("GOOGLE_MAPS_API_KEY")
@@ -238,34 +461,41 @@ async def get_photo(path: str):
         # Construir URL de la API de Google Places
         photo_url = f"https://places.googleapis.com/v1/{path}/media"
         params = {
-            "maxWidthPx": 400,
-            "maxHeightPx": 300,
+            "maxWidthPx": width,
+            "maxHeightPx": height,
             "key": google_api_key
         }
 
-        # Hacer request a Google Places API
-        response = requests.get(photo_url, params=params, timeout=10)
+        # Abrir la respuesta de Google en streaming
+        response = await http_client.aopen_stream(
+            photo_url, service="google_photos", params=params
+        )
 
-        if response.status_code == 200:
-            # Devolver la imagen con el content-type correcto
-            return Response(
-                content=response.content,
-                media_type=response.headers.get("Content-Type", "image/jpeg")
-            )
-        else:
+        if response.status_code != 200:
+            body = await response.aread()
             raise HTTPException(
                 status_code=response.status_code,
-                detail=f"Error obteniendo foto de Google: {response.text}"
+                detail=f"Error obteniendo foto de Google: {body.decode('utf-8', 'replace')}"
             )
 
-    except requests.exceptions.Timeout:
+        return response
+
+    except httpx.TimeoutException:
+        await _close_response(response)
         raise HTTPException(status_code=504, detail="Timeout obteniendo foto")
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
+        await _close_response(response)
         raise HTTPException(status_code=502, detail=f"Error de red: {str(e)}")
     except Exception as e:
+        await _close_response(response)
         raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
 
 
+async def _close_response(response):
+    if response is not None:
+        await response.aclose()
+
+
 # ==================== MAIN ====================
 
 if __name__ == "__main__":
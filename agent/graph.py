@@ -7,18 +7,34 @@ Implementa el bucle ReAct con nodos explícitos:
 - brain: LLM decide qué hacer
 - execute: Ejecuta la herramienta
 - respond: Envía respuesta al usuario
+
+Hay dos variantes del grafo: síncrona (run_agent) y async (arun_agent),
+que comparten la lógica de decisión y de actualización del conocimiento.
+
+El brain tiene dos modos (BRAIN_MODE):
+- text: el LLM escribe THOUGHT/ACTION/ACTION_INPUT y se parsea con regex
+- tools: las herramientas se enlazan como funciones nativas (bind_tools)
+  y la decisión llega ya estructurada en tool_calls
+
+En ambos modos el brain puede pedir varias acciones independientes en
+una misma iteración; execute las ejecuta en paralelo y combina sus
+observaciones y su conocimiento.
 """
 
-from typing import Literal
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, List, Literal, Optional
+import asyncio
 from langgraph.graph import StateGraph, END
-from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, AIMessage
 import json
+import os
 import re
 
 from agent.state import AgentState, create_initial_state
-from agent.prompts import format_prompt
-from agent.tools import execute_tool, TOOLS_MAP
+from agent.prompts import format_prompt_messages
+from agent.tools import execute_tool, aexecute_tool, TOOLS_MAP, ToolContext
+from agent.session_store import get_session_store, serialize_messages, merge_history
+from backend.llm_clients import get_chat_model, record_llm_usage
 
 # Config
 from config.settings import load_config
@@ -26,6 +42,29 @@ config = load_config()
 
 # Constantes
 MAX_ITERATIONS = 10
+BRAIN_MODE = os.getenv("BRAIN_MODE", "text").lower()  # text | tools
+MAX_PARALLEL_ACTIONS = int(os.getenv("MAX_PARALLEL_ACTIONS", "4"))
+
+# Herramientas de solo lectura que pueden ir en paralelo. Las demás
+# (check_availability depende de maps_search, reservas, llamadas,
+# calendario) se ejecutan después y en orden.
+PARALLEL_SAFE_TOOLS = {"web_search", "maps_search"}
+
+# Pseudo-herramienta para responder al usuario en modo tools
+RESPOND_TOOL = {
+    "type": "function",
+    "function": {
+        "name": "respond",
+        "description": "Responde al usuario: contesta sus preguntas o pide la información que falta.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "message": {"type": "string", "description": "Tu respuesta al usuario"}
+            },
+            "required": ["message"],
+        },
+    },
+}
 
 
 # ===========================================================
@@ -34,13 +73,34 @@ MAX_ITERATIONS = 10
 
 
 def get_llm():
-    return ChatOpenAI(
-        model=config["MODEL_NAME"],
-        temperature=config["TEMPERATURE"],
-        openai_api_key=config["OPENAI_API_KEY"],
+    # Instancia compartida: reutiliza las conexiones entre iteraciones
+    return get_chat_model(
+        config["MODEL_NAME"],
+        config["TEMPERATURE"],
+        api_key=config["OPENAI_API_KEY"],
     )
 
 
+_bound_llm = None  # (llm, llm con herramientas enlazadas)
+
+
+def get_brain_llm():
+    """LLM del brain según BRAIN_MODE (en modo tools, con las herramientas enlazadas)."""
+    global _bound_llm
+    llm = get_llm()
+    if BRAIN_MODE != "tools":
+        return llm
+
+    if _bound_llm is None or _bound_llm[0] is not llm:
+        bound = llm.bind_tools(
+            list(TOOLS_MAP.values()) + [RESPOND_TOOL],
+            tool_choice="required",
+            parallel_tool_calls=MAX_PARALLEL_ACTIONS > 1,
+        )
+        _bound_llm = (llm, bound)
+    return _bound_llm[1]
+
+
 # ===========================================================
 # FORMATEO DE CONTEXTO
 # ===========================================================
@@ -176,9 +236,81 @@ def parse_llm_response(text: str) -> dict:
         if result["action"] != "respond":
             result["action_input"] = {}
 
+    # Varias acciones independientes (ACTIONS: [...])
+    actions = _parse_actions_list(text)
+    if actions:
+        result["action"] = actions[0]["tool"]
+        result["action_input"] = actions[0]["args"]
+        result["actions"] = actions
+
+    return result
+
+
+def _parse_actions_list(text: str) -> list:
+    """Extrae la lista de ACTIONS: [{"action": ..., "action_input": {...}}, ...]."""
+    match = re.search(r"ACTIONS:\s*(\[)", text, re.IGNORECASE)
+    if not match:
+        return []
+
+    try:
+        items, _ = json.JSONDecoder().raw_decode(text[match.start(1):])
+    except json.JSONDecodeError:
+        return []
+
+    actions = []
+    for item in items if isinstance(items, list) else []:
+        if isinstance(item, dict) and item.get("action"):
+            args = item.get("action_input")
+            actions.append({
+                "tool": str(item["action"]).strip().lower(),
+                "args": args if isinstance(args, dict) else {},
+            })
+    return actions
+
+
+def parse_tool_calls(response) -> dict:
+    """Extrae la decisión de una respuesta con tool_calls (modo tools)."""
+    content = response.content if isinstance(response.content, str) else ""
+    tool_calls = getattr(response, "tool_calls", None) or []
+
+    if not tool_calls:
+        invalid = getattr(response, "invalid_tool_calls", None) or []
+        if invalid or not content.strip():
+            # JSON de argumentos roto (LangChain lo deja en invalid_tool_calls)
+            # o respuesta vacía: se devuelve al brain como observación
+            names = ", ".join(call.get("name") or "?" for call in invalid)
+            error = (
+                f"ERROR: Los argumentos de {names} no eran JSON válido. "
+                if invalid
+                else "ERROR: La respuesta estaba vacía. "
+            )
+            return {
+                "thought": content.strip(),
+                "action": None,
+                "action_input": {},
+                "error": error + "Repite la acción con argumentos JSON válidos o responde al usuario.",
+            }
+        # Sin llamada a función: el texto es la respuesta al usuario
+        return {"thought": "", "action": "respond", "action_input": {"message": content}}
+
+    actions = [{"tool": call["name"], "args": call.get("args") or {}} for call in tool_calls]
+    result = {
+        "thought": content.strip(),
+        "action": actions[0]["tool"],
+        "action_input": actions[0]["args"],
+    }
+    if len(actions) > 1:
+        result["actions"] = actions
     return result
 
 
+def parse_brain_response(response) -> dict:
+    """Parsea la respuesta del brain según BRAIN_MODE."""
+    if BRAIN_MODE == "tools":
+        return parse_tool_calls(response)
+    return parse_llm_response(response.content)
+
+
 # ===========================================================
 # NODO: BRAIN (LLM decide)
 # ===========================================================
@@ -188,35 +320,84 @@ def brain_node(state: AgentState) -> AgentState:
     """El LLM analiza la situación y decide qué hacer."""
     print(f"\n🧠 [BRAIN] Iteración {state.get('iterations', 0)}")
 
-    llm = get_llm()
+    llm = get_brain_llm()
+    prompt = _build_brain_prompt(state)
 
-    # Formatear contexto para el prompt
+    # Llamar al LLM
+    print("   Pensando...")
+    response = llm.invoke(prompt)
+    _log_usage(response)
+
+    return _apply_decision(state, parse_brain_response(response))
+
+
+async def abrain_node(state: AgentState) -> AgentState:
+    """Versión async de brain_node (usa llm.ainvoke)."""
+    print(f"\n🧠 [BRAIN] Iteración {state.get('iterations', 0)}")
+
+    llm = get_brain_llm()
+    prompt = _build_brain_prompt(state)
+
+    print("   Pensando...")
+    response = await llm.ainvoke(prompt)
+    _log_usage(response)
+
+    return _apply_decision(state, parse_brain_response(response))
+
+
+def _build_brain_prompt(state: AgentState) -> list:
+    """Formatea el estado en mensajes: system estático + contexto dinámico."""
     conversation = format_conversation(state.get("messages", []))
     knowledge = format_knowledge(state.get("knowledge", {}))
     last_obs = state.get("last_observation") or "Ninguna (inicio de conversación)"
 
-    # Construir prompt completo
-    prompt = format_prompt(conversation, knowledge, last_obs)
+    mode = "tools" if BRAIN_MODE == "tools" else "text"
+    return format_prompt_messages(conversation, knowledge, last_obs, mode=mode)
 
-    # Llamar al LLM
-    print("   Pensando...")
-    response = llm.invoke([HumanMessage(content=prompt)])
-    output = response.content
 
-    # Parsear respuesta
-    parsed = parse_llm_response(output)
+def _log_usage(response):
+    """Registra los tokens de entrada cacheados vs. no cacheados."""
+    usage = record_llm_usage(response, source="brain")
+    if usage:
+        print(
+            f"   📊 Tokens entrada: {usage['input_tokens']} "
+            f"({usage['cached_tokens']} cacheados)"
+        )
+
+
+def _apply_decision(state: AgentState, parsed: dict) -> AgentState:
+    """Actualiza el estado con la decisión ya parseada del LLM."""
 
     print(
         f"   💭 Thought: {parsed['thought'][:80]}..."
         if parsed["thought"]
         else "   💭 (sin thought)"
     )
+    if parsed.get("error"):
+        # Decisión ilegible: otra iteración del brain con el error como observación
+        print(f"   ⚠️ {parsed['error']}")
+        state["next_tool"] = None
+        state["tool_args"] = {}
+        state["pending_actions"] = None
+        state["last_observation"] = parsed["error"]
+        state["iterations"] = state.get("iterations", 0) + 1
+        state["status"] = "thinking"
+        return state
+
+    actions = _normalize_actions(parsed.get("actions") or [])
+    if actions:
+        parsed["action"] = actions[0]["tool"]
+        parsed["action_input"] = actions[0]["args"]
+
     print(f"   🎯 Action: {parsed['action']}")
     print(f"   📥 Args: {parsed['action_input']}")
+    for extra in actions[1:]:
+        print(f"   ➕ Action: {extra['tool']} {extra['args']}")
 
     # Actualizar estado
     state["next_tool"] = parsed["action"]
     state["tool_args"] = parsed["action_input"]
+    state["pending_actions"] = actions if len(actions) > 1 else None
     state["iterations"] = state.get("iterations", 0) + 1
 
     # Si es respond, ir directamente a responder (no es una herramienta real)
@@ -228,6 +409,25 @@ def brain_node(state: AgentState) -> AgentState:
     return state
 
 
+def _normalize_actions(actions: list) -> list:
+    """
+    Limpia la lista de acciones múltiples.
+
+    respond solo tiene sentido sola: si viene junto a herramientas se
+    descarta (el brain responderá en la siguiente iteración). Se
+    eliminan duplicados y se limita a MAX_PARALLEL_ACTIONS.
+    """
+    tools = [a for a in actions if a["tool"] != "respond"]
+    if not tools:
+        return actions[:1]
+
+    unique = []
+    for action in tools:
+        if action not in unique:
+            unique.append(action)
+    return unique[:MAX_PARALLEL_ACTIONS]
+
+
 # ===========================================================
 # NODO: EXECUTE (Ejecuta herramienta)
 # ===========================================================
@@ -246,9 +446,111 @@ def execute_node(state: AgentState) -> AgentState:
         state["status"] = "responding"
         return state
 
-    # Ejecutar herramienta
-    result = execute_tool(tool_name, tool_args)
+    actions = state.get("pending_actions")
+    if actions:
+        return _execute_actions(state, actions)
+
+    # Ejecutar herramienta (con el contexto de la sesión)
+    result = execute_tool(tool_name, tool_args, context=state.get("tool_context"))
+
+    return _apply_observation(state, tool_name, tool_args, result)
+
+
+async def aexecute_node(state: AgentState) -> AgentState:
+    """Versión async de execute_node (usa aexecute_tool)."""
+    tool_name = state.get("next_tool")
+    tool_args = state.get("tool_args", {})
+
+    print(f"\n⚡ [EXECUTE] {tool_name}")
+
+    if tool_name == "respond":
+        state["status"] = "responding"
+        return state
+
+    actions = state.get("pending_actions")
+    if actions:
+        return await _aexecute_actions(state, actions)
+
+    result = await aexecute_tool(
+        tool_name, tool_args, context=state.get("tool_context")
+    )
+
+    return _apply_observation(state, tool_name, tool_args, result)
+
+
+def _split_actions(actions: list):
+    """
+    Separa las acciones que pueden ir en paralelo de las que van en orden.
+
+    Solo un maps_search por tanda: comparte los resultados en el ToolContext.
+    """
+    parallel, sequential = [], []
+    for action in actions:
+        is_duplicate_maps = action["tool"] == "maps_search" and any(
+            a["tool"] == "maps_search" for a in parallel
+        )
+        if action["tool"] in PARALLEL_SAFE_TOOLS and not is_duplicate_maps:
+            parallel.append(action)
+        else:
+            sequential.append(action)
+    return parallel, sequential
+
+
+def _execute_actions(state: AgentState, actions: list) -> AgentState:
+    """Ejecuta varias acciones: las independientes a la vez, el resto en orden."""
+    context = state.get("tool_context")
+    parallel, sequential = _split_actions(actions)
+    print(f"   🔀 {len(parallel)} en paralelo, {len(sequential)} en orden")
+
+    results = []
+    if parallel:
+        with ThreadPoolExecutor(max_workers=len(parallel)) as executor:
+            futures = [
+                executor.submit(execute_tool, a["tool"], a["args"], context=context)
+                for a in parallel
+            ]
+            results = [future.result() for future in futures]
+
+    for action in sequential:
+        results.append(execute_tool(action["tool"], action["args"], context=context))
 
+    return _apply_observations(state, parallel + sequential, results)
+
+
+async def _aexecute_actions(state: AgentState, actions: list) -> AgentState:
+    """Versión async de _execute_actions (asyncio.gather)."""
+    context = state.get("tool_context")
+    parallel, sequential = _split_actions(actions)
+    print(f"   🔀 {len(parallel)} en paralelo, {len(sequential)} en orden")
+
+    results = list(await asyncio.gather(*[
+        aexecute_tool(a["tool"], a["args"], context=context) for a in parallel
+    ]))
+
+    for action in sequential:
+        results.append(
+            await aexecute_tool(action["tool"], action["args"], context=context)
+        )
+
+    return _apply_observations(state, parallel + sequential, results)
+
+
+def _apply_observations(state: AgentState, actions: list, results: list) -> AgentState:
+    """Aplica cada resultado al conocimiento y combina las observaciones."""
+    for action, result in zip(actions, results):
+        print(f"   🔧 {action['tool']}")
+        _apply_observation(state, action["tool"], action["args"], result)
+
+    state["last_observation"] = "\n\n".join(
+        f"[{action['tool']}] {result}" for action, result in zip(actions, results)
+    )
+    return state
+
+
+def _apply_observation(
+    state: AgentState, tool_name: str, tool_args: dict, result: str
+) -> AgentState:
+    """Guarda el resultado de la herramienta y actualiza el conocimiento."""
     print(
         f"   📤 Resultado: {result[:100]}..."
         if len(str(result)) > 100
@@ -257,18 +559,19 @@ def execute_node(state: AgentState) -> AgentState:
 
     # Actualizar conocimiento según la herramienta
     knowledge = state.get("knowledge", {})
+    tool_context = state.get("tool_context")
 
     if tool_name == "maps_search" and "ERROR" not in result:
         # Guardar lugares encontrados
         from agent.tools import get_search_results
 
-        knowledge["places"] = get_search_results()
+        knowledge["places"] = get_search_results(tool_context)
 
     elif tool_name == "check_availability" and "ERROR" not in result:
         # Actualizar disponibilidad en places
         from agent.tools import get_search_results
 
-        knowledge["places"] = get_search_results()
+        knowledge["places"] = get_search_results(tool_context)
 
     elif tool_name == "make_booking" and "confirmada" in result.lower():
         # Guardar la reserva confirmada
@@ -394,13 +697,23 @@ def should_continue(state: AgentState) -> Literal["execute", "respond", "brain",
 
 def create_graph():
     """Crea y compila el grafo del agente."""
+    return _build_graph(brain_node, execute_node)
+
+
+def create_async_graph():
+    """Crea el grafo con nodos async (para ejecutar con ainvoke)."""
+    return _build_graph(abrain_node, aexecute_node)
+
+
+def _build_graph(brain, execute):
+    """Construye el grafo ReAct con los nodos brain/execute indicados."""
 
     # Crear grafo
     workflow = StateGraph(AgentState)
 
     # Añadir nodos
-    workflow.add_node("brain", brain_node)
-    workflow.add_node("execute", execute_node)
+    workflow.add_node("brain", brain)
+    workflow.add_node("execute", execute)
     workflow.add_node("respond", respond_node)
 
     # Definir flujo
@@ -428,6 +741,7 @@ def create_graph():
 # ===========================================================
 
 _graph = None
+_async_graph = None
 
 
 def get_graph():
@@ -438,19 +752,192 @@ def get_graph():
     return _graph
 
 
-def run_agent(messages: list) -> dict:
+def get_async_graph():
+    """Obtiene el grafo async (singleton)."""
+    global _async_graph
+    if _async_graph is None:
+        _async_graph = create_async_graph()
+    return _async_graph
+
+
+def run_agent(messages: list, session_id: Optional[str] = None) -> dict:
     """
     Ejecuta el agente.
 
     Args:
         messages: Lista de mensajes [{"role": "user/assistant", "content": "..."}]
+        session_id: Si se indica, se retoma el knowledge y el historial
+            guardados de esa sesión (basta con enviar el mensaje nuevo).
 
     Returns:
         {"response": str, "messages": list, "knowledge": dict}
     """
     graph = get_graph()
 
-    # Convertir mensajes
+    # Estado inicial
+    initial_state = _prepare_initial_state(messages, session_id)
+
+    # Ejecutar grafo
+    print("\n" + "=" * 50)
+    print("🚀 AGENTE ReAct")
+    print("=" * 50)
+
+    final_state = graph.invoke(initial_state)
+
+    _save_session(session_id, final_state)
+    return _build_result(final_state)
+
+
+async def arun_agent(messages: list, session_id: Optional[str] = None) -> dict:
+    """
+    Ejecuta el agente de forma asíncrona (graph.ainvoke).
+
+    Mismos argumentos y resultado que run_agent, pero las llamadas al LLM
+    y a las herramientas no bloquean el event loop.
+    """
+    graph = get_async_graph()
+
+    initial_state = _prepare_initial_state(messages, session_id)
+
+    print("\n" + "=" * 50)
+    print("🚀 AGENTE ReAct (async)")
+    print("=" * 50)
+
+    final_state = await graph.ainvoke(initial_state)
+
+    _save_session(session_id, final_state)
+    return _build_result(final_state)
+
+
+async def astream_agent(
+    messages: list, session_id: Optional[str] = None
+) -> AsyncIterator[dict]:
+    """
+    Ejecuta el agente emitiendo eventos de progreso por nodo del grafo.
+
+    Eventos (dicts con "type"):
+    - decision: el brain ha decidido una acción
+    - tool_started / tool_finished: ejecución de una herramienta
+    - places: lugares encontrados (en cuanto maps_search termina)
+    - final: respuesta final, con el mismo contenido que arun_agent
+    """
+    graph = get_async_graph()
+
+    initial_state = _prepare_initial_state(messages, session_id)
+    final_state = initial_state
+
+    print("\n" + "=" * 50)
+    print("🚀 AGENTE ReAct (streaming)")
+    print("=" * 50)
+
+    async for mode, chunk in graph.astream(
+        initial_state, stream_mode=["updates", "values"]
+    ):
+        if mode == "values":
+            final_state = chunk
+            continue
+
+        for node, update in chunk.items():
+            for event in _node_events(node, update):
+                yield event
+
+    _save_session(session_id, final_state)
+    yield {"type": "final", **_build_result(final_state)}
+
+
+def _node_events(node: str, update: dict) -> List[dict]:
+    """Traduce la actualización de un nodo a eventos de progreso."""
+    if not update:
+        return []
+
+    actions = update.get("pending_actions") or [
+        {"tool": update.get("next_tool"), "args": update.get("tool_args") or {}}
+    ]
+
+    if node == "brain":
+        action = update.get("next_tool")
+        events = [
+            {
+                "type": "decision",
+                "iteration": update.get("iterations", 0),
+                "action": action,
+                "args": update.get("tool_args") or {},
+                "actions": actions,
+            }
+        ]
+        # Sin herramienta (p. ej. error al parsear la decisión) no hay tool_started
+        events.extend(
+            {"type": "tool_started", "tool": a["tool"], "args": a["args"]}
+            for a in actions
+            if a.get("tool") and a["tool"] != "respond"
+        )
+        return events
+
+    if node == "execute" and update.get("status") == "thinking":
+        observation = str(update.get("last_observation") or "")
+        events = [
+            {
+                "type": "tool_finished",
+                "tool": a["tool"],
+                "ok": "ERROR" not in observation,
+                "result": observation[:300],
+            }
+            for a in actions
+            if a.get("tool")
+        ]
+        places = (update.get("knowledge") or {}).get("places")
+        if places and any(
+            a["tool"] in ("maps_search", "check_availability") for a in actions
+        ):
+            events.append({"type": "places", "places": places})
+        return events
+
+    return []
+
+
+def _prepare_initial_state(messages: list, session_id: Optional[str]) -> dict:
+    """Crea el estado inicial, retomando la sesión guardada si existe."""
+    session = get_session_store().get(session_id) if session_id else None
+
+    if not session:
+        return create_initial_state(
+            _to_lc_messages(messages), tool_context=ToolContext()
+        )
+
+    print(f"♻️  Sesión {session_id} retomada")
+    history = merge_history(session.get("messages", []), messages)
+    knowledge = session.get("knowledge") or {}
+    return create_initial_state(
+        _to_lc_messages(history),
+        knowledge=knowledge,
+        last_observation=session.get("last_observation"),
+        # Las herramientas retoman los lugares ya encontrados en la sesión
+        tool_context=ToolContext(search_results=knowledge.get("places")),
+    )
+
+
+def _save_session(session_id: Optional[str], final_state: dict):
+    """Guarda knowledge, última observación e historial de la sesión."""
+    if not session_id:
+        return
+
+    get_session_store().save(
+        session_id,
+        {
+            "messages": serialize_messages(final_state.get("messages", [])),
+            "knowledge": final_state.get("knowledge", {}),
+            "last_observation": final_state.get("last_observation"),
+        },
+    )
+
+
+def has_session(session_id: Optional[str]) -> bool:
+    """Indica si hay una sesión guardada (y vigente) para session_id."""
+    return bool(session_id) and get_session_store().get(session_id) is not None
+
+
+def _to_lc_messages(messages: list) -> list:
+    """Convierte mensajes en formato dict a mensajes de LangChain."""
     lc_messages = []
     for m in messages:
         if isinstance(m, dict):
@@ -460,18 +947,11 @@ def run_agent(messages: list) -> dict:
                 lc_messages.append(AIMessage(content=m["content"]))
         else:
             lc_messages.append(m)
+    return lc_messages
 
-    # Estado inicial
-    initial_state = create_initial_state(lc_messages)
-
-    # Ejecutar grafo
-    print("\n" + "=" * 50)
-    print("🚀 AGENTE ReAct")
-    print("=" * 50)
-
-    final_state = graph.invoke(initial_state)
 
-    # Extraer respuesta
+def _build_result(final_state: dict) -> dict:
+    """Extrae la respuesta final del estado del grafo."""
     response = ""
     for msg in reversed(final_state.get("messages", [])):
         if isinstance(msg, AIMessage):
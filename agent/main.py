@@ -6,6 +6,7 @@ MAIN - Punto de Entrada del Agente
 
 import sys
 import os
+import uuid
 from pathlib import Path
 
 # Path setup
@@ -15,7 +16,6 @@ sys.path.insert(0, str(root))
 from config.settings import load_config
 
 from agent.graph import run_agent
-from agent.tools import clear_search_results
 from backend.call_service import PUBLIC_URL, start_service
 
 config = load_config()
@@ -41,6 +41,8 @@ def main():
     print("Comandos: 'exit', 'reset'\n")
 
     messages = []
+    # La sesión conserva los lugares encontrados entre turnos
+    session_id = f"cli_{uuid.uuid4().hex[:8]}"
 
     while True:
         try:
@@ -58,7 +60,7 @@ def main():
 
         if user_input.lower() == "reset":
             messages = []
-            clear_search_results()
+            session_id = f"cli_{uuid.uuid4().hex[:8]}"
             print("🔄 Conversación reiniciada\n")
             continue
 
@@ -66,7 +68,7 @@ def main():
         messages.append({"role": "user", "content": user_input})
 
         try:
-            result = run_agent(messages)
+            result = run_agent(messages, session_id=session_id)
             response = result["response"]
             print(f"\n🤖 Agente: {response}\n")
 
@@ -8,11 +8,26 @@ El cerebro del agente. Un único prompt que contiene:
 - Herramientas disponibles y sus requisitos
 - Cómo razonar (ReAct)
 - Cuándo preguntar vs cuándo actuar
+
+El prompt se divide en dos partes para aprovechar la caché de prefijo
+del proveedor:
+- Parte estática (agent_system_prompt.md + formato de respuesta):
+  herramientas y reglas. Se envía como SystemMessage idéntico en todas
+  las llamadas.
+- Parte dinámica (agent_context_prompt.md): fecha, conversación,
+  knowledge y última observación. Va detrás, como HumanMessage.
+
+El formato de respuesta depende del modo del brain:
+- text: THOUGHT/ACTION/ACTION_INPUT en texto (agent_text_format.md)
+- tools: llamada a función nativa (agent_tools_format.md)
 """
 
 import os
 from datetime import datetime
 from pathlib import Path
+from typing import List
+
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
 
 
 def _load_prompt_from_file(filename: str) -> str:
@@ -27,8 +42,23 @@ def _load_prompt_from_file(filename: str) -> str:
         return f.read()
 
 
-# Load the system prompt from file
-SYSTEM_PROMPT = _load_prompt_from_file("agent_system_prompt.md")
+# Load the prompts from file
+STATIC_SYSTEM_PROMPT = _load_prompt_from_file("agent_system_prompt.md")
+CONTEXT_PROMPT = _load_prompt_from_file("agent_context_prompt.md")
+RESPONSE_FORMATS = {
+    "text": _load_prompt_from_file("agent_text_format.md"),
+    "tools": _load_prompt_from_file("agent_tools_format.md"),
+}
+
+# Prompt completo (plantilla) en un único texto
+SYSTEM_PROMPT = STATIC_SYSTEM_PROMPT + "\n" + RESPONSE_FORMATS["text"] + "\n" + CONTEXT_PROMPT
+
+# La parte estática se formatea una sola vez: debe ser idéntica byte a byte
+# entre llamadas para que el proveedor reutilice el prefijo cacheado
+_STATIC_SYSTEM_TEXT = {
+    mode: STATIC_SYSTEM_PROMPT.format() + "\n" + response_format
+    for mode, response_format in RESPONSE_FORMATS.items()
+}
 
 
 def format_prompt(
@@ -37,11 +67,40 @@ def format_prompt(
     last_observation: str = "Ninguna (inicio de conversación)"
 ) -> str:
     """Formatea el prompt con el contexto actual."""
+    return _STATIC_SYSTEM_TEXT["text"] + "\n" + format_context(
+        conversation, knowledge, last_observation
+    )
+
+
+def format_context(
+    conversation: str,
+    knowledge: str = "Ninguno",
+    last_observation: str = "Ninguna (inicio de conversación)"
+) -> str:
+    """Formatea solo la parte dinámica del prompt."""
     now = datetime.now()
-    return SYSTEM_PROMPT.format(
+    return CONTEXT_PROMPT.format(
         current_datetime=now.strftime("%Y-%m-%d %H:%M:%S (%A)"),
         today=now.strftime("%Y-%m-%d"),
         conversation=conversation,
         knowledge=knowledge,
         last_observation=last_observation
-    )
\ No newline at end of file
+    )
+
+
+def format_prompt_messages(
+    conversation: str,
+    knowledge: str = "Ninguno",
+    last_observation: str = "Ninguna (inicio de conversación)",
+    mode: str = "text"
+) -> List[BaseMessage]:
+    """
+    Devuelve el prompt como mensajes: SystemMessage estático (cacheable)
+    seguido de un HumanMessage con el contexto dinámico.
+
+    mode elige el formato de respuesta: "text" o "tools".
+    """
+    return [
+        SystemMessage(content=_STATIC_SYSTEM_TEXT[mode]),
+        HumanMessage(content=format_context(conversation, knowledge, last_observation)),
+    ]
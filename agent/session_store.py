@@ -0,0 +1,243 @@
+"""
+===========================================================
+SESSION STORE - Memoria del agente entre turnos
+===========================================================
+
+Guarda por session_id lo que el agente ya sabe de la conversación
+(knowledge, última observación e historial de mensajes), para que
+cada turno no empiece de cero ni repita maps_search/check_availability.
+
+Backends disponibles (SESSION_STORE_BACKEND):
+- memory: diccionario en proceso (por defecto)
+- sqlite: fichero SQLite, sobrevive a reinicios
+
+Ambos aplican TTL (SESSION_TTL_SECONDS) y desalojo LRU
+(SESSION_MAX_ENTRIES), y devuelven copias: un turno que modifica su
+estado no toca el guardado hasta que lo guarda (ni el de otro turno).
+"""
+
+import copy
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+
+# ===========================================================
+# CONFIGURACIÓN
+# ===========================================================
+
+SESSION_STORE_BACKEND = os.getenv("SESSION_STORE_BACKEND", "memory")
+SESSION_TTL_SECONDS = int(os.getenv("SESSION_TTL_SECONDS", "7200"))  # 2 horas
+SESSION_MAX_ENTRIES = int(os.getenv("SESSION_MAX_ENTRIES", "1000"))
+SESSION_DB_PATH = os.getenv(
+    "SESSION_DB_PATH",
+    str(Path(__file__).parent.parent / "data" / "sessions.db"),
+)
+
+
+# ===========================================================
+# INTERFAZ
+# ===========================================================
+
+
+class SessionStore:
+    """Interfaz común de los backends de sesión."""
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Devuelve los datos de la sesión o None si no existe o caducó."""
+        raise NotImplementedError
+
+    def save(self, session_id: str, data: Dict[str, Any]) -> None:
+        """Guarda (o reemplaza) los datos de la sesión."""
+        raise NotImplementedError
+
+    def delete(self, session_id: str) -> None:
+        """Elimina la sesión."""
+        raise NotImplementedError
+
+
+# ===========================================================
+# BACKEND: MEMORIA
+# ===========================================================
+
+
+class InMemorySessionStore(SessionStore):
+    """Sesiones en un OrderedDict con TTL y desalojo LRU (copias, como SQLite)."""
+
+    def __init__(
+        self,
+        ttl_seconds: int = SESSION_TTL_SECONDS,
+        max_entries: int = SESSION_MAX_ENTRIES,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._data.get(session_id)
+            if entry is None:
+                return None
+
+            saved_at, data = entry
+            if time.time() - saved_at > self.ttl_seconds:
+                del self._data[session_id]
+                return None
+
+            self._data.move_to_end(session_id)
+        return copy.deepcopy(data)
+
+    def save(self, session_id: str, data: Dict[str, Any]) -> None:
+        data = copy.deepcopy(data)
+        with self._lock:
+            self._data[session_id] = (time.time(), data)
+            self._data.move_to_end(session_id)
+
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._data.pop(session_id, None)
+
+
+# ===========================================================
+# BACKEND: SQLITE
+# ===========================================================
+
+
+class SQLiteSessionStore(SessionStore):
+    """Sesiones persistidas en SQLite (JSON) con TTL y desalojo LRU."""
+
+    def __init__(
+        self,
+        path: str = SESSION_DB_PATH,
+        ttl_seconds: int = SESSION_TTL_SECONDS,
+        max_entries: int = SESSION_MAX_ENTRIES,
+    ):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " session_id TEXT PRIMARY KEY,"
+            " data TEXT NOT NULL,"
+            " saved_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data, saved_at FROM sessions WHERE session_id = ?",
+                (session_id,),
+            ).fetchone()
+            if row is None:
+                return None
+
+            data, saved_at = row
+            now = time.time()
+            if now - saved_at > self.ttl_seconds:
+                self._conn.execute(
+                    "DELETE FROM sessions WHERE session_id = ?", (session_id,)
+                )
+                self._conn.commit()
+                return None
+
+            self._conn.execute(
+                "UPDATE sessions SET accessed_at = ? WHERE session_id = ?",
+                (now, session_id),
+            )
+            self._conn.commit()
+            return json.loads(data)
+
+    def save(self, session_id: str, data: Dict[str, Any]) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, data, saved_at, accessed_at)"
+                " VALUES (?, ?, ?, ?)",
+                (session_id, json.dumps(data, ensure_ascii=False, default=str), now, now),
+            )
+            # Desalojo: caducadas y, si sobran, las menos usadas
+            self._conn.execute(
+                "DELETE FROM sessions WHERE saved_at < ?", (now - self.ttl_seconds,)
+            )
+            self._conn.execute(
+                "DELETE FROM sessions WHERE session_id IN ("
+                " SELECT session_id FROM sessions ORDER BY accessed_at DESC"
+                " LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._conn.commit()
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            self._conn.commit()
+
+
+# ===========================================================
+# SINGLETON
+# ===========================================================
+
+_store: Optional[SessionStore] = None
+_store_lock = threading.Lock()
+
+
+def get_session_store() -> SessionStore:
+    """Obtiene el store de sesiones configurado (singleton)."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            if SESSION_STORE_BACKEND == "sqlite":
+                _store = SQLiteSessionStore()
+            else:
+                _store = InMemorySessionStore()
+        return _store
+
+
+# ===========================================================
+# SERIALIZACIÓN DE MENSAJES
+# ===========================================================
+
+
+def serialize_messages(messages: List) -> List[Dict[str, str]]:
+    """Convierte mensajes de LangChain al formato {"role", "content"}."""
+    serialized = []
+    for msg in messages:
+        if isinstance(msg, HumanMessage):
+            serialized.append({"role": "user", "content": msg.content})
+        elif isinstance(msg, AIMessage):
+            serialized.append({"role": "assistant", "content": msg.content})
+        elif isinstance(msg, dict):
+            serialized.append({"role": msg.get("role"), "content": msg.get("content", "")})
+    return serialized
+
+
+def merge_history(stored: List[Dict], incoming: List[Dict]) -> List[Dict]:
+    """
+    Combina el historial guardado con los mensajes recibidos.
+
+    Si el cliente reenvía el historial completo (empieza por el guardado),
+    se usa tal cual; si solo envía los mensajes nuevos, se añaden al final.
+    """
+    incoming = serialize_messages(incoming)
+    if len(incoming) >= len(stored) and incoming[: len(stored)] == stored:
+        return incoming
+    return stored + incoming
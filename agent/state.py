@@ -23,6 +23,9 @@ class AgentState(TypedDict):
     next_tool: Optional[str]
     tool_args: Optional[Dict[str, Any]]
     
+    # Acciones independientes a ejecutar a la vez ([{"tool", "args"}, ...])
+    pending_actions: Optional[List[Dict[str, Any]]]
+    
     # Resultado de la última herramienta
     last_observation: Optional[str]
     
@@ -32,15 +35,29 @@ class AgentState(TypedDict):
     # Contador de iteraciones (evita loops infinitos)
     iterations: int
 
+    # Contexto de herramientas de esta sesión (agent.tools.ToolContext)
+    tool_context: Optional[Any]
+
+
+def create_initial_state(
+    messages: List = None,
+    knowledge: Dict[str, Any] = None,
+    last_observation: Optional[str] = None,
+    tool_context: Optional[Any] = None,
+) -> dict:
+    """
+    Crea el estado inicial del agente.
 
-def create_initial_state(messages: List = None) -> dict:
-    """Crea el estado inicial del agente."""
+    knowledge y last_observation permiten retomar una sesión guardada.
+    """
     return {
         "messages": messages or [],
-        "knowledge": {},
+        "knowledge": knowledge or {},
         "next_tool": None,
         "tool_args": None,
-        "last_observation": None,
+        "pending_actions": None,
+        "last_observation": last_observation,
         "status": "thinking",
-        "iterations": 0
+        "iterations": 0,
+        "tool_context": tool_context,
     }
\ No newline at end of file
@@ -8,39 +8,33 @@ El grafo las ejecuta según lo que decida el LLM.
 """
 
 from typing import Optional, List, Dict
+from contextvars import ContextVar
+import asyncio
+import httpx
+import math
 from langchain_core.tools import tool
 from datetime import datetime
 import os
 import random
-import requests
+import re
+import threading
 import time as time_module
+import unicodedata
+import weakref
 
 # Google Places
 from backend.google_places import places_text_search, PlaceSearchPayload
 
+# Cliente HTTP compartido (servicio de llamadas)
+from backend import http_client
+from backend.cache import get_cache, register_reset_hook
+from backend.query_similarity import QUERY_SIMILARITY_ENABLED, get_query_index
+
 # Google calendar
 from langchain_google_community import CalendarToolkit
 
 # Tavily web search
-from tavily import TavilyClient
-
-
-# ===========================================================
-# ESTADO COMPARTIDO (para tools que dependen de otras)
-# ===========================================================
-
-_search_results: List[Dict] = []
-
-
-def get_search_results() -> List[Dict]:
-    """Obtiene los resultados de la última búsqueda."""
-    return _search_results
-
-
-def clear_search_results():
-    """Limpia los resultados de búsqueda."""
-    global _search_results
-    _search_results = []
+from tavily import TavilyClient, AsyncTavilyClient
 
 
 # ===========================================================
@@ -104,16 +98,210 @@ class MockBookingSystem:
         return {"success": False, "error": "Error temporal"}
 
 
-_booking_system = MockBookingSystem()
+# ===========================================================
+# CONTEXTO DE HERRAMIENTAS (estado por sesión/request)
+# ===========================================================
+
+
+class ToolContext:
+    """
+    Estado que comparten las herramientas dentro de una conversación.
+
+    Cada request/sesión tiene el suyo (viaja en AgentState y se activa en
+    execute_tool), así que varias conversaciones pueden ejecutar
+    herramientas en paralelo sin pisarse los resultados.
+    """
+
+    def __init__(self, search_results: Optional[List[Dict]] = None):
+        self.search_results: List[Dict] = list(search_results or [])
+        self.booking_system = MockBookingSystem()
+
+        # Retomar qué lugares tienen reserva online (de check_availability)
+        for p in self.search_results:
+            if p.get("has_api") is not None:
+                self.booking_system._api_cache[p.get("place_id", "")] = p["has_api"]
+
+
+_current_context: ContextVar[Optional[ToolContext]] = ContextVar(
+    "tool_context", default=None
+)
+
+# Contexto por defecto (CLI, tests o llamadas directas a las tools)
+_default_context = ToolContext()
+
+
+def get_tool_context() -> ToolContext:
+    """Obtiene el contexto activo (el de la request o el por defecto)."""
+    return _current_context.get() or _default_context
+
+
+def get_search_results(context: Optional[ToolContext] = None) -> List[Dict]:
+    """Obtiene los resultados de la última búsqueda."""
+    return (context or get_tool_context()).search_results
+
+
+def clear_search_results(context: Optional[ToolContext] = None):
+    """Limpia los resultados de búsqueda."""
+    (context or get_tool_context()).search_results = []
+
+# Espera de llamadas telefónicas
+CALL_MAX_WAIT = 150  # 2.5 minutos máximo
+CALL_WAIT_TIMEOUT = 25  # cada long-poll a /call-wait (el servicio limita a 30 s)
+CALL_POLL_INTERVAL = 3  # pausa tras un error antes de reintentar
 
 
 # ===========================================================
 # TOOL: web_search
 # ===========================================================
 
+# Caché de búsquedas web (clave: query normalizada + modo)
+WEB_SEARCH_CACHE_TTL = int(os.getenv("WEB_SEARCH_CACHE_TTL", str(6 * 3600)))
+WEB_SEARCH_CACHE_SIZE = int(os.getenv("WEB_SEARCH_CACHE_SIZE", "500"))
+
+# Modo normal: más resultados y resumen generado por Tavily
+WEB_SEARCH_DEPTH = os.getenv("WEB_SEARCH_DEPTH", "basic")
+WEB_SEARCH_MAX_RESULTS = int(os.getenv("WEB_SEARCH_MAX_RESULTS", "5"))
+
+# Modo rápido (turnos sensibles a la latencia): menos profundidad, menos
+# resultados y sin resumen. WEB_SEARCH_FAST_MODE=true lo fuerza siempre.
+WEB_SEARCH_FAST_MODE = os.getenv("WEB_SEARCH_FAST_MODE", "false").lower() == "true"
+WEB_SEARCH_FAST_DEPTH = os.getenv("WEB_SEARCH_FAST_DEPTH", "fast")
+WEB_SEARCH_FAST_MAX_RESULTS = int(os.getenv("WEB_SEARCH_FAST_MAX_RESULTS", "3"))
+
+# Clientes de Tavily reutilizados (sesión HTTP keep-alive): uno síncrono
+# y uno async por event loop, como en backend/http_client.py
+_tavily_lock = threading.Lock()
+_tavily_client: Optional[TavilyClient] = None
+_tavily_async_clients: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def _get_tavily_client(api_key: str) -> TavilyClient:
+    global _tavily_client
+    with _tavily_lock:
+        if _tavily_client is None or getattr(_tavily_client, "api_key", api_key) != api_key:
+            _tavily_client = TavilyClient(api_key=api_key)
+        return _tavily_client
+
+
+def _get_async_tavily_client(api_key: str) -> AsyncTavilyClient:
+    loop = asyncio.get_running_loop()
+    with _tavily_lock:
+        entry = _tavily_async_clients.get(loop)
+        if entry is None or entry[0] != api_key:
+            entry = (api_key, AsyncTavilyClient(api_key=api_key))
+            _tavily_async_clients[loop] = entry
+        return entry[1]
+
+
+def _reset_tavily_clients():
+    global _tavily_client
+    with _tavily_lock:
+        _tavily_client = None
+        _tavily_async_clients.clear()
+
+
+register_reset_hook(_reset_tavily_clients)
+
+
+def _web_search_cache():
+    return get_cache(
+        "web_search",
+        maxsize=WEB_SEARCH_CACHE_SIZE,
+        ttl_seconds=WEB_SEARCH_CACHE_TTL,
+        persistent=True,
+    )
+
+
+def normalize_web_query(query: str) -> str:
+    """
+    Clave de caché de una búsqueda web.
+
+    "Mejores restaurantes celíacos  Madrid" y "mejores restaurantes
+    celiacos madrid?" dan la misma clave: minúsculas, sin acentos, sin
+    puntuación y espacios simples.
+    """
+    text = unicodedata.normalize("NFKD", query.lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = re.sub(r"[^\w\s]", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _web_search_params(query: str, fast: bool) -> Dict:
+    if fast or WEB_SEARCH_FAST_MODE:
+        return {
+            "query": query,
+            "search_depth": WEB_SEARCH_FAST_DEPTH,
+            "max_results": WEB_SEARCH_FAST_MAX_RESULTS,
+            "include_answer": False,
+        }
+    return {
+        "query": query,
+        "search_depth": WEB_SEARCH_DEPTH,
+        "max_results": WEB_SEARCH_MAX_RESULTS,
+        "include_answer": True,
+    }
+
+
+def _web_search_scope(params: Dict) -> str:
+    mode = "fast" if not params["include_answer"] else "full"
+    return f"{mode}|{params['search_depth']}|{params['max_results']}"
+
+
+def _web_search_key(params: Dict) -> str:
+    return f"{_web_search_scope(params)}|{normalize_web_query(params['query'])}"
+
+
+def _cached_web_search(cache, key: str, params: Dict) -> Optional[Dict]:
+    """
+    Respuesta cacheada de la misma query o, si no hay, de una casi igual
+    (acentos, orden, plurales, erratas) con el mismo modo.
+    """
+    cached = cache.get(key)
+    if not QUERY_SIMILARITY_ENABLED:
+        return cached
+    index = get_query_index("web_search")
+    scope = _web_search_scope(params)
+    if cached is not None:
+        index.add(scope, params["query"], key)
+        return cached
+
+    similar_key = index.find(scope, params["query"])
+    if similar_key is None or similar_key == key:
+        return None
+    cached = cache.get(similar_key)
+    if cached is not None:
+        cache.count("similar_hits")
+    return cached
+
+
+def _store_web_search(cache, key: str, params: Dict, response: Dict):
+    if not (response["answer"] or response["results"]):
+        return
+    cache.set(key, response)
+    if QUERY_SIMILARITY_ENABLED:
+        get_query_index("web_search").add(_web_search_scope(params), params["query"], key)
+
+
+def _compact_response(response: Dict) -> Dict:
+    """Solo lo que usa _format_web_search (lo que se guarda en caché)."""
+    return {
+        "answer": response.get("answer") or "",
+        "results": [
+            {"title": r.get("title"), "content": (r.get("content") or "")[:300]}
+            for r in (response.get("results") or [])[:3]
+        ],
+    }
+
+
+def _record_web_search_call(cache, params: Dict, started: float):
+    cache.count("api_calls")
+    cache.count("api_ms_total", int((time_module.perf_counter() - started) * 1000))
+    if not params["include_answer"]:
+        cache.count("fast_calls")
+
 
 @tool
-def web_search(query: str) -> str:
+def web_search(query: str, fast: bool = False) -> str:
     """Busca información en internet.
 
     Útil para: información actualizada, recetas, recomendaciones,
@@ -121,32 +309,76 @@ def web_search(query: str) -> str:
 
     Args:
         query: La consulta de búsqueda
+        fast: True para una búsqueda rápida (menos resultados, sin resumen)
     """
 
     api_key = os.getenv("TAVILY_API_KEY")
     if not api_key:
         return "ERROR: TAVILY_API_KEY no configurada"
 
+    params = _web_search_params(query, fast)
+    cache = _web_search_cache()
+    key = _web_search_key(params)
+    cached = _cached_web_search(cache, key, params)
+    if cached is not None:
+        return _format_web_search(query, cached)
+
     try:
-        client = TavilyClient(api_key=api_key)
-        response = client.search(query=query, max_results=5, include_answer=True)
+        started = time_module.perf_counter()
+        response = _get_tavily_client(api_key).search(**params)
+        _record_web_search_call(cache, params, started)
+    except Exception as e:
+        return f"ERROR: {str(e)}"
+
+    response = _compact_response(response)
+    _store_web_search(cache, key, params, response)
+    return _format_web_search(query, response)
 
-        answer = response.get("answer", "")
-        results = response.get("results", [])
 
-        if not answer and not results:
-            return f"No encontré resultados para: {query}"
+async def _aweb_search(query: str, fast: bool = False) -> str:
+    """Versión async de web_search (no bloquea el event loop)."""
+    api_key = os.getenv("TAVILY_API_KEY")
+    if not api_key:
+        return "ERROR: TAVILY_API_KEY no configurada"
 
-        lines = []
-        if answer:
-            lines.append(f"**Resumen:** {answer}\n")
-        for i, r in enumerate(results[:3], 1):
-            lines.append(f"{i}. {r.get('title')}: {r.get('content', '')[:150]}...")
+    params = _web_search_params(query, fast)
+    cache = _web_search_cache()
+    key = _web_search_key(params)
+    cached = _cached_web_search(cache, key, params)
+    if cached is not None:
+        return _format_web_search(query, cached)
 
-        return "\n".join(lines)
+    try:
+        started = time_module.perf_counter()
+        response = await _get_async_tavily_client(api_key).search(**params)
+        _record_web_search_call(cache, params, started)
     except Exception as e:
         return f"ERROR: {str(e)}"
 
+    response = _compact_response(response)
+    _store_web_search(cache, key, params, response)
+    return _format_web_search(query, response)
+
+
+def _format_web_search(query: str, response: Dict) -> str:
+    """Formatea la respuesta de Tavily para el agente."""
+    answer = response.get("answer", "")
+    results = response.get("results", [])
+
+    if not answer and not results:
+        return f"No encontré resultados para: {query}"
+
+    lines = []
+    if answer:
+        lines.append(f"**Resumen:** {answer}\n")
+    for i, r in enumerate(results[:3], 1):
+        lines.append(f"{i}. {r.get('title')}: {r.get('content', '')[:150]}...")
+
+    return "\n".join(lines)
+
+
+web_search.coroutine = _aweb_search
+
 
 # ===========================================================
 # TOOL: maps_search
@@ -174,8 +406,6 @@ def maps_search(
         max_travel_time: Tiempo máximo de viaje en minutos
         travel_mode: "walking", "driving", "bicycling", "transit"
     """
-    global _search_results
-
     try:
         payload = PlaceSearchPayload(
             query=query,
@@ -193,7 +423,7 @@ def maps_search(
         if not places:
             return f"No encontré '{query}' en {location}"
 
-        _search_results = places
+        get_tool_context().search_results = places
 
         lines = [f"Encontré {len(places)} resultados:\n"]
         for i, p in enumerate(places, 1):
@@ -230,15 +460,15 @@ def check_availability(date: str, time: str, num_people: int = 2) -> str:
         time: Hora HH:MM (ej: "21:00")
         num_people: Número de personas
     """
-    global _search_results
+    context = get_tool_context()
 
-    if not _search_results:
+    if not context.search_results:
         return "ERROR: Primero busca lugares con maps_search"
 
     lines = [f"Disponibilidad para {date} {time} ({num_people}p):\n"]
 
-    for p in _search_results:
-        avail = _booking_system.check_availability(
+    for p in context.search_results:
+        avail = context.booking_system.check_availability(
             p.get("place_id", ""),
             p.get("name", ""),
             date,
@@ -280,17 +510,21 @@ def make_booking(place_name: str, date: str, time: str, num_people: int = 2) ->
         time: Hora HH:MM
         num_people: Número de personas
     """
-    global _search_results
+    context = get_tool_context()
 
     place = next(
-        (p for p in _search_results if place_name.lower() in p.get("name", "").lower()),
+        (
+            p
+            for p in context.search_results
+            if place_name.lower() in p.get("name", "").lower()
+        ),
         None,
     )
 
     if not place:
         return f"ERROR: No encontré '{place_name}'. Usa maps_search primero."
 
-    result = _booking_system.make_booking(
+    result = context.booking_system.make_booking(
         place.get("place_id", ""), place_name, date, time, num_people
     )
 
@@ -349,16 +583,14 @@ def phone_call(
     # Sobreescribmos el número de teléfono del restaurante para poder hacer nuestras pruebas
     phone_number = os.getenv("TO_PHONE_NUMBER")
 
-    # Obtener puerto del servicio de llamadas desde variable de entorno
-    CALL_SERVICE_PORT = os.getenv("CALL_SERVICE_PORT", "8080")
-    CALL_SERVICE_URL = f"http://localhost:{CALL_SERVICE_PORT}"
+    CALL_SERVICE_URL = _call_service_url()
 
     # Verificar servicio disponible
     try:
-        health = requests.get(f"{CALL_SERVICE_URL}/", timeout=5)
+        health = http_client.get(f"{CALL_SERVICE_URL}/", service="call_service", timeout=5)
         if health.status_code != 200:
             return "ERROR: El servicio de llamadas no está disponible. Ejecuta: python backend/call_service.py"
-    except requests.exceptions.ConnectionError:
+    except httpx.ConnectError:
         return f"ERROR: No se pudo conectar al servicio de llamadas en {CALL_SERVICE_URL}. ¿Está corriendo?"
 
     # Iniciar llamada
@@ -366,15 +598,12 @@ def phone_call(
     print(f"   🎯 Misión: {mission[:60]}...")
 
     try:
-        response = requests.post(
+        response = http_client.post(
             f"{CALL_SERVICE_URL}/start-call",
-            json={
-                "phone_number": phone_number,
-                "mission": mission,
-                "context": context,
-                "persona_name": persona_name,
-                "persona_phone": persona_phone,
-            },
+            service="call_service",
+            json=_call_request_body(
+                phone_number, mission, context, persona_name, persona_phone
+            ),
             timeout=10,
         )
 
@@ -386,91 +615,209 @@ def phone_call(
     except Exception as e:
         return f"ERROR iniciando llamada: {str(e)}"
 
-    # Esperar resultado (polling)
-    max_wait = 150  # 2.5 minutos máximo
-    start_time = time_module.time()
+    # Esperar resultado (long-poll: el servicio responde en cuanto termina)
+    deadline = time_module.time() + CALL_MAX_WAIT
     last_status = ""
 
-    while time_module.time() - start_time < max_wait:
+    while time_module.time() < deadline:
         try:
-            status_response = requests.get(
-                f"{CALL_SERVICE_URL}/call-status/{call_id}", timeout=5
+            status_response = http_client.get(
+                f"{CALL_SERVICE_URL}/call-wait/{call_id}",
+                service="call_service",
+                **_call_wait_args(deadline - time_module.time()),
             )
 
             if status_response.status_code != 200:
-                time_module.sleep(3)
+                time_module.sleep(CALL_POLL_INTERVAL)
                 continue
 
             data = status_response.json()
-            status = data.get("status")
-
-            # Log de progreso
-            if status != last_status:
-                status_emoji = {
-                    "initiating": "📱",
-                    "calling": "📞",
-                    "in_progress": "🗣️",
-                    "analyzing": "🔍",
-                    "completed": "✅",
-                    "failed": "❌",
-                }.get(status, "⏳")
-                print(f"   {status_emoji} Estado: {status}")
-                last_status = status
-
-            if status == "completed":
-                result = data.get("result", {})
-                transcript = data.get("transcript", [])
-                duration = data.get("duration_seconds", 0)
-
-                # Formatear respuesta
-                completed = "✅ SÍ" if result.get("mission_completed") else "❌ NO"
-
-                output = f"""📞 **LLAMADA COMPLETADA** (Duración: {int(duration)}s)
-                        **Misión cumplida:** {completed}
-                        **Resultado:** {result.get('outcome', 'Sin resultado')}
-                        """
+            last_status = _log_call_status(data.get("status"), last_status)
 
-                # Añadir notas si las hay
-                notes = result.get("notes", [])
-                if notes:
-                    output += "\n**📝 Notas importantes:**\n"
-                    for note in notes:
-                        output += f"  • {note}\n"
+            output = _format_call_outcome(data)
+            if output is not None:
+                return output
 
-                # Añadir transcripción resumida
-                if transcript:
-                    output += "\n**Transcripción:**\n"
-                    for entry in transcript[-8:]:  # Últimos 8 intercambios
-                        speaker = "🏪" if entry["speaker"] == "other" else "🤖"
-                        output += f"{speaker} {entry['message']}\n"
+        except Exception as e:
+            print(f"   ⚠️ Error consultando estado: {e}")
+            time_module.sleep(CALL_POLL_INTERVAL)
 
-                return output
+    return (
+        f"⏱️ La llamada está tardando más de lo esperado (>{CALL_MAX_WAIT}s). ID: {call_id}"
+    )
 
-            elif status == "failed":
-                result = data.get("result", {})
-                outcome = result.get("outcome", "Error desconocido")
-                notes = result.get("notes", [])
 
-                output = f"❌ **LLAMADA FALLIDA**\n\n**Motivo:** {outcome}"
-                if notes:
-                    output += f"\n**Sugerencia:** {notes[0]}"
+async def _aphone_call(
+    phone_number: str,
+    mission: str,
+    context: str = "",
+    persona_name: str = "",
+    persona_phone: str = "",
+) -> str:
+    """Versión async de phone_call: espera la llamada sin bloquear el event loop."""
+
+    phone_number = os.getenv("TO_PHONE_NUMBER")
+    CALL_SERVICE_URL = _call_service_url()
 
-                return output
+    try:
+        health = await http_client.aget(
+            f"{CALL_SERVICE_URL}/", service="call_service", timeout=5
+        )
+        if health.status_code != 200:
+            return "ERROR: El servicio de llamadas no está disponible. Ejecuta: python backend/call_service.py"
+    except httpx.ConnectError:
+        return f"ERROR: No se pudo conectar al servicio de llamadas en {CALL_SERVICE_URL}. ¿Está corriendo?"
 
-            # Aún en curso
-            time_module.sleep(3)
+    print(f"   📞 Iniciando llamada...")
+    print(f"   🎯 Misión: {mission[:60]}...")
+
+    try:
+        response = await http_client.apost(
+            f"{CALL_SERVICE_URL}/start-call",
+            service="call_service",
+            json=_call_request_body(
+                phone_number, mission, context, persona_name, persona_phone
+            ),
+            timeout=10,
+        )
+
+        if response.status_code != 200:
+            return f"ERROR: No se pudo iniciar la llamada: {response.text}"
+
+        call_id = response.json().get("call_id")
+
+    except Exception as e:
+        return f"ERROR iniciando llamada: {str(e)}"
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + CALL_MAX_WAIT
+    last_status = ""
+
+    while loop.time() < deadline:
+        try:
+            status_response = await http_client.aget(
+                f"{CALL_SERVICE_URL}/call-wait/{call_id}",
+                service="call_service",
+                **_call_wait_args(deadline - loop.time()),
+            )
+
+            if status_response.status_code == 200:
+                data = status_response.json()
+                last_status = _log_call_status(data.get("status"), last_status)
+
+                output = _format_call_outcome(data)
+                if output is not None:
+                    return output
+                continue  # el servicio ya esperó: repetir el long-poll
 
         except Exception as e:
             print(f"   ⚠️ Error consultando estado: {e}")
-            time_module.sleep(3)
+
+        await asyncio.sleep(CALL_POLL_INTERVAL)
 
     return (
-        f"⏱️ La llamada está tardando más de lo esperado (>{max_wait}s). ID: {call_id}"
+        f"⏱️ La llamada está tardando más de lo esperado (>{CALL_MAX_WAIT}s). ID: {call_id}"
     )
 
-    # -------------------------------------------------------
 
-    # ... (todo tu código anterior de MockBookingSystem, web_search, maps_search, etc.) ...
+phone_call.coroutine = _aphone_call
+
+
+def _call_service_url() -> str:
+    """URL del servicio de llamadas (puerto desde variable de entorno)."""
+    CALL_SERVICE_PORT = os.getenv("CALL_SERVICE_PORT", "8080")
+    return f"http://localhost:{CALL_SERVICE_PORT}"
+
+
+def _call_wait_args(remaining: float) -> Dict:
+    """Parámetros de un long-poll a /call-wait sin pasarse de CALL_MAX_WAIT."""
+    # Redondeo hacia arriba y al menos 1 s: timeout=0 respondería al
+    # instante y el último segundo se iría en peticiones seguidas
+    wait = max(1, min(CALL_WAIT_TIMEOUT, math.ceil(remaining)))
+    return {"params": {"timeout": wait}, "timeout": wait + 5}
+
+
+def _call_request_body(
+    phone_number: str,
+    mission: str,
+    context: str,
+    persona_name: str,
+    persona_phone: str,
+) -> Dict:
+    return {
+        "phone_number": phone_number,
+        "mission": mission,
+        "context": context,
+        "persona_name": persona_name,
+        "persona_phone": persona_phone,
+    }
+
+
+def _log_call_status(status: str, last_status: str) -> str:
+    """Muestra el progreso de la llamada cuando cambia de estado."""
+    if status != last_status:
+        status_emoji = {
+            "initiating": "📱",
+            "calling": "📞",
+            "in_progress": "🗣️",
+            "analyzing": "🔍",
+            "completed": "✅",
+            "failed": "❌",
+        }.get(status, "⏳")
+        print(f"   {status_emoji} Estado: {status}")
+    return status
+
+
+def _format_call_outcome(data: Dict) -> Optional[str]:
+    """
+    Formatea el resultado de una llamada terminada.
+
+    Devuelve None si la llamada sigue en curso.
+    """
+    status = data.get("status")
+
+    if status == "completed":
+        result = data.get("result", {})
+        transcript = data.get("transcript", [])
+        duration = data.get("duration_seconds", 0)
+
+        # Formatear respuesta
+        completed = "✅ SÍ" if result.get("mission_completed") else "❌ NO"
+
+        output = f"""📞 **LLAMADA COMPLETADA** (Duración: {int(duration)}s)
+                        **Misión cumplida:** {completed}
+                        **Resultado:** {result.get('outcome', 'Sin resultado')}
+                        """
+
+        # Añadir notas si las hay
+        notes = result.get("notes", [])
+        if notes:
+            output += "\n**📝 Notas importantes:**\n"
+            for note in notes:
+                output += f"  • {note}\n"
+
+        # Añadir transcripción resumida
+        if transcript:
+            output += "\n**Transcripción:**\n"
+            for entry in transcript[-8:]:  # Últimos 8 intercambios
+                speaker = "🏪" if entry["speaker"] == "other" else "🤖"
+                output += f"{speaker} {entry['message']}\n"
+
+        return output
+
+    elif status == "failed":
+        result = data.get("result", {})
+        outcome = result.get("outcome", "Error desconocido")
+        notes = result.get("notes", [])
+
+        output = f"❌ **LLAMADA FALLIDA**\n\n**Motivo:** {outcome}"
+        if notes:
+            output += f"\n**Sugerencia:** {notes[0]}"
+
+        return output
+
+    return None
+
 
 # ===========================================================
 # REGISTRO FINAL DE HERRAMIENTAS
@@ -497,12 +844,46 @@ except Exception as e:
 TOOLS_MAP = {t.name: t for t in TOOLS}
 
 
-def execute_tool(tool_name: str, tool_args: dict) -> str:
-    """Ejecuta una herramienta por nombre."""
+def execute_tool(
+    tool_name: str, tool_args: dict, context: Optional[ToolContext] = None
+) -> str:
+    """
+    Ejecuta una herramienta por nombre.
+
+    Si se pasa context, la herramienta trabaja sobre el estado de esa
+    sesión en lugar del contexto por defecto.
+    """
     if tool_name not in TOOLS_MAP:
         return f"ERROR: Herramienta '{tool_name}' no existe. Disponibles: {list(TOOLS_MAP.keys())}"
 
+    token = _current_context.set(context) if context is not None else None
     try:
         return TOOLS_MAP[tool_name].invoke(tool_args)
     except Exception as e:
         return f"ERROR ejecutando {tool_name}: {str(e)}"
+    finally:
+        if token is not None:
+            _current_context.reset(token)
+
+
+async def aexecute_tool(
+    tool_name: str, tool_args: dict, context: Optional[ToolContext] = None
+) -> str:
+    """
+    Ejecuta una herramienta por nombre sin bloquear el event loop.
+
+    Las herramientas con implementación async (web_search, phone_call) se
+    esperan directamente; el resto se ejecuta en el thread pool de LangChain,
+    que copia el contexto activo al hilo.
+    """
+    if tool_name not in TOOLS_MAP:
+        return f"ERROR: Herramienta '{tool_name}' no existe. Disponibles: {list(TOOLS_MAP.keys())}"
+
+    token = _current_context.set(context) if context is not None else None
+    try:
+        return await TOOLS_MAP[tool_name].ainvoke(tool_args)
+    except Exception as e:
+        return f"ERROR ejecutando {tool_name}: {str(e)}"
+    finally:
+        if token is not None:
+            _current_context.reset(token)
@@ -0,0 +1,330 @@
+"""
+===========================================================
+CACHE - Cachés en memoria y en disco para las APIs externas
+===========================================================
+
+Cachés reutilizables para resultados de APIs externas (geocoding,
+búsquedas...). Cada caché tiene nombre propio y dos niveles:
+- Memoria: LRU con TTL, por proceso
+- Disco (opcional): SQLite en CACHE_DIR, sobrevive a reinicios
+
+Las claves son strings (normalízalas antes de usarlas) y los valores
+cualquier cosa serializable a JSON. None no se cachea.
+
+Configuración:
+- CACHE_ENABLED: "false" desactiva todas las cachés (por defecto true)
+- CACHE_DIR: carpeta del fichero SQLite (por defecto data/cache)
+
+Uso:
+    geocode_cache = get_cache("geocode", ttl_seconds=30 * 86400)
+    coords = geocode_cache.get(key)
+    if coords is None:
+        coords = ...
+        geocode_cache.set(key, coords)
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+# ===========================================================
+# CONFIGURACIÓN
+# ===========================================================
+
+CACHE_ENABLED = os.getenv("CACHE_ENABLED", "true").lower() == "true"
+DEFAULT_CACHE_DIR = str(Path(__file__).parent.parent / "data" / "cache")
+
+
+def cache_dir() -> str:
+    # Se lee en cada apertura para que los tests puedan redirigirlo
+    return os.getenv("CACHE_DIR", DEFAULT_CACHE_DIR)
+
+
+# ===========================================================
+# NIVEL MEMORIA: LRU + TTL
+# ===========================================================
+
+
+class TTLCache:
+    """Diccionario LRU con caducidad por entrada."""
+
+    def __init__(self, maxsize: int = 1000, ttl_seconds: float = 3600):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+            if time.time() > expires_at:
+                del self._data[key]
+                return None
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None):
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            self._data[key] = (time.time() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# ===========================================================
+# NIVEL DISCO: SQLITE
+# ===========================================================
+
+
+class SQLiteCache:
+    """Tabla clave/valor (JSON) con caducidad, compartida por namespaces."""
+
+    def __init__(self, path: str, namespace: str, ttl_seconds: float = 86400):
+        self.path = path
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " namespace TEXT NOT NULL,"
+            " key TEXT NOT NULL,"
+            " value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " PRIMARY KEY (namespace, key))"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self.get_entry(key)
+        return entry[0] if entry is not None else None
+
+    def get_entry(self, key: str) -> Optional[Tuple[Any, float]]:
+        """(valor, expires_at) de una entrada vigente, o None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            ).fetchone()
+        if row is None:
+            return None
+
+        value, expires_at = row
+        if time.time() > expires_at:
+            self.delete(key)
+            return None
+        return json.loads(value), expires_at
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None):
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at)"
+                " VALUES (?, ?, ?, ?)",
+                (
+                    self.namespace,
+                    key,
+                    json.dumps(value, ensure_ascii=False, default=str),
+                    time.time() + ttl,
+                ),
+            )
+            self._conn.commit()
+
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM cache WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            )
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE namespace = ?", (self.namespace,))
+            self._conn.commit()
+
+    def purge_expired(self) -> int:
+        """Borra las entradas caducadas de este namespace."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM cache WHERE namespace = ? AND expires_at < ?",
+                (self.namespace, time.time()),
+            )
+            self._conn.commit()
+            return cursor.rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# ===========================================================
+# CACHÉ DE DOS NIVELES
+# ===========================================================
+
+
+class Cache:
+    """
+    Caché con nombre: memoria (LRU + TTL) delante de SQLite opcional.
+
+    Lleva contadores de aciertos en memoria, aciertos en disco y fallos.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        maxsize: int = 1000,
+        ttl_seconds: float = 3600,
+        persistent: bool = False,
+    ):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.memory = TTLCache(maxsize=maxsize, ttl_seconds=ttl_seconds)
+        self.disk: Optional[SQLiteCache] = None
+        if persistent:
+            self.disk = SQLiteCache(
+                str(Path(cache_dir()) / "cache.db"), namespace=name, ttl_seconds=ttl_seconds
+            )
+
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.counters: Dict[str, int] = {}  # contadores propios de cada caché
+
+    def get(self, key: str) -> Optional[Any]:
+        """Devuelve el valor cacheado o None."""
+        if not CACHE_ENABLED:
+            return None
+
+        value = self.memory.get(key)
+        if value is not None:
+            self._count("hits")
+            return value
+
+        if self.disk is not None:
+            entry = self.disk.get_entry(key)
+            if entry is not None:
+                value, expires_at = entry
+                # En memoria solo lo que le queda en disco, no un TTL nuevo
+                self.memory.set(key, value, max(0.0, expires_at - time.time()))
+                self._count("disk_hits")
+                return value
+
+        self._count("misses")
+        return None
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None):
+        """Guarda el valor (None no se guarda)."""
+        if not CACHE_ENABLED or value is None:
+            return
+        self.memory.set(key, value, ttl_seconds)
+        if self.disk is not None:
+            self.disk.set(key, value, ttl_seconds)
+
+    def delete(self, key: str):
+        self.memory.delete(key)
+        if self.disk is not None:
+            self.disk.delete(key)
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def _count(self, counter: str):
+        with self._stats_lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def count(self, counter: str, amount: int = 1):
+        """Incrementa un contador propio (p. ej. "stale_served")."""
+        with self._stats_lock:
+            self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def stats(self) -> Dict[str, Any]:
+        """Aciertos, fallos y tamaño actual."""
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.disk_hits) / lookups, 3) if lookups else 0.0,
+            "size": len(self.memory),
+            "persistent": self.disk is not None,
+            **self.counters,
+        }
+
+
+# ===========================================================
+# REGISTRO
+# ===========================================================
+
+_caches: Dict[str, Cache] = {}
+_registry_lock = threading.Lock()
+_reset_hooks: List[Callable[[], None]] = []
+
+
+def get_cache(
+    name: str,
+    maxsize: int = 1000,
+    ttl_seconds: float = 3600,
+    persistent: bool = False,
+) -> Cache:
+    """Obtiene (o crea la primera vez) la caché con ese nombre."""
+    with _registry_lock:
+        cache = _caches.get(name)
+        if cache is None:
+            cache = Cache(name, maxsize=maxsize, ttl_seconds=ttl_seconds, persistent=persistent)
+            _caches[name] = cache
+        return cache
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Estadísticas de todas las cachés registradas."""
+    with _registry_lock:
+        caches = list(_caches.values())
+    return {cache.name: cache.stats() for cache in caches}
+
+
+def register_reset_hook(hook: Callable[[], None]):
+    """Registra una función a llamar en reset_caches (clientes, singletons...)."""
+    _reset_hooks.append(hook)
+
+
+def reset_caches():
+    """Descarta todas las cachés del registro (tests o cambio de CACHE_DIR)."""
+    with _registry_lock:
+        for cache in _caches.values():
+            if cache.disk is not None:
+                cache.disk.close()
+        _caches.clear()
+    for hook in _reset_hooks:
+        hook()
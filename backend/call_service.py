@@ -15,10 +15,15 @@ Features:
 Endpoints:
 - POST /start-call: Inicia una llamada con misión
 - GET /call-status/<call_id>: Consulta estado
+- GET /call-wait/<call_id>?timeout=N: Espera (long-poll) a que termine
 - GET /health: Health check
+
+CALL_SERVICE_IMPL=asgi arranca en su lugar backend/call_service_async.py
+(FastAPI + asyncio), que reutiliza los helpers de este módulo.
 """
 
 import os
+import re
 import json
 import uuid
 import threading
@@ -33,10 +38,18 @@ from pyngrok import ngrok
 import logging
 from twilio.rest import Client
 from twilio.twiml.voice_response import VoiceResponse, Connect
-from openai import OpenAI
 from langsmith import traceable
 from langsmith.run_trees import RunTree
 
+# Path setup (permite ejecutar el servicio como script)
+import sys
+from pathlib import Path
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from backend.call_store import CallStore
+from backend.llm_clients import get_openai_client
+
 load_dotenv()
 
 # ===========================================================
@@ -89,15 +102,41 @@ LANGSMITH_ENABLED = os.getenv("LANGCHAIN_TRACING_V2", "").lower() == "true"
 # Límites
 MAX_CALL_DURATION = 120  # 2 minutos
 MAX_TURNS = 20  # Máximo de intercambios en la conversación
+CALL_WAIT_MAX_TIMEOUT = float(os.getenv("CALL_WAIT_MAX_TIMEOUT", "30"))  # long-poll de /call-wait
+
+# Respuestas del LLM en streaming: cada frase se envía a ConversationRelay
+# en cuanto está completa (la voz empieza antes de terminar la generación)
+STREAM_LLM_REPLIES = os.getenv("STREAM_LLM_REPLIES", "true").lower() == "true"
+STREAM_MIN_CHUNK_CHARS = 20  # por debajo, una coma no corta el fragmento
+TURN_CANCEL_JOIN_TIMEOUT = 2  # segundos a esperar a un turno cancelado
+
+# Implementación del servidor: "flask" (hilos) o "asgi" (asyncio, ver
+# backend/call_service_async.py) para muchas llamadas simultáneas
+CALL_SERVICE_IMPL = os.getenv("CALL_SERVICE_IMPL", "flask").lower()
 
 # Clientes
 twilio_client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
-openai_client = OpenAI(api_key=OPENAI_API_KEY)
+openai_client = get_openai_client(OPENAI_API_KEY)  # Pool compartido con el agente
+
+# Estado de llamadas: activas y recientes en memoria, terminadas en el
+# archivo SQLite (ver backend/call_store.py)
+def _forget_call(call_id: str):
+    """Limpia el estado asociado a una llamada que sale de memoria."""
+    call_done_events.pop(call_id, None)
+    conversation_sessions.pop(call_id, None)
 
-# Estado de llamadas
-calls_db: Dict[str, Dict[str, Any]] = {}
+
+calls_db = CallStore(on_evict=_forget_call)
 conversation_sessions: Dict[str, dict] = {}
 
+# Tiempo hasta el primer audio por turno (ms), por modo: "stream" / "full"
+voice_turn_stats: Dict[str, Dict[str, float]] = {}
+_voice_stats_lock = threading.Lock()
+
+# Aviso de llamada terminada (completed/failed) para /call-wait
+TERMINAL_STATUSES = ("completed", "failed")
+call_done_events: Dict[str, threading.Event] = {}
+
 # URL pública de ngrok
 PUBLIC_URL: Optional[str] = None
 
@@ -164,18 +203,7 @@ def analyze_call_result(
             "notes": [],
         }
 
-    # Formatear transcripción para el análisis
-    transcript_text = "\n".join(
-        [
-            f"{'Restaurante' if t['speaker'] == 'other' else 'Bot'}: {t['message']}"
-            for t in transcript
-        ]
-    )
-
-    # Format the analysis template
-    analysis_prompt = _CALL_ANALYSIS_TEMPLATE.format(
-        mission=mission, transcript_text=transcript_text
-    )
+    analysis_prompt = _analysis_prompt(mission, transcript)
 
     try:
         response = openai_client.chat.completions.create(
@@ -184,53 +212,75 @@ def analyze_call_result(
             temperature=float(os.getenv("TEMPERATURE", 0)),
             max_tokens=500,
         )
+        return _parse_analysis(response.choices[0].message.content)
 
-        result_text = response.choices[0].message.content.strip()
+    except Exception as e:
+        print(f"   ⚠️ Error analizando resultado: {e}")
+        return _fallback_analysis(transcript)
 
-        # Limpiar posibles marcadores de código
-        if result_text.startswith("```"):
-            result_text = result_text.split("```")[1]
-            if result_text.startswith("json"):
-                result_text = result_text[4:]
-        result_text = result_text.strip()
 
-        result = json.loads(result_text)
+def _transcript_text(transcript: List[Dict[str, Any]]) -> str:
+    return "\n".join(
+        [
+            f"{'Restaurante' if t['speaker'] == 'other' else 'Bot'}: {t['message']}"
+            for t in transcript
+        ]
+    )
 
-        return {
-            "mission_completed": result.get("mission_completed", False),
-            "outcome": result.get("outcome", "Resultado no determinado"),
-            "notes": result.get("notes", []),
-        }
 
-    except Exception as e:
-        print(f"   ⚠️ Error analizando resultado: {e}")
+def _analysis_prompt(mission: str, transcript: List[Dict[str, Any]]) -> str:
+    return _CALL_ANALYSIS_TEMPLATE.format(
+        mission=mission, transcript_text=_transcript_text(transcript)
+    )
 
-        # Análisis básico de fallback
-        full_text = transcript_text.lower()
-
-        completed = any(
-            word in full_text
-            for word in [
-                "confirmado",
-                "confirmada",
-                "perfecto",
-                "anotado",
-                "reservado",
-                "reservada",
-                "de acuerdo",
-                "hecho",
-            ]
-        )
 
-        return {
-            "mission_completed": completed,
-            "outcome": (
-                "Llamada completada"
-                if completed
-                else "Resultado incierto - revisar transcripción"
-            ),
-            "notes": [],
-        }
+def _parse_analysis(result_text: str) -> Dict[str, Any]:
+    """Resultado estructurado a partir del JSON del LLM (lanza si no es válido)."""
+    result_text = result_text.strip()
+
+    # Limpiar posibles marcadores de código
+    if result_text.startswith("```"):
+        result_text = result_text.split("```")[1]
+        if result_text.startswith("json"):
+            result_text = result_text[4:]
+    result_text = result_text.strip()
+
+    result = json.loads(result_text)
+
+    return {
+        "mission_completed": result.get("mission_completed", False),
+        "outcome": result.get("outcome", "Resultado no determinado"),
+        "notes": result.get("notes", []),
+    }
+
+
+def _fallback_analysis(transcript: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Análisis básico por palabras clave si falla el LLM."""
+    full_text = _transcript_text(transcript).lower()
+
+    completed = any(
+        word in full_text
+        for word in [
+            "confirmado",
+            "confirmada",
+            "perfecto",
+            "anotado",
+            "reservado",
+            "reservada",
+            "de acuerdo",
+            "hecho",
+        ]
+    )
+
+    return {
+        "mission_completed": completed,
+        "outcome": (
+            "Llamada completada"
+            if completed
+            else "Resultado incierto - revisar transcripción"
+        ),
+        "notes": [],
+    }
 
 
 # ===========================================================
@@ -247,6 +297,9 @@ def health():
             "status": "running",
             "public_url": PUBLIC_URL,
             "langsmith_enabled": LANGSMITH_ENABLED,
+            "stream_llm_replies": STREAM_LLM_REPLIES,
+            "voice_turns": _voice_turn_summary(),
+            "call_store": calls_db.stats(),
         }
     )
 
@@ -330,10 +383,49 @@ def start_call():
 def call_status(call_id: str):
     """Consulta el estado de una llamada."""
 
-    if call_id not in calls_db:
+    call = calls_db.get(call_id)
+    if call is None:
         return jsonify({"error": "Call not found"}), 404
 
-    call = calls_db[call_id]
+    return jsonify(call_payload(call_id, call))
+
+
+@app.route("/call-wait/<call_id>", methods=["GET"])
+def call_wait(call_id: str):
+    """
+    Espera a que la llamada termine y devuelve su estado (long-poll).
+
+    Responde en cuanto termina o al pasar ?timeout= segundos (máximo
+    CALL_WAIT_MAX_TIMEOUT); el cliente repite si sigue en curso.
+    """
+
+    call = calls_db.get(call_id)
+    if call is None:
+        return jsonify({"error": "Call not found"}), 404
+
+    timeout = request.args.get("timeout", default=CALL_WAIT_MAX_TIMEOUT, type=float)
+    timeout = max(0.0, min(timeout, CALL_WAIT_MAX_TIMEOUT))
+
+    # Una llamada en curso está en memoria: `call` ve sus cambios
+    if call["status"] not in TERMINAL_STATUSES:
+        _call_done_event(call_id).wait(timeout)
+
+    return jsonify(call_payload(call_id, call))
+
+
+def _call_done_event(call_id: str) -> threading.Event:
+    # setdefault es atómico: webhook y long-poll comparten el mismo Event
+    return call_done_events.setdefault(call_id, threading.Event())
+
+
+def _notify_call_done(call_id: str):
+    """Archiva la llamada y despierta a los /call-wait pendientes."""
+    calls_db.mark_finished(call_id)
+    _call_done_event(call_id).set()
+
+
+def call_payload(call_id: str, call: Dict[str, Any]) -> Dict[str, Any]:
+    """Estado público de una llamada (lo que devuelven /call-status y /call-wait)."""
 
     # Calcular duración si está en curso o completada
     duration = None
@@ -346,29 +438,31 @@ def call_status(call_id: str):
             start = datetime.fromisoformat(start)
         duration = (end - start).total_seconds()
 
-    return jsonify(
-        {
-            "call_id": call_id,
-            "status": call["status"],
-            "mission": call["mission"],
-            "transcript": call["transcript"],
-            "result": call["result"],
-            "duration_seconds": duration,
-            "created_at": call["created_at"],
-        }
-    )
+    return {
+        "call_id": call_id,
+        "status": call["status"],
+        "mission": call["mission"],
+        "transcript": call["transcript"],
+        "result": call["result"],
+        "duration_seconds": duration,
+        "created_at": call["created_at"],
+    }
 
 
 def _make_call_async(call_id: str, phone_number: str):
     """Realiza la llamada de forma asíncrona."""
+    record = calls_db.active(call_id)
+    if record is None:
+        return
     try:
         if not PUBLIC_URL:
-            calls_db[call_id]["status"] = "failed"
-            calls_db[call_id]["result"] = {
+            record["status"] = "failed"
+            record["result"] = {
                 "mission_completed": False,
                 "outcome": "Servicio no inicializado (ngrok no disponible)",
                 "notes": [],
             }
+            _notify_call_done(call_id)
             return
 
         voice_url = f"{PUBLIC_URL}/voice/{call_id}"
@@ -382,20 +476,21 @@ def _make_call_async(call_id: str, phone_number: str):
             status_callback_method="POST",
         )
 
-        calls_db[call_id]["twilio_call_sid"] = call.sid
-        calls_db[call_id]["status"] = "calling"
-        calls_db[call_id]["start_time"] = datetime.now()
+        record["twilio_call_sid"] = call.sid
+        record["status"] = "calling"
+        record["start_time"] = datetime.now()
 
         print(f"   ✓ Llamada Twilio iniciada: {call.sid}")
 
     except Exception as e:
         print(f"   ✗ Error: {e}")
-        calls_db[call_id]["status"] = "failed"
-        calls_db[call_id]["result"] = {
+        record["status"] = "failed"
+        record["result"] = {
             "mission_completed": False,
             "outcome": f"Error al iniciar llamada: {str(e)}",
             "notes": [],
         }
+        _notify_call_done(call_id)
 
 
 # ===========================================================
@@ -406,12 +501,16 @@ def _make_call_async(call_id: str, phone_number: str):
 @app.route("/voice/<call_id>", methods=["GET", "POST"])
 def voice_webhook(call_id: str):
     """Webhook de Twilio para iniciar la conversación."""
+    return conversation_twiml(request.host, call_id), 200, {"Content-Type": "application/xml"}
+
+
+def conversation_twiml(host: str, call_id: str) -> str:
+    """TwiML que conecta la llamada con el websocket de ConversationRelay."""
     from twilio.twiml.voice_response import ConversationRelay
 
     response = VoiceResponse()
     connect = Connect()
 
-    host = request.host
     conversation_relay = ConversationRelay(
         url=f"wss://{host}/conversation-ws/{call_id}",
         language="es-ES",
@@ -423,74 +522,88 @@ def voice_webhook(call_id: str):
     connect.append(conversation_relay)
     response.append(connect)
 
-    return str(response), 200, {"Content-Type": "application/xml"}
+    return str(response)
 
 
 @app.route("/twilio-status/<call_id>", methods=["POST"])
 def twilio_status_webhook(call_id: str):
     """Webhook de estado de llamada de Twilio."""
 
-    if call_id not in calls_db:
+    # Solo llamadas en memoria: las archivadas ya no cambian
+    call = calls_db.active(call_id)
+    if call is None:
         return "", 200
 
     call_status = request.values.get("CallStatus", "unknown")
-    call = calls_db[call_id]
 
     print(f"\n📞 [STATUS {call_id}] {call_status}")
 
-    if call_status == "completed":
-        call["status"] = "analyzing"
-        call["end_time"] = datetime.now()
-
+    if apply_twilio_status(call, call_status):
         # Analizar resultado en background
         thread = threading.Thread(target=_finalize_call, args=(call_id,), daemon=True)
         thread.start()
 
-    elif call_status == "failed":
-        call["status"] = "failed"
-        call["end_time"] = datetime.now()
-        call["result"] = {
-            "mission_completed": False,
-            "outcome": "La llamada falló",
-            "notes": [],
-        }
+    if call["status"] in TERMINAL_STATUSES:
+        _notify_call_done(call_id)
 
-    elif call_status == "busy":
-        call["status"] = "failed"
+    return "", 200
+
+
+# Estados de Twilio que terminan la llamada sin conversación que analizar
+_TWILIO_FAILURES = {
+    "failed": ("La llamada falló", []),
+    "busy": ("Línea ocupada", ["Intentar más tarde"]),
+    "no-answer": ("No contestaron", ["Intentar más tarde"]),
+}
+
+
+def apply_twilio_status(call: Dict[str, Any], call_status: str) -> bool:
+    """
+    Actualiza la llamada con un CallStatus de Twilio.
+
+    Devuelve True si terminó con conversación y hay que analizarla.
+    """
+    if call_status == "completed":
+        call["status"] = "analyzing"
         call["end_time"] = datetime.now()
-        call["result"] = {
-            "mission_completed": False,
-            "outcome": "Línea ocupada",
-            "notes": ["Intentar más tarde"],
-        }
+        return True
 
-    elif call_status == "no-answer":
+    if call_status in _TWILIO_FAILURES:
+        outcome, notes = _TWILIO_FAILURES[call_status]
         call["status"] = "failed"
         call["end_time"] = datetime.now()
-        call["result"] = {
-            "mission_completed": False,
-            "outcome": "No contestaron",
-            "notes": ["Intentar más tarde"],
-        }
+        call["result"] = {"mission_completed": False, "outcome": outcome, "notes": list(notes)}
 
     elif call_status in ["ringing", "in-progress"]:
         call["status"] = "in_progress"
 
-    return "", 200
+    return False
 
 
 @traceable(name="finalize_call", run_type="chain")
 def _finalize_call(call_id: str):
     """Analiza y finaliza la llamada."""
-    call = calls_db[call_id]
+    call = calls_db.active(call_id)
+    if call is None:
+        return
 
     print(f"\n🔍 [ANALYZE {call_id}] Analizando resultado...")
 
     # Analizar transcripción
-    result = analyze_call_result(mission=call["mission"], transcript=call["transcript"])
-
-    call["result"] = result
-    call["status"] = "completed"
+    try:
+        result = analyze_call_result(mission=call["mission"], transcript=call["transcript"])
+        call["result"] = result
+        call["status"] = "completed"
+    except Exception:
+        call["status"] = "failed"
+        call["result"] = {
+            "mission_completed": False,
+            "outcome": "No se pudo analizar la llamada",
+            "notes": [],
+        }
+        raise
+    finally:
+        _notify_call_done(call_id)
 
     print(f"   ✓ Misión completada: {result['mission_completed']}")
     print(f"   📋 Resultado: {result['outcome']}")
@@ -507,12 +620,11 @@ def _finalize_call(call_id: str):
 def conversation_websocket(ws, call_id: str):
     """WebSocket para la conversación con Twilio ConversationRelay."""
 
-    if call_id not in calls_db:
+    call = calls_db.active(call_id)
+    if call is None:
         print(f"   ✗ Llamada {call_id} no encontrada")
         return
 
-    call = calls_db[call_id]
-
     print(f"\n🎙️ [WS {call_id}] Conversación iniciada")
     print(f"   🎯 Misión: {call['mission'][:50]}...")
 
@@ -521,6 +633,9 @@ def conversation_websocket(ws, call_id: str):
         "messages": [{"role": "system", "content": call["script"]}],
         "turn_count": 0,
         "start_time": time_module.time(),
+        "send_lock": threading.Lock(),  # turno en curso y bucle principal envían por el mismo ws
+        "turn": None,
+        "turn_thread": None,
     }
 
     try:
@@ -531,6 +646,7 @@ def conversation_websocket(ws, call_id: str):
 
             if elapsed > MAX_CALL_DURATION:
                 print(f"   ⏱️ Límite de tiempo alcanzado ({MAX_CALL_DURATION}s)")
+                _cancel_turn(session)
                 _send_goodbye(
                     ws,
                     "Se me ha hecho un poco tarde, ¿podría llamar en otro momento? Gracias.",
@@ -539,6 +655,7 @@ def conversation_websocket(ws, call_id: str):
 
             if session.get("turn_count", 0) > MAX_TURNS:
                 print(f"   🔄 Límite de turnos alcanzado ({MAX_TURNS})")
+                _cancel_turn(session)
                 _send_goodbye(ws, "Muchas gracias por su tiempo. Hasta luego.")
                 break
 
@@ -560,10 +677,18 @@ def conversation_websocket(ws, call_id: str):
                 print(f"   📞 Setup: {twilio_call_sid}")
 
             elif message_type == "prompt":
-                _handle_prompt(ws, call_id, message)
+                # El turno corre en su hilo: el bucle sigue leyendo interrupts
+                _cancel_turn(session)
+                turn = VoiceTurn(ws, session["send_lock"])
+                thread = threading.Thread(
+                    target=_handle_prompt, args=(ws, call_id, message, turn), daemon=True
+                )
+                session["turn"], session["turn_thread"] = turn, thread
+                thread.start()
 
             elif message_type == "interrupt":
                 print(f"   ⚡ Interrupción detectada")
+                _handle_interrupt(call_id, message)
 
             elif message_type == "error":
                 print(f"   ✗ Error Twilio: {message.get('description')}")
@@ -573,15 +698,88 @@ def conversation_websocket(ws, call_id: str):
 
     finally:
         if call_id in conversation_sessions:
+            _cancel_turn(conversation_sessions[call_id])
             del conversation_sessions[call_id]
         print(f"   ✓ WebSocket cerrado")
 
 
+class VoiceTurn:
+    """
+    Un turno de respuesta en curso. Tras cancel() (interrupt o nuevo
+    prompt) no se envía nada más por el websocket y la generación se corta.
+    """
+
+    def __init__(self, ws, send_lock: Optional[threading.Lock] = None):
+        self.ws = ws
+        self.cancelled = threading.Event()
+        self._send_lock = send_lock or threading.Lock()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def send(self, token: str, last: bool) -> bool:
+        """Envía texto a ConversationRelay; False si el turno está cancelado."""
+        with self._send_lock:
+            if self.cancelled.is_set():
+                return False
+            self.ws.send(json.dumps({"type": "text", "token": token, "last": last}))
+            return True
+
+
+def _cancel_turn(session: dict):
+    """Cancela el turno en curso y espera (poco) a que deje el historial coherente."""
+    turn, thread = session.get("turn"), session.get("turn_thread")
+    if turn is not None:
+        turn.cancel()
+    if thread is not None and thread is not threading.current_thread():
+        thread.join(TURN_CANCEL_JOIN_TIMEOUT)
+    session["turn"] = session["turn_thread"] = None
+
+
+def _handle_interrupt(call_id: str, message: dict):
+    """
+    El interlocutor habló encima: se corta la generación y la última
+    respuesta queda registrada solo hasta donde llegó a sonar.
+    """
+    session = conversation_sessions.get(call_id)
+    if session is None:
+        return
+    _cancel_turn(session)
+
+    call = calls_db.active(call_id)
+    spoken = message.get("utteranceUntilInterrupt")
+    if call is not None and spoken is not None:
+        trim_to_spoken(session["messages"], call["transcript"], spoken)
+
+
+def trim_to_spoken(messages: List[Dict[str, str]], transcript: List[Dict[str, Any]], spoken: str):
+    """Deja la última respuesta (historial y transcripción) en lo que llegó a sonar."""
+    spoken = spoken.strip()
+
+    if messages and messages[-1]["role"] == "assistant":
+        if spoken:
+            messages[-1]["content"] = spoken
+        else:
+            messages.pop()
+
+    if transcript and transcript[-1]["speaker"] == "self":
+        if spoken:
+            transcript[-1]["message"] = spoken
+            transcript[-1]["interrupted"] = True
+        else:
+            transcript.pop()
+    print(f"   ✂️ Dicho hasta la interrupción: {spoken[:60]!r}")
+
+
 @traceable(name="handle_conversation_turn", run_type="llm")
-def _handle_prompt(ws, call_id: str, message: dict):
-    """Maneja un turno de la conversación."""
+def _handle_prompt(ws, call_id: str, message: dict, turn: Optional[VoiceTurn] = None):
+    """Maneja un turno de la conversación (cancelable con turn.cancel())."""
 
-    call = calls_db[call_id]
+    turn = turn or VoiceTurn(ws)
+    # Fuera de memoria la llamada es una copia de solo lectura: nada que anotar
+    call = calls_db.active(call_id)
+    if call is None:
+        return
     session = conversation_sessions[call_id]
 
     voice_prompt = message.get("voicePrompt", "")
@@ -601,17 +799,31 @@ def _handle_prompt(ws, call_id: str, message: dict):
     session["turn_count"] += 1
 
     # Llamar a OpenAI
+    turn_started = time_module.perf_counter()
     try:
-        response = openai_client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=session["messages"],
-            temperature=0.7,
-            max_tokens=150,
-        )
+        if STREAM_LLM_REPLIES:
+            ai_response = _stream_reply(turn, list(session["messages"]), turn_started)
+        else:
+            response = openai_client.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=list(session["messages"]),
+                temperature=0.7,
+                max_tokens=150,
+            )
+            ai_response = response.choices[0].message.content
+            if not ai_response:
+                ai_response = "Perdona, no te he escuchado bien. ¿Puedes repetir?"
+
+            # Enviar respuesta (salvo que la hayan interrumpido mientras se generaba)
+            if turn.send(ai_response, last=True):
+                _record_first_audio("full", turn_started)
+            else:
+                ai_response = ""
 
-        ai_response = response.choices[0].message.content
+        if turn.cancelled.is_set():
+            print(f"   ✂️ Turno cancelado")
         if not ai_response:
-            ai_response = "Perdona, no te he escuchado bien. ¿Puedes repetir?"
+            return  # nada llegó a enviarse: no hay respuesta que registrar
 
         print(f"   🤖 Tú: {ai_response}")
 
@@ -627,20 +839,123 @@ def _handle_prompt(ws, call_id: str, message: dict):
         # Añadir al historial
         session["messages"].append({"role": "assistant", "content": ai_response})
 
-        # Enviar respuesta
-        ws.send(json.dumps({"type": "text", "token": ai_response, "last": True}))
-
     except Exception as e:
         print(f"   ✗ Error OpenAI: {e}")
-        ws.send(
-            json.dumps(
-                {
-                    "type": "text",
-                    "token": "Perdona, ha habido un problema. ¿Puedes repetir?",
-                    "last": True,
-                }
-            )
-        )
+        turn.send("Perdona, ha habido un problema. ¿Puedes repetir?", last=True)
+
+
+def _stream_reply(turn: VoiceTurn, messages: List[Dict[str, str]], turn_started: float) -> str:
+    """
+    Genera la respuesta en streaming y la envía por frases (last=False);
+    al terminar manda last=True. Devuelve el texto enviado (solo lo que
+    salió antes de cancelar el turno).
+    """
+    stream = openai_client.chat.completions.create(
+        model="gpt-4o-mini",
+        messages=messages,
+        temperature=0.7,
+        max_tokens=150,
+        stream=True,
+    )
+
+    parts: List[str] = []
+    try:
+        for chunk in _sentence_chunks(_stream_deltas(stream, turn.cancelled)):
+            if not turn.send(chunk, last=False):
+                break
+            if not parts:
+                _record_first_audio("stream", turn_started)
+            parts.append(chunk)
+    finally:
+        if turn.cancelled.is_set() and hasattr(stream, "close"):
+            stream.close()  # corta la generación en OpenAI (ahorra tokens)
+
+    if turn.cancelled.is_set():
+        return "".join(parts).strip()
+
+    if not parts:
+        fallback = "Perdona, no te he escuchado bien. ¿Puedes repetir?"
+        if turn.send(fallback, last=True):
+            _record_first_audio("stream", turn_started)
+            return fallback
+        return ""
+
+    turn.send("", last=True)
+    return "".join(parts).strip()
+
+
+def _stream_deltas(stream, cancelled: Optional[threading.Event] = None):
+    """Texto de cada chunk de un chat.completions en streaming (hasta cancelar)."""
+    for chunk in stream:
+        if cancelled is not None and cancelled.is_set():
+            return
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+
+_SENTENCE_END = re.compile(r"[.!?…;:](?=\s)|,(?=\s)")
+
+
+class SentenceBuffer:
+    """
+    Agrupa los tokens en frases: corta tras . ! ? … ; : seguidos de espacio
+    (y tras una coma si el fragmento ya es largo). El resto sale en flush().
+    """
+
+    def __init__(self):
+        self.buffer = ""
+
+    def feed(self, delta: str) -> List[str]:
+        """Añade un token y devuelve las frases que ya están completas."""
+        self.buffer += delta
+        chunks = []
+        while True:
+            cut = None
+            for match in _SENTENCE_END.finditer(self.buffer):
+                if match.group() != "," or match.end() >= STREAM_MIN_CHUNK_CHARS:
+                    cut = match.end()
+                    break
+            if cut is None:
+                return chunks
+            # El espacio siguiente va con el fragmento para no pegar palabras
+            chunks.append(self.buffer[: cut + 1])
+            self.buffer = self.buffer[cut + 1 :]
+
+    def flush(self) -> Optional[str]:
+        rest, self.buffer = self.buffer, ""
+        return rest if rest.strip() else None
+
+
+def _sentence_chunks(deltas):
+    """Frases de un iterador de tokens (ver SentenceBuffer)."""
+    sentences = SentenceBuffer()
+    for delta in deltas:
+        yield from sentences.feed(delta)
+    rest = sentences.flush()
+    if rest:
+        yield rest
+
+
+def _record_first_audio(mode: str, turn_started: float):
+    """Anota el tiempo hasta el primer texto enviado a ConversationRelay."""
+    elapsed_ms = (time_module.perf_counter() - turn_started) * 1000
+    with _voice_stats_lock:
+        stats = voice_turn_stats.setdefault(mode, {"turns": 0, "first_audio_ms_total": 0.0})
+        stats["turns"] += 1
+        stats["first_audio_ms_total"] += elapsed_ms
+    print(f"   ⚡ Primer audio en {elapsed_ms:.0f} ms ({mode})")
+
+
+def _voice_turn_summary() -> Dict[str, Dict[str, float]]:
+    """Turnos y tiempo medio hasta el primer audio por modo."""
+    with _voice_stats_lock:
+        return {
+            mode: {
+                "turns": stats["turns"],
+                "avg_first_audio_ms": round(stats["first_audio_ms_total"] / stats["turns"], 1),
+            }
+            for mode, stats in voice_turn_stats.items()
+        }
 
 
 def _send_goodbye(ws, message: str):
@@ -675,16 +990,25 @@ def start_service(CALL_SERVICE_PORT):
         print(f"❌ Error: Faltan variables de entorno: {', '.join(missing)}")
         return None
 
-    # Iniciar Flask
-    flask_thread = threading.Thread(
-        target=lambda: app.run(
-            port=CALL_SERVICE_PORT, debug=False, use_reloader=False, host="0.0.0.0"
-        ),
-        daemon=True,
-    )
-    flask_thread.start()
+    if CALL_SERVICE_IMPL == "asgi":
+        # Implementación asyncio (muchas llamadas simultáneas por proceso)
+        from backend.call_service_async import start_server
 
-    print(f"✅ Flask iniciado en puerto {CALL_SERVICE_PORT}")
+        server_thread = start_server(CALL_SERVICE_PORT)
+        print(f"✅ Servidor ASGI iniciado en puerto {CALL_SERVICE_PORT}")
+    else:
+        server_thread = threading.Thread(
+            target=lambda: app.run(
+                port=CALL_SERVICE_PORT,
+                debug=False,
+                use_reloader=False,
+                host="0.0.0.0",
+                threaded=True,  # los long-poll de /call-wait no bloquean los webhooks
+            ),
+            daemon=True,
+        )
+        server_thread.start()
+        print(f"✅ Flask iniciado en puerto {CALL_SERVICE_PORT}")
     time_module.sleep(2)
 
     # Iniciar ngrok
@@ -732,7 +1056,7 @@ def start_service(CALL_SERVICE_PORT):
         except Exception as e:
             print(f"❌ Error: actualizando webhook de Twilio: {e}")
 
-    return flask_thread
+    return server_thread
 
 
 if __name__ == "__main__":
@@ -0,0 +1,591 @@
+"""
+===========================================================
+CALL SERVICE ASYNC - Servicio de llamadas sobre asyncio (ASGI)
+===========================================================
+
+Misma API que backend/call_service.py (Flask + hilos) pero sobre
+FastAPI/uvicorn: cada llamada es un conjunto de corrutinas en un único
+event loop, así un proceso atiende cientos de llamadas simultáneas sin
+un hilo bloqueado por websocket.
+
+- AsyncOpenAI para la conversación y el análisis final (uno por
+  servidor en app.state, creado y cerrado en el lifespan)
+- Twilio con AsyncTwilioHttpClient (calls.create_async)
+- Tareas asyncio en lugar de threading.Thread por llamada
+- Recursos acotados: llamadas activas, peticiones al LLM en paralelo
+  y conexiones del servidor
+
+Reutiliza de call_service.py el script, el análisis, el TwiML, los
+estados de Twilio, el troceado por frases y las métricas de voz.
+
+Endpoints:
+- POST /start-call, GET /call-status/{id}, GET /call-wait/{id}?timeout=N
+- GET|POST /voice/{id}, POST /twilio-status/{id}
+- WS /conversation-ws/{id}
+- GET /: Health check
+
+Se activa con CALL_SERVICE_IMPL=asgi (start_service de call_service.py).
+
+Configuración:
+- CALL_SERVICE_MAX_CALLS: llamadas activas a la vez (200)
+- CALL_SERVICE_LLM_CONCURRENCY: peticiones simultáneas al LLM (50)
+- CALL_SERVICE_MAX_CONNECTIONS: conexiones HTTP/WS del servidor (1000)
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time as time_module
+import uuid
+from contextlib import asynccontextmanager, suppress
+from datetime import datetime
+from typing import Any, Dict, List, Set
+from urllib.parse import parse_qs
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, Response
+from openai import AsyncOpenAI
+from twilio.http.async_http_client import AsyncTwilioHttpClient
+from twilio.rest import Client
+
+from backend import call_service
+from backend.call_store import CallStore
+from backend.llm_clients import LLM_POOL_KEEPALIVE_EXPIRY, LLM_TIMEOUT
+
+
+# ===========================================================
+# CONFIGURACIÓN
+# ===========================================================
+
+CALL_SERVICE_MAX_CALLS = int(os.getenv("CALL_SERVICE_MAX_CALLS", "200"))
+CALL_SERVICE_LLM_CONCURRENCY = int(os.getenv("CALL_SERVICE_LLM_CONCURRENCY", "50"))
+CALL_SERVICE_MAX_CONNECTIONS = int(os.getenv("CALL_SERVICE_MAX_CONNECTIONS", "1000"))
+
+RECEIVE_TIMEOUT = 30  # segundos sin mensajes antes de revisar los límites
+
+# Estado de llamadas (propio de esta implementación, mismo archivo SQLite)
+def _forget_call(call_id: str):
+    call_done_events.pop(call_id, None)
+    conversation_sessions.pop(call_id, None)
+
+
+calls_db = CallStore(on_evict=_forget_call)
+conversation_sessions: Dict[str, dict] = {}
+call_done_events: Dict[str, asyncio.Event] = {}
+_background_tasks: Set[asyncio.Task] = set()
+
+
+@asynccontextmanager
+async def _lifespan(app: FastAPI):
+    # Primitivas asyncio y clientes creados dentro del loop del servidor
+    app.state.llm_slots = asyncio.Semaphore(CALL_SERVICE_LLM_CONCURRENCY)
+    app.state.openai_client = _new_openai_client()
+    yield
+    for task in list(_background_tasks):
+        task.cancel()
+    openai_client = app.state.openai_client
+    app.state.openai_client = None
+    await openai_client.close()
+    twilio = getattr(app.state, "twilio_client", None)
+    if twilio is not None:
+        await twilio.http_client.close()
+
+
+app = FastAPI(title="Call Service (asyncio)", lifespan=_lifespan)
+
+
+def _llm_slots() -> asyncio.Semaphore:
+    if not hasattr(app.state, "llm_slots"):  # sin lifespan (p. ej. tests)
+        app.state.llm_slots = asyncio.Semaphore(CALL_SERVICE_LLM_CONCURRENCY)
+    return app.state.llm_slots
+
+
+def _new_openai_client() -> AsyncOpenAI:
+    # Pool propio, del tamaño del límite de peticiones LLM simultáneas
+    limits = httpx.Limits(
+        max_connections=CALL_SERVICE_LLM_CONCURRENCY,
+        max_keepalive_connections=CALL_SERVICE_LLM_CONCURRENCY,
+        keepalive_expiry=LLM_POOL_KEEPALIVE_EXPIRY,
+    )
+    return AsyncOpenAI(
+        api_key=call_service.OPENAI_API_KEY,
+        http_client=httpx.AsyncClient(limits=limits, timeout=LLM_TIMEOUT),
+    )
+
+
+def _openai_client() -> AsyncOpenAI:
+    """Cliente AsyncOpenAI del servidor (lo crea y cierra el lifespan)."""
+    if getattr(app.state, "openai_client", None) is None:  # sin lifespan (p. ej. tests)
+        app.state.openai_client = _new_openai_client()
+    return app.state.openai_client
+
+
+def _twilio_client() -> Client:
+    """Cliente Twilio async (se crea en el loop del servidor la primera vez)."""
+    if getattr(app.state, "twilio_client", None) is None:
+        app.state.twilio_client = Client(
+            call_service.TWILIO_ACCOUNT_SID,
+            call_service.TWILIO_AUTH_TOKEN,
+            http_client=AsyncTwilioHttpClient(),
+        )
+    return app.state.twilio_client
+
+
+def _spawn(coro) -> asyncio.Task:
+    """Tarea en segundo plano con referencia (evita que el GC la cancele)."""
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
+def _active_calls() -> int:
+    return calls_db.stats()["active"]
+
+
+def _call_done_event(call_id: str) -> asyncio.Event:
+    return call_done_events.setdefault(call_id, asyncio.Event())
+
+
+def _notify_call_done(call_id: str):
+    calls_db.mark_finished(call_id)
+    _call_done_event(call_id).set()
+
+
+# ===========================================================
+# ENDPOINTS REST
+# ===========================================================
+
+
+@app.get("/")
+async def health():
+    """Health check"""
+    return {
+        "service": "Call Service (Generalista, asyncio)",
+        "status": "running",
+        "public_url": call_service.PUBLIC_URL,
+        "langsmith_enabled": call_service.LANGSMITH_ENABLED,
+        "stream_llm_replies": call_service.STREAM_LLM_REPLIES,
+        "active_calls": _active_calls(),
+        "max_calls": CALL_SERVICE_MAX_CALLS,
+        "voice_turns": call_service._voice_turn_summary(),
+        "call_store": calls_db.stats(),
+    }
+
+
+@app.post("/start-call")
+async def start_call(request: Request):
+    """Inicia una llamada con misión dinámica (mismo body que la versión Flask)."""
+    try:
+        data = await request.json()
+    except Exception:
+        data = None
+
+    if not data:
+        return JSONResponse({"error": "No data provided"}, status_code=400)
+
+    phone_number = data.get("phone_number")
+    mission = data.get("mission")
+
+    if not phone_number:
+        return JSONResponse({"error": "phone_number is required"}, status_code=400)
+    if not mission:
+        return JSONResponse({"error": "mission is required"}, status_code=400)
+    if _active_calls() >= CALL_SERVICE_MAX_CALLS:
+        return JSONResponse({"error": "Too many active calls"}, status_code=503)
+
+    call_id = str(uuid.uuid4())[:8]
+    context = data.get("context", "")
+    persona_name = data.get("persona_name")
+    persona_phone = data.get("persona_phone")
+
+    calls_db[call_id] = {
+        "id": call_id,
+        "status": "initiating",
+        "phone_number": phone_number,
+        "mission": mission,
+        "context": context,
+        "persona_name": persona_name,
+        "persona_phone": persona_phone,
+        "script": call_service.generate_call_script(mission, context, persona_name, persona_phone),
+        "transcript": [],
+        "result": None,
+        "twilio_call_sid": None,
+        "start_time": None,
+        "end_time": None,
+        "created_at": datetime.now().isoformat(),
+    }
+
+    _spawn(_make_call(call_id, phone_number))
+
+    print(f"\n📞 [CALL {call_id}] Iniciando llamada")
+    print(f"   📱 Teléfono: {phone_number}")
+    print(f"   🎯 Misión: {mission[:50]}...")
+
+    return {"call_id": call_id, "status": "initiating", "message": "Llamada iniciándose..."}
+
+
+@app.get("/call-status/{call_id}")
+async def call_status(call_id: str):
+    """Consulta el estado de una llamada."""
+    call = calls_db.get(call_id)
+    if call is None:
+        return JSONResponse({"error": "Call not found"}, status_code=404)
+    return call_service.call_payload(call_id, call)
+
+
+@app.get("/call-wait/{call_id}")
+async def call_wait(call_id: str, timeout: float = call_service.CALL_WAIT_MAX_TIMEOUT):
+    """Espera a que la llamada termine y devuelve su estado (long-poll)."""
+    call = calls_db.get(call_id)
+    if call is None:
+        return JSONResponse({"error": "Call not found"}, status_code=404)
+
+    timeout = max(0.0, min(timeout, call_service.CALL_WAIT_MAX_TIMEOUT))
+    # Una llamada en curso está en memoria: `call` ve sus cambios
+    if call["status"] not in call_service.TERMINAL_STATUSES:
+        with suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(_call_done_event(call_id).wait(), timeout)
+
+    return call_service.call_payload(call_id, call)
+
+
+async def _make_call(call_id: str, phone_number: str):
+    """Lanza la llamada en Twilio."""
+    call = calls_db.active(call_id)
+    if call is None:
+        return
+    try:
+        public_url = call_service.PUBLIC_URL
+        if not public_url:
+            call["status"] = "failed"
+            call["result"] = {
+                "mission_completed": False,
+                "outcome": "Servicio no inicializado (ngrok no disponible)",
+                "notes": [],
+            }
+            _notify_call_done(call_id)
+            return
+
+        twilio_call = await _twilio_client().calls.create_async(
+            to=phone_number,
+            from_=call_service.TWILIO_PHONE,
+            url=f"{public_url}/voice/{call_id}",
+            status_callback=f"{public_url}/twilio-status/{call_id}",
+            status_callback_method="POST",
+        )
+
+        call["twilio_call_sid"] = twilio_call.sid
+        call["status"] = "calling"
+        call["start_time"] = datetime.now()
+
+        print(f"   ✓ Llamada Twilio iniciada: {twilio_call.sid}")
+
+    except Exception as e:
+        print(f"   ✗ Error: {e}")
+        call["status"] = "failed"
+        call["result"] = {
+            "mission_completed": False,
+            "outcome": f"Error al iniciar llamada: {str(e)}",
+            "notes": [],
+        }
+        _notify_call_done(call_id)
+
+
+# ===========================================================
+# WEBHOOKS DE TWILIO
+# ===========================================================
+
+
+@app.api_route("/voice/{call_id}", methods=["GET", "POST"])
+async def voice_webhook(call_id: str, request: Request):
+    """Webhook de Twilio para iniciar la conversación."""
+    host = request.headers.get("host", request.url.netloc)
+    return Response(call_service.conversation_twiml(host, call_id), media_type="application/xml")
+
+
+@app.post("/twilio-status/{call_id}")
+async def twilio_status_webhook(call_id: str, request: Request):
+    """Webhook de estado de llamada de Twilio."""
+    # Solo llamadas en memoria: las archivadas ya no cambian
+    call = calls_db.active(call_id)
+    if call is None:
+        return Response("", status_code=200)
+
+    # Twilio envía x-www-form-urlencoded: sin depender de python-multipart
+    form = parse_qs((await request.body()).decode("utf-8"))
+    twilio_status = form.get("CallStatus", ["unknown"])[0]
+
+    print(f"\n📞 [STATUS {call_id}] {twilio_status}")
+
+    if call_service.apply_twilio_status(call, twilio_status):
+        _spawn(_finalize_call(call_id))
+
+    if call["status"] in call_service.TERMINAL_STATUSES:
+        _notify_call_done(call_id)
+
+    return Response("", status_code=200)
+
+
+async def _finalize_call(call_id: str):
+    """Analiza y finaliza la llamada."""
+    call = calls_db.active(call_id)
+    if call is None:
+        return
+    print(f"\n🔍 [ANALYZE {call_id}] Analizando resultado...")
+    try:
+        call["result"] = await analyze_call_result(call["mission"], call["transcript"])
+        call["status"] = "completed"
+    except Exception as e:
+        # Tarea en segundo plano (_spawn): nadie recogería la excepción
+        print(f"   ✗ Error analizando la llamada {call_id}: {e}")
+        call["status"] = "failed"
+        call["result"] = {
+            "mission_completed": False,
+            "outcome": "No se pudo analizar la llamada",
+            "notes": [],
+        }
+    finally:
+        _notify_call_done(call_id)
+
+    print(f"   ✓ Misión completada: {call['result']['mission_completed']}")
+    print(f"   📋 Resultado: {call['result']['outcome']}")
+
+
+async def analyze_call_result(mission: str, transcript: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Versión async de call_service.analyze_call_result."""
+    if not transcript:
+        return {"mission_completed": False, "outcome": "No hubo conversación", "notes": []}
+
+    try:
+        async with _llm_slots():
+            response = await _openai_client().chat.completions.create(
+                model=os.getenv("MODEL_NAME", "gpt-4o-mini"),
+                messages=[
+                    {"role": "user", "content": call_service._analysis_prompt(mission, transcript)}
+                ],
+                temperature=float(os.getenv("TEMPERATURE", 0)),
+                max_tokens=500,
+            )
+        return call_service._parse_analysis(response.choices[0].message.content)
+    except Exception as e:
+        print(f"   ⚠️ Error analizando resultado: {e}")
+        return call_service._fallback_analysis(transcript)
+
+
+# ===========================================================
+# WEBSOCKET PARA CONVERSACIÓN
+# ===========================================================
+
+
+@app.websocket("/conversation-ws/{call_id}")
+async def conversation_websocket(ws: WebSocket, call_id: str):
+    """WebSocket para la conversación con Twilio ConversationRelay."""
+    await ws.accept()
+    call = calls_db.active(call_id)
+    if call is None:
+        await ws.close()
+        return
+
+    print(f"\n🎙️ [WS {call_id}] Conversación iniciada")
+
+    session = conversation_sessions[call_id] = {
+        "messages": [{"role": "system", "content": call["script"]}],
+        "turn_count": 0,
+        "start_time": time_module.time(),
+        "send_lock": asyncio.Lock(),
+        "turn_task": None,
+    }
+
+    try:
+        while True:
+            elapsed = time_module.time() - session["start_time"]
+            if elapsed > call_service.MAX_CALL_DURATION:
+                print(f"   ⏱️ Límite de tiempo alcanzado ({call_service.MAX_CALL_DURATION}s)")
+                await _cancel_turn(session)
+                await _send_text(
+                    ws,
+                    session,
+                    "Se me ha hecho un poco tarde, ¿podría llamar en otro momento? Gracias.",
+                    last=True,
+                )
+                break
+
+            if session["turn_count"] > call_service.MAX_TURNS:
+                print(f"   🔄 Límite de turnos alcanzado ({call_service.MAX_TURNS})")
+                await _cancel_turn(session)
+                await _send_text(ws, session, "Muchas gracias por su tiempo. Hasta luego.", last=True)
+                break
+
+            try:
+                raw = await asyncio.wait_for(ws.receive_text(), RECEIVE_TIMEOUT)
+            except asyncio.TimeoutError:
+                continue
+
+            message = json.loads(raw)
+            message_type = message.get("type")
+
+            if message_type == "setup":
+                print(f"   📞 Setup: {message.get('callSid')}")
+
+            elif message_type == "prompt":
+                await _cancel_turn(session)
+                session["turn_task"] = asyncio.create_task(_handle_prompt(ws, call_id, message))
+
+            elif message_type == "interrupt":
+                print(f"   ⚡ Interrupción detectada")
+                await _cancel_turn(session)
+                spoken = message.get("utteranceUntilInterrupt")
+                if spoken is not None:
+                    call_service.trim_to_spoken(session["messages"], call["transcript"], spoken)
+
+            elif message_type == "error":
+                print(f"   ✗ Error Twilio: {message.get('description')}")
+
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        print(f"   ✗ Error WS: {e}")
+
+    finally:
+        await _cancel_turn(session)
+        conversation_sessions.pop(call_id, None)
+        print(f"   ✓ WebSocket cerrado")
+
+
+async def _cancel_turn(session: dict):
+    """Cancela el turno en curso y espera a que registre lo que llegó a enviar."""
+    task = session.get("turn_task")
+    session["turn_task"] = None
+    if task is not None and not task.done():
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+
+
+async def _send_text(ws: WebSocket, session: dict, token: str, last: bool):
+    async with session["send_lock"]:
+        await ws.send_text(json.dumps({"type": "text", "token": token, "last": last}))
+
+
+async def _handle_prompt(ws: WebSocket, call_id: str, message: dict):
+    """Un turno de la conversación; se cancela con task.cancel()."""
+    # Fuera de memoria la llamada es una copia de solo lectura: nada que anotar
+    call = calls_db.active(call_id)
+    if call is None:
+        return
+    session = conversation_sessions[call_id]
+
+    voice_prompt = message.get("voicePrompt", "")
+    print(f"   🏪 Restaurante: {voice_prompt}")
+
+    call["transcript"].append(
+        {"speaker": "other", "message": voice_prompt, "timestamp": datetime.now().isoformat()}
+    )
+    session["messages"].append({"role": "user", "content": voice_prompt})
+    session["turn_count"] += 1
+
+    turn_started = time_module.perf_counter()
+    parts: List[str] = []
+    try:
+        if call_service.STREAM_LLM_REPLIES:
+            await _stream_reply(ws, session, list(session["messages"]), parts, turn_started)
+        else:
+            async with _llm_slots():
+                response = await _openai_client().chat.completions.create(
+                    model="gpt-4o-mini",
+                    messages=list(session["messages"]),
+                    temperature=0.7,
+                    max_tokens=150,
+                )
+            reply = response.choices[0].message.content or (
+                "Perdona, no te he escuchado bien. ¿Puedes repetir?"
+            )
+            await _send_text(ws, session, reply, last=True)
+            call_service._record_first_audio("full", turn_started)
+            parts.append(reply)
+
+    except asyncio.CancelledError:
+        print(f"   ✂️ Turno cancelado")
+        raise
+
+    except Exception as e:
+        print(f"   ✗ Error OpenAI: {e}")
+        await _send_text(ws, session, "Perdona, ha habido un problema. ¿Puedes repetir?", last=True)
+
+    finally:
+        # Solo se registra lo que llegó a enviarse (también si se canceló)
+        ai_response = "".join(parts).strip()
+        if ai_response:
+            print(f"   🤖 Tú: {ai_response}")
+            call["transcript"].append(
+                {"speaker": "self", "message": ai_response, "timestamp": datetime.now().isoformat()}
+            )
+            session["messages"].append({"role": "assistant", "content": ai_response})
+
+
+async def _stream_reply(
+    ws: WebSocket, session: dict, messages: List[Dict[str, str]], parts: List[str], turn_started: float
+):
+    """Envía la respuesta por frases (last=False) y cierra con last=True."""
+    sentences = call_service.SentenceBuffer()
+
+    async def send_chunk(chunk: str):
+        await _send_text(ws, session, chunk, last=False)
+        if not parts:
+            call_service._record_first_audio("stream", turn_started)
+        parts.append(chunk)
+
+    async with _llm_slots():
+        stream = await _openai_client().chat.completions.create(
+            model="gpt-4o-mini",
+            messages=messages,
+            temperature=0.7,
+            max_tokens=150,
+            stream=True,
+        )
+        try:
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    for sentence in sentences.feed(chunk.choices[0].delta.content):
+                        await send_chunk(sentence)
+        finally:
+            # Al cancelar, cerrar el stream corta la generación en OpenAI
+            with suppress(Exception):
+                await stream.close()
+
+    rest = sentences.flush()
+    if rest:
+        await send_chunk(rest)
+
+    if not parts:
+        fallback = "Perdona, no te he escuchado bien. ¿Puedes repetir?"
+        await _send_text(ws, session, fallback, last=True)
+        call_service._record_first_audio("stream", turn_started)
+        parts.append(fallback)
+        return
+
+    await _send_text(ws, session, "", last=True)
+
+
+# ===========================================================
+# ARRANQUE
+# ===========================================================
+
+
+def start_server(port: int) -> threading.Thread:
+    """Arranca uvicorn en un hilo daemon (como el Flask de call_service)."""
+    config = uvicorn.Config(
+        app,
+        host="0.0.0.0",
+        port=port,
+        log_level="warning",
+        limit_concurrency=CALL_SERVICE_MAX_CONNECTIONS,
+    )
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,314 @@
+"""
+===========================================================
+CALL STORE - Estado de llamadas acotado y persistente
+===========================================================
+
+Sustituye a los diccionarios calls_db del servicio de llamadas, que
+guardaban script, transcripción y resultado de cada llamada durante
+toda la vida del proceso (y los perdían al reiniciar).
+
+- Nivel caliente (memoria): las llamadas activas y las terminadas
+  recientemente. Una llamada terminada (mark_finished) se archiva y se
+  descarta de memoria pasado CALL_STORE_TTL, o antes si hay más de
+  CALL_STORE_MAX_HOT llamadas en memoria. Al descartarla se vuelve a
+  archivar, con lo que cambió después de terminar (p. ej. el análisis).
+  Las activas solo se descartan si superan CALL_STORE_MAX_ACTIVE_AGE
+  (llamadas que nunca recibieron un estado final).
+- Archivo (SQLite): una fila por llamada con la llamada completa en
+  JSON. /call-status de una llamada ya descartada (o de antes de un
+  reinicio) se responde desde aquí, con una copia de solo lectura.
+
+CallStore se usa como un dict (calls_db.get(call_id), `in`, ...); iterar
+o len() recorren solo el nivel caliente. Quien modifica una llamada
+(webhooks, websocket) la pide con active(): solo el nivel caliente.
+
+Configuración:
+- CALL_STORE_TTL: segundos en memoria tras terminar (600)
+- CALL_STORE_MAX_HOT: llamadas en memoria como máximo (1000)
+- CALL_STORE_MAX_ACTIVE_AGE: segundos máximos de una llamada activa (14400)
+- CALL_STORE_PATH: fichero SQLite del archivo (por defecto CACHE_DIR/calls.db)
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from collections.abc import Mapping, MutableMapping
+from datetime import datetime
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from backend.cache import cache_dir, register_reset_hook
+
+
+# ===========================================================
+# CONFIGURACIÓN
+# ===========================================================
+
+CALL_STORE_TTL = float(os.getenv("CALL_STORE_TTL", "600"))
+CALL_STORE_MAX_HOT = int(os.getenv("CALL_STORE_MAX_HOT", "1000"))
+# Twilio corta las llamadas a las 4 h: más tiempo activa es un estado perdido
+CALL_STORE_MAX_ACTIVE_AGE = float(os.getenv("CALL_STORE_MAX_ACTIVE_AGE", "14400"))
+
+
+def call_store_path() -> str:
+    return os.getenv("CALL_STORE_PATH") or str(Path(cache_dir()) / "calls.db")
+
+
+def _json_default(value: Any) -> Any:
+    # start_time / end_time son datetime; call_payload acepta ISO
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+# ===========================================================
+# ARCHIVO SQLITE
+# ===========================================================
+
+
+class CallArchive:
+    """Llamadas terminadas en SQLite (una fila por call_id)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS calls (
+                call_id TEXT PRIMARY KEY,
+                status TEXT,
+                mission TEXT,
+                created_at TEXT,
+                finished_at REAL NOT NULL,
+                data TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_calls_finished ON calls (finished_at);
+            """
+        )
+        self._conn.commit()
+
+    def save(self, call_id: str, call: Dict[str, Any], finished_at: float):
+        data = json.dumps(call, ensure_ascii=False, default=_json_default)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO calls VALUES (?, ?, ?, ?, ?, ?)",
+                (call_id, call.get("status"), call.get("mission"), call.get("created_at"), finished_at, data),
+            )
+            self._conn.commit()
+
+    def load(self, call_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM calls WHERE call_id = ?", (call_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def exists(self, call_id: str) -> bool:
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM calls WHERE call_id = ?", (call_id,)).fetchone()
+        return row is not None
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# ===========================================================
+# CALL STORE
+# ===========================================================
+
+_stores: List["weakref.ref[CallStore]"] = []  # CallStore no es hashable (Mapping)
+
+
+class CallStore(MutableMapping):
+    """
+    Diccionario call_id -> llamada con nivel caliente acotado y archivo.
+
+    on_evict(call_id) se llama al descartar una llamada de memoria, para
+    limpiar el estado asociado (sesiones, eventos de /call-wait...).
+    """
+
+    def __init__(
+        self,
+        ttl: float = CALL_STORE_TTL,
+        max_hot: int = CALL_STORE_MAX_HOT,
+        path: Optional[str] = None,
+        on_evict: Optional[Callable[[str], None]] = None,
+        max_active_age: float = CALL_STORE_MAX_ACTIVE_AGE,
+    ):
+        self.ttl = ttl
+        self.max_hot = max_hot
+        self.max_active_age = max_active_age
+        self.path = path  # None: call_store_path() al abrir
+        self.on_evict = on_evict
+
+        self._lock = threading.RLock()
+        self._hot: Dict[str, Dict[str, Any]] = {}
+        self._finished: "OrderedDict[str, float]" = OrderedDict()  # en orden de fin
+        self._active: "OrderedDict[str, float]" = OrderedDict()  # en orden de alta
+        self._archive: Optional[CallArchive] = None
+
+        self.archived = 0
+        self.evicted = 0
+        self.archive_hits = 0
+        _stores.append(weakref.ref(self))
+
+    # --- archivo ---
+
+    def _get_archive(self) -> CallArchive:
+        with self._lock:
+            if self._archive is None:
+                self._archive = CallArchive(self.path or call_store_path())
+            return self._archive
+
+    def close(self):
+        """Cierra el archivo (se reabre en el siguiente uso)."""
+        with self._lock:
+            if self._archive is not None:
+                self._archive.close()
+            self._archive = None
+
+    # --- MutableMapping ---
+
+    def active(self, call_id: str) -> Optional[Dict[str, Any]]:
+        """La llamada si está en memoria (modificable), o None."""
+        with self._lock:
+            return self._hot.get(call_id)
+
+    def get(self, call_id: str, default: Any = None) -> Any:
+        """
+        La llamada: del nivel caliente o, si no, del archivo como copia de
+        solo lectura (una sola lectura de SQLite y un archive_hit).
+        """
+        call = self.active(call_id)
+        if call is not None:
+            return call
+
+        call = self._get_archive().load(call_id)
+        if call is None:
+            return default
+        with self._lock:
+            self.archive_hits += 1
+        return MappingProxyType(call)
+
+    def __getitem__(self, call_id: str) -> Mapping[str, Any]:
+        call = self.get(call_id)
+        if call is None:
+            raise KeyError(call_id)
+        return call
+
+    def __contains__(self, call_id: object) -> bool:
+        with self._lock:
+            if call_id in self._hot:
+                return True
+        return isinstance(call_id, str) and self._get_archive().exists(call_id)
+
+    def __setitem__(self, call_id: str, call: Dict[str, Any]):
+        with self._lock:
+            self._hot[call_id] = call
+            self._finished.pop(call_id, None)
+            self._active.setdefault(call_id, time.time())
+        self._evict()
+
+    def __delitem__(self, call_id: str):
+        # Solo el nivel caliente: el archivo es histórico
+        with self._lock:
+            del self._hot[call_id]
+            self._finished.pop(call_id, None)
+            self._active.pop(call_id, None)
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            return iter(list(self._hot))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._hot)
+
+    # --- ciclo de vida ---
+
+    def mark_finished(self, call_id: str):
+        """Archiva la llamada y programa su descarte de memoria tras el TTL."""
+        with self._lock:
+            call = self._hot.get(call_id)
+            if call is None:
+                return
+            now = time.time()
+            self._active.pop(call_id, None)
+            self._finished.pop(call_id, None)
+            self._finished[call_id] = now
+
+        self._save(call_id, call, now)
+        self._evict()
+
+    def _save(self, call_id: str, call: Dict[str, Any], finished_at: float):
+        try:
+            self._get_archive().save(call_id, call, finished_at)
+            with self._lock:
+                self.archived += 1
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            print(f"⚠️ No se pudo archivar la llamada {call_id}: {e}")
+
+    def _evict(self):
+        now = time.time()
+        evicted: List[Tuple[str, Dict[str, Any], float]] = []
+        with self._lock:
+            while self._finished:
+                call_id, finished_at = next(iter(self._finished.items()))
+                # Las elegidas siguen en _hot hasta archivarlas: no cuentan
+                hot = len(self._hot) - len(evicted)
+                if now - finished_at < self.ttl and hot <= self.max_hot:
+                    break
+                del self._finished[call_id]
+                evicted.append((call_id, self._hot[call_id], finished_at))
+            # Activas abandonadas (sin estado final): en orden de alta
+            while self._active:
+                call_id, started_at = next(iter(self._active.items()))
+                if now - started_at < self.max_active_age:
+                    break
+                del self._active[call_id]
+                evicted.append((call_id, self._hot[call_id], now))
+
+        # Se archiva la versión final antes de quitarla de memoria
+        for call_id, call, finished_at in evicted:
+            self._save(call_id, call, finished_at)
+        with self._lock:
+            for call_id, call, _ in evicted:
+                if self._hot.get(call_id) is call:
+                    del self._hot[call_id]
+            self.evicted += len(evicted)
+
+        if self.on_evict is not None:
+            for call_id, _, _ in evicted:
+                self.on_evict(call_id)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hot": len(self._hot),
+                "active": len(self._active),
+                "finished_in_memory": len(self._finished),
+                "archived": self.archived,
+                "evicted": self.evicted,
+                "archive_hits": self.archive_hits,
+            }
+
+
+def _close_call_stores():
+    # Los tests cambian CACHE_DIR: el archivo se reabre en la nueva ruta
+    _stores[:] = [ref for ref in _stores if ref() is not None]
+    for ref in _stores:
+        store = ref()
+        if store is not None:
+            store.close()
+
+
+register_reset_hook(_close_call_stores)
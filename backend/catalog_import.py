@@ -0,0 +1,461 @@
+"""
+===========================================================
+CATALOG IMPORT - Carga masiva de lugares en el catálogo local
+===========================================================
+
+Importa extractos de restaurantes (CSV, GeoJSON u OSM/Overpass JSON)
+al catálogo de backend/place_catalog.py con el mismo esquema
+normalizado que produce places_text_search (name, address, place_id,
+types, rating, location, opening_hours...).
+
+- Lectura en streaming: los ficheros no se cargan enteros en memoria
+  (CSV fila a fila; GeoJSON/Overpass objeto a objeto)
+- Escritura por bloques (--chunk-size). Por defecto los índices se
+  mantienen al día, para que el API pueda seguir leyendo el catálogo
+  durante la carga. Con --offline (catálogo que nadie está usando) se
+  quitan los índices y se construyen al final, que es más rápido
+- --cover marca como cubiertas las celdas geohash que contienen lugares
+  importados, para que las búsquedas por texto en ellas se respondan
+  desde el catálogo (el resto del rectángulo del fichero no)
+
+Los lugares importados caducan como el resto (PLACE_CATALOG_MAX_AGE):
+para pre-calentar una ciudad antes de un lanzamiento, importa poco
+antes o sube ese valor. El API lee el catálogo al arrancar.
+
+Uso:
+    python -m backend.catalog_import madrid.geojson --cover
+    python -m backend.catalog_import restaurantes.csv --chunk-size 5000 --offline
+    python -m backend.catalog_import overpass.json --format osm
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import math
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO
+
+ROOT_DIR = Path(__file__).parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from backend.place_catalog import (
+    BUCKET_PRECISION,
+    IMPORT_SOURCE,
+    PlaceCatalog,
+    catalog_path,
+    geohash_encode,
+)
+
+
+# ===========================================================
+# CONFIGURACIÓN
+# ===========================================================
+
+DEFAULT_CHUNK_SIZE = 2000
+READ_BLOCK_SIZE = 1 << 16  # 64 KB por lectura en los JSON
+
+# Columnas/propiedades aceptadas para cada campo (primera que exista)
+FIELD_ALIASES = {
+    "place_id": ["place_id", "id", "osm_id", "@id"],
+    "name": ["name", "nombre", "title"],
+    "address": ["address", "formatted_address", "direccion"],
+    "lat": ["lat", "latitude", "y"],
+    "lng": ["lng", "lon", "long", "longitude", "x"],
+    "types": ["types", "type", "category", "categories", "amenity"],
+    "rating": ["rating", "stars"],
+    "user_ratings_total": ["user_ratings_total", "reviews", "review_count"],
+    "price_level": ["price_level", "price"],
+    "neighborhood": ["neighborhood", "barrio", "addr:suburb", "addr:neighbourhood"],
+    "phone": ["phone", "telefono", "contact:phone"],
+    "website": ["website", "url", "contact:website"],
+    "opening_hours": ["opening_hours", "hours", "horario"],
+}
+
+
+# ===========================================================
+# NORMALIZACIÓN
+# ===========================================================
+
+
+def _first(record: Dict[str, Any], field: str) -> Any:
+    for alias in FIELD_ALIASES[field]:
+        value = record.get(alias)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def _to_float(value: Any) -> Optional[float]:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) else None
+
+
+def _to_int(value: Any) -> Optional[int]:
+    number = _to_float(value)
+    return int(number) if number is not None else None
+
+
+def _split_list(value: Any) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return [str(v).strip() for v in value if str(v).strip()]
+    for separator in ("|", ";", ","):
+        if separator in str(value):
+            return [v.strip() for v in str(value).split(separator) if v.strip()]
+    return [str(value).strip()] if str(value).strip() else []
+
+
+def _osm_address(record: Dict[str, Any]) -> Optional[str]:
+    street = record.get("addr:street")
+    if not street:
+        return None
+    number = record.get("addr:housenumber")
+    parts = [f"{street} {number}" if number else street]
+    for key in ("addr:postcode", "addr:city"):
+        if record.get(key):
+            parts.append(str(record[key]))
+    return ", ".join(parts)
+
+
+def normalize_record(
+    record: Dict[str, Any],
+    lat: Optional[float] = None,
+    lng: Optional[float] = None,
+    default_id: Optional[str] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Convierte una fila/feature/elemento al esquema de places_text_search.
+
+    Devuelve None si faltan nombre o coordenadas.
+    """
+    lat = lat if lat is not None else _to_float(_first(record, "lat"))
+    lng = lng if lng is not None else _to_float(_first(record, "lng"))
+    name = _first(record, "name")
+    if lat is None or lng is None or not name:
+        return None
+
+    place_id = _first(record, "place_id") or default_id
+    if not place_id:
+        place_id = f"import:{lat:.6f},{lng:.6f}:{name}"
+
+    types = _split_list(_first(record, "types"))
+    # Cocina de OSM con la convención de tipos de Google: pizza -> pizza_restaurant
+    for cuisine in _split_list(record.get("cuisine")):
+        types.append(f"{cuisine.lower().replace(' ', '_')}_restaurant")
+    types = list(dict.fromkeys(t.lower() for t in types)) or ["restaurant"]
+
+    opening_hours = _first(record, "opening_hours")
+    if isinstance(opening_hours, str):
+        opening_hours = {"weekday_text": [opening_hours]}
+
+    return {
+        "name": str(name),
+        "address": _first(record, "address") or _osm_address(record),
+        "place_id": str(place_id),
+        "types": types,
+        "rating": _to_float(_first(record, "rating")),
+        "user_ratings_total": _to_int(_first(record, "user_ratings_total")),
+        "price_level": _to_int(_first(record, "price_level")),
+        "location": {"lat": lat, "lng": lng},
+        "neighborhood": _first(record, "neighborhood"),
+        "phone": _first(record, "phone"),
+        "website": _first(record, "website"),
+        "opening_hours": opening_hours or {},
+        "photo_name": None,
+        "source": IMPORT_SOURCE,  # no se refresca con Place Details
+    }
+
+
+# ===========================================================
+# LECTORES (STREAMING)
+# ===========================================================
+
+
+def _iter_json_lines(first: str, fh: TextIO) -> Iterator[Dict[str, Any]]:
+    pending = ""
+    for block in itertools.chain([first], iter(lambda: fh.read(READ_BLOCK_SIZE), "")):
+        lines = (pending + block).split("\n")
+        pending = lines.pop()
+        for line in lines:
+            if line.strip():
+                yield json.loads(line)
+    if pending.strip():
+        yield json.loads(pending)
+
+
+def iter_json_array(fh: TextIO, key: str) -> Iterator[Dict[str, Any]]:
+    """
+    Recorre los objetos del array `key` de un JSON grande sin cargarlo entero.
+
+    También acepta JSON por líneas (un objeto por línea, p. ej. GeoJSONSeq).
+    """
+    buffer = fh.read(READ_BLOCK_SIZE)
+
+    # ¿JSON por líneas? La primera línea es un objeto completo sin `key`
+    first_line = buffer.lstrip().split("\n", 1)[0]
+    try:
+        first = json.loads(first_line)
+    except json.JSONDecodeError:
+        first = None
+    if isinstance(first, dict) and key not in first:
+        yield from _iter_json_lines(buffer, fh)
+        return
+
+    # Documento único: avanzar hasta el "[" del array `key`
+    pattern = re.compile(r'"%s"\s*:\s*\[' % re.escape(key))
+    while True:
+        match = pattern.search(buffer)
+        if match:
+            buffer = buffer[match.end() :]
+            break
+        block = fh.read(READ_BLOCK_SIZE)
+        if not block:
+            return
+        buffer = buffer[-len(key) - 64 :] + block  # la clave puede quedar partida
+
+    decoder = json.JSONDecoder()
+    eof = False
+    while True:
+        buffer = buffer.lstrip(" \t\r\n,")
+        if buffer.startswith("]"):
+            return
+        try:
+            obj, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError as e:
+            end = _element_end(buffer)
+            if end is not None:
+                # Elemento completo pero inválido: se omite y se sigue
+                print(f"   ⚠️ Elemento JSON inválido omitido: {e}")
+                buffer = buffer[end:]
+                continue
+            if eof:
+                raise ValueError(f"JSON truncado: el array '{key}' no se cierra") from e
+            block = fh.read(READ_BLOCK_SIZE)
+            eof = not block
+            buffer += block
+            continue
+        yield obj
+        buffer = buffer[end:]
+
+
+def _element_end(buffer: str) -> Optional[int]:
+    """
+    Fin del primer elemento del buffer: tras su llave o corchete de cierre
+    (a profundidad 0, fuera de cadenas) o, si no es un objeto/array, en la
+    siguiente coma o "]". None si el elemento aún no está completo.
+    """
+    depth = 0
+    in_string = escaped = False
+    for i, char in enumerate(buffer):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            depth += 1
+        elif char in "}]":
+            if depth == 0:
+                # "]" del array tras un valor suelto; un "}" de más se salta
+                return i if char == "]" else i + 1
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        elif char == "," and depth == 0:
+            return i
+    return None
+
+
+def read_csv(fh: TextIO) -> Iterator[Dict[str, Any]]:
+    for row in csv.DictReader(fh):
+        place = normalize_record(row)
+        if place:
+            yield place
+
+
+def read_geojson(fh: TextIO) -> Iterator[Dict[str, Any]]:
+    for feature in iter_json_array(fh, "features"):
+        geometry = feature.get("geometry") or {}
+        coordinates = geometry.get("coordinates")
+        if geometry.get("type") != "Point" or not coordinates:
+            continue
+        properties = dict(feature.get("properties") or {})
+        properties.update(properties.pop("tags", None) or {})
+        default_id = f"osm:{feature['id']}" if feature.get("id") is not None else None
+        place = normalize_record(
+            properties,
+            lat=_to_float(coordinates[1]),
+            lng=_to_float(coordinates[0]),
+            default_id=default_id,
+        )
+        if place:
+            yield place
+
+
+def read_overpass(fh: TextIO) -> Iterator[Dict[str, Any]]:
+    for element in iter_json_array(fh, "elements"):
+        center = element.get("center") or element  # ways/relations con "out center"
+        place = normalize_record(
+            dict(element.get("tags") or {}),
+            lat=_to_float(center.get("lat")),
+            lng=_to_float(center.get("lon")),
+            default_id=f"osm:{element.get('type', 'node')}/{element.get('id')}",
+        )
+        if place:
+            yield place
+
+
+READERS = {"csv": read_csv, "geojson": read_geojson, "osm": read_overpass}
+
+
+def detect_format(path: str) -> str:
+    suffix = Path(path).suffix.lower()
+    if suffix == ".csv":
+        return "csv"
+    if suffix in (".geojson", ".geojsonl", ".geojsons"):
+        return "geojson"
+    with open(path, encoding="utf-8") as fh:
+        head = fh.read(READ_BLOCK_SIZE)
+    return "osm" if '"elements"' in head else "geojson"
+
+
+# ===========================================================
+# IMPORTACIÓN
+# ===========================================================
+
+
+def _chunks(items: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def import_places(
+    path: str,
+    file_format: Optional[str] = None,
+    catalog: Optional[PlaceCatalog] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    cover: bool = False,
+    offline: bool = False,
+) -> Dict[str, Any]:
+    """
+    Importa un fichero al catálogo y devuelve un resumen.
+
+    Sin catalog se abre el de PLACE_CATALOG_PATH (o CACHE_DIR/places.db)
+    sin índice en memoria. offline=True quita los índices SQL durante la
+    carga: solo para catálogos que no está leyendo el API.
+    """
+    file_format = file_format or detect_format(path)
+    reader = READERS[file_format]
+    own_catalog = catalog is None
+    if own_catalog:
+        catalog = PlaceCatalog(catalog_path(), memory_index=False)
+
+    started = time.time()
+    total = 0
+    cells = set()  # celdas con lugares importados (--cover)
+
+    try:
+        try:
+            if offline:
+                catalog.drop_indexes()
+            with open(path, encoding="utf-8", newline="") as fh:
+                for chunk in _chunks(reader(fh), chunk_size):
+                    total += catalog.upsert_many(chunk, text_index=not offline)
+                    if cover:
+                        for place in chunk:
+                            location = place["location"]
+                            cells.add(
+                                geohash_encode(location["lat"], location["lng"], BUCKET_PRECISION)
+                            )
+                    print(f"   📥 {total} lugares importados...")
+        finally:
+            if offline:
+                print("🔨 Construyendo índices espaciales y de texto...")
+                catalog.create_indexes()
+
+        # Solo si el fichero se leyó entero: una zona a medias no está cubierta
+        if cells:
+            catalog.record_cells(cells)
+    finally:
+        if own_catalog:
+            catalog.close()
+        else:
+            catalog.reload()
+
+    return {
+        "file": path,
+        "format": file_format,
+        "imported": total,
+        "covered_cells": len(cells),
+        "seconds": round(time.time() - started, 2),
+    }
+
+
+# ===========================================================
+# CLI
+# ===========================================================
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Importa restaurantes (CSV, GeoJSON u Overpass JSON) al catálogo local"
+    )
+    parser.add_argument("files", nargs="+", help="Ficheros a importar")
+    parser.add_argument("--format", choices=sorted(READERS), help="Por defecto, según la extensión")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument(
+        "--cover",
+        action="store_true",
+        help="Marca como cubiertas las celdas geohash con lugares importados",
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Quita los índices durante la carga (solo con el API parado)",
+    )
+    args = parser.parse_args(argv)
+
+    status = 0
+    for path in args.files:
+        print(f"\n📂 Importando {path}")
+        try:
+            summary = import_places(
+                path,
+                file_format=args.format,
+                chunk_size=args.chunk_size,
+                cover=args.cover,
+                offline=args.offline,
+            )
+        except ValueError as e:
+            # Lo leído hasta el error ya está en el catálogo
+            print(f"❌ {path}: {e}")
+            status = 1
+            continue
+        print(
+            f"✅ {summary['imported']} lugares ({summary['format']}) "
+            f"en {summary['seconds']} s"
+        )
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -13,6 +13,8 @@ El flujo interno del módulo es:
 1) Geocodificar la ubicación si se pasa como texto.
 2) Ejecutar Places Text Search.
 3) Para cada sitio encontrado, obtener detalles avanzados (Place Details).
+   Los lugares se guardan en el catálogo local (backend/place_catalog.py),
+   que responde búsquedas repetidas en una zona ya cubierta.
 4) Normalizar los datos para facilitar su uso.
 5) Filtrar resultados por tiempo máximo de viaje (opcional).
 6) Devolver resultados enriquecidos y uniformes.
@@ -32,6 +34,7 @@ Define todos los parámetros que puede recibir la búsqueda:
 - extras (list[str]): Palabras clave adicionales para añadir a la query.
 - max_travel_time (int | None): Tiempo máximo de viaje en minutos.
 - travel_mode (str): walking, driving, bicycling o transit.
+- travel_time_strategy (str | None): "api", "estimate" (sin red) o "auto".
 
 Esta clase es el *único input* que debe recibir la función places_text_search().
 
@@ -58,7 +61,9 @@ Esta función realiza todo el proceso de búsqueda:
    - Normaliza los datos en un diccionario uniforme.
 
 5) Si el payload incluye max_travel_time:
-   Filtra los resultados usando Distance Matrix API.
+   Filtra los resultados usando Distance Matrix API (backend/travel_time.py:
+   descarta antes los que están demasiado lejos en línea recta y cachea
+   las duraciones).
 
 6) Devuelve un diccionario:
 {
@@ -131,11 +136,22 @@ ESTAMOS ATOPE JEFE DE EQUIPO !!!!
 
 # ---------------- IMPORTS ----------------
 from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
-import requests
+from typing import Optional, List, Dict, Any, Callable
 import os
+import re
+import time
+import threading
+import unicodedata
+import json
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
+from backend import http_client
+from backend.cache import get_cache, register_reset_hook
+from backend.place_catalog import get_place_catalog
+from backend.query_similarity import QUERY_SIMILARITY_ENABLED, get_query_index, similar_queries
+from backend.travel_time import SPEED_PROFILES_M_PER_MIN, within_travel_time
+
 
 # ---------------- CARGA CONFIGURACIÓN ----------------
 
@@ -147,6 +163,35 @@ if not GOOGLE_MAPS_API_KEY:
     raise ValueError("Debes definir la variable de entorno GOOGLE_MAPS_API_KEY")
 
 
+# ---------------- Cachés ----------------
+GEOCODE_CACHE_TTL = int(os.getenv("GEOCODE_CACHE_TTL", str(30 * 24 * 3600)))  # 30 días
+GEOCODE_CACHE_SIZE = int(os.getenv("GEOCODE_CACHE_SIZE", "2000"))
+# Text Search: fresco durante PLACES_CACHE_TTL; después, y hasta
+# PLACES_CACHE_STALE_TTL más, se sirve al momento y se refresca en segundo plano
+PLACES_CACHE_TTL = int(os.getenv("PLACES_CACHE_TTL", "900"))  # 15 minutos
+PLACES_CACHE_STALE_TTL = int(os.getenv("PLACES_CACHE_STALE_TTL", str(24 * 3600)))
+PLACES_CACHE_SIZE = int(os.getenv("PLACES_CACHE_SIZE", "500"))
+# Catálogo local: una búsqueda igual dentro de un círculo ya cubierto hace
+# menos de PLACE_CATALOG_MAX_AGE segundos se responde sin llamar a Google
+PLACE_CATALOG_ENABLED = os.getenv("PLACE_CATALOG_ENABLED", "true").lower() == "true"
+PLACE_CATALOG_MAX_AGE = int(os.getenv("PLACE_CATALOG_MAX_AGE", str(24 * 3600)))
+# Búsqueda por texto en el catálogo (variantes de la misma búsqueda): solo
+# en zonas ya cubiertas y con al menos PLACE_CATALOG_MIN_RESULTS resultados
+PLACE_CATALOG_TEXT_SEARCH = os.getenv("PLACE_CATALOG_TEXT_SEARCH", "true").lower() == "true"
+PLACE_CATALOG_MIN_RESULTS = int(os.getenv("PLACE_CATALOG_MIN_RESULTS", "3"))
+# Si una búsqueda servida desde el catálogo incluye lugares con más
+# antigüedad que esta, se repite en segundo plano (una vez por periodo)
+PLACE_REFRESH_AGE = int(os.getenv("PLACE_REFRESH_AGE", str(6 * 3600)))
+
+
+# Campos que se piden de cada lugar (Text Search y Place Details)
+PLACE_FIELDS = [
+    "id", "displayName", "formattedAddress", "location", "rating", "userRatingCount",
+    "priceLevel", "types", "nationalPhoneNumber", "websiteUri", "regularOpeningHours",
+    "addressComponents", "photos",
+]
+
+
 # ---------------- Payload de búsqueda ----------------
 class PlaceSearchPayload(BaseModel):
     query: str
@@ -160,20 +205,58 @@ class PlaceSearchPayload(BaseModel):
     )
     col_date: Optional[str] = None  # fecha de la visita (YYYY-MM-DD)
     col_time: Optional[str] = None  # hora de la visita (HH:MM
+    travel_time_strategy: Optional[str] = None  # "api", "estimate" o "auto" (TRAVEL_TIME_STRATEGY)
 
 
 # ---------------- Funciones auxiliares ----------------
+def normalize_location_key(location: str) -> str:
+    """
+    Clave de caché para una ubicación textual.
+
+    "Madrid Centro", " madrid  centro " y "Madrid centro." dan la misma
+    clave: minúsculas, sin acentos, sin puntuación y espacios simples.
+    """
+    text = unicodedata.normalize("NFKD", location.lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = re.sub(r"[^\w\s,]", " ", text)
+    text = re.sub(r"\s*,\s*", ", ", text)
+    return re.sub(r"\s+", " ", text).strip(" ,")
+
+
+def _geocode_cache():
+    return get_cache(
+        "geocode",
+        maxsize=GEOCODE_CACHE_SIZE,
+        ttl_seconds=GEOCODE_CACHE_TTL,
+        persistent=True,
+    )
+
+
 def geocode_location(location: str) -> Optional[str]:
     """
     Convierte un string de ubicación en lat,lng usando Geocoding API.
 
     ACTUALIZADO: Usa solo Geocoding API (más simple y confiable).
+    Los resultados se cachean (memoria + SQLite) por ubicación normalizada;
+    los fallos no se cachean.
     """
+    cache_key = normalize_location_key(location)
+    cached = _geocode_cache().get(cache_key)
+    if cached is not None:
+        return cached
+
+    coords = _geocode_location_api(location)
+    _geocode_cache().set(cache_key, coords)
+    return coords
+
+
+def _geocode_location_api(location: str) -> Optional[str]:
+    """Llamada real a Geocoding API (sin caché)."""
     geocode_url = "https://maps.googleapis.com/maps/api/geocode/json"
     geocode_params = {"address": location, "key": GOOGLE_MAPS_API_KEY}
 
     try:
-        r = requests.get(geocode_url, params=geocode_params)
+        r = http_client.get(geocode_url, service="google_maps", params=geocode_params)
         r.raise_for_status()
         geocode_data = r.json()
 
@@ -228,8 +311,10 @@ def get_place_details(place_id: str) -> Dict[str, Any]:
         "address_components,place_id",
         "key": GOOGLE_MAPS_API_KEY,
     }
-    r = requests.get(
-        "https://maps.googleapis.com/maps/api/place/details/json", params=params
+    r = http_client.get(
+        "https://maps.googleapis.com/maps/api/place/details/json",
+        service="google_maps",
+        params=params,
     )
     r.raise_for_status()
     data = r.json()
@@ -237,32 +322,21 @@ def get_place_details(place_id: str) -> Dict[str, Any]:
 
 
 def filter_by_travel_time(
-    origin: str, destinations: List[str], max_time: int, mode: str = "walking"
+    origin: str,
+    destinations: List[Optional[str]],
+    max_time: int,
+    mode: str = "walking",
+    strategy: Optional[str] = None,
 ) -> List[bool]:
     """
     Devuelve un booleano por cada destino: True si está dentro del tiempo máximo de viaje.
-    """
-    if not destinations:
-        return []
 
-    params = {
-        "origins": origin,
-        "destinations": "|".join(destinations),
-        "mode": mode,
-        "key": GOOGLE_MAPS_API_KEY,
-    }
-    url = "https://maps.googleapis.com/maps/api/distancematrix/json"
-    r = requests.get(url, params=params)
-    r.raise_for_status()
-    data = r.json()
-    results = []
-    for elem in data.get("rows", [])[0].get("elements", []):
-        if elem.get("status") == "OK":
-            duration_sec = elem.get("duration", {}).get("value", 0)
-            results.append(duration_sec <= max_time * 60)
-        else:
-            results.append(False)
-    return results
+    Delegado en backend/travel_time.py: pre-filtro en línea recta, caché
+    de duraciones y peticiones a Distance Matrix por bloques en paralelo.
+    strategy="estimate" calcula los tiempos en local sin llamar a la API;
+    "auto" (por defecto) recurre a la estimación si la API es lenta o falla.
+    """
+    return within_travel_time(origin, destinations, max_time, mode, strategy)
 
 
 import re
@@ -276,7 +350,13 @@ def is_lat_lng(value: str) -> bool:
     return bool(re.match(pattern, value.strip()))
 
 
-def get_photo_url(photo_name: str, max_width: int = 400, max_height: int = 400) -> str:
+def get_photo_url(
+    photo_name: str,
+    max_width: int = 400,
+    max_height: int = 400,
+    image_format: Optional[str] = None,
+    proxy_base_url: Optional[str] = None,
+) -> str:
     """
     Genera la URL para obtener la foto de un lugar usando la nueva Places API (New).
 
@@ -284,6 +364,10 @@ def get_photo_url(photo_name: str, max_width: int = 400, max_height: int = 400)
         photo_name: Nombre de la foto en formato "places/{place_id}/photos/{photo_id}"
         max_width: Ancho máximo de la imagen en píxeles
         max_height: Alto máximo de la imagen en píxeles
+        image_format: "webp", "avif" o "jpeg" (solo a través del proxy)
+        proxy_base_url: URL del API (p. ej. "http://localhost:8000"); si se
+            indica se devuelve la URL del proxy /api/photo, que no expone la
+            API key y sirve miniaturas cacheadas
 
     Returns:
         URL completa de la foto con los parámetros necesarios
@@ -291,13 +375,82 @@ def get_photo_url(photo_name: str, max_width: int = 400, max_height: int = 400)
     if not photo_name:
         return None
 
+    if proxy_base_url:
+        params = f"?w={max_width}&h={max_height}"
+        if image_format:
+            params += f"&format={image_format}"
+        return f"{proxy_base_url.rstrip('/')}/api/photo/{photo_name}{params}"
+
     # Nueva Places API (New) usa un endpoint diferente para las fotos
+    # (Google solo sirve JPEG; image_format se ignora sin proxy)
     base_url = f"https://places.googleapis.com/v1/{photo_name}/media"
     params = f"?maxWidthPx={max_width}&maxHeightPx={max_height}&key={GOOGLE_MAPS_API_KEY}"
 
     return base_url + params
 
 
+def normalize_text_search_place(place: Dict[str, Any]) -> Dict[str, Any]:
+    """Convierte un lugar de Places API (New) Text Search al esquema normalizado."""
+    # Extraer price level (viene como string "PRICE_LEVEL_2")
+    price_level_str = place.get("priceLevel", "")
+    price_level = None
+    if price_level_str and price_level_str.startswith("PRICE_LEVEL_"):
+        try:
+            price_level = int(price_level_str.split("_")[-1])
+        except:
+            pass
+
+    # Extraer ubicación
+    loc = place.get("location", {})
+    location_dict = {"lat": loc.get("latitude"), "lng": loc.get("longitude")}
+
+    # Extraer neighborhood de addressComponents
+    neighborhood = None
+    for comp in place.get("addressComponents", []):
+        if "neighborhood" in comp.get("types", []):
+            neighborhood = comp.get("longText")
+            break
+        elif "sublocality_level_1" in comp.get("types", []):
+            neighborhood = comp.get("longText")
+        elif not neighborhood and "locality" in comp.get("types", []):
+            neighborhood = comp.get("longText")
+
+    # Extraer horarios
+    opening_hours = {}
+    if "regularOpeningHours" in place:
+        opening_hours = {
+            "open_now": place["regularOpeningHours"].get("openNow"),
+            "weekday_text": place["regularOpeningHours"].get(
+                "weekdayDescriptions", []
+            ),
+            "periods": place["regularOpeningHours"].get("periods", []),
+        }
+
+    # Extraer primera foto si está disponible
+    photo_name = None
+    photos = place.get("photos", [])
+    if photos and len(photos) > 0:
+        photo_name = photos[0].get("name")  # Formato: "places/{place_id}/photos/{photo_id}"
+
+    normalized = {
+        "name": place.get("displayName", {}).get("text"),
+        "address": place.get("formattedAddress"),
+        "place_id": place.get("id"),
+        "types": place.get("types", []),
+        "rating": place.get("rating"),
+        "user_ratings_total": place.get("userRatingCount"),
+        "price_level": price_level,
+        "location": location_dict,
+        "neighborhood": neighborhood,
+        "phone": place.get("nationalPhoneNumber"),
+        "website": place.get("websiteUri"),
+        "opening_hours": opening_hours,
+        "photo_name": photo_name,
+    }
+
+    return normalized
+
+
 def places_text_search(payload: PlaceSearchPayload) -> Dict[str, Any]:
     """
     Búsqueda de lugares usando la nueva Places API (New).
@@ -325,12 +478,10 @@ def places_text_search(payload: PlaceSearchPayload) -> Dict[str, Any]:
     radius = payload.radius
     if radius is None:
         if payload.max_travel_time:
-            if payload.travel_mode == "driving":
-                radius = payload.max_travel_time * 833
-            elif payload.travel_mode == "bicycling":
-                radius = payload.max_travel_time * 250
-            else:
-                radius = payload.max_travel_time * 80
+            speed = SPEED_PROFILES_M_PER_MIN.get(
+                payload.travel_mode, SPEED_PROFILES_M_PER_MIN["walking"]
+            )
+            radius = int(payload.max_travel_time * speed)
         else:
             radius = 5000
 
@@ -339,10 +490,7 @@ def places_text_search(payload: PlaceSearchPayload) -> Dict[str, Any]:
     headers = {
         "Content-Type": "application/json",
         "X-Goog-Api-Key": GOOGLE_MAPS_API_KEY,
-        "X-Goog-FieldMask": "places.id,places.displayName,places.formattedAddress,places.location,"
-        "places.rating,places.userRatingCount,places.priceLevel,places.types,"
-        "places.nationalPhoneNumber,places.websiteUri,places.regularOpeningHours,"
-        "places.addressComponents,places.photos",
+        "X-Goog-FieldMask": ",".join(f"places.{field}" for field in PLACE_FIELDS),
     }
 
     # Separar lat,lng
@@ -364,80 +512,301 @@ def places_text_search(payload: PlaceSearchPayload) -> Dict[str, Any]:
         body["minRating"] = 0.0
         body["priceLevels"] = [f"PRICE_LEVEL_{payload.price_level}"]
 
-    r = requests.post(url, headers=headers, json=body)
-    r.raise_for_status()
-    data = r.json()
+    data = _search_text_cached(
+        url, headers, body, local_lookup=lambda: _catalog_lookup(body, url, headers)
+    )
+    if "catalog_places" in data:
+        # Respondida por el catálogo local (ya normalizada)
+        results = data["catalog_places"]
+    else:
+        results = [normalize_text_search_place(place) for place in data.get("places", [])]
 
-    results = []
+    # Un destino por resultado (None sin coordenadas) para que el filtro quede alineado
     destinations = []
-
-    for place in data.get("places", []):
-        # Extraer price level (viene como string "PRICE_LEVEL_2")
-        price_level_str = place.get("priceLevel", "")
-        price_level = None
-        if price_level_str and price_level_str.startswith("PRICE_LEVEL_"):
-            try:
-                price_level = int(price_level_str.split("_")[-1])
-            except:
-                pass
-
-        # Extraer ubicación
-        loc = place.get("location", {})
-        location_dict = {"lat": loc.get("latitude"), "lng": loc.get("longitude")}
-
-        # Extraer neighborhood de addressComponents
-        neighborhood = None
-        for comp in place.get("addressComponents", []):
-            if "neighborhood" in comp.get("types", []):
-                neighborhood = comp.get("longText")
-                break
-            elif "sublocality_level_1" in comp.get("types", []):
-                neighborhood = comp.get("longText")
-            elif not neighborhood and "locality" in comp.get("types", []):
-                neighborhood = comp.get("longText")
-
-        # Extraer horarios
-        opening_hours = {}
-        if "regularOpeningHours" in place:
-            opening_hours = {
-                "open_now": place["regularOpeningHours"].get("openNow"),
-                "weekday_text": place["regularOpeningHours"].get(
-                    "weekdayDescriptions", []
-                ),
-                "periods": place["regularOpeningHours"].get("periods", []),
-            }
-
-        # Extraer primera foto si está disponible
-        photo_name = None
-        photos = place.get("photos", [])
-        if photos and len(photos) > 0:
-            photo_name = photos[0].get("name")  # Formato: "places/{place_id}/photos/{photo_id}"
-
-        normalized = {
-            "name": place.get("displayName", {}).get("text"),
-            "address": place.get("formattedAddress"),
-            "place_id": place.get("id"),
-            "types": place.get("types", []),
-            "rating": place.get("rating"),
-            "user_ratings_total": place.get("userRatingCount"),
-            "price_level": price_level,
-            "location": location_dict,
-            "neighborhood": neighborhood,
-            "phone": place.get("nationalPhoneNumber"),
-            "website": place.get("websiteUri"),
-            "opening_hours": opening_hours,
-            "photo_name": photo_name,
-        }
-
-        results.append(normalized)
+    for place in results:
+        location_dict = place.get("location") or {}
         if location_dict.get("lat") and location_dict.get("lng"):
             destinations.append(f"{location_dict['lat']},{location_dict['lng']}")
+        else:
+            destinations.append(None)
 
     # Filtrar por tiempo de viaje si se especifica
     if payload.max_travel_time is not None and destinations:
         travel_filter = filter_by_travel_time(
-            location, destinations, payload.max_travel_time, payload.travel_mode
+            location,
+            destinations,
+            payload.max_travel_time,
+            payload.travel_mode,
+            payload.travel_time_strategy,
         )
         results = [r for r, keep in zip(results, travel_filter) if keep]
 
     return results
+
+
+
+# ---------------- Caché de Text Search (stale-while-revalidate) ----------------
+
+_refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="places-refresh")
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+
+def _places_cache():
+    return get_cache(
+        "places_search",
+        maxsize=PLACES_CACHE_SIZE,
+        ttl_seconds=PLACES_CACHE_TTL + PLACES_CACHE_STALE_TTL,
+        persistent=True,
+    )
+
+
+def _places_scope(body: Dict[str, Any]) -> Dict[str, Any]:
+    """Todo lo que no es texto: centro redondeado (~10 m), radio, precio y nº."""
+    center = body["locationBias"]["circle"]["center"]
+    return {
+        "lat": round(center["latitude"], 4),
+        "lng": round(center["longitude"], 4),
+        "r": int(body["locationBias"]["circle"]["radius"]),
+        "price": body.get("priceLevels"),
+        "n": body.get("maxResultCount"),
+    }
+
+
+def _places_cache_key(body: Dict[str, Any]) -> str:
+    """
+    Clave canónica de una búsqueda: query normalizada, centro redondeado
+    (~10 m), radio y filtro de precio.
+    """
+    canonical = {"q": normalize_location_key(body["textQuery"]), **_places_scope(body)}
+    return json.dumps(canonical, sort_keys=True)
+
+
+def _similar_places_entry(cache, key: str, body: Dict[str, Any]) -> Optional[Dict]:
+    """
+    Entrada fresca de una búsqueda casi igual (acentos, plurales, orden,
+    erratas) en el mismo círculo y con los mismos filtros, o None.
+    """
+    if not QUERY_SIMILARITY_ENABLED:
+        return None
+    scope = json.dumps(_places_scope(body), sort_keys=True)
+    similar_key = get_query_index("places_search").find(scope, body["textQuery"])
+    if similar_key is None or similar_key == key:
+        return None
+    entry = cache.get(similar_key)
+    if entry is None or time.time() - entry["fetched_at"] > PLACES_CACHE_TTL:
+        return None
+    cache.count("similar_hits")
+    return entry
+
+
+def _remember_places_query(key: str, body: Dict[str, Any]):
+    if QUERY_SIMILARITY_ENABLED:
+        scope = json.dumps(_places_scope(body), sort_keys=True)
+        get_query_index("places_search").add(scope, body["textQuery"], key)
+
+
+def _search_text_request(url: str, headers: Dict[str, str], body: Dict[str, Any]) -> Dict:
+    """POST real a places:searchText."""
+    r = http_client.post(url, service="google_maps", headers=headers, json=body)
+    r.raise_for_status()
+    return r.json()
+
+
+def _search_text_cached(
+    url: str,
+    headers: Dict[str, str],
+    body: Dict[str, Any],
+    local_lookup: Optional[Callable[[], Optional[Dict]]] = None,
+) -> Dict:
+    """
+    Text Search con caché stale-while-revalidate.
+
+    - Fresca: se devuelve sin llamar a la API.
+    - Caducada (stale): se devuelve al momento y se lanza un refresco
+      en segundo plano.
+    - Sin entrada: se prueba local_lookup (catálogo local); si no
+      responde, llamada normal y se guarda.
+    """
+    cache = _places_cache()
+    key = _places_cache_key(body)
+
+    entry = cache.get(key)
+    if entry is not None:
+        if time.time() - entry["fetched_at"] > PLACES_CACHE_TTL:
+            cache.count("stale_served")
+            _schedule_refresh(key, url, headers, body)
+        _remember_places_query(key, body)
+        return entry["data"]
+
+    entry = _similar_places_entry(cache, key, body)
+    if entry is not None:
+        return entry["data"]
+
+    if local_lookup is not None:
+        local = local_lookup()
+        if local is not None:
+            cache.count("catalog_hits")
+            return local
+
+    data = _search_text_request(url, headers, body)
+    cache.set(key, {"fetched_at": time.time(), "data": data})
+    _remember_places_query(key, body)
+    _catalog_store(body, data)
+    return data
+
+
+def _schedule_refresh(key: str, url: str, headers: Dict[str, str], body: Dict[str, Any]):
+    """Refresca una entrada en segundo plano (una sola vez por clave)."""
+    with _refreshing_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+    _refresh_executor.submit(_refresh_entry, key, url, headers, body)
+
+
+def _refresh_entry(key: str, url: str, headers: Dict[str, str], body: Dict[str, Any]):
+    cache = _places_cache()
+    try:
+        data = _search_text_request(url, headers, body)
+        cache.set(key, {"fetched_at": time.time(), "data": data})
+        _catalog_store(body, data)
+        cache.count("refreshes")
+    except Exception as e:
+        cache.count("refresh_errors")
+        print(f"⚠️  Error refrescando búsqueda en segundo plano: {e}")
+    finally:
+        with _refreshing_lock:
+            _refreshing.discard(key)
+
+
+def _clear_refreshing():
+    with _refreshing_lock:
+        _refreshing.clear()
+
+
+register_reset_hook(_clear_refreshing)
+
+
+# ---------------- Catálogo local de lugares ----------------
+
+
+def _catalog_search_key(body: Dict[str, Any]) -> str:
+    """Query normalizada + filtro de precio (el círculo se guarda aparte)."""
+    return json.dumps(
+        {"q": normalize_location_key(body["textQuery"]), "price": body.get("priceLevels")},
+        sort_keys=True,
+    )
+
+
+def _catalog_query_matcher(body: Dict[str, Any]) -> Callable[[str], bool]:
+    """Acepta las búsquedas guardadas de la misma query (o una variante) y precio."""
+    query = normalize_location_key(body["textQuery"])
+    price = body.get("priceLevels")
+
+    def matches(query_key: str) -> bool:
+        try:
+            stored = json.loads(query_key)
+        except ValueError:
+            return False
+        if not isinstance(stored, dict) or stored.get("price") != price:
+            return False
+        if stored.get("q") == query:
+            return True
+        return QUERY_SIMILARITY_ENABLED and similar_queries(stored.get("q") or "", query)
+
+    return matches
+
+
+def _catalog_lookup(
+    body: Dict[str, Any],
+    url: Optional[str] = None,
+    headers: Optional[Dict[str, str]] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Resultados desde el catálogo local, o None para ir a Google.
+
+    1) La misma query ya se hizo en un círculo que contiene a este.
+    2) Si no, búsqueda por texto (BM25) en una zona cubierta por una
+       búsqueda de una variante de la query (query_similarity) o por una
+       importación masiva, con al menos PLACE_CATALOG_MIN_RESULTS lugares.
+    Si alguno de los lugares servidos lleva tiempo sin actualizarse, se
+    repite la búsqueda en segundo plano (una llamada, no una por lugar).
+    """
+    if not PLACE_CATALOG_ENABLED:
+        return None
+    circle = body["locationBias"]["circle"]
+    lat = circle["center"]["latitude"]
+    lng = circle["center"]["longitude"]
+    radius = circle["radius"]
+    try:
+        catalog = get_place_catalog()
+        places = catalog.find_search(
+            _catalog_search_key(body), lat, lng, radius, max_age=PLACE_CATALOG_MAX_AGE
+        )
+        if not places and PLACE_CATALOG_TEXT_SEARCH and catalog.covers(
+            lat,
+            lng,
+            radius,
+            max_age=PLACE_CATALOG_MAX_AGE,
+            query_matches=_catalog_query_matcher(body),
+        ):
+            price_levels = body.get("priceLevels") or []
+            places = catalog.text_search(
+                body["textQuery"],
+                lat,
+                lng,
+                radius,
+                max_age=PLACE_CATALOG_MAX_AGE,
+                price_level=int(price_levels[0].split("_")[-1]) if price_levels else None,
+                limit=body.get("maxResultCount", 20),
+            )
+            if len(places) < PLACE_CATALOG_MIN_RESULTS:
+                places = None
+            else:
+                catalog.record_text_hit()
+    except Exception as e:
+        print(f"⚠️  Error consultando el catálogo de lugares: {e}")
+        return None
+
+    if not places:
+        return None
+    if url and catalog.stale_ids([p["place_id"] for p in places], PLACE_REFRESH_AGE):
+        _schedule_catalog_refresh(url, headers, body)
+    return {"catalog_places": places}
+
+
+def _catalog_store(body: Dict[str, Any], data: Dict[str, Any]):
+    """Guarda en el catálogo los lugares de una respuesta de la API."""
+    if not PLACE_CATALOG_ENABLED:
+        return
+    places = [normalize_text_search_place(place) for place in data.get("places", [])]
+    circle = body["locationBias"]["circle"]
+    try:
+        catalog = get_place_catalog()
+        catalog.upsert_many(places, keywords=body["textQuery"])
+        catalog.record_search(
+            _catalog_search_key(body),
+            circle["center"]["latitude"],
+            circle["center"]["longitude"],
+            circle["radius"],
+            [place["place_id"] for place in places if place.get("place_id")],
+        )
+    except Exception as e:
+        print(f"⚠️  Error guardando en el catálogo de lugares: {e}")
+
+
+def _schedule_catalog_refresh(url: str, headers: Dict[str, str], body: Dict[str, Any]):
+    """
+    Repite en segundo plano una búsqueda servida desde el catálogo con
+    lugares antiguos: actualiza todos los que devuelva Google con una sola
+    llamada. Como mucho una vez por búsqueda cada PLACE_REFRESH_AGE.
+    """
+    key = _places_cache_key(body)
+    recent = get_cache(
+        "places_catalog_refresh", maxsize=PLACES_CACHE_SIZE, ttl_seconds=PLACE_REFRESH_AGE
+    )
+    if recent.get(key):
+        return
+    recent.set(key, True)
+    _schedule_refresh(key, url, headers, body)
@@ -0,0 +1,194 @@
+"""
+===========================================================
+HTTP CLIENT - Cliente HTTP compartido para llamadas salientes
+===========================================================
+
+Punto único para las llamadas HTTP a servicios externos (Google Maps,
+fotos de Places, servicio de llamadas...):
+- Pool de conexiones keep-alive compartido (httpx mantiene un pool
+  por host), así no se repite el handshake TLS en cada llamada
+- HTTP/2 si está instalado el paquete h2
+- Timeouts de conexión y lectura por servicio: un endpoint colgado
+  ya no puede bloquear un worker para siempre
+- Variante async (aget/apost), un cliente por event loop
+- Respuestas en streaming (aopen_stream) para no cargar todo en memoria
+
+Uso:
+    from backend import http_client
+
+    r = http_client.get(url, service="google_maps", params=params)
+    r = await http_client.aget(url, service="google_photos", params=params)
+
+Configuración:
+- HTTP_POOL_MAX_CONNECTIONS / HTTP_POOL_KEEPALIVE: tamaño del pool
+- HTTP_CONNECT_TIMEOUT: segundos para conectar (3)
+- HTTP_READ_TIMEOUT_<SERVICIO>: segundos de lectura por servicio
+  (p. ej. HTTP_READ_TIMEOUT_GOOGLE_MAPS=10)
+- HTTP2_ENABLED: "false" fuerza HTTP/1.1
+"""
+
+import asyncio
+import importlib.util
+import os
+import threading
+import weakref
+from typing import Optional, Union
+
+import httpx
+
+
+# ===========================================================
+# CONFIGURACIÓN
+# ===========================================================
+
+HTTP_POOL_MAX_CONNECTIONS = int(os.getenv("HTTP_POOL_MAX_CONNECTIONS", "50"))
+HTTP_POOL_KEEPALIVE = int(os.getenv("HTTP_POOL_KEEPALIVE", "20"))
+HTTP_POOL_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_POOL_KEEPALIVE_EXPIRY", "60"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3"))
+
+# HTTP/2 solo si el paquete h2 está disponible (pip install httpx[http2])
+HTTP2_ENABLED = (
+    os.getenv("HTTP2_ENABLED", "true").lower() == "true"
+    and importlib.util.find_spec("h2") is not None
+)
+
+# Timeout de lectura por servicio (segundos)
+SERVICE_READ_TIMEOUTS = {
+    "google_maps": 10.0,
+    "google_photos": 15.0,
+    "call_service": 10.0,
+    "default": 30.0,
+}
+
+
+def service_timeout(
+    service: str = "default", read: Optional[float] = None
+) -> httpx.Timeout:
+    """Timeout (conexión, lectura) de un servicio; read lo sobreescribe."""
+    if read is None:
+        env_value = os.getenv(f"HTTP_READ_TIMEOUT_{service.upper()}")
+        read = float(env_value) if env_value else SERVICE_READ_TIMEOUTS.get(
+            service, SERVICE_READ_TIMEOUTS["default"]
+        )
+    return httpx.Timeout(read, connect=min(HTTP_CONNECT_TIMEOUT, read))
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=HTTP_POOL_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_POOL_KEEPALIVE,
+        keepalive_expiry=HTTP_POOL_KEEPALIVE_EXPIRY,
+    )
+
+
+# ===========================================================
+# CLIENTES
+# ===========================================================
+
+_lock = threading.Lock()
+_client: Optional[httpx.Client] = None
+# Un AsyncClient por event loop: sus conexiones no se pueden compartir entre loops
+_async_clients: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def get_client() -> httpx.Client:
+    """Cliente síncrono compartido (singleton)."""
+    global _client
+    with _lock:
+        if _client is None or _client.is_closed:
+            _client = httpx.Client(
+                http2=HTTP2_ENABLED,
+                limits=_limits(),
+                timeout=service_timeout(),
+                follow_redirects=True,
+            )
+        return _client
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Cliente async compartido dentro del event loop actual."""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        client = _async_clients.get(loop)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                http2=HTTP2_ENABLED,
+                limits=_limits(),
+                timeout=service_timeout(),
+                follow_redirects=True,
+            )
+            _async_clients[loop] = client
+        return client
+
+
+def reset_http_clients():
+    """Cierra el cliente síncrono y olvida los async (tests o reconfiguración)."""
+    global _client
+    with _lock:
+        if _client is not None:
+            _client.close()
+        _client = None
+        _async_clients.clear()
+
+
+# ===========================================================
+# PETICIONES
+# ===========================================================
+
+TimeoutArg = Union[None, float, httpx.Timeout]
+
+
+def _resolve_timeout(service: str, timeout: TimeoutArg) -> httpx.Timeout:
+    if isinstance(timeout, httpx.Timeout):
+        return timeout
+    return service_timeout(service, timeout)
+
+
+def request(
+    method: str, url: str, service: str = "default", timeout: TimeoutArg = None, **kwargs
+) -> httpx.Response:
+    """Petición síncrona por el pool compartido."""
+    return get_client().request(
+        method, url, timeout=_resolve_timeout(service, timeout), **kwargs
+    )
+
+
+def get(url: str, service: str = "default", **kwargs) -> httpx.Response:
+    return request("GET", url, service=service, **kwargs)
+
+
+def post(url: str, service: str = "default", **kwargs) -> httpx.Response:
+    return request("POST", url, service=service, **kwargs)
+
+
+async def arequest(
+    method: str, url: str, service: str = "default", timeout: TimeoutArg = None, **kwargs
+) -> httpx.Response:
+    """Petición async por el pool compartido del event loop."""
+    return await get_async_client().request(
+        method, url, timeout=_resolve_timeout(service, timeout), **kwargs
+    )
+
+
+async def aget(url: str, service: str = "default", **kwargs) -> httpx.Response:
+    return await arequest("GET", url, service=service, **kwargs)
+
+
+async def apost(url: str, service: str = "default", **kwargs) -> httpx.Response:
+    return await arequest("POST", url, service=service, **kwargs)
+
+
+async def aopen_stream(
+    url: str, service: str = "default", method: str = "GET", timeout: TimeoutArg = None, **kwargs
+) -> httpx.Response:
+    """
+    Abre una petición async en modo streaming.
+
+    Devuelve la respuesta con las cabeceras ya recibidas; el cuerpo se
+    lee con aiter_bytes()/aread(). Hay que cerrarla con aclose().
+    """
+    client = get_async_client()
+    request_ = client.build_request(
+        method, url, timeout=_resolve_timeout(service, timeout), **kwargs
+    )
+    return await client.send(request_, stream=True)
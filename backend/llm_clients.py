@@ -0,0 +1,270 @@
+"""
+===========================================================
+LLM CLIENTS - Registro de clientes LLM compartidos
+===========================================================
+
+Clientes OpenAI/ChatOpenAI reutilizables a nivel de proceso.
+
+Crear un ChatOpenAI (o un OpenAI) en cada iteración del brain abre
+clientes HTTP nuevos, repite el handshake TLS y vuelve a parsear la
+configuración. Aquí se mantiene:
+- Un pool httpx síncrono con keep-alive, compartido, y uno async por
+  event loop (las conexiones async no se pueden usar desde otro loop)
+- Una instancia de ChatOpenAI por (modelo, temperatura) y loop
+- Un cliente OpenAI (y AsyncOpenAI por loop) por API key
+
+Lo usan agent/graph.py (brain) y backend/call_service.py.
+
+También registra el uso de tokens de cada llamada (entrada cacheada vs.
+no cacheada) para comprobar la tasa de acierto de la caché de prefijo.
+
+Configuración:
+- LLM_POOL_MAX_CONNECTIONS: conexiones máximas del pool (20)
+- LLM_POOL_KEEPALIVE: conexiones keep-alive en reposo (10)
+- LLM_POOL_KEEPALIVE_EXPIRY: segundos antes de cerrar una conexión ociosa (60)
+- LLM_TIMEOUT: timeout de las peticiones en segundos (60)
+"""
+
+import asyncio
+import os
+import threading
+import time
+import weakref
+from collections import deque
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+from langchain_openai import ChatOpenAI
+from openai import AsyncOpenAI, OpenAI
+
+
+# ===========================================================
+# CONFIGURACIÓN
+# ===========================================================
+
+LLM_POOL_MAX_CONNECTIONS = int(os.getenv("LLM_POOL_MAX_CONNECTIONS", "20"))
+LLM_POOL_KEEPALIVE = int(os.getenv("LLM_POOL_KEEPALIVE", "10"))
+LLM_POOL_KEEPALIVE_EXPIRY = float(os.getenv("LLM_POOL_KEEPALIVE_EXPIRY", "60"))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))
+LLM_USAGE_HISTORY = int(os.getenv("LLM_USAGE_HISTORY", "100"))  # llamadas recientes guardadas
+
+
+# ===========================================================
+# POOLS HTTP
+# ===========================================================
+
+_lock = threading.Lock()
+_http_client: Optional[httpx.Client] = None
+_openai_clients: Dict[str, OpenAI] = {}  # por API key
+_chat_models: Dict[Tuple[str, float, str], ChatOpenAI] = {}
+
+# Lo async va por event loop: las conexiones de un AsyncClient pertenecen
+# al loop que las abrió (igual que backend/http_client.py). Por loop:
+# {"http": AsyncClient, "openai": {api_key: AsyncOpenAI}, "chat": {clave: ChatOpenAI}}
+_async_clients: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def _pool_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=LLM_POOL_MAX_CONNECTIONS,
+        max_keepalive_connections=LLM_POOL_KEEPALIVE,
+        keepalive_expiry=LLM_POOL_KEEPALIVE_EXPIRY,
+    )
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def get_http_client() -> httpx.Client:
+    """Pool httpx síncrono compartido por todos los clientes LLM."""
+    global _http_client
+    with _lock:
+        if _http_client is None or _http_client.is_closed:
+            _http_client = httpx.Client(limits=_pool_limits(), timeout=LLM_TIMEOUT)
+        return _http_client
+
+
+def _loop_clients(loop: asyncio.AbstractEventLoop) -> Dict[str, Any]:
+    # Llamar con _lock tomado
+    clients = _async_clients.get(loop)
+    if clients is None or clients["http"].is_closed:
+        clients = {
+            "http": httpx.AsyncClient(limits=_pool_limits(), timeout=LLM_TIMEOUT),
+            "openai": {},
+            "chat": {},
+        }
+        _async_clients[loop] = clients
+    return clients
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """Pool httpx async compartido dentro del event loop actual."""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        return _loop_clients(loop)["http"]
+
+
+# ===========================================================
+# CLIENTES
+# ===========================================================
+
+
+def get_openai_client(api_key: Optional[str] = None) -> OpenAI:
+    """Cliente OpenAI síncrono sobre el pool compartido (uno por API key)."""
+    api_key = api_key or os.getenv("OPENAI_API_KEY", "")
+    http_client = get_http_client()
+    with _lock:
+        client = _openai_clients.get(api_key)
+        if client is None:
+            client = OpenAI(api_key=api_key, http_client=http_client)
+            _openai_clients[api_key] = client
+        return client
+
+
+def get_async_openai_client(api_key: Optional[str] = None) -> AsyncOpenAI:
+    """Cliente AsyncOpenAI del event loop actual (uno por API key)."""
+    api_key = api_key or os.getenv("OPENAI_API_KEY", "")
+    loop = asyncio.get_running_loop()
+    with _lock:
+        clients = _loop_clients(loop)
+        client = clients["openai"].get(api_key)
+        if client is None:
+            client = AsyncOpenAI(api_key=api_key, http_client=clients["http"])
+            clients["openai"][api_key] = client
+        return client
+
+
+def get_chat_model(
+    model: str, temperature: float, api_key: Optional[str] = None
+) -> ChatOpenAI:
+    """
+    Devuelve el ChatOpenAI de (modelo, temperatura), creándolo la primera vez.
+
+    Todas las instancias comparten los pools httpx, así que las
+    iteraciones del brain reutilizan conexiones ya abiertas. Dentro de
+    un event loop se devuelve la instancia de ese loop (con su pool async).
+    """
+    api_key = api_key or os.getenv("OPENAI_API_KEY", "")
+    key = (model, float(temperature), api_key)
+    loop = _running_loop()
+
+    http_client = get_http_client()
+    with _lock:
+        models = _loop_clients(loop)["chat"] if loop is not None else _chat_models
+        chat_model = models.get(key)
+        if chat_model is None:
+            kwargs = {}
+            if loop is not None:
+                kwargs["http_async_client"] = _async_clients[loop]["http"]
+            chat_model = ChatOpenAI(
+                model=model,
+                temperature=temperature,
+                openai_api_key=api_key,
+                http_client=http_client,
+                **kwargs,
+            )
+            models[key] = chat_model
+        return chat_model
+
+
+def _close_async_client(loop: asyncio.AbstractEventLoop, client: httpx.AsyncClient):
+    """Cierra un AsyncClient en su propio loop (sin bloquear si está corriendo)."""
+    if client.is_closed or loop.is_closed():
+        return
+    if loop.is_running():
+        if loop is _running_loop():
+            loop.create_task(client.aclose())
+        else:
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+    else:
+        loop.run_until_complete(client.aclose())
+
+
+def reset_llm_clients():
+    """Cierra y descarta los clientes creados (tests o cambio de configuración)."""
+    global _http_client
+    with _lock:
+        if _http_client is not None:
+            _http_client.close()
+        _http_client = None
+        _openai_clients.clear()
+        _chat_models.clear()
+        async_clients = list(_async_clients.items())
+        _async_clients.clear()
+
+    for loop, clients in async_clients:
+        _close_async_client(loop, clients["http"])
+
+
+# ===========================================================
+# USO DE TOKENS (CACHÉ DE PREFIJO)
+# ===========================================================
+
+_usage_lock = threading.Lock()
+_usage_totals: Dict[str, Dict[str, int]] = {}
+_recent_usage: deque = deque(maxlen=LLM_USAGE_HISTORY)
+
+
+def record_llm_usage(response: Any, source: str = "brain") -> Optional[Dict[str, Any]]:
+    """
+    Registra los tokens de una respuesta de LangChain (usage_metadata).
+
+    Devuelve el registro de la llamada, o None si el proveedor no
+    informó del uso.
+    """
+    usage = getattr(response, "usage_metadata", None)
+    if not isinstance(usage, dict):
+        return None
+
+    input_tokens = int(usage.get("input_tokens") or 0)
+    details = usage.get("input_token_details") or {}
+    cached_tokens = int(details.get("cache_read") or 0)
+
+    entry = {
+        "source": source,
+        "input_tokens": input_tokens,
+        "cached_tokens": cached_tokens,
+        "uncached_tokens": input_tokens - cached_tokens,
+        "output_tokens": int(usage.get("output_tokens") or 0),
+        "timestamp": time.time(),
+    }
+
+    with _usage_lock:
+        totals = _usage_totals.setdefault(
+            source,
+            {"calls": 0, "input_tokens": 0, "cached_tokens": 0, "output_tokens": 0},
+        )
+        totals["calls"] += 1
+        totals["input_tokens"] += input_tokens
+        totals["cached_tokens"] += cached_tokens
+        totals["output_tokens"] += entry["output_tokens"]
+        _recent_usage.append(entry)
+
+    return entry
+
+
+def get_llm_usage_stats() -> Dict[str, Any]:
+    """Totales por origen (brain, call_service...) y últimas llamadas."""
+    with _usage_lock:
+        by_source = {}
+        for source, totals in _usage_totals.items():
+            by_source[source] = {
+                **totals,
+                "cache_hit_rate": (
+                    round(totals["cached_tokens"] / totals["input_tokens"], 3)
+                    if totals["input_tokens"]
+                    else 0.0
+                ),
+            }
+        return {"by_source": by_source, "recent": list(_recent_usage)}
+
+
+def reset_llm_usage_stats():
+    """Pone a cero las estadísticas de uso."""
+    with _usage_lock:
+        _usage_totals.clear()
+        _recent_usage.clear()
@@ -0,0 +1,277 @@
+"""
+===========================================================
+PHOTO CACHE - Caché de imágenes del proxy de fotos
+===========================================================
+
+Caché de las fotos de Google Places que sirve /api/photo:
+- Memoria: LRU limitada en bytes (PHOTO_CACHE_MEMORY_MB)
+- Disco: ficheros en CACHE_DIR/photos, limitados en tamaño total
+  (PHOTO_CACHE_DISK_MB); se borran los menos usados al superarlo
+
+La clave es photo_name + dimensiones (+ formato). Una foto de Places no
+cambia para un mismo photo_name, así que el ETag se deriva de la clave
+y el navegador puede cachearla mucho tiempo.
+"""
+
+import asyncio
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from contextlib import suppress
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from backend.cache import cache_dir, register_reset_hook
+
+
+# ===========================================================
+# CONFIGURACIÓN
+# ===========================================================
+
+PHOTO_CACHE_MEMORY_MB = float(os.getenv("PHOTO_CACHE_MEMORY_MB", "32"))
+PHOTO_CACHE_DISK_MB = float(os.getenv("PHOTO_CACHE_DISK_MB", "256"))
+PHOTO_CACHE_MAX_AGE = int(os.getenv("PHOTO_CACHE_MAX_AGE", str(30 * 24 * 3600)))  # 30 días
+
+_EXTENSIONS = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/webp": ".webp",
+    "image/avif": ".avif",
+}
+_CONTENT_TYPES = {ext: content_type for content_type, ext in _EXTENSIONS.items()}
+
+
+def photo_cache_key(photo_name: str, width: int, height: int, image_format: str = "") -> str:
+    """Clave de caché de una foto a unas dimensiones (y formato) concretos."""
+    return f"{photo_name}|{width}x{height}|{image_format}"
+
+
+def photo_etag(key: str) -> str:
+    """ETag estable derivado de la clave (las fotos no cambian)."""
+    return '"' + hashlib.sha256(key.encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def cache_headers(key: str) -> Dict[str, str]:
+    """Cabeceras para que el navegador no vuelva a pedir la foto."""
+    return {
+        "Cache-Control": f"public, max-age={PHOTO_CACHE_MAX_AGE}, immutable",
+        "ETag": photo_etag(key),
+    }
+
+
+# ===========================================================
+# CACHÉ
+# ===========================================================
+
+
+class PhotoCache:
+    """
+    LRU en memoria (limitada en bytes) delante de un directorio limitado.
+
+    Los ficheros del disco se indexan en memoria (nombre, tamaño, orden de
+    uso), así que ni las búsquedas ni el desalojo recorren el directorio.
+    Desde código async hay que usar aget/aset: la E/S de disco va a un hilo.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        memory_bytes: int = int(PHOTO_CACHE_MEMORY_MB * 1024 * 1024),
+        disk_bytes: int = int(PHOTO_CACHE_DISK_MB * 1024 * 1024),
+    ):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, Tuple[bytes, str]]" = OrderedDict()
+        self._memory_size = 0
+
+        # stem -> (fichero, tamaño), del menos al más usado (mtime al arrancar)
+        self._disk: "OrderedDict[str, Tuple[Path, int]]" = OrderedDict()
+        self._disk_size = 0
+        entries = []
+        for f in self.directory.iterdir():
+            if f.is_file() and (f.suffix in _CONTENT_TYPES or f.suffix == ".img"):
+                st = f.stat()
+                entries.append((st.st_mtime, f, st.st_size))
+        for _, f, size in sorted(entries, key=lambda e: e[0]):
+            self._disk[f.stem] = (f, size)
+            self._disk_size += size
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    # ---------------- Lectura ----------------
+
+    def get(self, key: str) -> Optional[Tuple[bytes, str]]:
+        """Devuelve (bytes, content_type) o None."""
+        entry = self._memory_get(key)
+        if entry is not None:
+            return entry
+        return self._disk_get(key)
+
+    async def aget(self, key: str) -> Optional[Tuple[bytes, str]]:
+        """get() sin bloquear el event loop (el disco se lee en un hilo)."""
+        entry = self._memory_get(key)
+        if entry is not None:
+            return entry
+        return await asyncio.to_thread(self._disk_get, key)
+
+    def _memory_get(self, key: str) -> Optional[Tuple[bytes, str]]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+            return entry
+
+    def _disk_get(self, key: str) -> Optional[Tuple[bytes, str]]:
+        stem = self._file_stem(key)
+        with self._lock:
+            entry = self._disk.get(stem)
+            if entry is not None:
+                self._disk.move_to_end(stem)  # orden LRU del desalojo
+        path = entry[0] if entry is not None else None
+        if path is not None:
+            try:
+                data = path.read_bytes()
+                os.utime(path)  # orden de uso para el próximo arranque
+            except OSError:
+                data = None
+                self._forget_file(stem)
+            if data is not None:
+                content_type = _CONTENT_TYPES.get(path.suffix, "image/jpeg")
+                self._remember(key, data, content_type)
+                with self._lock:
+                    self.disk_hits += 1
+                return data, content_type
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    # ---------------- Escritura ----------------
+
+    def set(self, key: str, data: bytes, content_type: str = "image/jpeg"):
+        """Guarda la foto en memoria y en disco."""
+        if not data:
+            return
+        self._remember(key, data, content_type)
+        self._disk_set(key, data, content_type)
+
+    async def aset(self, key: str, data: bytes, content_type: str = "image/jpeg"):
+        """set() sin bloquear el event loop (el disco se escribe en un hilo)."""
+        if not data:
+            return
+        self._remember(key, data, content_type)
+        await asyncio.to_thread(self._disk_set, key, data, content_type)
+
+    def _disk_set(self, key: str, data: bytes, content_type: str):
+        stem = self._file_stem(key)
+        path = self.directory / (stem + _EXTENSIONS.get(content_type, ".img"))
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        try:
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)  # escritura atómica
+        except OSError as e:
+            print(f"⚠️  No se pudo guardar la foto en disco: {e}")
+            return
+
+        with self._lock:
+            previous = self._disk.pop(stem, None)
+            if previous is not None:
+                self._disk_size -= previous[1]
+            self._disk[stem] = (path, len(data))
+            self._disk_size += len(data)
+            if previous is not None and previous[0] != path:
+                stale = previous[0]  # misma clave con otro content-type
+            else:
+                stale = None
+        if stale is not None:
+            with suppress(OSError):
+                stale.unlink()
+        self._evict_disk()
+
+    def _remember(self, key: str, data: bytes, content_type: str):
+        if len(data) > self.memory_bytes:
+            return
+        with self._lock:
+            previous = self._memory.pop(key, None)
+            if previous is not None:
+                self._memory_size -= len(previous[0])
+            self._memory[key] = (data, content_type)
+            self._memory_size += len(data)
+            while self._memory_size > self.memory_bytes:
+                _, (old_data, _) = self._memory.popitem(last=False)
+                self._memory_size -= len(old_data)
+
+    def _evict_disk(self):
+        """Borra los ficheros menos usados hasta quedar bajo el límite."""
+        victims = []
+        with self._lock:
+            while self._disk_size > self.disk_bytes and self._disk:
+                _, (path, size) = self._disk.popitem(last=False)
+                self._disk_size -= size
+                victims.append(path)
+        for path in victims:
+            with suppress(OSError):
+                path.unlink()
+
+    def _forget_file(self, stem: str):
+        with self._lock:
+            entry = self._disk.pop(stem, None)
+            if entry is not None:
+                self._disk_size -= entry[1]
+
+    # ---------------- Utilidades ----------------
+
+    @staticmethod
+    def _file_stem(key: str) -> str:
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def _find_file(self, key: str) -> Optional[Path]:
+        """Fichero de la clave según el índice (sin tocar el disco)."""
+        with self._lock:
+            entry = self._disk.get(self._file_stem(key))
+        return entry[0] if entry is not None else None
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.disk_hits) / lookups, 3) if lookups else 0.0,
+            "memory_bytes": self._memory_size,
+            "disk_bytes": self._disk_size,
+        }
+
+
+# ===========================================================
+# SINGLETON
+# ===========================================================
+
+_photo_cache: Optional[PhotoCache] = None
+_photo_cache_lock = threading.Lock()
+
+
+def get_photo_cache() -> PhotoCache:
+    """Caché de fotos en CACHE_DIR/photos (singleton)."""
+    global _photo_cache
+    with _photo_cache_lock:
+        if _photo_cache is None:
+            _photo_cache = PhotoCache(str(Path(cache_dir()) / "photos"))
+        return _photo_cache
+
+
+def _reset_photo_cache():
+    global _photo_cache
+    with _photo_cache_lock:
+        _photo_cache = None
+
+
+register_reset_hook(_reset_photo_cache)
@@ -0,0 +1,124 @@
+"""
+===========================================================
+PHOTO TRANSCODE - Miniaturas WebP/AVIF para el proxy de fotos
+===========================================================
+
+Redimensiona y recodifica las fotos de Google Places (JPEG) a formatos
+más ligeros para las tarjetas del frontend:
+- WebP siempre que Pillow esté instalado
+- AVIF si la build de Pillow lo soporta (Pillow >= 11.3 o pillow-avif-plugin)
+
+El trabajo de CPU se hace en un pool de hilos propio (Pillow libera el
+GIL al decodificar/codificar), así no bloquea el event loop de FastAPI.
+
+Pillow es opcional: sin él el proxy sirve el JPEG original.
+
+Configuración:
+- PHOTO_TRANSCODE_WORKERS: hilos del pool (2)
+- PHOTO_WEBP_QUALITY / PHOTO_AVIF_QUALITY: calidad de codificación (75 / 55)
+- PHOTO_MAX_SIZE: lado máximo aceptado en píxeles (1600)
+"""
+
+import asyncio
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+try:
+    from PIL import Image
+
+    Image.init()
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+
+# ===========================================================
+# CONFIGURACIÓN
+# ===========================================================
+
+PHOTO_TRANSCODE_WORKERS = int(os.getenv("PHOTO_TRANSCODE_WORKERS", "2"))
+PHOTO_WEBP_QUALITY = int(os.getenv("PHOTO_WEBP_QUALITY", "75"))
+PHOTO_AVIF_QUALITY = int(os.getenv("PHOTO_AVIF_QUALITY", "55"))
+PHOTO_MAX_SIZE = int(os.getenv("PHOTO_MAX_SIZE", "1600"))
+
+# formato pedido -> (formato de Pillow, content-type)
+FORMATS = {
+    "webp": ("WEBP", "image/webp"),
+    "avif": ("AVIF", "image/avif"),
+    "jpeg": ("JPEG", "image/jpeg"),
+}
+
+_executor = ThreadPoolExecutor(
+    max_workers=PHOTO_TRANSCODE_WORKERS, thread_name_prefix="photo-transcode"
+)
+
+
+def supported_formats() -> Tuple[str, ...]:
+    """Formatos de salida disponibles con la build de Pillow instalada."""
+    if not PIL_AVAILABLE:
+        return ()
+    return tuple(name for name, (pil_format, _) in FORMATS.items() if pil_format in Image.SAVE)
+
+
+def normalize_format(image_format: Optional[str]) -> str:
+    """
+    Formato de salida a usar, o "" para servir el original.
+
+    Los formatos desconocidos o no soportados se ignoran (original).
+    """
+    image_format = (image_format or "").strip().lower()
+    if image_format == "jpg":
+        image_format = "jpeg"
+    return image_format if image_format in supported_formats() else ""
+
+
+def clamp_size(value: Optional[int], default: int) -> int:
+    """Ancho/alto pedido limitado a [16, PHOTO_MAX_SIZE]."""
+    if value is None:
+        return default
+    return max(16, min(int(value), PHOTO_MAX_SIZE))
+
+
+# ===========================================================
+# TRANSCODIFICACIÓN
+# ===========================================================
+
+
+def transcode(data: bytes, width: int, height: int, image_format: str) -> Tuple[bytes, str]:
+    """
+    Redimensiona la imagen para que quepa en width x height y la recodifica.
+
+    Devuelve (bytes, content_type). Lanza excepción si la imagen no se
+    puede decodificar.
+    """
+    pil_format, content_type = FORMATS[image_format]
+
+    with Image.open(io.BytesIO(data)) as img:
+        img.draft("RGB", (width, height))  # decodificación JPEG reducida, más rápida
+        img.thumbnail((width, height), Image.LANCZOS)
+        if img.mode not in ("RGB", "RGBA") or pil_format == "JPEG":
+            img = img.convert("RGB")
+
+        output = io.BytesIO()
+        if pil_format == "WEBP":
+            img.save(output, format=pil_format, quality=PHOTO_WEBP_QUALITY, method=4)
+        elif pil_format == "AVIF":
+            img.save(output, format=pil_format, quality=PHOTO_AVIF_QUALITY)
+        else:
+            img.save(output, format=pil_format, quality=85, optimize=True)
+
+    return output.getvalue(), content_type
+
+
+async def atranscode(
+    data: bytes, width: int, height: int, image_format: str
+) -> Optional[Tuple[bytes, str]]:
+    """transcode() en el pool de hilos; None si falla."""
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(_executor, transcode, data, width, height, image_format)
+    except Exception as e:
+        print(f"⚠️  No se pudo convertir la foto a {image_format}: {e}")
+        return None
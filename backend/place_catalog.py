@@ -0,0 +1,746 @@
+"""
+===========================================================
+PLACE CATALOG - Catálogo local de lugares con índice espacial
+===========================================================
+
+Guarda todos los lugares que devuelve places_text_search (esquema
+normalizado) en SQLite y mantiene en memoria un índice por celdas
+geohash para responder "lugares a menos de N metros de X" sin red.
+
+- places: un registro por place_id (datos normalizados + lat/lng,
+  geohash, tipos, precio y fecha de actualización)
+- searches: qué búsqueda (query normalizada + precio) se hizo en qué
+  círculo y qué lugares devolvió. Una búsqueda repetida dentro de un
+  círculo ya cubierto y reciente se responde desde el catálogo (y
+  con text_search, una variante de esa query: ver covers()).
+- covered_cells: celdas geohash cargadas por completo fuera de la API
+  (importación masiva con --cover); cuentan como cubiertas en covers().
+
+El índice en memoria es compacto (coordenadas, tipos, precio); los
+datos completos se leen de SQLite solo para los lugares devueltos.
+
+Búsqueda por texto (SQLite FTS5, si está disponible): nombre, tipos,
+barrio, dirección y las palabras de las búsquedas que devolvieron cada
+lugar, sin acentos (unicode61 remove_diacritics) y con un stemming
+ligero para que "pizzería" y "pizza" coincidan. text_search() ordena
+por BM25 y filtra por círculo y antigüedad.
+
+Configuración:
+- PLACE_CATALOG_PATH: fichero SQLite (por defecto CACHE_DIR/places.db)
+"""
+
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from backend.cache import cache_dir, register_reset_hook
+
+
+# ===========================================================
+# GEOHASH
+# ===========================================================
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+# Precisión de las celdas del índice: 6 caracteres ≈ 1,2 km x 0,6 km
+BUCKET_PRECISION = 6
+_CELL_LAT_DEG = 180 / 2 ** 15  # 30 bits / 2 -> 15 bits de latitud
+_CELL_LNG_DEG = 360 / 2 ** 15  # y 15 de longitud
+
+EARTH_RADIUS_M = 6371000.0
+
+
+def geohash_encode(lat: float, lng: float, precision: int = 9) -> str:
+    """Geohash estándar (base32) de un punto."""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits, bit_count, even = 0, 0, True
+
+    while len(chars) < precision:
+        if even:
+            mid = (lng_range[0] + lng_range[1]) / 2
+            if lng >= mid:
+                bits = (bits << 1) | 1
+                lng_range[0] = mid
+            else:
+                bits <<= 1
+                lng_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if lat >= mid:
+                bits = (bits << 1) | 1
+                lat_range[0] = mid
+            else:
+                bits <<= 1
+                lat_range[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits, bit_count = 0, 0
+
+    return "".join(chars)
+
+
+def _bbox_deg(lat: float, radius_m: float) -> Tuple[float, float]:
+    """Semiancho en grados (lat, lng) del rectángulo que contiene el círculo."""
+    dlat = math.degrees(radius_m / EARTH_RADIUS_M)
+    return dlat, dlat / max(math.cos(math.radians(lat)), 1e-6)
+
+
+def estimated_cell_count(lat: float, radius_m: float) -> int:
+    """Número aproximado de celdas que toca el círculo."""
+    dlat, dlng = _bbox_deg(lat, radius_m)
+    return int((2 * dlat / _CELL_LAT_DEG + 2) * (2 * dlng / _CELL_LNG_DEG + 2))
+
+
+def covering_cells(lat: float, lng: float, radius_m: float) -> Set[str]:
+    """Celdas (BUCKET_PRECISION) que cubren el círculo."""
+    dlat, dlng = _bbox_deg(lat, radius_m)
+
+    cells = set()
+    # Muestreo a media celda: ninguna celda del rectángulo se queda fuera
+    step_lat = _CELL_LAT_DEG / 2
+    step_lng = _CELL_LNG_DEG / 2
+    y = lat - dlat
+    while y <= lat + dlat + step_lat:
+        x = lng - dlng
+        while x <= lng + dlng + step_lng:
+            cells.add(
+                geohash_encode(
+                    max(-90.0, min(90.0, min(y, lat + dlat))),
+                    max(-180.0, min(180.0, min(x, lng + dlng))),
+                    BUCKET_PRECISION,
+                )
+            )
+            x += step_lng
+        y += step_lat
+    return cells
+
+
+def distance_m(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Distancia haversine en metros."""
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    h = (
+        math.sin((p2 - p1) / 2) ** 2
+        + math.cos(p1) * math.cos(p2) * math.sin(math.radians(lng2 - lng1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(h))
+
+
+# ===========================================================
+# TEXTO
+# ===========================================================
+
+# Palabras que no aportan a la búsqueda
+STOP_WORDS = {
+    "a", "al", "con", "cerca", "de", "del", "el", "en", "la", "las", "lo", "los",
+    "para", "por", "sin", "un", "una", "unos", "unas", "y", "o",
+}
+# Sufijos que se recortan (de más largo a más corto): pizzería -> pizz
+_SUFFIXES = ("erias", "eria", "eros", "eras", "ero", "era", "es", "s", "a", "o", "e")
+MAX_KEYWORDS = 40
+
+
+def fold_text(text: str) -> str:
+    """Minúsculas y sin acentos."""
+    text = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+def light_stem(word: str) -> str:
+    """Raíz aproximada de una palabra en español (mínimo 4 letras)."""
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 4:
+            return word[: -len(suffix)]
+    return word
+
+
+def search_terms(text: str) -> List[str]:
+    """Raíces de las palabras útiles de un texto, sin repetir."""
+    terms = []
+    for word in re.findall(r"\w+", fold_text(text or "")):
+        if word in STOP_WORDS or len(word) < 2:
+            continue
+        stem = light_stem(word)
+        if stem not in terms:
+            terms.append(stem)
+    return terms
+
+
+def build_match_query(text: str) -> Optional[str]:
+    """Consulta FTS5: todos los términos, cada uno por prefijo."""
+    terms = search_terms(text)
+    if not terms:
+        return None
+    return " AND ".join(f'"{term}"*' for term in terms)
+
+
+def _keyword_text(keywords: Optional[str]) -> Optional[str]:
+    if not keywords:
+        return None
+    words = re.findall(r"\w+", fold_text(keywords))
+    return " ".join(dict.fromkeys(w for w in words if w not in STOP_WORDS)) or None
+
+
+def _merge_keywords(old: Optional[str], new: Optional[str]) -> Optional[str]:
+    """Une las palabras clave guardadas con las nuevas (sin repetir, acotado)."""
+    words = list(dict.fromkeys((old or "").split() + (new or "").split()))
+    return " ".join(words[-MAX_KEYWORDS:]) or None
+
+
+# ===========================================================
+# CATÁLOGO
+# ===========================================================
+
+_SPATIAL_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_places_geohash ON places (geohash);
+CREATE INDEX IF NOT EXISTS idx_places_lat_lng ON places (lat, lng);
+"""
+
+# Celdas como máximo que covers() comprueba en covered_cells
+MAX_COVER_CELLS = 400
+
+# Valor de la columna source de los lugares importados (catalog_import)
+IMPORT_SOURCE = "import"
+
+# Entrada del índice en memoria: (lat, lng, tipos, precio, updated_at)
+IndexEntry = Tuple[float, float, frozenset, Optional[int], float]
+
+
+def _place_location(place: Dict[str, Any]) -> Optional[Tuple[float, float]]:
+    location = place.get("location") or {}
+    lat, lng = location.get("lat"), location.get("lng")
+    if lat is None or lng is None:
+        return None
+    return float(lat), float(lng)
+
+
+class PlaceCatalog:
+    """Catálogo persistente de lugares con índice geohash en memoria."""
+
+    def __init__(self, path: str, memory_index: bool = True):
+        self.path = path
+        self.memory_index = memory_index  # False en cargas masivas: sin índice en memoria
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.create_function("merge_keywords", 2, _merge_keywords, deterministic=True)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS places (
+                place_id TEXT PRIMARY KEY,
+                name TEXT,
+                lat REAL NOT NULL,
+                lng REAL NOT NULL,
+                geohash TEXT NOT NULL,
+                types TEXT,
+                price_level INTEGER,
+                rating REAL,
+                data TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                keywords TEXT,
+                source TEXT
+            );
+            CREATE TABLE IF NOT EXISTS searches (
+                query_key TEXT NOT NULL,
+                lat REAL NOT NULL,
+                lng REAL NOT NULL,
+                radius REAL NOT NULL,
+                place_ids TEXT NOT NULL,
+                fetched_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_searches_key ON searches (query_key);
+            CREATE TABLE IF NOT EXISTS covered_cells (
+                cell TEXT PRIMARY KEY,
+                fetched_at REAL NOT NULL
+            );
+            """
+        )
+        self._conn.executescript(_SPATIAL_INDEXES)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(places)")}
+        if "keywords" not in columns:  # catálogos creados antes de la búsqueda por texto
+            self._conn.execute("ALTER TABLE places ADD COLUMN keywords TEXT")
+        if "source" not in columns:  # catálogos creados antes de la importación masiva
+            self._conn.execute("ALTER TABLE places ADD COLUMN source TEXT")
+        self.fts_enabled = self._create_text_index()
+        self._conn.commit()
+
+        self._index: Dict[str, IndexEntry] = {}
+        self._buckets: Dict[str, Set[str]] = {}
+        # Lugares importados (backend/catalog_import.py): no son de Google,
+        # así que no se pueden refrescar con la API
+        self._imported: Set[str] = set()
+        if memory_index:
+            self._load_index()
+
+        self.lookups = 0
+        self.search_hits = 0
+        self.text_hits = 0
+
+    # ---------------- Índice de texto (FTS5) ----------------
+
+    def _create_text_index(self) -> bool:
+        exists = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'places_fts'"
+        ).fetchone()
+        if exists:
+            return True
+        try:
+            self._conn.execute(
+                "CREATE VIRTUAL TABLE places_fts USING fts5("
+                " name, types, neighborhood, address, keywords,"
+                " tokenize = 'unicode61 remove_diacritics 2')"
+            )
+        except sqlite3.OperationalError:
+            print("⚠️  SQLite sin FTS5: el catálogo no tendrá búsqueda por texto")
+            return False
+        self._rebuild_text_index()
+        return True
+
+    def _rebuild_text_index(self):
+        self._conn.execute("DELETE FROM places_fts")
+        self._conn.execute(
+            "INSERT INTO places_fts (rowid, name, types, neighborhood, address, keywords)"
+            " SELECT rowid, name, replace(types, '_', ' '),"
+            " json_extract(data, '$.neighborhood'), json_extract(data, '$.address'), keywords"
+            " FROM places"
+        )
+
+    def rebuild_text_index(self):
+        """Reconstruye el índice de texto desde la tabla places (tras cargas masivas)."""
+        if not self.fts_enabled:
+            return
+        with self._lock:
+            self._rebuild_text_index()
+            self._conn.commit()
+
+    def _index_text(self, place_id: str):
+        row = self._conn.execute(
+            "SELECT rowid, name, replace(types, '_', ' '), json_extract(data, '$.neighborhood'),"
+            " json_extract(data, '$.address'), keywords FROM places WHERE place_id = ?",
+            (place_id,),
+        ).fetchone()
+        if row is not None:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO places_fts"
+                " (rowid, name, types, neighborhood, address, keywords) VALUES (?, ?, ?, ?, ?, ?)",
+                row,
+            )
+
+    # ---------------- Índices SQL (cargas masivas) ----------------
+
+    def drop_indexes(self):
+        """Quita los índices espaciales de SQLite (se recrean con create_indexes)."""
+        with self._lock:
+            self._conn.execute("DROP INDEX IF EXISTS idx_places_geohash")
+            self._conn.execute("DROP INDEX IF EXISTS idx_places_lat_lng")
+            self._conn.commit()
+
+    def create_indexes(self):
+        """Crea los índices espaciales y reconstruye el de texto."""
+        with self._lock:
+            self._conn.executescript(_SPATIAL_INDEXES)
+            self._conn.commit()
+        self.rebuild_text_index()
+
+    # ---------------- Índice en memoria ----------------
+
+    def _load_index(self):
+        with self._lock:
+            self._index.clear()
+            self._buckets.clear()
+            self._imported.clear()
+            rows = self._conn.execute(
+                "SELECT place_id, lat, lng, types, price_level, updated_at, source FROM places"
+            )
+            for place_id, lat, lng, types, price_level, updated_at, source in rows:
+                self._add_to_index(
+                    place_id, lat, lng, json.loads(types or "[]"), price_level, updated_at, source
+                )
+
+    def reload(self):
+        """Vuelve a leer el índice en memoria (p. ej. tras una importación externa)."""
+        if self.memory_index:
+            self._load_index()
+
+    def _add_to_index(self, place_id, lat, lng, types, price_level, updated_at, source=None):
+        if not self.memory_index:
+            return
+        if source == IMPORT_SOURCE:
+            self._imported.add(place_id)
+        else:
+            self._imported.discard(place_id)
+        previous = self._index.get(place_id)
+        if previous is not None:
+            old_cell = geohash_encode(previous[0], previous[1], BUCKET_PRECISION)
+            self._buckets.get(old_cell, set()).discard(place_id)
+        self._index[place_id] = (lat, lng, frozenset(types or ()), price_level, updated_at)
+        cell = geohash_encode(lat, lng, BUCKET_PRECISION)
+        self._buckets.setdefault(cell, set()).add(place_id)
+
+    # ---------------- Escritura ----------------
+
+    def upsert_many(
+        self,
+        places: Iterable[Dict[str, Any]],
+        updated_at: Optional[float] = None,
+        keywords: Optional[str] = None,
+        text_index: bool = True,
+    ) -> int:
+        """
+        Inserta o actualiza lugares normalizados; devuelve cuántos.
+
+        keywords (p. ej. la query que los devolvió) se acumula a las ya
+        guardadas de cada lugar. text_index=False deja el índice de texto
+        para rebuild_text_index() (cargas masivas).
+        """
+        now = time.time() if updated_at is None else updated_at
+        rows = []
+        for place in places:
+            place_id = place.get("place_id")
+            point = _place_location(place)
+            if not place_id or point is None:
+                continue
+            rows.append(
+                (
+                    place_id,
+                    place.get("name"),
+                    point[0],
+                    point[1],
+                    geohash_encode(point[0], point[1]),
+                    json.dumps(place.get("types") or []),
+                    place.get("price_level"),
+                    place.get("rating"),
+                    json.dumps(place, ensure_ascii=False, default=str),
+                    now,
+                    _keyword_text(keywords),
+                    place.get("source"),
+                )
+            )
+
+        if not rows:
+            return 0
+        with self._lock:
+            # ON CONFLICT conserva el rowid, que es también el del índice de texto
+            self._conn.executemany(
+                "INSERT INTO places (place_id, name, lat, lng, geohash, types,"
+                " price_level, rating, data, updated_at, keywords, source)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT (place_id) DO UPDATE SET"
+                " name = excluded.name, lat = excluded.lat, lng = excluded.lng,"
+                " geohash = excluded.geohash, types = excluded.types,"
+                " price_level = excluded.price_level, rating = excluded.rating,"
+                " data = excluded.data, updated_at = excluded.updated_at,"
+                " keywords = merge_keywords(places.keywords, excluded.keywords),"
+                " source = excluded.source",
+                rows,
+            )
+            if self.fts_enabled and text_index:
+                for row in rows:
+                    self._index_text(row[0])
+            self._conn.commit()
+            for row in rows:
+                self._add_to_index(
+                    row[0], row[2], row[3], json.loads(row[5]), row[6], now, row[11]
+                )
+        return len(rows)
+
+    def record_search(
+        self, query_key: str, lat: float, lng: float, radius: float, place_ids: List[str]
+    ):
+        """Registra el círculo cubierto por una búsqueda y sus resultados."""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM searches WHERE query_key = ? AND lat = ? AND lng = ? AND radius = ?",
+                (query_key, lat, lng, radius),
+            )
+            self._conn.execute(
+                "INSERT INTO searches (query_key, lat, lng, radius, place_ids, fetched_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (query_key, lat, lng, radius, json.dumps(place_ids), time.time()),
+            )
+            self._conn.commit()
+
+    def record_cells(self, cells: Iterable[str]):
+        """Marca celdas (BUCKET_PRECISION) como cubiertas por completo desde ahora."""
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO covered_cells (cell, fetched_at) VALUES (?, ?)",
+                [(cell, now) for cell in cells],
+            )
+            self._conn.commit()
+
+    # ---------------- Lectura ----------------
+
+    def get_many(self, place_ids: List[str]) -> List[Dict[str, Any]]:
+        """Datos completos de los lugares, en el mismo orden."""
+        if not place_ids:
+            return []
+        with self._lock:
+            placeholders = ",".join("?" * len(place_ids))
+            rows = self._conn.execute(
+                f"SELECT place_id, data FROM places WHERE place_id IN ({placeholders})",
+                place_ids,
+            ).fetchall()
+        data = {place_id: json.loads(raw) for place_id, raw in rows}
+        return [data[place_id] for place_id in place_ids if place_id in data]
+
+    def nearby_ids(
+        self,
+        lat: float,
+        lng: float,
+        radius_m: float,
+        types: Optional[Iterable[str]] = None,
+        price_level: Optional[int] = None,
+        max_age: Optional[float] = None,
+    ) -> List[Tuple[str, float]]:
+        """(place_id, distancia en metros) dentro del círculo, de más cerca a más lejos."""
+        wanted_types = set(types or ())
+        min_updated = time.time() - max_age if max_age is not None else None
+
+        found = []
+        with self._lock:
+            self.lookups += 1
+            if estimated_cell_count(lat, radius_m) > len(self._buckets):
+                # Círculo enorme frente al catálogo: más barato recorrerlo entero
+                candidates: Iterable[str] = list(self._index)
+            else:
+                candidates = [
+                    place_id
+                    for cell in covering_cells(lat, lng, radius_m)
+                    for place_id in self._buckets.get(cell, ())
+                ]
+            for place_id in candidates:
+                p_lat, p_lng, p_types, p_price, updated_at = self._index[place_id]
+                if wanted_types and not (wanted_types & p_types):
+                    continue
+                if price_level is not None and p_price != price_level:
+                    continue
+                if min_updated is not None and updated_at < min_updated:
+                    continue
+                distance = distance_m(lat, lng, p_lat, p_lng)
+                if distance <= radius_m:
+                    found.append((place_id, distance))
+
+        found.sort(key=lambda item: item[1])
+        return found
+
+    def nearby(
+        self,
+        lat: float,
+        lng: float,
+        radius_m: float,
+        types: Optional[Iterable[str]] = None,
+        price_level: Optional[int] = None,
+        max_age: Optional[float] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Lugares a menos de radius_m metros de (lat, lng), de más cerca a más lejos.
+
+        types filtra por cualquiera de los tipos dados (p. ej. ["restaurant"]);
+        max_age descarta los lugares no actualizados en ese número de segundos.
+        Cada lugar incluye "distance_m".
+        """
+        found = self.nearby_ids(lat, lng, radius_m, types, price_level, max_age)
+        if limit is not None:
+            found = found[:limit]
+        places = self.get_many([place_id for place_id, _ in found])
+        for place, (_, distance) in zip(places, found):
+            place["distance_m"] = round(distance)
+        return places
+
+    def find_search(
+        self, query_key: str, lat: float, lng: float, radius: float, max_age: float
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Resultados de una búsqueda ya hecha que cubre este círculo.
+
+        Vale una búsqueda de la misma query, reciente (max_age) y cuyo
+        círculo contiene al pedido. Se devuelven sus lugares que caen
+        dentro del círculo nuevo, en el orden original; None si no hay.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT lat, lng, radius, place_ids FROM searches"
+                " WHERE query_key = ? AND fetched_at >= ? ORDER BY fetched_at DESC",
+                (query_key, time.time() - max_age),
+            ).fetchall()
+
+        for s_lat, s_lng, s_radius, raw_ids in rows:
+            if distance_m(lat, lng, s_lat, s_lng) + radius > s_radius:
+                continue
+            inside = {place_id for place_id, _ in self.nearby_ids(lat, lng, radius)}
+            place_ids = [place_id for place_id in json.loads(raw_ids) if place_id in inside]
+            if place_ids:
+                with self._lock:
+                    self.search_hits += 1
+                return self.get_many(place_ids)
+        return None
+
+    def covers(
+        self,
+        lat: float,
+        lng: float,
+        radius: float,
+        max_age: float,
+        query_matches: Optional[Callable[[str], bool]] = None,
+    ) -> bool:
+        """
+        True si el círculo está cubierto por datos recientes.
+
+        Vale una búsqueda cuyo círculo lo contiene y cuya query_key acepta
+        query_matches (una búsqueda de otra cosa solo trae sus 20 primeros
+        resultados: no cubre la zona para esta), o que todas las celdas
+        que toca estén en covered_cells (importación masiva).
+        """
+        min_fetched = time.time() - max_age
+        if query_matches is not None:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT query_key, lat, lng, radius FROM searches"
+                    " WHERE fetched_at >= ? AND radius >= ?",
+                    (min_fetched, radius),
+                ).fetchall()
+            if any(
+                distance_m(lat, lng, s_lat, s_lng) + radius <= s_radius and query_matches(query_key)
+                for query_key, s_lat, s_lng, s_radius in rows
+            ):
+                return True
+
+        if estimated_cell_count(lat, radius) > MAX_COVER_CELLS:
+            return False
+        cells = sorted(covering_cells(lat, lng, radius))
+        placeholders = ",".join("?" * len(cells))
+        with self._lock:
+            covered = self._conn.execute(
+                f"SELECT COUNT(*) FROM covered_cells"
+                f" WHERE fetched_at >= ? AND cell IN ({placeholders})",
+                [min_fetched, *cells],
+            ).fetchone()[0]
+        return covered == len(cells)
+
+    def text_search(
+        self,
+        text: str,
+        lat: float,
+        lng: float,
+        radius: float,
+        max_age: Optional[float] = None,
+        price_level: Optional[int] = None,
+        limit: int = 20,
+    ) -> List[Dict[str, Any]]:
+        """
+        Lugares del círculo que contienen todos los términos de text, por BM25.
+
+        Cada término se busca por prefijo de su raíz ("pizzería" -> pizz*).
+        Lista vacía si no hay FTS5 o ningún término útil.
+        """
+        match = build_match_query(text)
+        if not self.fts_enabled or not match:
+            return []
+
+        dlat, dlng = _bbox_deg(lat, radius)
+        sql = (
+            "SELECT p.place_id, p.lat, p.lng"
+            " FROM places_fts JOIN places p ON p.rowid = places_fts.rowid"
+            " WHERE places_fts MATCH ?"
+            " AND p.lat BETWEEN ? AND ? AND p.lng BETWEEN ? AND ?"
+        )
+        params: List[Any] = [match, lat - dlat, lat + dlat, lng - dlng, lng + dlng]
+        if max_age is not None:
+            sql += " AND p.updated_at >= ?"
+            params.append(time.time() - max_age)
+        if price_level is not None:
+            sql += " AND p.price_level = ?"
+            params.append(price_level)
+        # Pesos BM25: nombre > tipos > palabras de búsqueda > barrio > dirección
+        sql += " ORDER BY bm25(places_fts, 10.0, 4.0, 2.0, 1.0, 3.0) LIMIT ?"
+        params.append(limit * 3)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        place_ids = [
+            place_id
+            for place_id, p_lat, p_lng in rows
+            if distance_m(lat, lng, p_lat, p_lng) <= radius
+        ][:limit]
+        return self.get_many(place_ids)
+
+    def record_text_hit(self):
+        with self._lock:
+            self.text_hits += 1
+
+    def stale_ids(self, place_ids: Iterable[str], older_than: float) -> List[str]:
+        """Los place_ids de Google no actualizados en older_than segundos."""
+        limit = time.time() - older_than
+        with self._lock:
+            return [
+                place_id
+                for place_id in place_ids
+                if place_id in self._index
+                and place_id not in self._imported
+                and self._index[place_id][4] < limit
+            ]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            searches = self._conn.execute("SELECT COUNT(*) FROM searches").fetchone()[0]
+        return {
+            "places": len(self._index),
+            "buckets": len(self._buckets),
+            "searches": searches,
+            "lookups": self.lookups,
+            "search_hits": self.search_hits,
+            "text_hits": self.text_hits,
+            "text_search": self.fts_enabled,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# ===========================================================
+# SINGLETON
+# ===========================================================
+
+_catalog: Optional[PlaceCatalog] = None
+_catalog_lock = threading.Lock()
+
+
+def catalog_path() -> str:
+    return os.getenv("PLACE_CATALOG_PATH") or str(Path(cache_dir()) / "places.db")
+
+
+def get_place_catalog() -> PlaceCatalog:
+    """Catálogo de lugares del proceso (singleton)."""
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None:
+            _catalog = PlaceCatalog(catalog_path())
+        return _catalog
+
+
+def _reset_place_catalog():
+    global _catalog
+    with _catalog_lock:
+        if _catalog is not None:
+            _catalog.close()
+        _catalog = None
+
+
+register_reset_hook(_reset_place_catalog)
@@ -0,0 +1,375 @@
+"""
+===========================================================
+QUERY SIMILARITY - Consultas casi iguales para las cachés
+===========================================================
+
+Las cachés de web_search y maps_search usan claves exactas, así que
+"pizzerias en madrid" y "Pizzería Madrid" se buscaban dos veces. Esta
+capa, sin modelos externos, reconoce las variantes:
+
+1) Forma canónica: minúsculas, sin acentos, sin palabras vacías, en
+   singular y con las palabras ordenadas. Cubre acentos, orden,
+   artículos/preposiciones y plurales. Solo se quita el plural (no el
+   género: "lucio" y "lucia" son consultas distintas) y los nombres
+   propios (en mayúscula fuera de la primera palabra) no se tocan.
+2) Erratas: MinHash sobre trigramas de las palabras canónicas, con LSH
+   (bandas) para encontrar candidatos sin recorrer todo el índice y
+   Jaccard exacto como primer filtro. Para aceptar un candidato sus
+   palabras tienen que corresponderse una a una con las de la consulta,
+   iguales o a una errata (una letra) de distancia en palabras largas:
+   "madrid centro" y "madrid norte" nunca coinciden.
+
+Cada consulta se registra con un "scope" (todo lo que no es texto:
+centro, radio, precio, modo...) que tiene que coincidir exactamente;
+los números, las negaciones ("sin gluten") y los nombres propios
+también. El índice vive en
+memoria, acotado por QUERY_SIMILARITY_MAX_ENTRIES.
+
+Uso:
+    index = get_query_index("web_search")
+    key = index.find(scope, query)   # clave de caché de una variante
+    ...
+    index.add(scope, query, cache_key)
+
+Configuración:
+- QUERY_SIMILARITY_ENABLED: "false" desactiva la capa (true)
+- QUERY_SIMILARITY_THRESHOLD: Jaccard mínimo entre consultas (0.8)
+- QUERY_SIMILARITY_MAX_ENTRIES: consultas recordadas por índice (2000)
+"""
+
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+
+from backend.cache import register_reset_hook
+from backend.place_catalog import STOP_WORDS, fold_text
+
+
+# ===========================================================
+# CONFIGURACIÓN
+# ===========================================================
+
+QUERY_SIMILARITY_ENABLED = os.getenv("QUERY_SIMILARITY_ENABLED", "true").lower() == "true"
+QUERY_SIMILARITY_THRESHOLD = float(os.getenv("QUERY_SIMILARITY_THRESHOLD", "0.8"))
+QUERY_SIMILARITY_MAX_ENTRIES = int(os.getenv("QUERY_SIMILARITY_MAX_ENTRIES", "2000"))
+
+# Firma MinHash: NUM_PERM = BANDS * ROWS. 16 bandas de 4 filas dan
+# candidato a partir de Jaccard ~0,5; el umbral real se aplica después
+NUM_PERM = 64
+LSH_BANDS = 16
+LSH_ROWS = NUM_PERM // LSH_BANDS
+
+# Palabras que cambian el sentido: nunca se ignoran ni se aproximan
+NEGATIONS = {"sin", "no", "ni"}
+QUERY_STOP_WORDS = (STOP_WORDS - NEGATIONS) | {"me", "mi", "que", "donde", "hay", "algun", "alguna"}
+
+# Longitud mínima de una palabra para aceptar una errata en ella
+TYPO_MIN_LENGTH = 6
+
+_MERSENNE = (1 << 61) - 1
+_PERMUTATIONS = [
+    (
+        int.from_bytes(hashlib.blake2b(f"a{i}".encode(), digest_size=8).digest(), "big") % _MERSENNE
+        | 1,
+        int.from_bytes(hashlib.blake2b(f"b{i}".encode(), digest_size=8).digest(), "big") % _MERSENNE,
+    )
+    for i in range(NUM_PERM)
+]
+
+
+# ===========================================================
+# CANONICALIZACIÓN
+# ===========================================================
+
+
+def _singular(word: str) -> str:
+    """Quita el plural: "veganos" -> "vegano", "restaurantes" -> "restaurant"."""
+    if len(word) > 4 and word.endswith("s"):
+        word = word[:-1]
+    # "restaurante(s)" y "bar(es)": la e final tras consonante tampoco cuenta
+    if len(word) > 4 and word.endswith("e") and word[-2] not in "aeiou":
+        word = word[:-1]
+    return word
+
+
+def _words(text: str) -> List[Tuple[str, bool]]:
+    """(palabra sin acentos, es nombre propio) de las palabras útiles."""
+    words = []
+    for i, word in enumerate(re.findall(r"\w+", text or "")):
+        folded = fold_text(word)
+        if folded in QUERY_STOP_WORDS:
+            continue
+        # Mayúscula fuera del inicio de la frase: nombre propio ("Casa Lucio")
+        words.append((folded, i > 0 and word[0].isupper()))
+    return words
+
+
+def canonical_terms(text: str) -> List[str]:
+    """Palabras útiles en singular, sin repetir y ordenadas."""
+    terms = set()
+    for word, proper in _words(text):
+        keep = proper or word.isdigit() or word in NEGATIONS
+        terms.add(word if keep else _singular(word))
+    return sorted(terms)
+
+
+def canonical_query(text: str) -> str:
+    """Forma canónica: "Pizzerías en Madrid" -> "madrid pizzeria"."""
+    return " ".join(canonical_terms(text))
+
+
+def _guard(text: str) -> Tuple[str, ...]:
+    """Lo que tiene que coincidir exactamente: números, negaciones y nombres propios."""
+    return tuple(
+        sorted(
+            {
+                word
+                for word, proper in _words(text)
+                if proper or word.isdigit() or word in NEGATIONS
+            }
+        )
+    )
+
+
+def _one_edit_apart(a: str, b: str) -> bool:
+    """True si a y b difieren en una letra (cambiada, de más, de menos o dos traspuestas)."""
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) == len(b):
+        diffs = [i for i in range(len(a)) if a[i] != b[i]]
+        if len(diffs) == 1:
+            return True
+        return (
+            len(diffs) == 2
+            and diffs[1] == diffs[0] + 1
+            and a[diffs[0]] == b[diffs[1]]
+            and a[diffs[1]] == b[diffs[0]]
+        )
+    short, long_ = (a, b) if len(a) < len(b) else (b, a)
+    i = 0
+    while i < len(short) and short[i] == long_[i]:
+        i += 1
+    return short[i:] == long_[i + 1 :]
+
+
+def same_terms(a: List[str], b: List[str]) -> bool:
+    """
+    True si las palabras de a y b se corresponden una a una: iguales o,
+    en palabras de TYPO_MIN_LENGTH letras o más, a una errata.
+    """
+    if len(a) != len(b):
+        return False
+    left = [t for t in a if t not in b]
+    right = [t for t in b if t not in a]
+    for term in left:
+        match = next(
+            (
+                other
+                for other in right
+                if min(len(term), len(other)) >= TYPO_MIN_LENGTH
+                and not term.isdigit()
+                and _one_edit_apart(term, other)
+            ),
+            None,
+        )
+        if match is None:
+            return False
+        right.remove(match)
+    return not right
+
+
+def shingles(terms: List[str]) -> FrozenSet[str]:
+    """Trigramas de cada palabra (con marcas de inicio/fin)."""
+    grams = set()
+    for term in terms:
+        padded = f"#{term}#"
+        if len(padded) <= 3:
+            grams.add(padded)
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+def minhash(grams: FrozenSet[str]) -> Tuple[int, ...]:
+    """Firma MinHash (NUM_PERM valores) de un conjunto de trigramas."""
+    hashes = [
+        int.from_bytes(hashlib.blake2b(g.encode(), digest_size=8).digest(), "big")
+        for g in grams
+    ]
+    if not hashes:
+        return tuple([_MERSENNE] * NUM_PERM)
+    return tuple(min((a * h + b) % _MERSENNE for h in hashes) for a, b in _PERMUTATIONS)
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def similar_queries(a: str, b: str) -> bool:
+    """True si a y b son la misma consulta salvo forma (canónica) o erratas."""
+    terms_a, terms_b = canonical_terms(a), canonical_terms(b)
+    if not terms_a or not terms_b:
+        return False
+    if terms_a == terms_b:
+        return True
+    return _guard(a) == _guard(b) and same_terms(terms_a, terms_b)
+
+
+# ===========================================================
+# ÍNDICE
+# ===========================================================
+
+
+class QueryIndex:
+    """
+    Consultas ya cacheadas, agrupadas por scope, con búsqueda por
+    forma canónica y por similitud (MinHash + LSH).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        threshold: float = QUERY_SIMILARITY_THRESHOLD,
+        maxsize: int = QUERY_SIMILARITY_MAX_ENTRIES,
+    ):
+        self.name = name
+        self.threshold = threshold
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        # (scope, canónica) -> (clave de caché, trigramas, guard, bandas, palabras)
+        self._entries: "OrderedDict[Tuple[str, str], tuple]" = OrderedDict()
+        # (scope, nº de banda, valores de la banda) -> canónicas
+        self._buckets: Dict[Tuple[str, int, tuple], Set[str]] = {}
+
+        self.lookups = 0
+        self.exact_hits = 0
+        self.similar_hits = 0
+
+    @staticmethod
+    def _bands(signature: Tuple[int, ...]) -> List[tuple]:
+        return [
+            signature[band * LSH_ROWS : (band + 1) * LSH_ROWS] for band in range(LSH_BANDS)
+        ]
+
+    def add(self, scope: str, query: str, key: str):
+        """Registra que `query` (en `scope`) está cacheada con la clave `key`."""
+        terms = canonical_terms(query)
+        if not terms:
+            return
+        canonical = " ".join(terms)
+        grams = shingles(terms)
+        bands = self._bands(minhash(grams))
+
+        with self._lock:
+            entry_key = (scope, canonical)
+            if entry_key in self._entries:
+                self._drop(entry_key)
+            self._entries[entry_key] = (key, grams, _guard(query), bands, terms)
+            for i, band in enumerate(bands):
+                self._buckets.setdefault((scope, i, band), set()).add(canonical)
+            while len(self._entries) > self.maxsize:
+                self._drop(next(iter(self._entries)))
+
+    def _drop(self, entry_key: Tuple[str, str]):
+        scope, canonical = entry_key
+        _, _, _, bands, _ = self._entries.pop(entry_key)
+        for i, band in enumerate(bands):
+            bucket = self._buckets.get((scope, i, band))
+            if bucket is not None:
+                bucket.discard(canonical)
+                if not bucket:
+                    del self._buckets[(scope, i, band)]
+
+    def find(self, scope: str, query: str) -> Optional[str]:
+        """
+        Clave de caché de una consulta equivalente (misma forma canónica)
+        o con las mismas palabras salvo erratas (same_terms, Jaccard >=
+        threshold) del mismo scope, o None.
+        """
+        terms = canonical_terms(query)
+        if not terms:
+            return None
+        canonical = " ".join(terms)
+
+        with self._lock:
+            self.lookups += 1
+            entry = self._entries.get((scope, canonical))
+            if entry is not None:
+                self._entries.move_to_end((scope, canonical))
+                self.exact_hits += 1
+                return entry[0]
+
+        grams = shingles(terms)
+        guard = _guard(query)
+        bands = self._bands(minhash(grams))
+
+        with self._lock:
+            candidates: Set[str] = set()
+            for i, band in enumerate(bands):
+                candidates |= self._buckets.get((scope, i, band), set())
+
+            best_key, best_score = None, self.threshold
+            for candidate in candidates:
+                key, other_grams, other_guard, _, other_terms = self._entries[(scope, candidate)]
+                if other_guard != guard:
+                    continue
+                score = jaccard(grams, other_grams)
+                if score >= best_score and same_terms(terms, other_terms):
+                    best_key, best_score = key, score
+            if best_key is not None:
+                self.similar_hits += 1
+            return best_key
+
+    def discard_key(self, key: str):
+        """Olvida las consultas que apuntan a una clave (p. ej. caducada)."""
+        with self._lock:
+            for entry_key in [k for k, v in self._entries.items() if v[0] == key]:
+                self._drop(entry_key)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "lookups": self.lookups,
+                "exact_hits": self.exact_hits,
+                "similar_hits": self.similar_hits,
+            }
+
+
+# ===========================================================
+# REGISTRO
+# ===========================================================
+
+_indexes: Dict[str, QueryIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_query_index(name: str) -> QueryIndex:
+    """Índice de consultas con ese nombre (uno por caché)."""
+    with _indexes_lock:
+        index = _indexes.get(name)
+        if index is None:
+            index = QueryIndex(name)
+            _indexes[name] = index
+        return index
+
+
+def query_similarity_stats() -> Dict[str, Dict[str, int]]:
+    with _indexes_lock:
+        indexes = list(_indexes.values())
+    return {index.name: index.stats() for index in indexes}
+
+
+def _reset_query_indexes():
+    with _indexes_lock:
+        _indexes.clear()
+
+
+register_reset_hook(_reset_query_indexes)
@@ -0,0 +1,411 @@
+"""
+===========================================================
+TRAVEL TIME - Tiempos de viaje con Distance Matrix
+===========================================================
+
+Motor de tiempos de viaje para las búsquedas con max_travel_time:
+1) Pre-filtro haversine: un destino cuya distancia en línea recta ya
+   supera lo que el modo puede recorrer en ese tiempo se descarta sin
+   llamar a la API
+2) Caché (memoria + SQLite) de la duración por origen/destino/modo
+3) Los destinos restantes se piden en bloques de DISTANCE_MATRIX_CHUNK
+   (límite de la API: 25 destinos y 100 elementos por petición), en
+   paralelo
+
+Estrategias (TRAVEL_TIME_STRATEGY o PlaceSearchPayload.travel_time_strategy):
+- "api": siempre Distance Matrix (los errores se propagan)
+- "estimate": estimación local, sin red: haversine vectorizado (numpy)
+  x factor de rodeo / velocidad típica del modo
+- "auto" (por defecto): Distance Matrix con timeout corto; si es lenta,
+  falla o se supera el presupuesto de llamadas por minuto se usa la
+  estimación, y durante TRAVEL_TIME_COOLDOWN segundos se sigue estimando
+
+Uso:
+    from backend.travel_time import within_travel_time
+
+    keep = within_travel_time("40.41,-3.70", ["40.42,-3.71", ...], 15, "walking")
+
+Configuración:
+- TRAVEL_TIME_CACHE_TTL: segundos que vale una duración cacheada (6 h)
+- TRAVEL_TIME_CACHE_SIZE: entradas en memoria (5000)
+- DISTANCE_MATRIX_CHUNK: destinos por petición (25)
+- DISTANCE_MATRIX_WORKERS: peticiones simultáneas (4)
+- TRAVEL_TIME_STRATEGY: api | estimate | auto
+- TRAVEL_TIME_API_TIMEOUT: segundos de lectura en modo auto (2)
+- DISTANCE_MATRIX_MAX_CALLS_PER_MIN: presupuesto en modo auto (60)
+- TRAVEL_TIME_COOLDOWN: segundos estimando tras un fallo (60)
+"""
+
+import math
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from backend import http_client
+from backend.cache import get_cache, register_reset_hook
+
+
+# ===========================================================
+# CONFIGURACIÓN
+# ===========================================================
+
+TRAVEL_TIME_CACHE_TTL = int(os.getenv("TRAVEL_TIME_CACHE_TTL", str(6 * 3600)))
+TRAVEL_TIME_CACHE_SIZE = int(os.getenv("TRAVEL_TIME_CACHE_SIZE", "5000"))
+DISTANCE_MATRIX_CHUNK = min(int(os.getenv("DISTANCE_MATRIX_CHUNK", "25")), 25)
+DISTANCE_MATRIX_WORKERS = int(os.getenv("DISTANCE_MATRIX_WORKERS", "4"))
+
+TRAVEL_TIME_STRATEGY = os.getenv("TRAVEL_TIME_STRATEGY", "auto").lower()
+TRAVEL_TIME_API_TIMEOUT = float(os.getenv("TRAVEL_TIME_API_TIMEOUT", "2"))
+DISTANCE_MATRIX_MAX_CALLS_PER_MIN = int(os.getenv("DISTANCE_MATRIX_MAX_CALLS_PER_MIN", "60"))
+TRAVEL_TIME_COOLDOWN = float(os.getenv("TRAVEL_TIME_COOLDOWN", "60"))
+STRATEGIES = ("api", "estimate", "auto")
+
+DISTANCE_MATRIX_URL = "https://maps.googleapis.com/maps/api/distancematrix/json"
+
+# Velocidad máxima creíble por modo (km/h), en línea recta. Solo sirve
+# para descartar destinos imposibles: tiene que ser una cota por arriba.
+MAX_SPEED_KMH = {
+    "walking": 7.0,
+    "bicycling": 30.0,
+    "transit": 80.0,
+    "driving": 120.0,
+}
+
+# Velocidad típica por modo (metros/minuto), la misma que usa el radio de
+# búsqueda de places_text_search. Transit se aproxima como a pie: la
+# estimación prefiere descartar de menos que de más.
+SPEED_PROFILES_M_PER_MIN = {
+    "walking": 80.0,
+    "bicycling": 250.0,
+    "driving": 833.0,
+    "transit": 80.0,
+}
+
+# Las calles no van en línea recta: distancia real ≈ línea recta x factor
+DETOUR_FACTOR = float(os.getenv("TRAVEL_TIME_DETOUR_FACTOR", "1.3"))
+
+# Duración cacheada de un destino al que no hay ruta
+UNREACHABLE = -1
+
+_executor = ThreadPoolExecutor(
+    max_workers=DISTANCE_MATRIX_WORKERS, thread_name_prefix="distance-matrix"
+)
+
+
+# ===========================================================
+# GEOMETRÍA
+# ===========================================================
+
+
+def parse_lat_lng(value: Optional[str]) -> Optional[Tuple[float, float]]:
+    """'lat,lng' -> (lat, lng), o None si no es válido."""
+    if not value:
+        return None
+    try:
+        lat, lng = value.split(",")
+        return float(lat), float(lng)
+    except ValueError:
+        return None
+
+
+def haversine_km(a: Tuple[float, float], b: Tuple[float, float]) -> float:
+    """Distancia en línea recta (km) entre dos puntos (lat, lng)."""
+    lat1, lng1 = map(math.radians, a)
+    lat2, lng2 = map(math.radians, b)
+    h = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    )
+    return 2 * 6371.0 * math.asin(math.sqrt(h))
+
+
+def max_reach_km(max_minutes: float, mode: str = "walking") -> float:
+    """Distancia máxima en línea recta alcanzable en max_minutes."""
+    speed = MAX_SPEED_KMH.get(mode, MAX_SPEED_KMH["driving"])
+    return speed * max_minutes / 60
+
+
+# ===========================================================
+# DISTANCE MATRIX
+# ===========================================================
+
+
+def _travel_cache():
+    return get_cache(
+        "travel_time",
+        maxsize=TRAVEL_TIME_CACHE_SIZE,
+        ttl_seconds=TRAVEL_TIME_CACHE_TTL,
+        persistent=True,
+    )
+
+
+def _cache_key(origin: Tuple[float, float], destination: Tuple[float, float], mode: str) -> str:
+    # Coordenadas redondeadas a ~10 m
+    return f"{mode}|{origin[0]:.4f},{origin[1]:.4f}|{destination[0]:.4f},{destination[1]:.4f}"
+
+
+def _request_chunk(
+    origin: str, destinations: List[str], mode: str, timeout: Optional[float] = None
+) -> List[int]:
+    """Una petición a Distance Matrix; duración en segundos o UNREACHABLE."""
+    params = {
+        "origins": origin,
+        "destinations": "|".join(destinations),
+        "mode": mode,
+        "key": os.getenv("GOOGLE_MAPS_API_KEY"),
+    }
+    r = http_client.get(
+        DISTANCE_MATRIX_URL, service="google_maps", params=params, timeout=timeout
+    )
+    r.raise_for_status()
+    data = r.json()
+
+    status = data.get("status", "OK")
+    if status != "OK":
+        raise RuntimeError(f"Distance Matrix devolvió {status}")
+
+    rows = data.get("rows") or [{}]
+    elements = rows[0].get("elements", [])
+    durations = []
+    for i in range(len(destinations)):
+        elem = elements[i] if i < len(elements) else {}
+        if elem.get("status") == "OK":
+            durations.append(int(elem.get("duration", {}).get("value", 0)))
+        else:
+            durations.append(UNREACHABLE)
+    return durations
+
+
+def cached_durations(
+    origin: str, destinations: List[Optional[str]], mode: str = "walking"
+) -> Dict[int, Optional[int]]:
+    """Duraciones ya cacheadas: posición -> segundos (None si no hay ruta)."""
+    cache = _travel_cache()
+    origin_point = parse_lat_lng(origin)
+    found: Dict[int, Optional[int]] = {}
+    if origin_point is None:
+        return found
+
+    for i, destination in enumerate(destinations):
+        point = parse_lat_lng(destination)
+        if point is None:
+            continue
+        cached = cache.get(_cache_key(origin_point, point, mode))
+        if cached is not None:
+            found[i] = None if cached == UNREACHABLE else cached
+    return found
+
+
+def travel_durations(
+    origin: str, destinations: List[str], mode: str = "walking", timeout: Optional[float] = None
+) -> List[Optional[int]]:
+    """
+    Duración en segundos de origin a cada destino (None si no hay ruta).
+
+    Usa la caché y pide el resto en bloques paralelos.
+    """
+    cache = _travel_cache()
+    origin_point = parse_lat_lng(origin)
+    durations: List[Optional[int]] = [None] * len(destinations)
+    pending: Dict[str, List[int]] = {}  # destino -> posiciones
+
+    found = cached_durations(origin, destinations, mode)
+    for i, destination in enumerate(destinations):
+        if i in found:
+            durations[i] = found[i]
+        else:
+            pending.setdefault(destination, []).append(i)
+
+    if pending:
+        unique = list(pending)
+        chunks = [
+            unique[i : i + DISTANCE_MATRIX_CHUNK]
+            for i in range(0, len(unique), DISTANCE_MATRIX_CHUNK)
+        ]
+        cache.count("api_calls", len(chunks))
+        _record_api_calls(len(chunks))
+        if len(chunks) == 1:
+            chunk_results = [_request_chunk(origin, chunks[0], mode, timeout)]
+        else:
+            chunk_results = list(
+                _executor.map(lambda chunk: _request_chunk(origin, chunk, mode, timeout), chunks)
+            )
+
+        for chunk, results in zip(chunks, chunk_results):
+            for destination, seconds in zip(chunk, results):
+                point = parse_lat_lng(destination)
+                if origin_point and point:
+                    cache.set(_cache_key(origin_point, point, mode), seconds)
+                for i in pending[destination]:
+                    durations[i] = None if seconds == UNREACHABLE else seconds
+
+    return durations
+
+
+# ===========================================================
+# ESTIMACIÓN LOCAL
+# ===========================================================
+
+
+def estimate_durations(
+    origin: str, destinations: List[Optional[str]], mode: str = "walking"
+) -> List[Optional[int]]:
+    """
+    Duración estimada en segundos sin llamar a ninguna API.
+
+    Haversine vectorizado sobre todos los destinos, multiplicado por
+    DETOUR_FACTOR y dividido por la velocidad típica del modo. None para
+    los destinos sin coordenadas.
+    """
+    origin_point = parse_lat_lng(origin)
+    points = [parse_lat_lng(d) for d in destinations]
+    valid = [i for i, p in enumerate(points) if p is not None]
+    durations: List[Optional[int]] = [None] * len(destinations)
+    if origin_point is None or not valid:
+        return durations
+
+    coords = np.radians(np.array([points[i] for i in valid], dtype=float))
+    lat1, lng1 = np.radians(origin_point)
+    lat2, lng2 = coords[:, 0], coords[:, 1]
+    h = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    )
+    meters = 2 * 6371000.0 * np.arcsin(np.sqrt(h)) * DETOUR_FACTOR
+
+    speed = SPEED_PROFILES_M_PER_MIN.get(mode, SPEED_PROFILES_M_PER_MIN["walking"])
+    seconds = np.rint(meters / speed * 60).astype(int)
+    for i, value in zip(valid, seconds):
+        durations[i] = int(value)
+    return durations
+
+
+# ===========================================================
+# ESTRATEGIA (API / ESTIMACIÓN / AUTO)
+# ===========================================================
+
+_budget_lock = threading.Lock()
+_recent_calls: deque = deque()  # instantes de las últimas peticiones a la API
+_cooldown_until = 0.0
+
+
+def _record_api_calls(count: int):
+    now = time.time()
+    with _budget_lock:
+        _recent_calls.extend([now] * count)
+
+
+def _api_available() -> bool:
+    """False si se está en enfriamiento o se agotó el presupuesto del minuto."""
+    now = time.time()
+    with _budget_lock:
+        if now < _cooldown_until:
+            return False
+        while _recent_calls and now - _recent_calls[0] > 60:
+            _recent_calls.popleft()
+        return len(_recent_calls) < DISTANCE_MATRIX_MAX_CALLS_PER_MIN
+
+
+def _start_cooldown():
+    global _cooldown_until
+    with _budget_lock:
+        _cooldown_until = time.time() + TRAVEL_TIME_COOLDOWN
+
+
+def _reset_strategy_state():
+    global _cooldown_until
+    with _budget_lock:
+        _recent_calls.clear()
+        _cooldown_until = 0.0
+
+
+register_reset_hook(_reset_strategy_state)
+
+
+def resolve_strategy(strategy: Optional[str] = None) -> str:
+    """Estrategia a usar: la pedida si es válida, si no TRAVEL_TIME_STRATEGY."""
+    strategy = (strategy or TRAVEL_TIME_STRATEGY).lower()
+    return strategy if strategy in STRATEGIES else "auto"
+
+
+def _estimate_with_cache(
+    origin: str, destinations: List[str], mode: str
+) -> List[Optional[int]]:
+    """Estimación local, respetando las duraciones reales ya cacheadas."""
+    durations = estimate_durations(origin, destinations, mode)
+    found = cached_durations(origin, destinations, mode)
+    for i, seconds in found.items():
+        durations[i] = seconds
+    _travel_cache().count("estimated", len(destinations) - len(found))
+    return durations
+
+
+def _durations_for(
+    origin: str, destinations: List[str], mode: str, strategy: str
+) -> List[Optional[int]]:
+    if strategy == "estimate":
+        _travel_cache().count("estimated", len(destinations))
+        return estimate_durations(origin, destinations, mode)
+    if strategy == "api":
+        return travel_durations(origin, destinations, mode)
+
+    # auto
+    if not _api_available():
+        _travel_cache().count("fallbacks")
+        return _estimate_with_cache(origin, destinations, mode)
+    try:
+        return travel_durations(origin, destinations, mode, timeout=TRAVEL_TIME_API_TIMEOUT)
+    except Exception as e:
+        print(f"⚠️  Distance Matrix no disponible ({e}); se estiman los tiempos de viaje")
+        _start_cooldown()
+        _travel_cache().count("fallbacks")
+        return _estimate_with_cache(origin, destinations, mode)
+
+
+def within_travel_time(
+    origin: str,
+    destinations: List[Optional[str]],
+    max_minutes: int,
+    mode: str = "walking",
+    strategy: Optional[str] = None,
+) -> List[bool]:
+    """
+    Un booleano por destino: True si se llega en max_minutes o menos.
+
+    Los destinos sin coordenadas o fuera del alcance en línea recta dan
+    False sin llamar a la API. strategy: "api", "estimate" o "auto"
+    (por defecto TRAVEL_TIME_STRATEGY).
+    """
+    if not destinations:
+        return []
+
+    origin_point = parse_lat_lng(origin)
+    reach = max_reach_km(max_minutes, mode)
+    keep = [False] * len(destinations)
+
+    candidates = []
+    for i, destination in enumerate(destinations):
+        point = parse_lat_lng(destination)
+        if point is None:
+            continue
+        if origin_point and haversine_km(origin_point, point) > reach:
+            continue
+        candidates.append(i)
+
+    skipped = len(destinations) - len(candidates)
+    if skipped:
+        _travel_cache().count("prefiltered", skipped)
+    if not candidates:
+        return keep
+
+    durations = _durations_for(
+        origin, [destinations[i] for i in candidates], mode, resolve_strategy(strategy)
+    )
+    for i, seconds in zip(candidates, durations):
+        keep[i] = seconds is not None and seconds <= max_minutes * 60
+    return keep
@@ -20,6 +20,7 @@ import html as html_module
 from frontend.frontend_api_helpers import (
     search_restaurants_via_agent,
     process_agent_response_for_ui,
+    photo_proxy_url,
 )
 
 # ==========================================
@@ -27,6 +28,10 @@ from frontend.frontend_api_helpers import (
 # ==========================================
 API_BASE_URL = "http://localhost:8000"
 API_KEY = "demo-api-key"
+# Miniatura de las tarjetas (160px de alto; 2x para pantallas retina)
+CARD_PHOTO_WIDTH = 480
+CARD_PHOTO_HEIGHT = 320
+CARD_PHOTO_FORMAT = "webp"
 
 st.set_page_config(
     layout="wide",
@@ -623,8 +628,14 @@ with col_options:
             hours = restaurant.get("opening_hours", {})
             photo_name = restaurant.get("photo_name")
 
-            # Generar URL de foto usando el endpoint proxy de FastAPI
-            photo_url = f"{API_BASE_URL}/api/photo/{photo_name}" if photo_name else None
+            # Generar URL de foto usando el endpoint proxy de FastAPI (miniatura WebP)
+            photo_url = photo_proxy_url(
+                photo_name,
+                CARD_PHOTO_WIDTH,
+                CARD_PHOTO_HEIGHT,
+                image_format=CARD_PHOTO_FORMAT,
+                base_url=API_BASE_URL,
+            )
 
             # Determinar disponibilidad/estado
             availability = restaurant.get("availability", "")
@@ -8,8 +8,8 @@ CORREGIDO:
 """
 import requests
 import json
-from typing import Dict, List, Any, Optional
-from datetime import datetime, date, time
+from typing import Dict, List, Any, Optional, Iterator
+from datetime import date, time
 
 
 # ==========================================
@@ -38,6 +38,10 @@ def search_restaurants_via_agent(
     CORREGIDO: Recibe el historial COMPLETO (incluyendo el mensaje actual)
     desde el frontend. No manipula ni añade mensajes.
     
+    Si ya hay session_id, el servidor recuerda la conversación y solo se
+    envían los mensajes nuevos (desde la última respuesta del asistente).
+    Si la sesión caducó en el servidor, se reenvía el historial completo.
+    
     Args:
         messages: Historial COMPLETO de mensajes [{"role": "user/assistant", "content": "..."}]
         location: Ubicación de búsqueda (del formulario)
@@ -49,53 +53,35 @@ def search_restaurants_via_agent(
         max_distance: Distancia máxima en km
         price_level: Nivel de precio (1-4)
         extras: Preferencias adicionales
-        session_id: ID de sesión existente
+        session_id: ID de sesión existente (devuelto por el servidor)
     
     Returns:
         Diccionario con status, message, restaurants, etc.
     """
     
-    # Generar session_id si no existe
-    if not session_id:
-        session_id = f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    # Solo enviamos lo nuevo si el servidor ya conoce la sesión. En el
+    # primer turno no se envía session_id: lo genera el servidor (único)
+    incremental = bool(session_id)
     
     # Preparar contexto de sesión (preferencias del formulario)
-    session_context = {
-        "travel_mode": travel_mode,
-        "max_distance_km": max_distance,
-        "price_level": price_level,
-    }
-    
-    if location and location.strip():
-        session_context["location"] = location
-    
-    if party_size:
-        session_context["party_size_hint"] = party_size
-    
-    if extras and extras.strip():
-        session_context["extras"] = extras
-    
-    if selected_date:
-        session_context["date"] = selected_date.isoformat()
-    
-    if selected_time:
-        session_context["time"] = selected_time.isoformat()
+    session_context = _build_session_context(
+        location, party_size, selected_date, selected_time,
+        mins, travel_mode, max_distance, price_level, extras
+    )
     
-    if mins and not selected_date:
-        session_context["mins_to_wait"] = mins
-    
-    # Preparar payload - enviamos el historial TAL CUAL viene del frontend
+    # Preparar payload - historial TAL CUAL o solo los mensajes nuevos
     payload = {
         "session_id": session_id,
         "user_id": "streamlit_user",
-        "messages": messages,  # ← Historial COMPLETO, sin modificar
+        "messages": _new_messages(messages) if incremental else messages,
+        "incremental": incremental,
         "session_context": session_context
     }
     
     try:
         print(f"\n{'='*50}")
         print(f"📡 Enviando al API: {API_BASE_URL}/api/reservation-requests")
-        print(f"📨 Mensajes: {len(messages)}")
+        print(f"📨 Mensajes: {len(payload['messages'])} (incremental={incremental})")
         for i, msg in enumerate(messages[-3:]):  # Solo últimos 3 para el log
             print(f"   {i+1}. [{msg['role']}]: {msg['content'][:50]}...")
         print(f"{'='*50}\n")
@@ -113,8 +99,25 @@ def search_restaurants_via_agent(
         response.raise_for_status()
         result = response.json()
         
-        # Asegurar session_id en respuesta
-        if "session_id" not in result or result["session_id"] is None:
+        # Sesión caducada en el servidor: reenviar el historial completo
+        if result.get("status") == "session_expired":
+            print("♻️  Sesión caducada, reenviando historial completo")
+            payload["messages"] = messages
+            payload["incremental"] = False
+            response = requests.post(
+                f"{API_BASE_URL}/api/reservation-requests",
+                json=payload,
+                headers={
+                    "Content-Type": "application/json",
+                    "x-api-key": API_KEY
+                },
+                timeout=360
+            )
+            response.raise_for_status()
+            result = response.json()
+        
+        # Asegurar session_id en respuesta (el que asignó el servidor)
+        if not result.get("session_id"):
             result["session_id"] = session_id
         
         print(f"✅ Respuesta: status={result.get('status')}")
@@ -159,6 +162,148 @@ def search_restaurants_via_agent(
         }
 
 
+def _build_session_context(
+    location: str,
+    party_size: int,
+    selected_date: Optional[date],
+    selected_time: Optional[time],
+    mins: Optional[int],
+    travel_mode: str,
+    max_distance: float,
+    price_level: int,
+    extras: str
+) -> Dict[str, Any]:
+    """Preferencias del formulario que acompañan a la conversación."""
+    session_context = {
+        "travel_mode": travel_mode,
+        "max_distance_km": max_distance,
+        "price_level": price_level,
+    }
+    
+    if location and location.strip():
+        session_context["location"] = location
+    
+    if party_size:
+        session_context["party_size_hint"] = party_size
+    
+    if extras and extras.strip():
+        session_context["extras"] = extras
+    
+    if selected_date:
+        session_context["date"] = selected_date.isoformat()
+    
+    if selected_time:
+        session_context["time"] = selected_time.isoformat()
+    
+    if mins and not selected_date:
+        session_context["mins_to_wait"] = mins
+    
+    return session_context
+
+
+def stream_restaurants_via_agent(
+    messages: List[Dict[str, str]],
+    session_id: Optional[str] = None,
+    **preferences
+) -> Iterator[Dict[str, Any]]:
+    """
+    Igual que search_restaurants_via_agent, pero usa el endpoint SSE y va
+    devolviendo los eventos de progreso del agente según llegan.
+    
+    Eventos: decision, tool_started, tool_finished, places (restaurantes
+    listos para pintar) y final (mismo contenido que la respuesta normal).
+    
+    Args:
+        messages: Historial COMPLETO de mensajes
+        session_id: ID de sesión existente (devuelto por el servidor)
+        **preferences: Mismas preferencias que search_restaurants_via_agent
+    """
+    incremental = bool(session_id)  # sin session_id lo genera el servidor
+    
+    defaults = {
+        "location": "", "party_size": 2, "selected_date": None,
+        "selected_time": None, "mins": None, "travel_mode": "walking",
+        "max_distance": 15.0, "price_level": 2, "extras": "",
+    }
+    defaults.update(preferences)
+    
+    payload = {
+        "session_id": session_id,
+        "user_id": "streamlit_user",
+        "messages": _new_messages(messages) if incremental else messages,
+        "incremental": incremental,
+        "session_context": _build_session_context(**defaults)
+    }
+    
+    try:
+        for event in _post_sse(f"{API_BASE_URL}/api/reservation-requests/stream", payload):
+            # Sesión caducada en el servidor: repetir con el historial completo
+            if event.get("type") == "final" and event.get("status") == "session_expired":
+                payload["messages"] = messages
+                payload["incremental"] = False
+                yield from _post_sse(f"{API_BASE_URL}/api/reservation-requests/stream", payload)
+                return
+            yield event
+    
+    except requests.exceptions.RequestException as e:
+        yield {
+            "type": "final",
+            "status": "failed",
+            "message": f"Error de conexión con el servidor: {str(e)}",
+            "session_id": session_id
+        }
+
+
+def _post_sse(url: str, payload: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Hace POST y parsea la respuesta Server-Sent Events en dicts."""
+    with requests.post(
+        url,
+        json=payload,
+        headers={
+            "Content-Type": "application/json",
+            "Accept": "text/event-stream",
+            "x-api-key": API_KEY
+        },
+        stream=True,
+        timeout=(5, 360)  # conexión, y espera máxima entre eventos
+    ) as response:
+        response.raise_for_status()
+        
+        data_lines = []
+        for line in response.iter_lines(decode_unicode=True):
+            if line is None:
+                continue
+            if line.startswith("data:"):
+                data_lines.append(line[5:].strip())
+            elif line == "" and data_lines:
+                yield json.loads("\n".join(data_lines))
+                data_lines = []
+
+
+def photo_proxy_url(
+    photo_name: Optional[str],
+    width: int,
+    height: int,
+    image_format: Optional[str] = None,
+    base_url: str = API_BASE_URL,
+) -> Optional[str]:
+    """URL de la foto a través del proxy /api/photo del API (miniatura cacheada)."""
+    if not photo_name:
+        return None
+    params = f"?w={width}&h={height}"
+    if image_format:
+        params += f"&format={image_format}"
+    return f"{base_url.rstrip('/')}/api/photo/{photo_name}{params}"
+
+
+def _new_messages(messages: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """Mensajes posteriores a la última respuesta del asistente."""
+    for i in range(len(messages) - 1, -1, -1):
+        if messages[i]["role"] == "assistant":
+            return messages[i + 1:]
+    return messages
+
+
 def process_agent_response_for_ui(agent_response: Dict[str, Any]) -> List[Dict[str, Any]]:
     """
     Convierte la respuesta del agente al formato que espera la UI.
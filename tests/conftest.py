@@ -21,6 +21,17 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 # FIXTURES DE CONFIGURACIÓN
 # ===========================================================
 
+@pytest.fixture(autouse=True)
+def isolated_caches(tmp_path, monkeypatch):
+    """Cada test usa cachés vacías en un directorio temporal."""
+    monkeypatch.setenv("CACHE_DIR", str(tmp_path / "cache"))
+    from backend.cache import reset_caches
+
+    reset_caches()
+    yield
+    reset_caches()
+
+
 @pytest.fixture
 def mock_env_vars(monkeypatch):
     """Configura variables de entorno para tests."""
@@ -7,7 +7,7 @@ Tests de integración para el servidor FastAPI.
 """
 
 import pytest
-from unittest.mock import patch, Mock, MagicMock
+from unittest.mock import patch, Mock, MagicMock, AsyncMock
 from fastapi.testclient import TestClient
 import os
 
@@ -20,7 +20,7 @@ def api_client(mock_env_vars):
         "GOOGLE_MAPS_API_KEY": "test-key",
         "TAVILY_API_KEY": "test-key",
     }):
-        with patch("FastAPI.api_server.run_agent") as mock_agent:
+        with patch("FastAPI.api_server.arun_agent", new_callable=AsyncMock) as mock_agent:
             mock_agent.return_value = {
                 "response": "Test response",
                 "messages": [],
@@ -63,7 +63,7 @@ class TestReservationRequestEndpoint:
             "GOOGLE_MAPS_API_KEY": "test-key",
             "TAVILY_API_KEY": "test-key",
         }):
-            with patch("FastAPI.api_server.run_agent") as mock_agent:
+            with patch("FastAPI.api_server.arun_agent", new_callable=AsyncMock) as mock_agent:
                 mock_agent.return_value = {
                     "response": "He encontrado varios restaurantes",
                     "messages": [],
@@ -98,7 +98,7 @@ class TestReservationRequestEndpoint:
             "GOOGLE_MAPS_API_KEY": "test-key",
             "TAVILY_API_KEY": "test-key",
         }):
-            with patch("FastAPI.api_server.run_agent") as mock_agent:
+            with patch("FastAPI.api_server.arun_agent", new_callable=AsyncMock) as mock_agent:
                 mock_agent.return_value = {
                     "response": "¿En qué puedo ayudarte?",
                     "messages": [],
@@ -123,7 +123,7 @@ class TestReservationRequestEndpoint:
             "GOOGLE_MAPS_API_KEY": "test-key",
             "TAVILY_API_KEY": "test-key",
         }):
-            with patch("FastAPI.api_server.run_agent") as mock_agent:
+            with patch("FastAPI.api_server.arun_agent", new_callable=AsyncMock) as mock_agent:
                 mock_agent.return_value = {
                     "response": "Test",
                     "messages": [],
@@ -283,7 +283,7 @@ class TestContinueConversationEndpoint:
             "GOOGLE_MAPS_API_KEY": "test-key",
             "TAVILY_API_KEY": "test-key",
         }):
-            with patch("FastAPI.api_server.run_agent") as mock_agent:
+            with patch("FastAPI.api_server.arun_agent", new_callable=AsyncMock) as mock_agent:
                 mock_agent.return_value = {
                     "response": "Test",
                     "messages": [],
@@ -305,6 +305,15 @@ class TestContinueConversationEndpoint:
 class TestPhotoEndpoint:
     """Tests para el endpoint de fotos."""
 
+    def test_frontend_photo_proxy_url(self):
+        """Verifica la URL del proxy que construye el frontend (sin backend.google_places)."""
+        from frontend.frontend_api_helpers import photo_proxy_url
+
+        url = photo_proxy_url("places/a/photos/b", 480, 320, "webp", base_url="http://api/")
+
+        assert url == "http://api/api/photo/places/a/photos/b?w=480&h=320&format=webp"
+        assert photo_proxy_url(None, 480, 320) is None
+
     def test_photo_endpoint_missing_api_key(self, mock_env_vars, monkeypatch):
         """Verifica error cuando falta API key."""
         monkeypatch.delenv("GOOGLE_MAPS_API_KEY", raising=False)
@@ -321,14 +330,10 @@ class TestPhotoEndpoint:
 
             assert response.status_code == 500
 
-    @patch("FastAPI.api_server.requests.get")
-    def test_photo_endpoint_success(self, mock_get, mock_env_vars):
+    @patch("FastAPI.api_server.http_client.aopen_stream", new_callable=AsyncMock)
+    def test_photo_endpoint_success(self, mock_stream, mock_env_vars):
         """Verifica obtención de foto exitosa."""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.content = b"fake_image_data"
-        mock_response.headers = {"Content-Type": "image/jpeg"}
-        mock_get.return_value = mock_response
+        mock_stream.return_value = _stream_response(b"fake_image_data")
 
         with patch.dict(os.environ, {
             "OPENAI_API_KEY": "test-key",
@@ -342,14 +347,14 @@ class TestPhotoEndpoint:
 
             assert response.status_code == 200
             assert response.headers["content-type"] == "image/jpeg"
+            assert response.content == b"fake_image_data"
+            assert "max-age" in response.headers["cache-control"]
+            assert response.headers["etag"]
 
-    @patch("FastAPI.api_server.requests.get")
-    def test_photo_endpoint_google_error(self, mock_get, mock_env_vars):
+    @patch("FastAPI.api_server.http_client.aopen_stream", new_callable=AsyncMock)
+    def test_photo_endpoint_google_error(self, mock_stream, mock_env_vars):
         """Verifica manejo de error de Google."""
-        mock_response = Mock()
-        mock_response.status_code = 404
-        mock_response.text = "Photo not found"
-        mock_get.return_value = mock_response
+        mock_stream.return_value = _stream_response(b"Photo not found", status_code=404)
 
         with patch.dict(os.environ, {
             "OPENAI_API_KEY": "test-key",
@@ -365,12 +370,12 @@ class TestPhotoEndpoint:
             assert response.status_code in [404, 500]
             assert response.status_code != 200
 
-    @patch("FastAPI.api_server.requests.get")
-    def test_photo_endpoint_timeout(self, mock_get, mock_env_vars):
+    @patch("FastAPI.api_server.http_client.aopen_stream", new_callable=AsyncMock)
+    def test_photo_endpoint_timeout(self, mock_stream, mock_env_vars):
         """Verifica manejo de timeout."""
-        import requests
+        import httpx
 
-        mock_get.side_effect = requests.exceptions.Timeout()
+        mock_stream.side_effect = httpx.ReadTimeout("timeout")
 
         with patch.dict(os.environ, {
             "OPENAI_API_KEY": "test-key",
@@ -384,6 +389,81 @@ class TestPhotoEndpoint:
 
             assert response.status_code == 504
 
+    @patch("FastAPI.api_server.http_client.aopen_stream", new_callable=AsyncMock)
+    def test_photo_served_from_cache(self, mock_stream, mock_env_vars):
+        """Verifica que la segunda petición de la misma foto no sale a Google."""
+        mock_stream.return_value = _stream_response(b"fake_image_data")
+
+        with patch.dict(os.environ, {"GOOGLE_MAPS_API_KEY": "test-key"}):
+            from FastAPI.api_server import app
+            client = TestClient(app)
+
+            first = client.get("/api/photo/places/test/photos/photo123")
+            second = client.get("/api/photo/places/test/photos/photo123")
+
+        assert first.content == second.content == b"fake_image_data"
+        assert second.headers["etag"] == first.headers["etag"]
+        assert mock_stream.call_count == 1
+
+    @patch("FastAPI.api_server.http_client.aopen_stream", new_callable=AsyncMock)
+    def test_photo_not_modified(self, mock_stream, mock_env_vars):
+        """Verifica el 304 cuando el navegador envía el ETag vigente."""
+        with patch.dict(os.environ, {"GOOGLE_MAPS_API_KEY": "test-key"}):
+            from FastAPI.api_server import app
+            from backend.photo_cache import photo_cache_key, photo_etag
+
+            client = TestClient(app)
+            etag = photo_etag(photo_cache_key("places/test/photos/photo123", 400, 300))
+
+            response = client.get(
+                "/api/photo/places/test/photos/photo123",
+                headers={"If-None-Match": etag},
+            )
+
+        assert response.status_code == 304
+        assert response.content == b""
+        mock_stream.assert_not_called()
+
+
+    @patch("FastAPI.api_server.http_client.aopen_stream", new_callable=AsyncMock)
+    def test_photo_webp_thumbnail(self, mock_stream, mock_env_vars):
+        """Verifica la miniatura WebP redimensionada y cacheada por variante."""
+        import io
+        Image = pytest.importorskip("PIL.Image")
+
+        source = io.BytesIO()
+        Image.new("RGB", (400, 300), (10, 120, 60)).save(source, format="JPEG")
+        mock_stream.return_value = _stream_response(source.getvalue())
+
+        with patch.dict(os.environ, {"GOOGLE_MAPS_API_KEY": "test-key"}):
+            from FastAPI.api_server import app
+            client = TestClient(app)
+
+            url = "/api/photo/places/test/photos/photo123?w=120&h=90&format=webp"
+            first = client.get(url)
+            second = client.get(url)
+
+        assert first.status_code == 200
+        assert first.headers["content-type"] == "image/webp"
+        with Image.open(io.BytesIO(first.content)) as img:
+            assert img.width <= 120 and img.height <= 90
+        assert second.content == first.content
+        assert mock_stream.call_count == 1
+        assert mock_stream.call_args.kwargs["params"]["maxWidthPx"] == 120
+
+def _stream_response(body: bytes, status_code: int = 200):
+    """Respuesta de http_client.aopen_stream simulada."""
+    async def aiter_bytes():
+        yield body
+
+    response = Mock()
+    response.status_code = status_code
+    response.headers = {"Content-Type": "image/jpeg"}
+    response.aiter_bytes = aiter_bytes
+    response.aread = AsyncMock(return_value=body)
+    response.aclose = AsyncMock()
+    return response
+
 
 class TestAgentErrorHandling:
     """Tests para manejo de errores del agente."""
@@ -395,7 +475,7 @@ class TestAgentErrorHandling:
             "GOOGLE_MAPS_API_KEY": "test-key",
             "TAVILY_API_KEY": "test-key",
         }):
-            with patch("FastAPI.api_server.run_agent") as mock_agent:
+            with patch("FastAPI.api_server.arun_agent", new_callable=AsyncMock) as mock_agent:
                 mock_agent.side_effect = Exception("Error del agente")
                 from FastAPI.api_server import app
                 client = TestClient(app)
@@ -411,3 +491,160 @@ class TestAgentErrorHandling:
                 data = response.json()
                 assert data["status"] == "error"
                 assert "Error" in data["message"]
+
+
+class TestSessionHandling:
+    """Tests para las sesiones del lado del servidor."""
+
+    def test_incremental_request_with_unknown_session(self, mock_env_vars):
+        """Verifica que se pide el historial completo si la sesión no existe."""
+        with patch.dict(os.environ, {
+            "OPENAI_API_KEY": "test-key",
+            "GOOGLE_MAPS_API_KEY": "test-key",
+            "TAVILY_API_KEY": "test-key",
+        }):
+            with patch("FastAPI.api_server.arun_agent", new_callable=AsyncMock) as mock_agent:
+                from FastAPI.api_server import app
+                client = TestClient(app)
+
+                response = client.post(
+                    "/api/reservation-requests",
+                    json={
+                        "session_id": "sesion-caducada",
+                        "incremental": True,
+                        "messages": [{"role": "user", "content": "Reserva la primera"}]
+                    }
+                )
+
+                assert response.status_code == 200
+                assert response.json()["status"] == "session_expired"
+                mock_agent.assert_not_called()
+
+    def test_request_passes_session_id_to_agent(self, mock_env_vars):
+        """Verifica que el session_id se pasa al agente."""
+        with patch.dict(os.environ, {
+            "OPENAI_API_KEY": "test-key",
+            "GOOGLE_MAPS_API_KEY": "test-key",
+            "TAVILY_API_KEY": "test-key",
+        }):
+            with patch("FastAPI.api_server.arun_agent", new_callable=AsyncMock) as mock_agent:
+                mock_agent.return_value = {"response": "Hola", "messages": [], "knowledge": {}}
+                from FastAPI.api_server import app
+                client = TestClient(app)
+
+                client.post(
+                    "/api/reservation-requests",
+                    json={
+                        "session_id": "test-123",
+                        "messages": [{"role": "user", "content": "Hola"}]
+                    }
+                )
+
+                assert mock_agent.call_args.kwargs["session_id"] == "test-123"
+
+    def test_first_turns_get_different_sessions(self, mock_env_vars):
+        """Verifica que dos primeros turnos simultáneos no comparten sesión."""
+        with patch.dict(os.environ, {
+            "OPENAI_API_KEY": "test-key",
+            "GOOGLE_MAPS_API_KEY": "test-key",
+            "TAVILY_API_KEY": "test-key",
+        }):
+            with patch("FastAPI.api_server.arun_agent", new_callable=AsyncMock) as mock_agent:
+                mock_agent.return_value = {"response": "Hola", "messages": [], "knowledge": {}}
+                from FastAPI.api_server import app
+                from frontend import frontend_api_helpers
+                client = TestClient(app)
+
+                def post(url, json, headers, timeout):
+                    return client.post(
+                        url.replace(frontend_api_helpers.API_BASE_URL, ""), json=json, headers=headers
+                    )
+
+                with patch.object(frontend_api_helpers.requests, "post", side_effect=post) as mock_post:
+                    messages = [{"role": "user", "content": "Hola"}]
+                    first = frontend_api_helpers.search_restaurants_via_agent(messages)
+                    second = frontend_api_helpers.search_restaurants_via_agent(messages)
+
+                assert mock_post.call_args_list[0].kwargs["json"]["session_id"] is None
+                assert first["session_id"] and second["session_id"]
+                assert first["session_id"] != second["session_id"]
+                sessions = [c.kwargs["session_id"] for c in mock_agent.call_args_list]
+                assert sessions == [first["session_id"], second["session_id"]]
+
+
+class TestStreamingEndpoint:
+    """Tests para el endpoint SSE /api/reservation-requests/stream."""
+
+    def test_stream_emits_progress_and_final_events(self, mock_env_vars):
+        """Verifica que se emiten eventos de progreso y el evento final."""
+        async def fake_stream(messages, session_id=None):
+            yield {"type": "decision", "iteration": 1, "action": "maps_search", "args": {}}
+            yield {"type": "places", "places": [{"name": "La Trattoria", "rating": 4.5}]}
+            yield {
+                "type": "final",
+                "response": "He encontrado La Trattoria",
+                "messages": [],
+                "knowledge": {"places": [{"name": "La Trattoria", "rating": 4.5}]},
+            }
+
+        with patch.dict(os.environ, {
+            "OPENAI_API_KEY": "test-key",
+            "GOOGLE_MAPS_API_KEY": "test-key",
+            "TAVILY_API_KEY": "test-key",
+        }):
+            with patch("FastAPI.api_server.astream_agent", side_effect=fake_stream):
+                from FastAPI.api_server import app
+                client = TestClient(app)
+
+                response = client.post(
+                    "/api/reservation-requests/stream",
+                    json={
+                        "session_id": "test-123",
+                        "messages": [{"role": "user", "content": "Pizza en Madrid"}]
+                    }
+                )
+
+                assert response.status_code == 200
+                assert response.headers["content-type"].startswith("text/event-stream")
+                assert "event: decision" in response.text
+                assert "event: places" in response.text
+                assert "event: final" in response.text
+                assert "La Trattoria" in response.text
+
+    def test_stream_incremental_with_unknown_session(self, mock_env_vars):
+        """Verifica que el stream pide el historial completo si la sesión caducó."""
+        with patch.dict(os.environ, {
+            "OPENAI_API_KEY": "test-key",
+            "GOOGLE_MAPS_API_KEY": "test-key",
+            "TAVILY_API_KEY": "test-key",
+        }):
+            with patch("FastAPI.api_server.astream_agent") as mock_stream:
+                from FastAPI.api_server import app
+                client = TestClient(app)
+
+                response = client.post(
+                    "/api/reservation-requests/stream",
+                    json={
+                        "session_id": "sesion-caducada",
+                        "incremental": True,
+                        "messages": [{"role": "user", "content": "Reserva la primera"}]
+                    }
+                )
+
+                assert "session_expired" in response.text
+                mock_stream.assert_not_called()
+
+
+class TestMetricsEndpoints:
+    """Tests para los endpoints de métricas."""
+
+    def test_cache_metrics(self, api_client):
+        """Verifica que se exponen las estadísticas de las cachés."""
+        from backend.cache import get_cache
+
+        get_cache("geocode").get("madrid")
+
+        response = api_client.get("/api/metrics/cache")
+
+        assert response.status_code == 200
+        assert response.json()["geocode"]["misses"] == 1
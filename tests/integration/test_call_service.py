@@ -381,6 +381,235 @@ class TestTwilioWebhooks:
         assert response.status_code == 200
 
 
+    def test_twilio_status_ignores_archived_call(self, flask_client):
+        """Verifica que un webhook tardío no modifica una llamada ya archivada."""
+        from backend.call_service import calls_db
+
+        calls_db["test123"].update(status="completed", created_at=datetime.now().isoformat())
+        calls_db.mark_finished("test123")
+        del calls_db["test123"]
+
+        response = flask_client.post("/twilio-status/test123", data={"CallStatus": "failed"})
+
+        assert response.status_code == 200
+        assert calls_db["test123"]["status"] == "completed"
+        assert flask_client.get("/call-status/test123").get_json()["status"] == "completed"
+
+class TestCallWait:
+    """Tests para el long-poll /call-wait."""
+
+    @pytest.fixture
+    def flask_client(self, mock_env_vars):
+        """Cliente de test Flask con una llamada en curso."""
+        with patch("backend.call_service._load_prompt_from_file") as mock_load:
+            mock_load.return_value = ""
+
+            from backend.call_service import app, call_done_events, calls_db
+            app.config["TESTING"] = True
+
+            calls_db["wait123"] = {
+                "id": "wait123",
+                "status": "in_progress",
+                "mission": "Test",
+                "transcript": [],
+                "result": None,
+                "start_time": datetime.now(),
+                "created_at": datetime.now().isoformat(),
+            }
+            call_done_events.pop("wait123", None)
+
+            with app.test_client() as client:
+                yield client
+
+    def test_call_wait_times_out_while_in_progress(self, flask_client):
+        """Verifica que devuelve el estado actual al agotar el timeout."""
+        response = flask_client.get("/call-wait/wait123?timeout=0")
+
+        assert response.status_code == 200
+        assert response.get_json()["status"] == "in_progress"
+
+    def test_call_wait_returns_when_call_finishes(self, flask_client):
+        """Verifica que el webhook de Twilio despierta al long-poll."""
+        import threading
+        import time
+
+        from backend.call_service import app
+
+        def finish():
+            time.sleep(0.2)
+            app.test_client().post("/twilio-status/wait123", data={"CallStatus": "no-answer"})
+
+        threading.Thread(target=finish).start()
+        started = time.time()
+        response = flask_client.get("/call-wait/wait123?timeout=10")
+
+        assert time.time() - started < 5
+        assert response.get_json()["status"] == "failed"
+        assert response.get_json()["result"]["outcome"] == "No contestaron"
+
+    def test_call_wait_not_found(self, flask_client):
+        """Verifica error para call_id inexistente."""
+        assert flask_client.get("/call-wait/nonexistent123").status_code == 404
+
+
+class TestStreamedReplies:
+    """Tests para las respuestas del LLM en streaming por ConversationRelay."""
+
+    def _delta(self, text):
+        return Mock(choices=[Mock(delta=Mock(content=text))])
+
+    def _session(self, call_id):
+        from backend.call_service import calls_db, conversation_sessions
+
+        calls_db[call_id] = {"id": call_id, "mission": "Test", "transcript": []}
+        conversation_sessions[call_id] = {"messages": [], "turn_count": 0}
+
+    def test_sentence_chunks(self, mock_env_vars):
+        """Verifica el corte por frases (las comas solo en fragmentos largos)."""
+        from backend.call_service import _sentence_chunks
+
+        tokens = ["Hola", ",", " buenas", " tardes.", " Querría", " una mesa", " para dos,", " a las", " nueve"]
+
+        assert list(_sentence_chunks(iter(tokens))) == [
+            "Hola, buenas tardes. ",
+            "Querría una mesa para dos, ",
+            "a las nueve",
+        ]
+
+    @patch("backend.call_service.STREAM_LLM_REPLIES", True)
+    @patch("backend.call_service.openai_client")
+    def test_prompt_streams_partial_text(self, mock_openai, mock_env_vars):
+        """Verifica que se envían frases con last=False y un cierre con last=True."""
+        from backend.call_service import _handle_prompt, calls_db, voice_turn_stats
+
+        mock_openai.chat.completions.create.return_value = iter(
+            [self._delta(t) for t in ["Perfecto.", " Mesa para dos", " a las nueve."]]
+        )
+        ws = Mock()
+        self._session("stream1")
+
+        _handle_prompt(ws, "stream1", {"voicePrompt": "¿Para cuántos?"})
+
+        sent = [json.loads(c.args[0]) for c in ws.send.call_args_list]
+        assert [m["last"] for m in sent] == [False, False, True]
+        assert sent[0]["token"] == "Perfecto. "
+        assert mock_openai.chat.completions.create.call_args.kwargs["stream"] is True
+        assert calls_db["stream1"]["transcript"][-1]["message"] == "Perfecto. Mesa para dos a las nueve."
+        assert voice_turn_stats["stream"]["turns"] >= 1
+
+    @patch("backend.call_service.STREAM_LLM_REPLIES", False)
+    @patch("backend.call_service.openai_client")
+    def test_prompt_without_streaming(self, mock_openai, mock_env_vars):
+        """Verifica STREAM_LLM_REPLIES=false: un único mensaje con last=True."""
+        from backend.call_service import _handle_prompt
+
+        mock_openai.chat.completions.create.return_value = Mock(
+            choices=[Mock(message=Mock(content="Perfecto, gracias."))]
+        )
+        ws = Mock()
+        self._session("full1")
+
+        _handle_prompt(ws, "full1", {"voicePrompt": "Vale"})
+
+        ws.send.assert_called_once()
+        assert json.loads(ws.send.call_args.args[0]) == {
+            "type": "text", "token": "Perfecto, gracias.", "last": True
+        }
+
+
+class TestInterrupts:
+    """Tests para la cancelación de turnos al recibir un interrupt."""
+
+    def _session(self, call_id):
+        from backend.call_service import calls_db, conversation_sessions
+
+        calls_db[call_id] = {"id": call_id, "mission": "Test", "transcript": []}
+        conversation_sessions[call_id] = {"messages": [], "turn_count": 0}
+
+    @patch("backend.call_service.STREAM_LLM_REPLIES", True)
+    @patch("backend.call_service.openai_client")
+    def test_cancel_mid_stream_stops_sending(self, mock_openai, mock_env_vars):
+        """Verifica que tras cancelar no se envía nada más y se cierra el stream."""
+        from backend.call_service import VoiceTurn, _handle_prompt, calls_db
+
+        ws = Mock()
+        turn = VoiceTurn(ws)
+
+        class FakeStream:
+            closed = False
+
+            def __iter__(self):
+                yield Mock(choices=[Mock(delta=Mock(content="Claro, sin problema. "))])
+                turn.cancel()  # llega el interrupt mientras se genera
+                yield Mock(choices=[Mock(delta=Mock(content="¿A qué hora le viene bien?"))])
+
+            def close(self):
+                FakeStream.closed = True
+
+        mock_openai.chat.completions.create.return_value = FakeStream()
+        self._session("int1")
+
+        _handle_prompt(ws, "int1", {"voicePrompt": "Quería una mesa"}, turn)
+
+        sent = [json.loads(c.args[0]) for c in ws.send.call_args_list]
+        assert sent == [{"type": "text", "token": "Claro, sin problema. ", "last": False}]
+        assert FakeStream.closed
+        assert calls_db["int1"]["transcript"][-1]["message"] == "Claro, sin problema."
+
+    @patch("backend.call_service.openai_client")
+    def test_turns_skip_calls_out_of_memory(self, mock_openai, mock_env_vars):
+        """Verifica que turnos e interrupts no escriben en una llamada ya archivada."""
+        from backend.call_service import _handle_interrupt, _handle_prompt, calls_db
+
+        self._session("gone1")
+        calls_db["gone1"].update(status="completed", transcript=[{"speaker": "self", "message": "Hola"}])
+        calls_db.mark_finished("gone1")
+        del calls_db["gone1"]
+        ws = Mock()
+
+        _handle_prompt(ws, "gone1", {"voicePrompt": "¿Sigue ahí?"})
+        _handle_interrupt("gone1", {"utteranceUntilInterrupt": ""})
+
+        ws.send.assert_not_called()
+        mock_openai.chat.completions.create.assert_not_called()
+        assert calls_db["gone1"]["transcript"] == [{"speaker": "self", "message": "Hola"}]
+
+    def test_interrupt_truncates_last_reply(self, mock_env_vars):
+        """Verifica que historial y transcripción quedan con lo que sonó."""
+        from backend.call_service import _handle_interrupt, calls_db, conversation_sessions
+
+        self._session("int2")
+        conversation_sessions["int2"]["messages"] = [
+            {"role": "user", "content": "Dígame"},
+            {"role": "assistant", "content": "Quería reservar para dos a las nueve."},
+        ]
+        calls_db["int2"]["transcript"] = [
+            {"speaker": "self", "message": "Quería reservar para dos a las nueve."}
+        ]
+
+        _handle_interrupt("int2", {"type": "interrupt", "utteranceUntilInterrupt": "Quería reservar"})
+
+        assert conversation_sessions["int2"]["messages"][-1]["content"] == "Quería reservar"
+        assert calls_db["int2"]["transcript"][-1]["message"] == "Quería reservar"
+        assert calls_db["int2"]["transcript"][-1]["interrupted"] is True
+
+    def test_interrupt_before_any_audio_drops_reply(self, mock_env_vars):
+        """Verifica que una respuesta que no llegó a sonar se descarta."""
+        from backend.call_service import _handle_interrupt, calls_db, conversation_sessions
+
+        self._session("int3")
+        conversation_sessions["int3"]["messages"] = [
+            {"role": "user", "content": "Dígame"},
+            {"role": "assistant", "content": "Hola"},
+        ]
+        calls_db["int3"]["transcript"] = [{"speaker": "self", "message": "Hola"}]
+
+        _handle_interrupt("int3", {"utteranceUntilInterrupt": ""})
+
+        assert conversation_sessions["int3"]["messages"][-1]["role"] == "user"
+        assert calls_db["int3"]["transcript"] == []
+
+
 class TestVoiceWebhook:
     """Tests para el webhook de voz."""
 
@@ -0,0 +1,223 @@
+"""
+===========================================================
+TEST CALL SERVICE ASYNC - Tests para backend/call_service_async.py
+===========================================================
+
+Tests de integración del servicio de llamadas sobre asyncio (FastAPI).
+"""
+
+import json
+import time
+from datetime import datetime
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+
+class _FakeStream:
+    """Stream async de OpenAI con los deltas indicados."""
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.closed = False
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for token in self.tokens:
+            yield Mock(choices=[Mock(delta=Mock(content=token))])
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def async_client(mock_env_vars):
+    """Cliente de test FastAPI (un único event loop para toda la prueba)."""
+    from fastapi.testclient import TestClient
+
+    from backend.call_service_async import app, call_done_events, calls_db, conversation_sessions
+
+    calls_db.clear()
+    call_done_events.clear()
+    conversation_sessions.clear()
+
+    with TestClient(app) as client:
+        yield client
+
+    calls_db.clear()
+    call_done_events.clear()
+
+
+def _add_call(call_id, status="in_progress"):
+    from backend.call_service_async import calls_db
+
+    calls_db[call_id] = {
+        "id": call_id,
+        "status": status,
+        "mission": "Reservar mesa",
+        "script": "Eres un asistente.",
+        "transcript": [],
+        "result": None,
+        "start_time": datetime.now(),
+        "created_at": datetime.now().isoformat(),
+    }
+
+
+class TestAsyncEndpoints:
+    """Tests de los endpoints REST."""
+
+    def test_health_check(self, async_client):
+        """Verifica el health check con los límites configurados."""
+        data = async_client.get("/").json()
+
+        assert data["status"] == "running"
+        assert data["active_calls"] == 0
+        assert "voice_turns" in data
+
+    def test_start_call_validation(self, async_client):
+        """Verifica los errores de validación (mismo contrato que Flask)."""
+        assert async_client.post("/start-call", json={}).status_code == 400
+        assert async_client.post("/start-call", json={"mission": "Test"}).status_code == 400
+        assert async_client.post("/start-call", json={"phone_number": "+34600"}).status_code == 400
+
+    @patch("backend.call_service_async._make_call", new_callable=AsyncMock)
+    @patch("backend.call_service._load_prompt_from_file", return_value="{mission}")
+    def test_start_call_success(self, mock_load, mock_make_call, async_client):
+        """Verifica que se registra la llamada y se lanza en segundo plano."""
+        response = async_client.post(
+            "/start-call",
+            json={
+                "phone_number": "+34600000000",
+                "mission": "Reservar mesa",
+                "persona_name": "Ana",
+                "persona_phone": "612345678",
+            },
+        )
+
+        assert response.status_code == 200
+        call_id = response.json()["call_id"]
+        assert async_client.get(f"/call-status/{call_id}").json()["status"] == "initiating"
+        mock_make_call.assert_awaited_once_with(call_id, "+34600000000")
+
+    @patch("backend.call_service_async.CALL_SERVICE_MAX_CALLS", 1)
+    def test_start_call_rejects_when_full(self, async_client):
+        """Verifica el 503 al llegar al máximo de llamadas activas."""
+        _add_call("busy1")
+
+        response = async_client.post(
+            "/start-call", json={"phone_number": "+34600000000", "mission": "Test"}
+        )
+
+        assert response.status_code == 503
+
+    def test_voice_webhook_returns_twiml(self, async_client):
+        """Verifica el TwiML de ConversationRelay."""
+        response = async_client.post("/voice/abc123")
+
+        assert response.headers["content-type"].startswith("application/xml")
+        assert "/conversation-ws/abc123" in response.text
+
+
+class TestAsyncLifecycle:
+    """Tests del lifespan y las tareas en segundo plano."""
+
+    def test_lifespan_owns_openai_client(self, mock_env_vars):
+        """Verifica que el cliente OpenAI se crea en el arranque y se cierra al parar."""
+        from fastapi.testclient import TestClient
+
+        from backend.call_service_async import _openai_client, app
+
+        with TestClient(app):
+            client = app.state.openai_client
+            assert client is not None and _openai_client() is client
+            assert not client._client.is_closed
+
+        assert app.state.openai_client is None
+        assert client._client.is_closed
+
+    @patch("backend.call_service_async.analyze_call_result", new_callable=AsyncMock)
+    def test_finalize_call_logs_errors_instead_of_raising(self, mock_analyze, mock_env_vars):
+        """Verifica que un fallo al analizar marca la llamada como fallida sin propagarse."""
+        import asyncio
+
+        from backend.call_service_async import _finalize_call, calls_db
+
+        mock_analyze.side_effect = RuntimeError("boom")
+        _add_call("fin1")
+        try:
+            asyncio.run(_finalize_call("fin1"))
+
+            assert calls_db["fin1"]["status"] == "failed"
+            assert calls_db["fin1"]["result"]["mission_completed"] is False
+        finally:
+            calls_db.clear()
+
+
+class TestAsyncCallWait:
+    """Tests del long-poll /call-wait sobre asyncio.Event."""
+
+    def test_call_wait_times_out_while_in_progress(self, async_client):
+        """Verifica que devuelve el estado actual al agotar el timeout."""
+        _add_call("wait1")
+
+        response = async_client.get("/call-wait/wait1?timeout=0.1")
+
+        assert response.json()["status"] == "in_progress"
+
+    @patch("backend.call_service_async.analyze_call_result", new_callable=AsyncMock)
+    def test_twilio_status_wakes_call_wait(self, mock_analyze, async_client):
+        """Verifica que el webhook de fin de llamada despierta al long-poll."""
+        mock_analyze.return_value = {"mission_completed": True, "outcome": "Reservado", "notes": []}
+        _add_call("wait2")
+
+        async_client.post("/twilio-status/wait2", data={"CallStatus": "completed"})
+        started = time.time()
+        response = async_client.get("/call-wait/wait2?timeout=10")
+
+        assert time.time() - started < 5
+        assert response.json()["status"] == "completed"
+        assert response.json()["result"]["outcome"] == "Reservado"
+
+    def test_call_wait_not_found(self, async_client):
+        """Verifica error para call_id inexistente."""
+        assert async_client.get("/call-wait/nonexistent").status_code == 404
+
+
+class TestAsyncConversation:
+    """Tests del websocket de ConversationRelay."""
+
+    @patch("backend.call_service.STREAM_LLM_REPLIES", True)
+    @patch("backend.call_service_async._openai_client")
+    def test_prompt_streams_sentences(self, mock_client, async_client):
+        """Verifica el envío por frases y el registro de la respuesta."""
+        from backend.call_service_async import calls_db
+
+        stream = _FakeStream(["Perfecto.", " Mesa para dos", " a las nueve."])
+        mock_client.return_value.chat.completions.create = AsyncMock(return_value=stream)
+        _add_call("ws1")
+
+        with async_client.websocket_connect("/conversation-ws/ws1") as ws:
+            ws.send_text(json.dumps({"type": "prompt", "voicePrompt": "¿Para cuántos?"}))
+            sent = [ws.receive_json() for _ in range(3)]
+
+        assert [m["last"] for m in sent] == [False, False, True]
+        assert sent[0]["token"] == "Perfecto. "
+        assert stream.closed
+        assert calls_db["ws1"]["transcript"][-1]["message"] == "Perfecto. Mesa para dos a las nueve."
+
+    @patch("backend.call_service.STREAM_LLM_REPLIES", False)
+    @patch("backend.call_service_async._openai_client")
+    def test_prompt_without_streaming(self, mock_client, async_client):
+        """Verifica STREAM_LLM_REPLIES=false: un único mensaje con last=True."""
+        mock_client.return_value.chat.completions.create = AsyncMock(
+            return_value=Mock(choices=[Mock(message=Mock(content="Perfecto, gracias."))])
+        )
+        _add_call("ws2")
+
+        with async_client.websocket_connect("/conversation-ws/ws2") as ws:
+            ws.send_text(json.dumps({"type": "prompt", "voicePrompt": "Vale"}))
+            message = ws.receive_json()
+
+        assert message == {"type": "text", "token": "Perfecto, gracias.", "last": True}
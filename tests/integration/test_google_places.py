@@ -80,7 +80,7 @@ class TestIsLatLng:
 class TestGeocodeLocation:
     """Tests para geocode_location."""
 
-    @patch("backend.google_places.requests.get")
+    @patch("backend.google_places.http_client.get")
     def test_geocode_location_success(self, mock_get, mock_geocode_response):
         """Verifica geocodificación exitosa."""
         from backend.google_places import geocode_location
@@ -97,7 +97,7 @@ class TestGeocodeLocation:
         assert "40.4168" in result
         assert "-3.7038" in result
 
-    @patch("backend.google_places.requests.get")
+    @patch("backend.google_places.http_client.get")
     def test_geocode_location_no_results(self, mock_get):
         """Verifica manejo de sin resultados."""
         from backend.google_places import geocode_location
@@ -112,7 +112,7 @@ class TestGeocodeLocation:
 
         assert result is None
 
-    @patch("backend.google_places.requests.get")
+    @patch("backend.google_places.http_client.get")
     def test_geocode_location_handles_error(self, mock_get):
         """Verifica manejo de errores."""
         from backend.google_places import geocode_location
@@ -123,6 +123,71 @@ class TestGeocodeLocation:
 
         assert result is None
 
+    @patch("backend.google_places.http_client.get")
+    def test_geocode_location_uses_cache(self, mock_get, mock_geocode_response):
+        """Verifica que variantes de la misma ubicación no repiten la llamada."""
+        from backend.google_places import geocode_location
+
+        mock_get.return_value = Mock(
+            status_code=200,
+            json=Mock(return_value=mock_geocode_response),
+            raise_for_status=Mock()
+        )
+
+        first = geocode_location("Madrid centro")
+        second = geocode_location("  madrid   Centro ")
+
+        assert first == second
+        assert mock_get.call_count == 1
+
+    @patch("backend.google_places.http_client.get")
+    def test_geocode_location_cache_survives_restart(self, mock_get, mock_geocode_response):
+        """Verifica que la caché en disco sobrevive al reinicio de la memoria."""
+        from backend.google_places import geocode_location
+        from backend.cache import reset_caches, cache_stats
+
+        mock_get.return_value = Mock(
+            status_code=200,
+            json=Mock(return_value=mock_geocode_response),
+            raise_for_status=Mock()
+        )
+
+        geocode_location("Navalcarnero")
+        reset_caches()  # simula un reinicio del proceso
+        result = geocode_location("Navalcarnero")
+
+        assert "40.4168" in result
+        assert mock_get.call_count == 1
+        assert cache_stats()["geocode"]["disk_hits"] == 1
+
+    @patch("backend.google_places.http_client.get")
+    def test_geocode_location_failures_not_cached(self, mock_get):
+        """Verifica que los errores no se cachean."""
+        from backend.google_places import geocode_location
+
+        mock_get.side_effect = Exception("Error de conexión")
+
+        geocode_location("Madrid")
+        geocode_location("Madrid")
+
+        assert mock_get.call_count == 2
+
+
+class TestNormalizeLocationKey:
+    """Tests para normalize_location_key."""
+
+    def test_normalizes_case_accents_and_spaces(self):
+        """Verifica minúsculas, acentos y espacios."""
+        from backend.google_places import normalize_location_key
+
+        assert normalize_location_key("  Móstoles   Centro. ") == "mostoles centro"
+
+    def test_normalizes_commas(self):
+        """Verifica que las comas se normalizan."""
+        from backend.google_places import normalize_location_key
+
+        assert normalize_location_key("Gran Vía ,Madrid") == "gran via, madrid"
+
 
 class TestExtractNeighborhood:
     """Tests para extract_neighborhood."""
@@ -217,7 +282,7 @@ class TestNormalizePlaceDetails:
 class TestFilterByTravelTime:
     """Tests para filter_by_travel_time."""
 
-    @patch("backend.google_places.requests.get")
+    @patch("backend.google_places.http_client.get")
     def test_filter_by_travel_time(self, mock_get):
         """Verifica filtrado por tiempo de viaje."""
         from backend.google_places import filter_by_travel_time
@@ -238,7 +303,7 @@ class TestFilterByTravelTime:
 
         result = filter_by_travel_time(
             origin="40.4168,-3.7038",
-            destinations=["40.42,-3.71", "40.43,-3.72", "40.44,-3.73"],
+            destinations=["40.42,-3.71", "40.419,-3.708", "40.421,-3.704"],
             max_time=15,  # 15 minutos
             mode="walking"
         )
@@ -261,7 +326,7 @@ class TestFilterByTravelTime:
 class TestPlacesTextSearch:
     """Tests para places_text_search."""
 
-    @patch("backend.google_places.requests.post")
+    @patch("backend.google_places.http_client.post")
     @patch("backend.google_places.geocode_location")
     def test_places_text_search_success(self, mock_geocode, mock_post, mock_places_response):
         """Verifica búsqueda exitosa."""
@@ -285,7 +350,7 @@ class TestPlacesTextSearch:
         assert len(result) > 0
         assert result[0]["name"] == "Restaurante El Buen Sabor"
 
-    @patch("backend.google_places.requests.post")
+    @patch("backend.google_places.http_client.post")
     def test_places_text_search_with_coordinates(self, mock_post, mock_places_response):
         """Verifica búsqueda con coordenadas directas."""
         from backend.google_places import places_text_search, PlaceSearchPayload
@@ -305,7 +370,7 @@ class TestPlacesTextSearch:
 
         assert isinstance(result, list)
 
-    @patch("backend.google_places.requests.post")
+    @patch("backend.google_places.http_client.post")
     @patch("backend.google_places.geocode_location")
     def test_places_text_search_no_results(self, mock_geocode, mock_post):
         """Verifica búsqueda sin resultados."""
@@ -344,7 +409,7 @@ class TestPlacesTextSearch:
 
         assert "geocodificar" in str(exc_info.value)
 
-    @patch("backend.google_places.requests.post")
+    @patch("backend.google_places.http_client.post")
     @patch("backend.google_places.filter_by_travel_time")
     @patch("backend.google_places.geocode_location")
     def test_places_text_search_with_travel_filter(
@@ -373,6 +438,240 @@ class TestPlacesTextSearch:
         mock_filter.assert_called_once()
 
 
+class TestPlacesSearchCache:
+    """Tests para la caché stale-while-revalidate de Text Search."""
+
+    def _mock_post(self, mock_post, response):
+        mock_post.return_value = Mock(
+            status_code=200,
+            json=Mock(return_value=response),
+            raise_for_status=Mock()
+        )
+
+    @patch("backend.google_places.http_client.post")
+    def test_repeated_search_uses_cache(self, mock_post, mock_places_response):
+        """Verifica que la misma búsqueda no repite la llamada a la API."""
+        from backend.google_places import places_text_search, PlaceSearchPayload
+
+        self._mock_post(mock_post, mock_places_response)
+
+        places_text_search(PlaceSearchPayload(query="Restaurante", location="40.4168,-3.7038"))
+        result = places_text_search(
+            PlaceSearchPayload(query="  restaurante ", location="40.41681,-3.70379")
+        )
+
+        assert mock_post.call_count == 1
+        assert result[0]["name"] == "Restaurante El Buen Sabor"
+
+    @patch("backend.google_places.http_client.post")
+    def test_different_price_level_is_not_shared(self, mock_post, mock_places_response):
+        """Verifica que el filtro de precio forma parte de la clave."""
+        from backend.google_places import places_text_search, PlaceSearchPayload
+
+        self._mock_post(mock_post, mock_places_response)
+
+        places_text_search(PlaceSearchPayload(query="pizza", location="40.4168,-3.7038"))
+        places_text_search(
+            PlaceSearchPayload(query="pizza", location="40.4168,-3.7038", price_level=2)
+        )
+
+        assert mock_post.call_count == 2
+
+    @patch("backend.google_places.http_client.post")
+    def test_stale_entry_served_and_refreshed(self, mock_post, mock_places_response):
+        """Verifica que una entrada caducada se sirve y se refresca en segundo plano."""
+        import backend.google_places as gp
+        from backend.cache import cache_stats
+
+        self._mock_post(mock_post, mock_places_response)
+        payload = gp.PlaceSearchPayload(query="pizza", location="40.4168,-3.7038")
+
+        with patch("backend.google_places.time.time", return_value=1000.0):
+            gp.places_text_search(payload)
+
+        refreshed = {"places": []}
+        self._mock_post(mock_post, refreshed)
+        sync_executor = Mock()
+        sync_executor.submit.side_effect = lambda fn, *args: fn(*args)
+
+        with patch.object(gp, "_refresh_executor", sync_executor), \
+                patch("backend.google_places.time.time",
+                      return_value=1000.0 + gp.PLACES_CACHE_TTL + 1):
+            stale = gp.places_text_search(payload)
+            fresh = gp.places_text_search(payload)
+
+        # Se sirvió el resultado antiguo y la caché ya tiene el nuevo
+        assert stale[0]["name"] == "Restaurante El Buen Sabor"
+        assert fresh == []
+        assert cache_stats()["places_search"]["stale_served"] == 1
+        assert cache_stats()["places_search"]["refreshes"] == 1
+
+
+    @patch("backend.google_places.PLACE_CATALOG_ENABLED", False)
+    @patch("backend.google_places.http_client.post")
+    def test_near_duplicate_query_reuses_cache(self, mock_post, mock_places_response):
+        """Verifica que una variante (acentos, plural, preposición) reutiliza la caché."""
+        from backend.cache import cache_stats
+        from backend.google_places import places_text_search, PlaceSearchPayload
+
+        self._mock_post(mock_post, mock_places_response)
+
+        places_text_search(PlaceSearchPayload(query="pizzerias en madrid", location="40.4168,-3.7038"))
+        result = places_text_search(PlaceSearchPayload(query="Pizzería Madrid", location="40.4168,-3.7038"))
+
+        assert mock_post.call_count == 1
+        assert result[0]["name"] == "Restaurante El Buen Sabor"
+        assert cache_stats()["places_search"]["similar_hits"] == 1
+
+    @patch("backend.google_places.PLACE_CATALOG_ENABLED", False)
+    @patch("backend.google_places.http_client.post")
+    def test_negation_is_not_a_near_duplicate(self, mock_post, mock_places_response):
+        """Verifica que "sin gluten" no reutiliza "con gluten"."""
+        from backend.google_places import places_text_search, PlaceSearchPayload
+
+        self._mock_post(mock_post, mock_places_response)
+
+        places_text_search(PlaceSearchPayload(query="pizza con gluten", location="40.4168,-3.7038"))
+        places_text_search(PlaceSearchPayload(query="pizza sin gluten", location="40.4168,-3.7038"))
+
+        assert mock_post.call_count == 2
+
+class TestPlaceCatalogIntegration:
+    """Tests del catálogo local dentro de places_text_search."""
+
+    @patch("backend.google_places.http_client.post")
+    def test_nearby_repeat_search_uses_catalog(self, mock_post, mock_places_response):
+        """Verifica que una búsqueda en una zona ya cubierta no llama a Google."""
+        from backend.google_places import places_text_search, PlaceSearchPayload
+        from backend.cache import cache_stats
+
+        mock_post.return_value = Mock(
+            status_code=200,
+            json=Mock(return_value=mock_places_response),
+            raise_for_status=Mock()
+        )
+
+        places_text_search(
+            PlaceSearchPayload(query="restaurante", location="40.4168,-3.7038", radius=3000)
+        )
+        result = places_text_search(
+            PlaceSearchPayload(query="Restaurante", location="40.4175,-3.7030", radius=1000)
+        )
+
+        assert mock_post.call_count == 1
+        assert result[0]["name"] == "Restaurante El Buen Sabor"
+        assert cache_stats()["places_search"]["catalog_hits"] == 1
+
+    @patch("backend.google_places.http_client.post")
+    def test_variant_query_uses_text_search(self, mock_post):
+        """Verifica que una variante de la query en zona cubierta no llama a Google."""
+        from backend.google_places import places_text_search, PlaceSearchPayload
+
+        places = [
+            {
+                "id": f"pz{i}",
+                "displayName": {"text": f"Pizzería {name}"},
+                "formattedAddress": "Calle Mayor, Navalcarnero",
+                "location": {"latitude": 40.2870 + i * 0.001, "longitude": -4.0145},
+                "types": ["pizza_restaurant", "restaurant"],
+            }
+            for i, name in enumerate(["Roma", "Nápoles", "Milano"])
+        ]
+        mock_post.return_value = Mock(
+            status_code=200,
+            json=Mock(return_value={"places": places}),
+            raise_for_status=Mock()
+        )
+
+        places_text_search(
+            PlaceSearchPayload(query="pizzería", location="40.2870,-4.0145", radius=3000)
+        )
+        result = places_text_search(
+            PlaceSearchPayload(query="pizzerías en", location="40.2875,-4.0145", radius=1500)
+        )
+
+        assert mock_post.call_count == 1
+        assert {p["place_id"] for p in result} == {"pz0", "pz1", "pz2"}
+
+    @patch("backend.google_places.http_client.post")
+    def test_other_query_does_not_cover_the_zone(self, mock_post):
+        """Verifica que buscar "sushi" no da por cubierta la zona para "pizza"."""
+        from backend.google_places import places_text_search, PlaceSearchPayload
+
+        places = [
+            {
+                "id": f"pz{i}",
+                "displayName": {"text": f"Pizzería Sushi {i}"},
+                "formattedAddress": "Calle Mayor, Navalcarnero",
+                "location": {"latitude": 40.2870 + i * 0.001, "longitude": -4.0145},
+                "types": ["pizza_restaurant", "restaurant"],
+            }
+            for i in range(3)
+        ]
+        mock_post.return_value = Mock(
+            status_code=200,
+            json=Mock(return_value={"places": places}),
+            raise_for_status=Mock()
+        )
+
+        places_text_search(
+            PlaceSearchPayload(query="sushi", location="40.2870,-4.0145", radius=3000)
+        )
+        places_text_search(
+            PlaceSearchPayload(query="pizza", location="40.2875,-4.0145", radius=1500)
+        )
+
+        assert mock_post.call_count == 2
+
+    @patch("backend.google_places._refresh_executor")
+    @patch("backend.google_places.http_client.post")
+    def test_stale_catalog_places_are_refreshed(self, mock_post, mock_executor, mock_places_response):
+        """Verifica que una búsqueda con lugares antiguos se repite una sola vez."""
+        from backend.google_places import places_text_search, PlaceSearchPayload, _refresh_entry
+
+        mock_post.return_value = Mock(
+            status_code=200,
+            json=Mock(return_value=mock_places_response),
+            raise_for_status=Mock()
+        )
+
+        places_text_search(
+            PlaceSearchPayload(query="restaurante", location="40.4168,-3.7038", radius=3000)
+        )
+        with patch("backend.google_places.PLACE_REFRESH_AGE", -1):
+            for _ in range(2):
+                places_text_search(
+                    PlaceSearchPayload(query="restaurante", location="40.4175,-3.7030", radius=1000)
+                )
+
+        # Una búsqueda de texto en segundo plano, ningún Place Details por lugar
+        assert mock_post.call_count == 1
+        mock_executor.submit.assert_called_once()
+        assert mock_executor.submit.call_args.args[0] is _refresh_entry
+        assert mock_executor.submit.call_args.args[4]["textQuery"] == "restaurante"
+
+    @patch("backend.google_places.PLACE_CATALOG_ENABLED", False)
+    @patch("backend.google_places.http_client.post")
+    def test_catalog_can_be_disabled(self, mock_post, mock_places_response):
+        """Verifica PLACE_CATALOG_ENABLED=false."""
+        from backend.google_places import places_text_search, PlaceSearchPayload
+
+        mock_post.return_value = Mock(
+            status_code=200,
+            json=Mock(return_value=mock_places_response),
+            raise_for_status=Mock()
+        )
+
+        places_text_search(
+            PlaceSearchPayload(query="restaurante", location="40.4168,-3.7038", radius=3000)
+        )
+        places_text_search(
+            PlaceSearchPayload(query="restaurante", location="40.4175,-3.7030", radius=1000)
+        )
+
+        assert mock_post.call_count == 2
+
+
 class TestGetPhotoUrl:
     """Tests para get_photo_url."""
 
@@ -400,6 +699,23 @@ class TestGetPhotoUrl:
         assert "maxWidthPx=800" in result
         assert "maxHeightPx=600" in result
 
+    def test_get_photo_url_via_proxy(self):
+        """Verifica la URL del proxy con tamaño y formato de miniatura."""
+        from backend.google_places import get_photo_url
+
+        photo_name = "places/ChIJ123/photos/photo456"
+
+        result = get_photo_url(
+            photo_name, max_width=320, max_height=200,
+            image_format="webp", proxy_base_url="http://localhost:8000/",
+        )
+
+        assert result == (
+            "http://localhost:8000/api/photo/places/ChIJ123/photos/photo456"
+            "?w=320&h=200&format=webp"
+        )
+        assert "key=" not in result
+
     def test_get_photo_url_returns_none_for_empty(self):
         """Verifica retorno None para nombre vacío."""
         from backend.google_places import get_photo_url
@@ -8,7 +8,8 @@ Tests unitarios para el grafo del agente ReAct.
 
 import pytest
 import json
-from unittest.mock import Mock, patch, MagicMock
+import asyncio
+from unittest.mock import Mock, patch, MagicMock, AsyncMock
 from langchain_core.messages import HumanMessage, AIMessage
 
 
@@ -404,6 +405,210 @@ class TestBrainNode:
         assert result["status"] == "responding"
 
 
+class TestToolsBrainMode:
+    """Tests para el modo tools del brain (tool-calling nativo)."""
+
+    def test_parse_tool_calls_extracts_action(self):
+        """Verifica que la decisión se toma de tool_calls."""
+        from agent.graph import parse_tool_calls
+
+        response = AIMessage(
+            content="",
+            tool_calls=[{"name": "maps_search", "args": {"query": "pizza", "location": "Madrid"}, "id": "call_1"}],
+        )
+
+        result = parse_tool_calls(response)
+
+        assert result["action"] == "maps_search"
+        assert result["action_input"] == {"query": "pizza", "location": "Madrid"}
+
+    def test_parse_tool_calls_without_calls_responds(self):
+        """Verifica que sin tool_calls el texto se usa como respuesta."""
+        from agent.graph import parse_tool_calls
+
+        result = parse_tool_calls(AIMessage(content="¿Para cuántas personas?"))
+
+        assert result["action"] == "respond"
+        assert result["action_input"]["message"] == "¿Para cuántas personas?"
+
+    def test_invalid_tool_calls_go_back_to_the_brain(self):
+        """Verifica que un JSON de argumentos roto no acaba en una respuesta vacía."""
+        from agent.graph import _apply_decision, parse_tool_calls, should_continue
+
+        response = AIMessage(
+            content="",
+            invalid_tool_calls=[
+                {"name": "maps_search", "args": '{"query": "pizza",', "id": "call_1", "error": "JSON"}
+            ],
+        )
+
+        parsed = parse_tool_calls(response)
+        state = _apply_decision({"iterations": 0, "knowledge": {}}, parsed)
+
+        assert parsed["action"] is None and "maps_search" in parsed["error"]
+        assert state["status"] == "thinking" and state["iterations"] == 1
+        assert "ERROR" in state["last_observation"]
+        assert should_continue(state) == "brain"
+
+    def test_empty_response_is_not_sent(self):
+        """Verifica que una respuesta sin texto ni tool_calls no se envía al usuario."""
+        from agent.graph import parse_tool_calls
+
+        result = parse_tool_calls(AIMessage(content=""))
+
+        assert result["action"] is None and result["error"].startswith("ERROR")
+
+    @patch("agent.graph.get_llm")
+    def test_brain_node_uses_bound_tools(self, mock_get_llm, mock_config):
+        """Verifica que en modo tools se enlazan las herramientas y respond."""
+        import agent.graph as graph_module
+
+        bound_llm = Mock()
+        bound_llm.invoke.return_value = AIMessage(
+            content="",
+            tool_calls=[{"name": "respond", "args": {"message": "¡Hola!"}, "id": "call_1"}],
+        )
+        mock_llm = Mock()
+        mock_llm.bind_tools.return_value = bound_llm
+        mock_get_llm.return_value = mock_llm
+
+        state = {
+            "messages": [HumanMessage(content="Hola")],
+            "knowledge": {},
+            "last_observation": None,
+            "status": "thinking",
+            "iterations": 0,
+        }
+
+        with patch.object(graph_module, "BRAIN_MODE", "tools"), \
+                patch.object(graph_module, "_bound_llm", None), \
+                patch("agent.graph.config", mock_config):
+            result = graph_module.brain_node(state)
+
+        tool_names = [
+            t["function"]["name"] if isinstance(t, dict) else t.name
+            for t in mock_llm.bind_tools.call_args[0][0]
+        ]
+        assert "maps_search" in tool_names
+        assert "respond" in tool_names
+        mock_llm.invoke.assert_not_called()
+        assert result["next_tool"] == "respond"
+        assert result["tool_args"] == {"message": "¡Hola!"}
+        assert result["status"] == "responding"
+
+
+class TestMultipleActions:
+    """Tests para varias acciones independientes por iteración."""
+
+    def test_parse_actions_list(self):
+        """Verifica el parseo de ACTIONS con varias herramientas."""
+        from agent.graph import parse_llm_response
+
+        text = """THOUGHT: Busco en Maps y reseñas a la vez
+ACTIONS: [{"action": "maps_search", "action_input": {"query": "pizzería", "location": "Navalcarnero"}}, {"action": "web_search", "action_input": {"query": "reseñas pizzerías Navalcarnero"}}]"""
+
+        result = parse_llm_response(text)
+
+        assert result["action"] == "maps_search"
+        assert [a["tool"] for a in result["actions"]] == ["maps_search", "web_search"]
+        assert result["actions"][1]["args"] == {"query": "reseñas pizzerías Navalcarnero"}
+
+    def test_apply_decision_drops_respond_with_tools(self):
+        """Verifica que respond se descarta si viene junto a herramientas."""
+        from agent.graph import _apply_decision
+
+        parsed = {
+            "thought": "",
+            "action": "web_search",
+            "action_input": {"query": "a"},
+            "actions": [
+                {"tool": "web_search", "args": {"query": "a"}},
+                {"tool": "respond", "args": {"message": "hola"}},
+                {"tool": "maps_search", "args": {"query": "b", "location": "Madrid"}},
+            ],
+        }
+
+        result = _apply_decision({"iterations": 0}, parsed)
+
+        assert [a["tool"] for a in result["pending_actions"]] == ["web_search", "maps_search"]
+        assert result["status"] == "executing"
+
+    @patch("agent.tools.get_search_results")
+    @patch("agent.graph.execute_tool")
+    def test_execute_node_runs_all_actions(self, mock_execute_tool, mock_get_results):
+        """Verifica que se ejecutan todas las acciones y se combinan."""
+        from agent.graph import execute_node
+
+        mock_execute_tool.side_effect = lambda name, args, context=None: f"resultado {name}"
+        mock_get_results.return_value = [{"name": "Pizzería Napoli"}]
+
+        state = {
+            "next_tool": "maps_search",
+            "tool_args": {"query": "pizza", "location": "Madrid"},
+            "pending_actions": [
+                {"tool": "maps_search", "args": {"query": "pizza", "location": "Madrid"}},
+                {"tool": "web_search", "args": {"query": "reseñas pizza Madrid"}},
+            ],
+            "knowledge": {},
+            "status": "executing",
+        }
+
+        result = execute_node(state)
+
+        assert mock_execute_tool.call_count == 2
+        assert "[maps_search] resultado maps_search" in result["last_observation"]
+        assert "[web_search] resultado web_search" in result["last_observation"]
+        assert result["knowledge"]["places"] == [{"name": "Pizzería Napoli"}]
+        assert result["knowledge"]["web_search"]["query"] == "reseñas pizza Madrid"
+        assert result["status"] == "thinking"
+
+    def test_split_actions_keeps_dependent_tools_sequential(self):
+        """Verifica que check_availability no va en paralelo con maps_search."""
+        from agent.graph import _split_actions
+
+        parallel, sequential = _split_actions([
+            {"tool": "check_availability", "args": {}},
+            {"tool": "maps_search", "args": {"query": "a"}},
+            {"tool": "web_search", "args": {"query": "b"}},
+            {"tool": "maps_search", "args": {"query": "c"}},
+        ])
+
+        assert [a["tool"] for a in parallel] == ["maps_search", "web_search"]
+        assert [a["tool"] for a in sequential] == ["check_availability", "maps_search"]
+
+    @patch("agent.graph.aexecute_tool", new_callable=AsyncMock)
+    def test_aexecute_node_runs_actions_concurrently(self, mock_aexecute_tool):
+        """Verifica que la versión async lanza las acciones a la vez."""
+        from agent.graph import aexecute_node
+
+        running = {"now": 0, "max": 0}
+
+        async def fake_tool(name, args, context=None):
+            running["now"] += 1
+            running["max"] = max(running["max"], running["now"])
+            await asyncio.sleep(0.01)
+            running["now"] -= 1
+            return f"resultado {name}"
+
+        mock_aexecute_tool.side_effect = fake_tool
+
+        state = {
+            "next_tool": "web_search",
+            "tool_args": {"query": "a"},
+            "pending_actions": [
+                {"tool": "web_search", "args": {"query": "a"}},
+                {"tool": "web_search", "args": {"query": "b"}},
+            ],
+            "knowledge": {},
+            "status": "executing",
+        }
+
+        result = asyncio.run(aexecute_node(state))
+
+        assert running["max"] == 2
+        assert result["last_observation"].count("[web_search]") == 2
+
+
 class TestExecuteNode:
     """Tests para el nodo execute."""
 
@@ -472,6 +677,30 @@ class TestExecuteNode:
         assert result["knowledge"]["booking"]["place_name"] == "La Trattoria"
 
 
+    @patch("agent.tools.places_text_search")
+    def test_execute_node_uses_state_tool_context(self, mock_places_search, mock_env_vars):
+        """Verifica que execute_node usa el contexto de herramientas del estado."""
+        from agent.graph import execute_node
+        from agent.tools import ToolContext
+
+        mock_places_search.return_value = [{"name": "Pizzería Napoli"}]
+        context = ToolContext()
+
+        state = {
+            "next_tool": "maps_search",
+            "tool_args": {"query": "pizza", "location": "Madrid"},
+            "knowledge": {},
+            "status": "executing",
+            "last_observation": None,
+            "tool_context": context,
+        }
+
+        result = execute_node(state)
+
+        assert context.search_results == [{"name": "Pizzería Napoli"}]
+        assert result["knowledge"]["places"] is context.search_results
+
+
 class TestRespondNode:
     """Tests para el nodo respond."""
 
@@ -525,3 +754,144 @@ class TestCreateGraph:
 
         assert graph is not None
         assert hasattr(graph, "invoke")
+
+
+class TestAsyncAgent:
+    """Tests para la variante async del grafo."""
+
+    @patch("agent.graph.get_llm")
+    def test_abrain_node_uses_ainvoke(self, mock_get_llm, empty_agent_state):
+        """Verifica que abrain_node llama al LLM con ainvoke."""
+        from agent.graph import abrain_node
+
+        mock_llm = Mock()
+        mock_llm.ainvoke = AsyncMock(return_value=Mock(
+            content="THOUGHT: Test\nACTION: web_search\nACTION_INPUT: {\"query\": \"pizza\"}"
+        ))
+        mock_get_llm.return_value = mock_llm
+
+        result = asyncio.run(abrain_node(empty_agent_state))
+
+        mock_llm.ainvoke.assert_awaited_once()
+        mock_llm.invoke.assert_not_called()
+        assert result["next_tool"] == "web_search"
+        assert result["status"] == "executing"
+
+    @patch("agent.graph.aexecute_tool", new_callable=AsyncMock)
+    def test_aexecute_node_updates_knowledge(self, mock_aexecute_tool):
+        """Verifica que aexecute_node guarda la observación y el knowledge."""
+        from agent.graph import aexecute_node
+
+        mock_aexecute_tool.return_value = "1. Pizzería Napoli"
+
+        state = {
+            "next_tool": "web_search",
+            "tool_args": {"query": "pizzerías Madrid"},
+            "knowledge": {},
+            "status": "executing",
+            "last_observation": None,
+        }
+
+        result = asyncio.run(aexecute_node(state))
+
+        mock_aexecute_tool.assert_awaited_once_with(
+            "web_search", {"query": "pizzerías Madrid"}, context=None
+        )
+        assert result["status"] == "thinking"
+        assert result["knowledge"]["web_search"]["query"] == "pizzerías Madrid"
+
+    @patch("agent.graph.get_llm")
+    def test_arun_agent_returns_response(self, mock_get_llm):
+        """Verifica que arun_agent ejecuta el grafo con ainvoke."""
+        import agent.graph as graph_module
+
+        mock_llm = Mock()
+        mock_llm.ainvoke = AsyncMock(return_value=Mock(
+            content="THOUGHT: Saludo\nACTION: respond\nACTION_INPUT: {\"message\": \"¡Hola!\"}"
+        ))
+        mock_get_llm.return_value = mock_llm
+
+        with patch.object(graph_module, "_async_graph", None):
+            result = asyncio.run(
+                graph_module.arun_agent([{"role": "user", "content": "Hola"}])
+            )
+
+        assert result["response"] == "¡Hola!"
+        assert result["knowledge"] == {}
+
+    @patch("agent.graph.aexecute_tool", new_callable=AsyncMock)
+    @patch("agent.graph.get_llm")
+    def test_astream_agent_emits_events(self, mock_get_llm, mock_aexecute_tool):
+        """Verifica que astream_agent emite eventos por nodo y el final."""
+        import agent.graph as graph_module
+
+        mock_llm = Mock()
+        mock_llm.ainvoke = AsyncMock(side_effect=[
+            Mock(content="THOUGHT: Buscar\nACTION: web_search\nACTION_INPUT: {\"query\": \"pizza\"}"),
+            Mock(content="THOUGHT: Listo\nACTION: respond\nACTION_INPUT: {\"message\": \"Hay pizzerías\"}"),
+        ])
+        mock_get_llm.return_value = mock_llm
+        mock_aexecute_tool.return_value = "1. Pizzería Napoli"
+
+        async def collect():
+            return [
+                event async for event in
+                graph_module.astream_agent([{"role": "user", "content": "Pizza"}])
+            ]
+
+        with patch.object(graph_module, "_async_graph", None):
+            events = asyncio.run(collect())
+
+        types = [event["type"] for event in events]
+        assert types[:3] == ["decision", "tool_started", "tool_finished"]
+        assert types[-1] == "final"
+        assert events[-1]["response"] == "Hay pizzerías"
+
+    def test_node_events_without_tool(self):
+        """Verifica que una decisión sin herramienta no emite tool_started."""
+        from agent.graph import _node_events
+
+        events = _node_events("brain", {"next_tool": None, "iterations": 1})
+
+        assert [event["type"] for event in events] == ["decision"]
+
+
+class TestAgentSessions:
+    """Tests para la reutilización de sesiones entre turnos."""
+
+    @patch("agent.graph.get_llm")
+    def test_run_agent_reuses_session_knowledge(self, mock_get_llm):
+        """Verifica que el segundo turno retoma knowledge e historial."""
+        import agent.graph as graph_module
+        from agent.session_store import InMemorySessionStore
+
+        store = InMemorySessionStore()
+        store.save("s1", {
+            "messages": [
+                {"role": "user", "content": "Pizza en Madrid"},
+                {"role": "assistant", "content": "He encontrado La Trattoria"},
+            ],
+            "knowledge": {"places": [{"name": "La Trattoria"}]},
+            "last_observation": "Encontré 1 resultados",
+        })
+
+        mock_llm = Mock()
+        mock_llm.invoke.return_value = Mock(
+            content="THOUGHT: Ya lo tengo\nACTION: respond\nACTION_INPUT: {\"message\": \"¿Para cuántos?\"}"
+        )
+        mock_get_llm.return_value = mock_llm
+
+        with patch("agent.graph.get_session_store", return_value=store), \
+                patch.object(graph_module, "_graph", None):
+            result = graph_module.run_agent(
+                [{"role": "user", "content": "Reserva ahí"}], session_id="s1"
+            )
+
+        prompt = mock_llm.invoke.call_args[0][0][-1].content
+        assert "La Trattoria" in prompt
+        assert "Pizza en Madrid" in prompt
+        assert result["knowledge"]["places"][0]["name"] == "La Trattoria"
+
+        saved = store.get("s1")
+        assert len(saved["messages"]) == 4
+        assert saved["messages"][-1] == {"role": "assistant", "content": "¿Para cuántos?"}
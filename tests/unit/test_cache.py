@@ -0,0 +1,123 @@
+"""
+===========================================================
+TEST CACHE - Tests para backend/cache.py
+===========================================================
+
+Tests unitarios para las cachés en memoria y en disco.
+"""
+
+import pytest
+from unittest.mock import patch
+
+
+class TestTTLCache:
+    """Tests para la caché en memoria (LRU + TTL)."""
+
+    def test_set_and_get(self):
+        """Verifica que se recupera un valor guardado."""
+        from backend.cache import TTLCache
+
+        cache = TTLCache(maxsize=10, ttl_seconds=60)
+        cache.set("madrid", "40.4,-3.7")
+
+        assert cache.get("madrid") == "40.4,-3.7"
+
+    def test_expired_entry_returns_none(self):
+        """Verifica que las entradas caducan."""
+        from backend.cache import TTLCache
+
+        cache = TTLCache(maxsize=10, ttl_seconds=10)
+        with patch("backend.cache.time.time", return_value=1000.0):
+            cache.set("madrid", "40.4,-3.7")
+        with patch("backend.cache.time.time", return_value=1011.0):
+            assert cache.get("madrid") is None
+
+    def test_lru_eviction(self):
+        """Verifica que se desaloja la entrada menos usada."""
+        from backend.cache import TTLCache
+
+        cache = TTLCache(maxsize=2, ttl_seconds=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+
+class TestPersistentCache:
+    """Tests para la caché de dos niveles."""
+
+    def test_disk_tier_survives_memory_reset(self):
+        """Verifica que el valor se recupera de SQLite tras vaciar la memoria."""
+        from backend.cache import get_cache
+
+        cache = get_cache("test", ttl_seconds=60, persistent=True)
+        cache.set("k", {"lat": 40.4})
+        cache.memory.clear()
+
+        assert cache.get("k") == {"lat": 40.4}
+        assert cache.stats()["disk_hits"] == 1
+
+    def test_disk_entries_expire(self):
+        """Verifica que las entradas en disco también caducan."""
+        from backend.cache import get_cache
+
+        cache = get_cache("test", ttl_seconds=10, persistent=True)
+        with patch("backend.cache.time.time", return_value=1000.0):
+            cache.set("k", "v")
+        cache.memory.clear()
+        with patch("backend.cache.time.time", return_value=1011.0):
+            assert cache.get("k") is None
+
+    def test_disk_hit_keeps_remaining_ttl_in_memory(self):
+        """Verifica que lo promovido desde disco caduca cuando caducaba en disco."""
+        from backend.cache import get_cache
+
+        cache = get_cache("test", ttl_seconds=10, persistent=True)
+        with patch("backend.cache.time.time", return_value=1000.0):
+            cache.set("k", "v")
+        cache.memory.clear()
+        with patch("backend.cache.time.time", return_value=1008.0):
+            assert cache.get("k") == "v"  # acierto en disco, pasa a memoria
+        with patch("backend.cache.time.time", return_value=1011.0):
+            assert cache.memory.get("k") is None
+            assert cache.get("k") is None
+
+    def test_none_is_not_cached(self):
+        """Verifica que None no se guarda."""
+        from backend.cache import get_cache
+
+        cache = get_cache("test")
+        cache.set("k", None)
+
+        assert cache.get("k") is None
+        assert cache.stats()["size"] == 0
+
+    def test_stats_count_hits_and_misses(self):
+        """Verifica los contadores de aciertos y fallos."""
+        from backend.cache import get_cache, cache_stats
+
+        cache = get_cache("test")
+        cache.get("k")
+        cache.set("k", "v")
+        cache.get("k")
+
+        stats = cache_stats()["test"]
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+
+    def test_reset_caches_runs_hooks(self):
+        """Verifica que reset_caches vacía el registro y llama a los hooks."""
+        from backend import cache as cache_module
+
+        calls = []
+        with patch.object(cache_module, "_reset_hooks", [lambda: calls.append(1)]):
+            cache_module.get_cache("test")
+            cache_module.reset_caches()
+
+        assert cache_module.cache_stats() == {}
+        assert calls == [1]
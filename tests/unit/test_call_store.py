@@ -0,0 +1,165 @@
+"""
+===========================================================
+TEST CALL STORE - Tests para backend/call_store.py
+===========================================================
+
+Tests unitarios del nivel caliente con TTL y el archivo SQLite.
+"""
+
+from datetime import datetime
+from unittest.mock import Mock, patch
+
+import pytest
+
+
+def _call(call_id, status="in_progress"):
+    return {
+        "id": call_id,
+        "status": status,
+        "mission": "Reservar mesa",
+        "transcript": [{"speaker": "other", "message": "Dígame"}],
+        "result": None,
+        "start_time": datetime(2025, 1, 1, 21, 0),
+        "created_at": "2025-01-01T21:00:00",
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    from backend.call_store import CallStore
+
+    store = CallStore(ttl=60, max_hot=10, path=str(tmp_path / "calls.db"))
+    yield store
+    store.close()
+
+
+class TestCallStore:
+    """Tests de CallStore."""
+
+    def test_behaves_like_a_dict(self, store):
+        """Verifica el acceso tipo dict sobre el nivel caliente."""
+        store["a1"] = _call("a1")
+        store["a1"]["status"] = "calling"
+
+        assert "a1" in store and "zz" not in store
+        assert store["a1"]["status"] == "calling"
+        assert list(store) == ["a1"] and len(store) == 1
+        with pytest.raises(KeyError):
+            store["zz"]
+
+    def test_finished_call_evicted_after_ttl_and_read_from_archive(self, store):
+        """Verifica el descarte tras el TTL y la lectura desde el archivo."""
+        on_evict = Mock()
+        store.on_evict = on_evict
+        store["a1"] = _call("a1", status="completed")
+
+        with patch("backend.call_store.time.time", return_value=1000.0):
+            store.mark_finished("a1")
+        with patch("backend.call_store.time.time", return_value=1061.0):
+            store["a2"] = _call("a2")
+
+        assert list(store) == ["a2"]
+        on_evict.assert_called_once_with("a1")
+        archived = store["a1"]
+        assert archived["status"] == "completed"
+        assert archived["start_time"] == "2025-01-01T21:00:00"
+        assert store.stats()["archive_hits"] == 1
+
+    def test_eviction_archives_changes_after_finishing(self, store):
+        """Verifica que al descartar se archiva lo que cambió tras mark_finished."""
+        store["a1"] = _call("a1", status="completed")
+        with patch("backend.call_store.time.time", return_value=1000.0):
+            store.mark_finished("a1")
+        store["a1"]["result"] = {"outcome": "Reservado"}
+        with patch("backend.call_store.time.time", return_value=1061.0):
+            store["a2"] = _call("a2")
+
+        assert "a1" not in list(store)
+        assert store["a1"]["result"] == {"outcome": "Reservado"}
+
+    def test_archived_calls_are_read_only_and_read_once(self, store):
+        """Verifica la copia de solo lectura y un único archive_hit por consulta."""
+        store["a1"] = _call("a1", status="completed")
+        store.mark_finished("a1")
+        store.ttl = 0
+        store._evict()
+
+        assert "a1" in store and "zz" not in store
+        call = store.get("a1")
+        with pytest.raises(TypeError):
+            call["status"] = "in_progress"
+        assert store.active("a1") is None
+        assert store.get("zz") is None
+        assert store.stats()["archive_hits"] == 1
+
+    def test_abandoned_active_calls_expire(self, tmp_path):
+        """Verifica que una llamada sin estado final sale de memoria tras max_active_age."""
+        from backend.call_store import CallStore
+
+        store = CallStore(max_active_age=3600, path=str(tmp_path / "calls.db"))
+        with patch("backend.call_store.time.time", return_value=1000.0):
+            store["old"] = _call("old")
+        with patch("backend.call_store.time.time", return_value=4601.0):
+            store["new"] = _call("new")
+
+        assert list(store) == ["new"]
+        assert store.stats()["active"] == 1 and store.stats()["evicted"] == 1
+        assert store["old"]["status"] == "in_progress"
+        store.close()
+
+    def test_max_hot_never_evicts_active_calls(self, tmp_path):
+        """Verifica que el límite descarta primero las terminadas y nunca las activas."""
+        from backend.call_store import CallStore
+
+        store = CallStore(ttl=3600, max_hot=2, path=str(tmp_path / "calls.db"))
+        store["done"] = _call("done", status="failed")
+        store.mark_finished("done")
+        for call_id in ("b1", "b2", "b3"):
+            store[call_id] = _call(call_id)
+
+        assert sorted(store) == ["b1", "b2", "b3"]
+        assert store.stats()["active"] == 3 and store.stats()["evicted"] == 1
+        store.close()
+
+    def test_max_hot_evicts_only_the_overflow(self, tmp_path):
+        """Verifica que al pasarse del límite en una se descarta solo una terminada."""
+        from backend.call_store import CallStore
+
+        store = CallStore(ttl=3600, max_hot=3, path=str(tmp_path / "calls.db"))
+        for call_id in ("d1", "d2", "d3"):
+            store[call_id] = _call(call_id, status="completed")
+            store.mark_finished(call_id)
+        store["b1"] = _call("b1")
+
+        assert sorted(store) == ["b1", "d2", "d3"]
+        assert store.stats()["evicted"] == 1
+        store.close()
+
+    def test_archive_survives_restart(self, tmp_path):
+        """Verifica que otra instancia (reinicio) lee las llamadas archivadas."""
+        from backend.call_store import CallStore
+
+        path = str(tmp_path / "calls.db")
+        first = CallStore(path=path)
+        first["a1"] = _call("a1", status="completed")
+        first.mark_finished("a1")
+        first.close()
+
+        second = CallStore(path=path)
+        try:
+            assert len(second) == 0
+            assert second["a1"]["transcript"][0]["message"] == "Dígame"
+        finally:
+            second.close()
+
+    def test_default_path_follows_cache_dir(self, tmp_path, monkeypatch):
+        """Verifica CACHE_DIR/calls.db por defecto."""
+        from backend.call_store import CallStore
+
+        monkeypatch.setenv("CACHE_DIR", str(tmp_path / "otra"))
+        store = CallStore()
+        store["a1"] = _call("a1", status="completed")
+        store.mark_finished("a1")
+        store.close()
+
+        assert (tmp_path / "otra" / "calls.db").exists()
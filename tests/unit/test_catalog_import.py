@@ -0,0 +1,214 @@
+"""
+===========================================================
+TEST CATALOG IMPORT - Tests para backend/catalog_import.py
+===========================================================
+
+Tests unitarios de la importación masiva de CSV, GeoJSON y Overpass.
+"""
+
+import io
+import json
+
+import pytest
+
+
+CSV_DATA = """id,name,address,latitude,longitude,types,rating,price_level
+r1,Pizzería Napoli,Calle Mayor 1,40.4168,-3.7038,restaurant|pizza_restaurant,4.6,2
+r2,Sushi Bar,Calle Luna 3,40.4170,-3.7040,restaurant,4.2,3
+r3,Sin Coordenadas,Calle Sol 5,,,restaurant,4.0,1
+"""
+
+
+def _geojson(count):
+    return {
+        "type": "FeatureCollection",
+        "features": [
+            {
+                "type": "Feature",
+                "id": f"node/{i}",
+                "geometry": {"type": "Point", "coordinates": [-3.70 + i * 1e-4, 40.41]},
+                "properties": {"name": f"Tasca {i}", "amenity": "restaurant", "cuisine": "tapas"},
+            }
+            for i in range(count)
+        ],
+    }
+
+
+OVERPASS_DATA = {
+    "version": 0.6,
+    "elements": [
+        {
+            "type": "node",
+            "id": 42,
+            "lat": 40.4168,
+            "lon": -3.7038,
+            "tags": {
+                "name": "Casa Lucio",
+                "amenity": "restaurant",
+                "cuisine": "spanish",
+                "addr:street": "Calle Cava Baja",
+                "addr:housenumber": "35",
+                "opening_hours": "Mo-Su 13:00-16:00",
+            },
+        },
+        {"type": "way", "id": 7, "center": {"lat": 40.41, "lon": -3.70}, "tags": {"name": "Botín"}},
+        {"type": "node", "id": 8, "lat": 40.41, "lon": -3.70, "tags": {"amenity": "bench"}},
+    ],
+}
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    from backend.place_catalog import PlaceCatalog
+
+    catalog = PlaceCatalog(str(tmp_path / "places.db"))
+    yield catalog
+    catalog.close()
+
+
+class TestReaders:
+    """Tests de los lectores en streaming."""
+
+    def test_csv_normalizes_and_skips_invalid_rows(self):
+        """Verifica el esquema normalizado y que se omiten filas sin coordenadas."""
+        from backend.catalog_import import read_csv
+
+        places = list(read_csv(io.StringIO(CSV_DATA)))
+
+        assert [p["place_id"] for p in places] == ["r1", "r2"]
+        assert places[0]["location"] == {"lat": 40.4168, "lng": -3.7038}
+        assert places[0]["types"] == ["restaurant", "pizza_restaurant"]
+        assert places[0]["rating"] == 4.6 and places[0]["price_level"] == 2
+
+    def test_geojson_features_in_small_blocks(self, monkeypatch):
+        """Verifica que el array de features se lee aunque llegue en bloques pequeños."""
+        import backend.catalog_import as catalog_import
+
+        monkeypatch.setattr(catalog_import, "READ_BLOCK_SIZE", 32)
+        places = list(catalog_import.read_geojson(io.StringIO(json.dumps(_geojson(5)))))
+
+        assert [p["place_id"] for p in places] == [f"osm:node/{i}" for i in range(5)]
+        assert places[0]["types"] == ["restaurant", "tapas_restaurant"]
+
+    def test_invalid_element_is_skipped(self, monkeypatch, capsys):
+        """Verifica que un feature inválido se omite sin perder los siguientes."""
+        import backend.catalog_import as catalog_import
+
+        features = [json.dumps(f) for f in _geojson(3)["features"]]
+        features[1] = '{"type": "Feature", "id": "node/1", "properties": {"name": }}'
+        data = '{"type": "FeatureCollection", "features": [' + ", ".join(features) + "]}"
+        monkeypatch.setattr(catalog_import, "READ_BLOCK_SIZE", 32)
+
+        places = list(catalog_import.read_geojson(io.StringIO(data)))
+
+        assert [p["place_id"] for p in places] == ["osm:node/0", "osm:node/2"]
+        assert "omitido" in capsys.readouterr().out
+
+    def test_truncated_array_raises(self):
+        """Verifica que un fichero cortado a mitad de un elemento no se da por bueno."""
+        from backend.catalog_import import read_geojson
+
+        data = json.dumps(_geojson(3))
+        truncated = data[: data.index('"node/2"') + 20]
+
+        with pytest.raises(ValueError, match="truncado"):
+            list(read_geojson(io.StringIO(truncated)))
+
+    def test_geojson_lines(self):
+        """Verifica el formato de un feature por línea."""
+        from backend.catalog_import import read_geojson
+
+        lines = "\n".join(json.dumps(f) for f in _geojson(3)["features"])
+
+        assert len(list(read_geojson(io.StringIO(lines)))) == 3
+
+    def test_overpass_elements(self):
+        """Verifica nodos, ways con center y que se omiten elementos sin nombre."""
+        from backend.catalog_import import read_overpass
+
+        places = list(read_overpass(io.StringIO(json.dumps(OVERPASS_DATA))))
+
+        assert [p["place_id"] for p in places] == ["osm:node/42", "osm:way/7"]
+        assert places[0]["address"] == "Calle Cava Baja 35"
+        assert places[0]["opening_hours"] == {"weekday_text": ["Mo-Su 13:00-16:00"]}
+        assert "spanish_restaurant" in places[0]["types"]
+
+
+class TestImportPlaces:
+    """Tests de import_places y la CLI."""
+
+    def test_import_in_chunks_then_text_search(self, tmp_path, catalog):
+        """Verifica la carga offline por bloques y que el índice de texto queda construido."""
+        from backend.catalog_import import import_places
+
+        path = tmp_path / "madrid.geojson"
+        path.write_text(json.dumps(_geojson(7)), encoding="utf-8")
+
+        summary = import_places(str(path), catalog=catalog, chunk_size=3, offline=True)
+
+        assert summary["imported"] == 7 and summary["format"] == "geojson"
+        assert catalog.stats()["places"] == 7
+        if catalog.fts_enabled:
+            assert len(catalog.text_search("tasca", 40.41, -3.70, 2000)) == 7
+
+    def test_live_import_keeps_indexes(self, tmp_path, catalog, monkeypatch):
+        """Verifica que sin --offline no se quitan los índices del catálogo en uso."""
+        from backend.catalog_import import import_places
+
+        path = tmp_path / "madrid.geojson"
+        path.write_text(json.dumps(_geojson(5)), encoding="utf-8")
+        monkeypatch.setattr(catalog, "drop_indexes", lambda: pytest.fail("drop_indexes"))
+
+        import_places(str(path), catalog=catalog, chunk_size=2)
+
+        indexes = {
+            row[0] for row in catalog._conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+        }
+        assert {"idx_places_geohash", "idx_places_lat_lng"} <= indexes
+        if catalog.fts_enabled:
+            assert len(catalog.text_search("tasca", 40.41, -3.70, 2000)) == 5
+
+    def test_cover_marks_only_cells_with_places(self, tmp_path, catalog):
+        """Verifica que --cover cubre las celdas con lugares y no todo el rectángulo."""
+        from backend.catalog_import import import_places
+
+        path = tmp_path / "restaurantes.csv"
+        far = "r4,Asador Norte,Calle Lejos 9,40.5000,-3.6000,restaurant,4.1,2\n"
+        path.write_text(CSV_DATA + far, encoding="utf-8")
+
+        summary = import_places(str(path), catalog=catalog, cover=True)
+
+        assert summary["covered_cells"] == 2
+        assert catalog.covers(40.4169, -3.7039, 10, max_age=3600)
+        assert catalog.covers(40.5000, -3.6000, 10, max_age=3600)
+        # Entre ambos (dentro del rectángulo del fichero) no hay datos importados
+        assert not catalog.covers(40.4584, -3.6520, 10, max_age=3600)
+
+    def test_main_reports_truncated_file(self, tmp_path, monkeypatch):
+        """Verifica que la CLI termina con error si un fichero está cortado."""
+        from backend.catalog_import import main
+
+        monkeypatch.setenv("PLACE_CATALOG_PATH", str(tmp_path / "cli.db"))
+        path = tmp_path / "cortado.geojson"
+        data = json.dumps(_geojson(3))
+        path.write_text(data[: data.index('"node/2"') + 20], encoding="utf-8")
+
+        assert main([str(path)]) == 1
+
+    def test_main_uses_configured_catalog(self, tmp_path, monkeypatch):
+        """Verifica la CLI contra PLACE_CATALOG_PATH y la detección de formato."""
+        from backend.catalog_import import main
+        from backend.place_catalog import PlaceCatalog
+
+        db_path = tmp_path / "cli.db"
+        monkeypatch.setenv("PLACE_CATALOG_PATH", str(db_path))
+        path = tmp_path / "overpass.json"
+        path.write_text(json.dumps(OVERPASS_DATA), encoding="utf-8")
+
+        assert main([str(path)]) == 0
+
+        catalog = PlaceCatalog(str(db_path))
+        try:
+            assert catalog.stats()["places"] == 2
+        finally:
+            catalog.close()
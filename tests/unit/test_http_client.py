@@ -0,0 +1,95 @@
+"""
+===========================================================
+TEST HTTP CLIENT - Tests para backend/http_client.py
+===========================================================
+
+Tests unitarios para el cliente HTTP compartido.
+"""
+
+import asyncio
+import pytest
+from unittest.mock import patch, Mock, AsyncMock
+
+
+@pytest.fixture(autouse=True)
+def fresh_clients():
+    """Cada test empieza sin clientes creados."""
+    from backend.http_client import reset_http_clients
+
+    reset_http_clients()
+    yield
+    reset_http_clients()
+
+
+class TestServiceTimeout:
+    """Tests para los timeouts por servicio."""
+
+    def test_known_service_timeout(self):
+        """Verifica el timeout de lectura de un servicio conocido."""
+        from backend.http_client import service_timeout, SERVICE_READ_TIMEOUTS
+
+        timeout = service_timeout("google_maps")
+
+        assert timeout.read == SERVICE_READ_TIMEOUTS["google_maps"]
+        assert timeout.connect is not None
+
+    def test_env_overrides_service_timeout(self, monkeypatch):
+        """Verifica que HTTP_READ_TIMEOUT_<SERVICIO> cambia el timeout."""
+        from backend.http_client import service_timeout
+
+        monkeypatch.setenv("HTTP_READ_TIMEOUT_GOOGLE_MAPS", "2.5")
+
+        assert service_timeout("google_maps").read == 2.5
+
+    def test_explicit_timeout_wins(self):
+        """Verifica que un timeout explícito sustituye al del servicio."""
+        from backend.http_client import service_timeout
+
+        assert service_timeout("google_maps", read=5).read == 5
+
+
+class TestClients:
+    """Tests para la reutilización de clientes."""
+
+    def test_sync_client_is_shared(self):
+        """Verifica que el cliente síncrono es único."""
+        from backend.http_client import get_client
+
+        assert get_client() is get_client()
+
+    def test_async_client_is_shared_within_loop(self):
+        """Verifica que dentro de un loop se reutiliza el cliente async."""
+        from backend.http_client import get_async_client
+
+        async def two_clients():
+            return get_async_client(), get_async_client()
+
+        first, second = asyncio.run(two_clients())
+
+        assert first is second
+
+    def test_get_uses_service_timeout(self):
+        """Verifica que get pasa el timeout del servicio al cliente."""
+        from backend import http_client
+
+        fake_client = Mock()
+        with patch.object(http_client, "get_client", return_value=fake_client):
+            http_client.get("https://example.com", service="google_maps", params={"a": 1})
+
+        method, url = fake_client.request.call_args[0]
+        kwargs = fake_client.request.call_args[1]
+        assert (method, url) == ("GET", "https://example.com")
+        assert kwargs["timeout"].read == http_client.SERVICE_READ_TIMEOUTS["google_maps"]
+        assert kwargs["params"] == {"a": 1}
+
+    def test_aget_uses_async_client(self):
+        """Verifica que aget usa el cliente async del loop."""
+        from backend import http_client
+
+        fake_client = Mock()
+        fake_client.request = AsyncMock(return_value=Mock(status_code=200))
+        with patch.object(http_client, "get_async_client", return_value=fake_client):
+            response = asyncio.run(http_client.aget("https://example.com", service="google_photos"))
+
+        assert response.status_code == 200
+        fake_client.request.assert_awaited_once()
@@ -0,0 +1,167 @@
+"""
+===========================================================
+TEST LLM CLIENTS - Tests para backend/llm_clients.py
+===========================================================
+
+Tests unitarios para el registro de clientes LLM compartidos.
+"""
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def fresh_clients():
+    """Cada test empieza con el registro vacío."""
+    from backend.llm_clients import reset_llm_clients
+
+    reset_llm_clients()
+    yield
+    reset_llm_clients()
+
+
+class TestChatModelRegistry:
+    """Tests para get_chat_model."""
+
+    def test_same_model_returns_same_instance(self):
+        """Verifica que se reutiliza la instancia por (modelo, temperatura)."""
+        from backend.llm_clients import get_chat_model
+
+        first = get_chat_model("gpt-4o-mini", 0.3, api_key="test-key")
+        second = get_chat_model("gpt-4o-mini", 0.3, api_key="test-key")
+
+        assert first is second
+
+    def test_different_temperature_returns_new_instance(self):
+        """Verifica que cada configuración tiene su propia instancia."""
+        from backend.llm_clients import get_chat_model
+
+        first = get_chat_model("gpt-4o-mini", 0.3, api_key="test-key")
+        second = get_chat_model("gpt-4o-mini", 0.7, api_key="test-key")
+
+        assert first is not second
+
+    def test_models_share_http_pool(self):
+        """Verifica que todas las instancias usan el mismo pool httpx."""
+        from backend.llm_clients import get_chat_model, get_http_client
+
+        first = get_chat_model("gpt-4o-mini", 0.3, api_key="test-key")
+        second = get_chat_model("gpt-4o", 0.0, api_key="test-key")
+
+        assert first.http_client is get_http_client()
+        assert second.http_client is first.http_client
+
+
+class TestOpenAIClient:
+    """Tests para get_openai_client."""
+
+    def test_openai_client_is_singleton(self):
+        """Verifica que el cliente OpenAI se crea una sola vez."""
+        from backend.llm_clients import get_openai_client
+
+        assert get_openai_client("test-key") is get_openai_client("test-key")
+
+    def test_reset_creates_new_clients(self):
+        """Verifica que reset_llm_clients descarta los clientes."""
+        from backend.llm_clients import get_openai_client, reset_llm_clients
+
+        first = get_openai_client("test-key")
+        reset_llm_clients()
+
+        assert get_openai_client("test-key") is not first
+
+    def test_openai_client_per_api_key(self):
+        """Verifica que otra API key no reutiliza el cliente de la primera."""
+        from backend.llm_clients import get_openai_client
+
+        assert get_openai_client("key-a").api_key == "key-a"
+        assert get_openai_client("key-b").api_key == "key-b"
+
+
+class TestAsyncClients:
+    """Tests para los clientes async (uno por event loop)."""
+
+    def test_async_clients_are_per_event_loop(self):
+        """Verifica que cada loop tiene su pool y que se reutiliza dentro del loop."""
+        import asyncio
+
+        from backend.llm_clients import get_async_http_client, get_async_openai_client
+
+        async def clients():
+            first = get_async_openai_client("test-key")
+            assert get_async_openai_client("test-key") is first
+            return first, get_async_http_client()
+
+        first_client, first_pool = asyncio.run(clients())
+        second_client, second_pool = asyncio.run(clients())
+
+        assert first_client is not second_client
+        assert first_pool is not second_pool
+
+    def test_chat_model_uses_loop_pool(self):
+        """Verifica que dentro de un loop el ChatOpenAI usa el pool async de ese loop."""
+        import asyncio
+
+        from backend.llm_clients import get_async_http_client, get_chat_model
+
+        async def check():
+            model = get_chat_model("gpt-4o-mini", 0.3, api_key="test-key")
+            assert model.http_async_client is get_async_http_client()
+
+        asyncio.run(check())
+
+    def test_reset_closes_async_pool(self):
+        """Verifica que reset_llm_clients cierra el pool async del loop."""
+        import asyncio
+
+        from backend.llm_clients import get_async_http_client, reset_llm_clients
+
+        loop = asyncio.new_event_loop()
+        try:
+            async def pool():
+                return get_async_http_client()
+
+            client = loop.run_until_complete(pool())
+            reset_llm_clients()
+
+            assert client.is_closed
+        finally:
+            loop.close()
+
+
+class TestUsageStats:
+    """Tests para el registro de tokens cacheados."""
+
+    @pytest.fixture(autouse=True)
+    def fresh_stats(self):
+        from backend.llm_clients import reset_llm_usage_stats
+
+        reset_llm_usage_stats()
+        yield
+        reset_llm_usage_stats()
+
+    def test_record_usage_with_cache_read(self):
+        """Verifica que se separan tokens cacheados y no cacheados."""
+        from unittest.mock import Mock
+        from backend.llm_clients import record_llm_usage, get_llm_usage_stats
+
+        response = Mock(usage_metadata={
+            "input_tokens": 3000,
+            "output_tokens": 50,
+            "input_token_details": {"cache_read": 2048},
+        })
+
+        entry = record_llm_usage(response)
+
+        assert entry["cached_tokens"] == 2048
+        assert entry["uncached_tokens"] == 952
+        stats = get_llm_usage_stats()["by_source"]["brain"]
+        assert stats["calls"] == 1
+        assert stats["cache_hit_rate"] == round(2048 / 3000, 3)
+
+    def test_record_usage_without_metadata(self):
+        """Verifica que se ignora una respuesta sin usage_metadata."""
+        from unittest.mock import Mock
+        from backend.llm_clients import record_llm_usage, get_llm_usage_stats
+
+        assert record_llm_usage(Mock(usage_metadata=None)) is None
+        assert get_llm_usage_stats()["by_source"] == {}
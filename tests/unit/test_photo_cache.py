@@ -0,0 +1,115 @@
+"""
+===========================================================
+TEST PHOTO CACHE - Tests para backend/photo_cache.py
+===========================================================
+
+Tests unitarios para la caché de fotos (memoria + disco).
+"""
+
+import os
+
+
+class TestPhotoCache:
+    """Tests para PhotoCache."""
+
+    def test_set_and_get(self, tmp_path):
+        """Verifica que se recupera la foto con su content-type."""
+        from backend.photo_cache import PhotoCache
+
+        cache = PhotoCache(str(tmp_path))
+        cache.set("places/a|400x300|", b"jpeg-bytes", "image/jpeg")
+
+        assert cache.get("places/a|400x300|") == (b"jpeg-bytes", "image/jpeg")
+        assert cache.stats()["hits"] == 1
+
+    def test_disk_survives_new_instance(self, tmp_path):
+        """Verifica que una instancia nueva lee la foto del disco."""
+        from backend.photo_cache import PhotoCache
+
+        PhotoCache(str(tmp_path)).set("places/a|400x300|", b"webp-bytes", "image/webp")
+        cache = PhotoCache(str(tmp_path))
+
+        assert cache.get("places/a|400x300|") == (b"webp-bytes", "image/webp")
+        assert cache.stats()["disk_hits"] == 1
+
+    def test_miss_returns_none(self, tmp_path):
+        """Verifica que una foto no guardada devuelve None."""
+        from backend.photo_cache import PhotoCache
+
+        cache = PhotoCache(str(tmp_path))
+
+        assert cache.get("places/no-existe|400x300|") is None
+        assert cache.stats()["misses"] == 1
+
+    def test_disk_eviction_keeps_recent(self, tmp_path):
+        """Verifica que se borran las fotos menos usadas al superar el límite."""
+        from backend.photo_cache import PhotoCache
+
+        cache = PhotoCache(str(tmp_path), memory_bytes=0, disk_bytes=25)
+        cache.set("a", b"x" * 10)
+        os.utime(cache._find_file("a"), (1000, 1000))
+        cache.set("b", b"x" * 10)
+        cache.set("c", b"x" * 10)
+
+        assert cache.get("a") is None
+        assert cache.get("c") is not None
+        assert cache.stats()["disk_bytes"] <= 25
+
+    def test_memory_limit_in_bytes(self, tmp_path):
+        """Verifica que la memoria no supera su límite en bytes."""
+        from backend.photo_cache import PhotoCache
+
+        cache = PhotoCache(str(tmp_path), memory_bytes=15)
+        cache.set("a", b"x" * 10)
+        cache.set("b", b"x" * 10)
+
+        assert cache.stats()["memory_bytes"] <= 15
+
+    def test_overwrite_does_not_double_count(self, tmp_path):
+        """Verifica que guardar otra vez la misma clave no suma su tamaño dos veces."""
+        from backend.photo_cache import PhotoCache
+
+        cache = PhotoCache(str(tmp_path))
+        cache.set("a", b"x" * 10)
+        cache.set("a", b"y" * 4)
+
+        assert cache.stats()["disk_bytes"] == 4
+        assert PhotoCache(str(tmp_path)).stats()["disk_bytes"] == 4
+
+    def test_async_get_and_set(self, tmp_path):
+        """Verifica aget/aset (disco en un hilo) y la lectura desde disco."""
+        import asyncio
+
+        from backend.photo_cache import PhotoCache
+
+        cache = PhotoCache(str(tmp_path), memory_bytes=0)
+
+        async def roundtrip():
+            await cache.aset("a", b"jpeg-bytes", "image/jpeg")
+            return await cache.aget("a")
+
+        assert asyncio.run(roundtrip()) == (b"jpeg-bytes", "image/jpeg")
+        assert cache.stats()["disk_hits"] == 1
+
+
+class TestPhotoHeaders:
+    """Tests para las claves y cabeceras HTTP."""
+
+    def test_etag_depends_on_dimensions(self):
+        """Verifica que cada tamaño de la foto tiene su propio ETag."""
+        from backend.photo_cache import photo_cache_key, photo_etag
+
+        small = photo_etag(photo_cache_key("places/a", 400, 300))
+        large = photo_etag(photo_cache_key("places/a", 800, 600))
+
+        assert small != large
+        assert small.startswith('"') and small.endswith('"')
+
+    def test_cache_headers(self):
+        """Verifica Cache-Control de larga duración y el ETag."""
+        from backend.photo_cache import cache_headers
+
+        headers = cache_headers("places/a|400x300|")
+
+        assert "immutable" in headers["Cache-Control"]
+        assert headers["ETag"]
@@ -0,0 +1,62 @@
+"""
+===========================================================
+TEST PHOTO TRANSCODE - Tests para backend/photo_transcode.py
+===========================================================
+
+Tests unitarios para las miniaturas WebP/AVIF (requieren Pillow).
+"""
+
+import asyncio
+import io
+
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def _jpeg(width=800, height=600) -> bytes:
+    output = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 80, 40)).save(output, format="JPEG")
+    return output.getvalue()
+
+
+class TestNormalizeFormat:
+    """Tests para normalize_format y clamp_size."""
+
+    def test_known_formats(self):
+        """Verifica que webp/jpg se aceptan y lo desconocido da el original."""
+        from backend.photo_transcode import normalize_format
+
+        assert normalize_format("WEBP") == "webp"
+        assert normalize_format("jpg") == "jpeg"
+        assert normalize_format("gif") == ""
+        assert normalize_format(None) == ""
+
+    def test_clamp_size(self):
+        """Verifica los límites de tamaño."""
+        from backend.photo_transcode import PHOTO_MAX_SIZE, clamp_size
+
+        assert clamp_size(None, 400) == 400
+        assert clamp_size(5, 400) == 16
+        assert clamp_size(100000, 400) == PHOTO_MAX_SIZE
+
+
+class TestTranscode:
+    """Tests para transcode/atranscode."""
+
+    def test_webp_thumbnail(self):
+        """Verifica que la miniatura cabe en el tamaño pedido y es WebP."""
+        from backend.photo_transcode import transcode
+
+        data, content_type = transcode(_jpeg(), 200, 100, "webp")
+
+        assert content_type == "image/webp"
+        with Image.open(io.BytesIO(data)) as img:
+            assert img.format == "WEBP"
+            assert img.width <= 200 and img.height <= 100
+
+    def test_atranscode_invalid_image_returns_none(self):
+        """Verifica que una imagen corrupta no rompe el proxy."""
+        from backend.photo_transcode import atranscode
+
+        assert asyncio.run(atranscode(b"no-es-una-imagen", 200, 100, "webp")) is None
@@ -0,0 +1,188 @@
+"""
+===========================================================
+TEST PLACE CATALOG - Tests para backend/place_catalog.py
+===========================================================
+
+Tests unitarios del catálogo local de lugares y su índice geohash.
+"""
+
+import pytest
+
+
+def _place(place_id, lat, lng, types=("restaurant",), price_level=2, name=None):
+    return {
+        "place_id": place_id,
+        "name": name or place_id,
+        "location": {"lat": lat, "lng": lng},
+        "types": list(types),
+        "price_level": price_level,
+        "rating": 4.5,
+    }
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    from backend.place_catalog import PlaceCatalog
+
+    catalog = PlaceCatalog(str(tmp_path / "places.db"))
+    yield catalog
+    catalog.close()
+
+
+class TestGeohash:
+    """Tests de geohash y celdas."""
+
+    def test_geohash_known_value(self):
+        """Verifica un geohash de referencia."""
+        from backend.place_catalog import geohash_encode
+
+        assert geohash_encode(57.64911, 10.40744, 11) == "u4pruydqqvj"
+
+    def test_covering_cells_include_point_cell(self):
+        """Verifica que las celdas del círculo incluyen la del centro."""
+        from backend.place_catalog import BUCKET_PRECISION, covering_cells, geohash_encode
+
+        cells = covering_cells(40.4168, -3.7038, 800)
+
+        assert geohash_encode(40.4168, -3.7038, BUCKET_PRECISION) in cells
+        assert len(cells) > 1
+
+
+class TestNearby:
+    """Tests para nearby()."""
+
+    def test_nearby_sorted_by_distance(self, catalog):
+        """Verifica el filtro por radio y el orden por distancia."""
+        catalog.upsert_many([
+            _place("lejos", 40.4300, -3.7038),   # ~1,5 km
+            _place("cerca", 40.4175, -3.7038),   # ~80 m
+            _place("medio", 40.4200, -3.7038),   # ~350 m
+        ])
+
+        places = catalog.nearby(40.4168, -3.7038, 500)
+
+        assert [p["place_id"] for p in places] == ["cerca", "medio"]
+        assert places[0]["distance_m"] < places[1]["distance_m"]
+
+    def test_nearby_filters_types_and_price(self, catalog):
+        """Verifica los filtros de tipo y precio."""
+        catalog.upsert_many([
+            _place("bar", 40.4170, -3.7038, types=("bar",)),
+            _place("caro", 40.4171, -3.7038, price_level=4),
+            _place("ok", 40.4172, -3.7038),
+        ])
+
+        places = catalog.nearby(40.4168, -3.7038, 500, types=["restaurant"], price_level=2)
+
+        assert [p["place_id"] for p in places] == ["ok"]
+
+    def test_index_survives_reopen(self, tmp_path):
+        """Verifica que el índice se reconstruye desde SQLite."""
+        from backend.place_catalog import PlaceCatalog
+
+        first = PlaceCatalog(str(tmp_path / "places.db"))
+        first.upsert_many([_place("a", 40.4170, -3.7038)])
+        first.close()
+        second = PlaceCatalog(str(tmp_path / "places.db"))
+
+        assert [p["place_id"] for p in second.nearby(40.4168, -3.7038, 200)] == ["a"]
+        second.close()
+
+
+class TestFindSearch:
+    """Tests para las búsquedas cubiertas."""
+
+    def test_contained_circle_is_answered(self, catalog):
+        """Verifica que un círculo dentro de uno ya buscado se responde."""
+        catalog.upsert_many([_place("a", 40.4170, -3.7038), _place("b", 40.4250, -3.7038)])
+        catalog.record_search("pizza", 40.4168, -3.7038, 2000, ["b", "a"])
+
+        places = catalog.find_search("pizza", 40.4170, -3.7040, 500, max_age=3600)
+
+        assert [p["place_id"] for p in places] == ["a"]
+
+    def test_uncovered_circle_returns_none(self, catalog):
+        """Verifica que un círculo que se sale del buscado no se responde."""
+        catalog.upsert_many([_place("a", 40.4170, -3.7038)])
+        catalog.record_search("pizza", 40.4168, -3.7038, 1000, ["a"])
+
+        assert catalog.find_search("pizza", 40.4168, -3.7038, 3000, max_age=3600) is None
+        assert catalog.find_search("sushi", 40.4168, -3.7038, 500, max_age=3600) is None
+
+
+class TestTextSearch:
+    """Tests para la búsqueda por texto (FTS5)."""
+
+    def test_variant_query_matches(self, catalog):
+        """Verifica que "pizzería" encuentra lo guardado como "pizza" y sin acentos."""
+        catalog.upsert_many(
+            [_place("p1", 40.4170, -3.7038, types=("pizza_restaurant",), name="Nápoles")],
+            keywords="pizza Navalcarnero",
+        )
+        catalog.upsert_many([_place("s1", 40.4171, -3.7038, name="Sushi Bar")], keywords="sushi")
+
+        places = catalog.text_search("pizzería napoles", 40.4168, -3.7038, 1000)
+
+        assert [p["place_id"] for p in places] == ["p1"]
+
+    def test_geographic_filter(self, catalog):
+        """Verifica que solo se devuelven lugares dentro del círculo."""
+        catalog.upsert_many([
+            _place("cerca", 40.4170, -3.7038, name="Pizzeria Cerca"),
+            _place("lejos", 40.4500, -3.7038, name="Pizzeria Lejos"),
+        ])
+
+        places = catalog.text_search("pizza", 40.4168, -3.7038, 1000)
+
+        assert [p["place_id"] for p in places] == ["cerca"]
+
+    def test_name_ranks_above_keywords(self, catalog):
+        """Verifica el orden BM25: coincidir en el nombre pesa más."""
+        catalog.upsert_many([_place("kw", 40.4170, -3.7038, name="Casa Pepe")], keywords="terraza")
+        catalog.upsert_many([_place("nombre", 40.4171, -3.7038, name="La Terraza")])
+
+        places = catalog.text_search("terraza", 40.4168, -3.7038, 1000)
+
+        assert [p["place_id"] for p in places] == ["nombre", "kw"]
+
+    def test_keywords_accumulate(self, catalog):
+        """Verifica que las palabras de búsquedas distintas se suman."""
+        place = _place("p1", 40.4170, -3.7038, name="Casa Pepe")
+        catalog.upsert_many([place], keywords="terraza")
+        catalog.upsert_many([place], keywords="tapas")
+
+        assert catalog.text_search("terraza tapas", 40.4168, -3.7038, 1000)
+
+    def test_stale_ids(self, catalog):
+        """Verifica qué lugares llevan tiempo sin actualizarse."""
+        catalog.upsert_many([_place("viejo", 40.4170, -3.7038)], updated_at=1000.0)
+        catalog.upsert_many([_place("nuevo", 40.4171, -3.7038)])
+
+        assert catalog.stale_ids(["viejo", "nuevo"], older_than=3600) == ["viejo"]
+
+    def test_covers_only_for_matching_queries(self, catalog):
+        """Verifica que una búsqueda cubre el círculo solo para las queries que acepta query_matches."""
+        catalog.record_search("sushi", 40.4168, -3.7038, 3000, [])
+
+        assert catalog.covers(40.4170, -3.7038, 500, 3600, query_matches=lambda key: key == "sushi")
+        assert not catalog.covers(40.4170, -3.7038, 500, 3600, query_matches=lambda key: key == "pizza")
+        assert not catalog.covers(40.4170, -3.7038, 500, 3600)
+
+    def test_covers_with_covered_cells(self, catalog):
+        """Verifica que covers() exige que todas las celdas del círculo estén cubiertas."""
+        from backend.place_catalog import covering_cells
+
+        catalog.record_cells(covering_cells(40.4168, -3.7038, 10))
+
+        assert catalog.covers(40.4168, -3.7038, 10, max_age=3600)
+        assert not catalog.covers(40.4168, -3.7038, 3000, max_age=3600)
+        assert not catalog.covers(40.4168, -3.7038, 10, max_age=-1)
+
+    def test_stale_ids_skip_imported_places(self, catalog):
+        """Verifica que los lugares importados no se refrescan con la API (ni tras reabrir)."""
+        imported = dict(_place("osm:node/1", 40.4170, -3.7038), source="import")
+        catalog.upsert_many([imported, _place("google", 40.4171, -3.7038)], updated_at=1000.0)
+
+        assert catalog.stale_ids(["osm:node/1", "google"], older_than=3600) == ["google"]
+        catalog.reload()
+        assert catalog.stale_ids(["osm:node/1", "google"], older_than=3600) == ["google"]
@@ -197,3 +197,55 @@ class TestSystemPromptContent:
         found_guardrails = sum(1 for kw in guardrail_keywords if kw.lower() in prompt_lower)
 
         assert found_guardrails >= 1, "El prompt debería contener guardrails"
+
+
+class TestPromptMessages:
+    """Tests para format_prompt_messages (caché de prefijo)."""
+
+    def test_returns_system_then_context(self):
+        """Verifica que devuelve SystemMessage estático y HumanMessage dinámico."""
+        from langchain_core.messages import SystemMessage, HumanMessage
+        from agent.prompts import format_prompt_messages
+
+        messages = format_prompt_messages(
+            conversation="Usuario: Pizza en Madrid",
+            knowledge="**Lugares encontrados:** La Trattoria",
+            last_observation="Encontré 3 restaurantes"
+        )
+
+        assert isinstance(messages[0], SystemMessage)
+        assert isinstance(messages[1], HumanMessage)
+        assert "Pizza en Madrid" in messages[1].content
+        assert "La Trattoria" in messages[1].content
+        assert "Pizza en Madrid" not in messages[0].content
+
+    def test_system_message_is_stable(self):
+        """Verifica que la parte estática es idéntica entre llamadas."""
+        from agent.prompts import format_prompt_messages
+
+        first = format_prompt_messages(conversation="Usuario: Hola")
+        second = format_prompt_messages(
+            conversation="Usuario: Otra cosa",
+            knowledge="Lugares: X",
+            last_observation="Algo"
+        )
+
+        assert first[0].content == second[0].content
+
+    def test_static_prompt_has_no_dynamic_data(self):
+        """Verifica que la fecha no está en la parte estática."""
+        from agent.prompts import format_prompt_messages
+
+        messages = format_prompt_messages(conversation="Usuario: Hola")
+
+        assert datetime.now().strftime("%Y-%m-%d") not in messages[0].content
+        assert datetime.now().strftime("%Y-%m-%d") in messages[1].content
+
+    def test_tools_mode_uses_function_calling_format(self):
+        """Verifica que el modo tools no pide el formato de texto."""
+        from agent.prompts import format_prompt_messages
+
+        messages = format_prompt_messages(conversation="Usuario: Hola", mode="tools")
+
+        assert "ACTION_INPUT: [JSON válido]" not in messages[0].content
+        assert "respond" in messages[0].content
@@ -0,0 +1,103 @@
+"""
+===========================================================
+TEST QUERY SIMILARITY - Tests para backend/query_similarity.py
+===========================================================
+
+Tests unitarios de la forma canónica y el índice MinHash/LSH.
+"""
+
+
+class TestCanonicalQuery:
+    """Tests de canonical_query."""
+
+    def test_accents_plurals_order_and_stop_words(self):
+        """Verifica que las variantes habituales dan la misma forma canónica."""
+        from backend.query_similarity import canonical_query
+
+        assert canonical_query("pizzerias en madrid") == canonical_query("Pizzería Madrid")
+        assert canonical_query("restaurantes veganos Malasaña") == canonical_query(
+            "Malasaña restaurante vegano"
+        )
+
+    def test_gender_and_proper_nouns_are_not_stemmed(self):
+        """Verifica que "lucio"/"lucia" y los nombres propios no se confunden."""
+        from backend.query_similarity import canonical_query
+
+        assert canonical_query("horario restaurante casa lucio") != canonical_query(
+            "horario restaurante casa lucia"
+        )
+        assert "lucios" in canonical_query("horario de Casa Lucios").split()
+
+    def test_negations_and_numbers_are_kept(self):
+        """Verifica que "sin" y los números no se descartan."""
+        from backend.query_similarity import canonical_query
+
+        assert "sin" in canonical_query("pizza sin gluten").split()
+        assert "15" in canonical_query("menu 15 euros").split()
+
+
+class TestSimilarQueries:
+    """Tests de similar_queries."""
+
+    def test_variants_and_typos_but_not_other_queries(self):
+        """Verifica variantes y erratas frente a consultas distintas."""
+        from backend.query_similarity import similar_queries
+
+        assert similar_queries("pizzerías en madrid", "Pizzería Madrid")
+        assert similar_queries("restaurante vegano", "resturante vegano")
+        assert not similar_queries("sushi", "pizza")
+        assert not similar_queries("madrid centro", "madrid norte")
+
+
+class TestQueryIndex:
+    """Tests de QueryIndex."""
+
+    def test_exact_and_similar_matches(self):
+        """Verifica la forma canónica y la similitud con erratas."""
+        from backend.query_similarity import QueryIndex
+
+        index = QueryIndex("test", threshold=0.7)
+        index.add("madrid", "restaurante vegano malasaña", "k1")
+
+        assert index.find("madrid", "restaurantes veganos en Malasaña") == "k1"
+        assert index.find("madrid", "resturante vegano malasaña") == "k1"
+        assert index.stats()["exact_hits"] == 1 and index.stats()["similar_hits"] == 1
+
+    def test_scope_and_guard_must_match(self):
+        """Verifica que otro scope, otra negación u otro número no coinciden."""
+        from backend.query_similarity import QueryIndex
+
+        index = QueryIndex("test", threshold=0.7)
+        index.add("madrid", "pizza con gluten", "k1")
+        index.add("madrid", "menu del dia 15 euros", "k2")
+
+        assert index.find("sevilla", "pizza con gluten") is None
+        assert index.find("madrid", "pizza sin gluten") is None
+        assert index.find("madrid", "menu del dia 20 euros") is None
+        assert index.find("madrid", "restaurante japones") is None
+
+    def test_different_distinctive_terms_never_match(self):
+        """Verifica que consultas con otras palabras distintivas no se reutilizan."""
+        from backend.query_similarity import QueryIndex
+
+        index = QueryIndex("test", threshold=0.5)
+        index.add("madrid", "mejores restaurantes celiacos baratos en madrid centro", "k1")
+        index.add("madrid", "horario restaurante casa lucio", "k2")
+        index.add("madrid", "Reservar en Casa Pepe", "k3")
+
+        assert index.find("madrid", "mejores restaurantes celiacos baratos en madrid norte") is None
+        assert index.find("madrid", "horario restaurante casa lucia") is None
+        assert index.find("madrid", "horario restaurante casa lucio abierto") is None
+        assert index.find("madrid", "Reservar en Casa Pipe") is None
+
+    def test_bounded_size(self):
+        """Verifica que se descartan las consultas más antiguas."""
+        from backend.query_similarity import QueryIndex
+
+        index = QueryIndex("test", maxsize=2)
+        for i, query in enumerate(["sushi", "ramen", "tapas"]):
+            index.add("madrid", query, f"k{i}")
+
+        assert len(index) == 2
+        assert index.find("madrid", "sushi") is None
+        assert index.find("madrid", "tapas") == "k2"
@@ -0,0 +1,136 @@
+"""
+===========================================================
+TEST SESSION STORE - Tests para agent/session_store.py
+===========================================================
+
+Tests unitarios para el almacenamiento de sesiones del agente.
+"""
+
+import pytest
+from unittest.mock import patch
+from langchain_core.messages import HumanMessage, AIMessage
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store_factory(request, tmp_path):
+    """Crea stores de ambos backends con TTL/tamaño configurables."""
+    from agent.session_store import InMemorySessionStore, SQLiteSessionStore
+
+    def factory(ttl_seconds=60, max_entries=10):
+        if request.param == "memory":
+            return InMemorySessionStore(ttl_seconds=ttl_seconds, max_entries=max_entries)
+        return SQLiteSessionStore(
+            path=str(tmp_path / "sessions.db"),
+            ttl_seconds=ttl_seconds,
+            max_entries=max_entries,
+        )
+
+    return factory
+
+
+class TestSessionStoreBackends:
+    """Tests comunes a los backends de sesión."""
+
+    def test_save_and_get(self, store_factory):
+        """Verifica que se recuperan los datos guardados."""
+        store = store_factory()
+
+        store.save("s1", {"knowledge": {"places": [{"name": "La Trattoria"}]}})
+
+        assert store.get("s1")["knowledge"]["places"][0]["name"] == "La Trattoria"
+
+    def test_returns_copies(self, store_factory):
+        """Verifica que modificar lo leído (o lo guardado) no cambia la sesión."""
+        store = store_factory()
+        data = {"knowledge": {"places": [{"name": "La Trattoria"}]}}
+        store.save("s1", data)
+
+        data["knowledge"]["places"].append({"name": "Otro"})
+        first = store.get("s1")
+        first["knowledge"]["places"].clear()
+        first["knowledge"]["booking"] = {"place_name": "X"}
+
+        assert store.get("s1") == {"knowledge": {"places": [{"name": "La Trattoria"}]}}
+
+    def test_get_unknown_returns_none(self, store_factory):
+        """Verifica que una sesión inexistente devuelve None."""
+        store = store_factory()
+
+        assert store.get("no-existe") is None
+
+    def test_expired_session_returns_none(self, store_factory):
+        """Verifica que las sesiones caducan tras el TTL."""
+        store = store_factory(ttl_seconds=10)
+
+        with patch("agent.session_store.time.time", return_value=1000.0):
+            store.save("s1", {"knowledge": {}})
+        with patch("agent.session_store.time.time", return_value=1011.0):
+            assert store.get("s1") is None
+
+    def test_lru_eviction(self, store_factory):
+        """Verifica que se desaloja la sesión menos usada."""
+        store = store_factory(max_entries=2)
+
+        with patch("agent.session_store.time.time", return_value=1000.0):
+            store.save("s1", {"n": 1})
+        with patch("agent.session_store.time.time", return_value=1001.0):
+            store.save("s2", {"n": 2})
+        with patch("agent.session_store.time.time", return_value=1002.0):
+            store.get("s1")  # s1 pasa a ser la más reciente
+        with patch("agent.session_store.time.time", return_value=1003.0):
+            store.save("s3", {"n": 3})
+            assert store.get("s2") is None
+            assert store.get("s1") == {"n": 1}
+            assert store.get("s3") == {"n": 3}
+
+    def test_delete(self, store_factory):
+        """Verifica que delete elimina la sesión."""
+        store = store_factory()
+
+        store.save("s1", {"n": 1})
+        store.delete("s1")
+
+        assert store.get("s1") is None
+
+
+class TestMergeHistory:
+    """Tests para merge_history y serialize_messages."""
+
+    def test_serialize_messages(self):
+        """Verifica la conversión de mensajes de LangChain a dicts."""
+        from agent.session_store import serialize_messages
+
+        result = serialize_messages([HumanMessage(content="Hola"), AIMessage(content="¡Hola!")])
+
+        assert result == [
+            {"role": "user", "content": "Hola"},
+            {"role": "assistant", "content": "¡Hola!"},
+        ]
+
+    def test_merge_appends_new_messages(self):
+        """Verifica que los mensajes nuevos se añaden al historial guardado."""
+        from agent.session_store import merge_history
+
+        stored = [
+            {"role": "user", "content": "Pizza en Madrid"},
+            {"role": "assistant", "content": "He encontrado 3 pizzerías"},
+        ]
+
+        result = merge_history(stored, [{"role": "user", "content": "Reserva la primera"}])
+
+        assert len(result) == 3
+        assert result[-1]["content"] == "Reserva la primera"
+
+    def test_merge_accepts_full_history(self):
+        """Verifica que un historial completo reenviado no se duplica."""
+        from agent.session_store import merge_history
+
+        stored = [
+            {"role": "user", "content": "Pizza en Madrid"},
+            {"role": "assistant", "content": "He encontrado 3 pizzerías"},
+        ]
+        incoming = stored + [{"role": "user", "content": "Reserva la primera"}]
+
+        result = merge_history(stored, incoming)
+
+        assert result == incoming
@@ -7,10 +7,21 @@ Tests unitarios para las herramientas del agente.
 """
 
 import pytest
-from unittest.mock import Mock, patch, MagicMock
+import asyncio
+from unittest.mock import Mock, patch, MagicMock, AsyncMock
 import os
 
 
+@pytest.fixture
+def tool_context():
+    """Contexto de herramientas aislado (sustituye al contexto por defecto)."""
+    from agent.tools import ToolContext
+
+    context = ToolContext()
+    with patch("agent.tools._default_context", context):
+        yield context
+
+
 class TestExecuteTool:
     """Tests para la función execute_tool."""
 
@@ -54,6 +65,34 @@ class TestExecuteTool:
         assert "Error de conexión" in result
 
 
+class TestAexecuteTool:
+    """Tests para la función aexecute_tool."""
+
+    def test_aexecute_tool_unknown_tool_returns_error(self):
+        """Verifica que retorna error para herramienta desconocida."""
+        from agent.tools import aexecute_tool
+
+        result = asyncio.run(aexecute_tool("herramienta_inexistente", {}))
+
+        assert "ERROR" in result
+        assert "no existe" in result
+
+    @patch("agent.tools.TOOLS_MAP")
+    def test_aexecute_tool_awaits_ainvoke(self, mock_tools_map):
+        """Verifica que usa ainvoke de la herramienta."""
+        from agent.tools import aexecute_tool
+
+        mock_tool = Mock()
+        mock_tool.ainvoke = AsyncMock(return_value="Resultado async")
+        mock_tools_map.__contains__ = Mock(return_value=True)
+        mock_tools_map.__getitem__ = Mock(return_value=mock_tool)
+
+        result = asyncio.run(aexecute_tool("web_search", {"query": "test"}))
+
+        mock_tool.ainvoke.assert_awaited_once_with({"query": "test"})
+        assert result == "Resultado async"
+
+
 class TestSearchResultsCache:
     """Tests para las funciones de caché de resultados."""
 
@@ -66,13 +105,12 @@ class TestSearchResultsCache:
 
         assert result == []
 
-    def test_clear_search_results(self):
+    def test_clear_search_results(self, tool_context):
         """Verifica que limpia los resultados de búsqueda."""
-        from agent.tools import _search_results, clear_search_results, get_search_results
-        import agent.tools as tools_module
+        from agent.tools import clear_search_results, get_search_results
 
         # Simular que hay resultados
-        tools_module._search_results = [{"name": "Test"}]
+        tool_context.search_results = [{"name": "Test"}]
 
         clear_search_results()
         result = get_search_results()
@@ -80,6 +118,71 @@ class TestSearchResultsCache:
         assert result == []
 
 
+class TestToolContext:
+    """Tests para el contexto de herramientas por sesión."""
+
+    def test_execute_tool_uses_given_context(self):
+        """Verifica que las tools trabajan sobre el contexto de la sesión."""
+        from agent.tools import ToolContext, execute_tool, get_search_results
+
+        context_a = ToolContext(search_results=[{"name": "La Trattoria", "place_id": "a"}])
+        context_b = ToolContext()
+
+        result_a = execute_tool("make_booking", {
+            "place_name": "La Trattoria", "date": "2026-01-20", "time": "21:00"
+        }, context=context_a)
+        result_b = execute_tool("make_booking", {
+            "place_name": "La Trattoria", "date": "2026-01-20", "time": "21:00"
+        }, context=context_b)
+
+        assert "No encontré" not in result_a
+        assert "No encontré" in result_b
+        assert get_search_results(context_b) == []
+
+    def test_maps_search_writes_to_session_context(self, tool_context, mock_env_vars):
+        """Verifica que maps_search no toca el contexto de otras sesiones."""
+        from agent.tools import ToolContext, execute_tool
+
+        context = ToolContext()
+
+        with patch("agent.tools.places_text_search", return_value=[{"name": "Napoli"}]):
+            execute_tool("maps_search", {"query": "pizza", "location": "Madrid"}, context=context)
+
+        assert context.search_results == [{"name": "Napoli"}]
+        assert tool_context.search_results == []
+
+    def test_context_restores_booking_api_cache(self):
+        """Verifica que el contexto retoma has_api de check_availability."""
+        from agent.tools import ToolContext
+
+        context = ToolContext(search_results=[
+            {"name": "La Trattoria", "place_id": "p1", "has_api": True}
+        ])
+
+        assert context.booking_system._api_cache == {"p1": True}
+
+    def test_aexecute_tool_isolates_concurrent_contexts(self, mock_env_vars):
+        """Verifica que dos conversaciones concurrentes no se pisan."""
+        from agent.tools import ToolContext, aexecute_tool
+
+        def fake_search(payload):
+            return [{"name": f"Lugar {payload.location}"}]
+
+        context_a, context_b = ToolContext(), ToolContext()
+
+        async def run_both():
+            await asyncio.gather(
+                aexecute_tool("maps_search", {"query": "pizza", "location": "A"}, context=context_a),
+                aexecute_tool("maps_search", {"query": "pizza", "location": "B"}, context=context_b),
+            )
+
+        with patch("agent.tools.places_text_search", side_effect=fake_search):
+            asyncio.run(run_both())
+
+        assert context_a.search_results == [{"name": "Lugar A"}]
+        assert context_b.search_results == [{"name": "Lugar B"}]
+
+
 class TestMockBookingSystem:
     """Tests para MockBookingSystem."""
 
@@ -216,6 +319,83 @@ class TestWebSearch:
         assert "No encontré" in result
 
 
+    @patch("agent.tools.AsyncTavilyClient")
+    def test_web_search_async_uses_async_client(self, mock_async_client, mock_env_vars):
+        """Verifica que ainvoke usa el cliente async de Tavily."""
+        from agent.tools import web_search
+
+        mock_client = Mock()
+        mock_client.search = AsyncMock(return_value={
+            "answer": "",
+            "results": [{"title": "Guía", "content": "Restaurantes..."}]
+        })
+        mock_async_client.return_value = mock_client
+
+        result = asyncio.run(web_search.ainvoke({"query": "restaurantes Madrid"}))
+
+        mock_client.search.assert_awaited_once()
+        assert "Guía" in result
+
+
+    @patch("agent.tools.TavilyClient")
+    def test_web_search_cache_and_client_reuse(self, mock_tavily_client, mock_env_vars):
+        """Verifica que una query equivalente sale de caché y el cliente se reutiliza."""
+        from agent.tools import _web_search_cache, web_search
+
+        mock_client = Mock()
+        mock_client.api_key = os.environ["TAVILY_API_KEY"]
+        mock_client.search.return_value = {
+            "answer": "",
+            "results": [{"title": "Sin gluten", "content": "Restaurantes..."}],
+        }
+        mock_tavily_client.return_value = mock_client
+
+        first = web_search.invoke({"query": "Mejores restaurantes celíacos Madrid"})
+        second = web_search.invoke({"query": "mejores restaurantes celiacos  madrid?"})
+        web_search.invoke({"query": "terrazas Madrid"})
+
+        assert first == second
+        assert mock_client.search.call_count == 2
+        assert mock_tavily_client.call_count == 1
+        stats = _web_search_cache().stats()
+        assert stats["hits"] == 1 and stats["api_calls"] == 2
+        assert "api_ms_total" in stats
+
+    @patch("agent.tools.TavilyClient")
+    def test_web_search_near_duplicate_query(self, mock_tavily_client, mock_env_vars):
+        """Verifica que una variante con otro orden y plurales sale de caché."""
+        from agent.tools import _web_search_cache, web_search
+
+        mock_client = Mock()
+        mock_client.search.return_value = {
+            "answer": "",
+            "results": [{"title": "Sin gluten", "content": "Restaurantes..."}],
+        }
+        mock_tavily_client.return_value = mock_client
+
+        web_search.invoke({"query": "restaurantes celiacos en Madrid"})
+        result = web_search.invoke({"query": "Madrid restaurante celíaco"})
+
+        assert mock_client.search.call_count == 1
+        assert "Sin gluten" in result
+        assert _web_search_cache().stats()["similar_hits"] == 1
+
+    @patch("agent.tools.TavilyClient")
+    def test_web_search_fast_mode(self, mock_tavily_client, mock_env_vars):
+        """Verifica que el modo rápido pide menos resultados y sin resumen."""
+        from agent.tools import WEB_SEARCH_FAST_MAX_RESULTS, web_search
+
+        mock_client = Mock()
+        mock_client.search.return_value = {"answer": "", "results": [{"title": "A", "content": "b"}]}
+        mock_tavily_client.return_value = mock_client
+
+        web_search.invoke({"query": "horario museo", "fast": True})
+
+        kwargs = mock_client.search.call_args.kwargs
+        assert kwargs["include_answer"] is False
+        assert kwargs["max_results"] == WEB_SEARCH_FAST_MAX_RESULTS
+
+
 class TestMapsSearch:
     """Tests para la herramienta maps_search."""
 
@@ -292,14 +472,16 @@ class TestCheckAvailability:
         assert "ERROR" in result
         assert "maps_search" in result
 
-    @patch("agent.tools._booking_system")
-    def test_check_availability_with_results(self, mock_booking_system, mock_env_vars):
+    def test_check_availability_with_results(self, tool_context, mock_env_vars):
         """Verifica disponibilidad con resultados previos."""
         from agent.tools import check_availability
-        import agent.tools as tools_module
+
+        context = tool_context
+        mock_booking_system = Mock()
+        context.booking_system = mock_booking_system
 
         # Simular resultados de búsqueda
-        tools_module._search_results = [
+        context.search_results = [
             {
                 "name": "La Trattoria",
                 "place_id": "place123",
@@ -342,14 +524,16 @@ class TestMakeBooking:
         assert "ERROR" in result
         assert "No encontré" in result
 
-    @patch("agent.tools._booking_system")
-    def test_make_booking_success(self, mock_booking_system, mock_env_vars):
+    def test_make_booking_success(self, tool_context, mock_env_vars):
         """Verifica reserva exitosa."""
         from agent.tools import make_booking
-        import agent.tools as tools_module
+
+        context = tool_context
+        mock_booking_system = Mock()
+        context.booking_system = mock_booking_system
 
         # Simular resultados de búsqueda
-        tools_module._search_results = [
+        context.search_results = [
             {
                 "name": "La Trattoria",
                 "place_id": "place123",
@@ -378,13 +562,15 @@ class TestMakeBooking:
         assert "confirmada" in result
         assert "RES-123" in result
 
-    @patch("agent.tools._booking_system")
-    def test_make_booking_failure_offers_phone(self, mock_booking_system, mock_env_vars):
+    def test_make_booking_failure_offers_phone(self, tool_context, mock_env_vars):
         """Verifica que ofrece teléfono cuando falla la reserva."""
         from agent.tools import make_booking
-        import agent.tools as tools_module
 
-        tools_module._search_results = [
+        context = tool_context
+        mock_booking_system = Mock()
+        context.booking_system = mock_booking_system
+
+        context.search_results = [
             {
                 "name": "La Trattoria",
                 "place_id": "place123",
@@ -411,13 +597,13 @@ class TestMakeBooking:
 class TestPhoneCall:
     """Tests para la herramienta phone_call."""
 
-    @patch("agent.tools.requests.get")
+    @patch("agent.tools.http_client.get")
     def test_phone_call_service_unavailable(self, mock_get, mock_env_vars):
         """Verifica error cuando el servicio no está disponible."""
-        import requests
+        import httpx
         from agent.tools import phone_call
 
-        mock_get.side_effect = requests.exceptions.ConnectionError("Connection refused")
+        mock_get.side_effect = httpx.ConnectError("Connection refused")
 
         result = phone_call.invoke({
             "phone_number": "+34912345678",
@@ -426,8 +612,24 @@ class TestPhoneCall:
 
         assert "ERROR" in result
 
-    @patch("agent.tools.requests.post")
-    @patch("agent.tools.requests.get")
+    @patch("agent.tools.http_client.aget", new_callable=AsyncMock)
+    def test_async_phone_call_service_unavailable(self, mock_aget, mock_env_vars):
+        """Verifica que la versión async usa el cliente compartido."""
+        import httpx
+        from agent.tools import phone_call
+
+        mock_aget.side_effect = httpx.ConnectError("Connection refused")
+
+        result = asyncio.run(phone_call.ainvoke({
+            "phone_number": "+34912345678",
+            "mission": "Reservar mesa",
+        }))
+
+        assert "ERROR" in result
+        assert mock_aget.call_args.kwargs["service"] == "call_service"
+
+    @patch("agent.tools.http_client.post")
+    @patch("agent.tools.http_client.get")
     def test_phone_call_initiates_call(self, mock_get, mock_post, mock_env_vars):
         """Verifica que se inicia la llamada correctamente."""
         from agent.tools import phone_call
@@ -464,3 +666,36 @@ class TestPhoneCall:
         })
 
         assert "COMPLETADA" in result or "ERROR" not in result
+        assert "/call-wait/call123" in mock_get.call_args.args[0]
+        assert mock_get.call_args.kwargs["params"]["timeout"] > 0
+
+    def test_call_wait_args_never_ask_for_zero_timeout(self):
+        """Verifica que el último segundo antes del límite no pide timeout=0."""
+        from agent.tools import CALL_WAIT_TIMEOUT, _call_wait_args
+
+        assert _call_wait_args(0.4)["params"]["timeout"] == 1
+        assert _call_wait_args(2.2)["params"]["timeout"] == 3
+        assert _call_wait_args(1000)["params"]["timeout"] == CALL_WAIT_TIMEOUT
+
+    @patch("agent.tools.time_module.sleep")
+    @patch("agent.tools.http_client.post")
+    @patch("agent.tools.http_client.get")
+    def test_phone_call_repeats_long_poll_without_sleeping(
+        self, mock_get, mock_post, mock_sleep, mock_env_vars
+    ):
+        """Verifica que una llamada en curso repite el long-poll sin pausas."""
+        from agent.tools import phone_call
+
+        mock_post.return_value = Mock(status_code=200, json=Mock(return_value={"call_id": "c1"}))
+        in_progress = Mock(status_code=200, json=Mock(return_value={"status": "in_progress"}))
+        failed = Mock(
+            status_code=200,
+            json=Mock(return_value={"status": "failed", "result": {"outcome": "No contestaron"}}),
+        )
+        mock_get.side_effect = [Mock(status_code=200), in_progress, in_progress, failed]
+
+        result = phone_call.invoke({"phone_number": "+34912345678", "mission": "Reservar"})
+
+        assert "No contestaron" in result
+        assert mock_get.call_count == 4
+        mock_sleep.assert_not_called()
@@ -0,0 +1,175 @@
+"""
+===========================================================
+TEST TRAVEL TIME - Tests para backend/travel_time.py
+===========================================================
+
+Tests unitarios del motor de tiempos de viaje (Distance Matrix mockeada).
+"""
+
+import pytest
+from unittest.mock import Mock, patch
+
+ORIGIN = "40.4168,-3.7038"  # Puerta del Sol
+
+
+def _matrix_response(seconds):
+    """Respuesta de Distance Matrix con una duración por destino."""
+    return Mock(
+        status_code=200,
+        json=Mock(return_value={
+            "status": "OK",
+            "rows": [{
+                "elements": [
+                    {"status": "OK", "duration": {"value": s}} if s is not None
+                    else {"status": "ZERO_RESULTS"}
+                    for s in seconds
+                ]
+            }],
+        }),
+        raise_for_status=Mock(),
+    )
+
+
+class TestGeometry:
+    """Tests de haversine y alcance por modo."""
+
+    def test_haversine_known_distance(self):
+        """Verifica Sol -> Retiro (~1,6 km)."""
+        from backend.travel_time import haversine_km
+
+        distance = haversine_km((40.4168, -3.7038), (40.4153, -3.6845))
+
+        assert 1.5 < distance < 1.8
+
+    def test_max_reach_by_mode(self):
+        """Verifica que conducir alcanza más que andar."""
+        from backend.travel_time import max_reach_km
+
+        assert max_reach_km(15, "driving") > max_reach_km(15, "walking")
+
+
+class TestWithinTravelTime:
+    """Tests para within_travel_time."""
+
+    @patch("backend.travel_time.http_client.get")
+    def test_prefilter_skips_far_destinations(self, mock_get):
+        """Verifica que un destino lejano se descarta sin llamar a la API."""
+        from backend.travel_time import within_travel_time
+
+        mock_get.return_value = _matrix_response([300])
+
+        result = within_travel_time(ORIGIN, ["40.418,-3.705", "41.3851,2.1734"], 15, "walking")
+
+        assert result == [True, False]
+        params = mock_get.call_args.kwargs["params"]
+        assert params["destinations"] == "40.418,-3.705"
+
+    @patch("backend.travel_time.http_client.get")
+    def test_missing_coordinates_are_dropped(self, mock_get):
+        """Verifica que un destino sin coordenadas da False."""
+        from backend.travel_time import within_travel_time
+
+        mock_get.return_value = _matrix_response([300])
+
+        assert within_travel_time(ORIGIN, [None, "40.418,-3.705"], 15) == [False, True]
+
+    @patch("backend.travel_time.http_client.get")
+    def test_durations_are_cached(self, mock_get):
+        """Verifica que la segunda consulta no llama a la API."""
+        from backend.travel_time import within_travel_time
+
+        mock_get.return_value = _matrix_response([300, None])
+        destinations = ["40.418,-3.705", "40.419,-3.708"]
+
+        first = within_travel_time(ORIGIN, destinations, 15)
+        second = within_travel_time(ORIGIN, destinations, 15)
+
+        assert first == second == [True, False]
+        assert mock_get.call_count == 1
+
+    @patch("backend.travel_time.http_client.get")
+    def test_destinations_are_chunked(self, mock_get):
+        """Verifica que más de 25 destinos se reparten en varias peticiones."""
+        from backend.travel_time import within_travel_time
+
+        destinations = [f"40.41{i:02d},-3.7038" for i in range(30)]
+        mock_get.side_effect = lambda url, service, params, **kwargs: _matrix_response(
+            [60] * len(params["destinations"].split("|"))
+        )
+
+        result = within_travel_time(ORIGIN, destinations, 60, "driving")
+
+        assert result == [True] * 30
+        sizes = sorted(
+            len(call.kwargs["params"]["destinations"].split("|"))
+            for call in mock_get.call_args_list
+        )
+        assert sizes == [5, 25]
+
+    @patch("backend.travel_time.http_client.get")
+    def test_api_error_status_raises(self, mock_get):
+        """Verifica que OVER_QUERY_LIMIT no se confunde con 'sin ruta'."""
+        from backend.travel_time import within_travel_time
+
+        mock_get.return_value = Mock(
+            json=Mock(return_value={"status": "OVER_QUERY_LIMIT"}),
+            raise_for_status=Mock(),
+        )
+
+        with pytest.raises(RuntimeError):
+            within_travel_time(ORIGIN, ["40.418,-3.705"], 15, strategy="api")
+
+
+class TestEstimateStrategy:
+    """Tests para la estimación local y el modo auto."""
+
+    def test_estimate_durations(self):
+        """Verifica la estimación: ~0,3 km a pie con rodeo ≈ 5 min."""
+        from backend.travel_time import estimate_durations
+
+        durations = estimate_durations(ORIGIN, ["40.4195,-3.7038", None], "walking")
+
+        assert 240 < durations[0] < 360
+        assert durations[1] is None
+
+    @patch("backend.travel_time.http_client.get")
+    def test_estimate_strategy_skips_api(self, mock_get):
+        """Verifica que strategy="estimate" no hace ninguna petición."""
+        from backend.travel_time import within_travel_time
+
+        result = within_travel_time(
+            ORIGIN, ["40.4195,-3.7038", "40.4250,-3.7038"], 10, "walking", strategy="estimate"
+        )
+
+        assert result == [True, False]
+        mock_get.assert_not_called()
+
+    @patch("backend.travel_time.http_client.get")
+    def test_auto_falls_back_on_timeout(self, mock_get):
+        """Verifica que en modo auto un timeout estima y activa el enfriamiento."""
+        import httpx
+        from backend.travel_time import within_travel_time
+        from backend.cache import cache_stats
+
+        mock_get.side_effect = httpx.ReadTimeout("timeout")
+
+        first = within_travel_time(ORIGIN, ["40.4195,-3.7038"], 10, strategy="auto")
+        second = within_travel_time(ORIGIN, ["40.4195,-3.7038"], 10, strategy="auto")
+
+        assert first == second == [True]
+        assert mock_get.call_count == 1  # la segunda ya no espera a la API
+        assert cache_stats()["travel_time"]["fallbacks"] == 2
+
+    @patch("backend.travel_time.DISTANCE_MATRIX_MAX_CALLS_PER_MIN", 1)
+    @patch("backend.travel_time.http_client.get")
+    def test_auto_respects_call_budget(self, mock_get):
+        """Verifica que agotado el presupuesto por minuto se estima."""
+        from backend.travel_time import within_travel_time
+
+        mock_get.return_value = _matrix_response([300])
+
+        within_travel_time(ORIGIN, ["40.418,-3.705"], 15, strategy="auto")
+        result = within_travel_time(ORIGIN, ["40.4195,-3.7038"], 15, strategy="auto")
+
+        assert result == [True]
+        assert mock_get.call_count == 1